@@ -0,0 +1,72 @@
+"""
+Add keyset pagination indexes and per-user session counters
+
+Revision ID: 20261017_session_keyset_pagination
+Revises: 20251020_add_conversation_state_flow_context
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_session_keyset_pagination'
+down_revision = '20251020_add_conversation_state_flow_context'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite indexes matching ORDER BY last_message_at DESC NULLS LAST, id DESC
+    op.create_index(
+        'ix_chat_sessions_user_status_recent', 'chat_sessions',
+        ['user_id', 'status', sa.text('last_message_at DESC NULLS LAST'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_chat_sessions_user_status_category_recent', 'chat_sessions',
+        ['user_id', 'status', 'category', sa.text('last_message_at DESC NULLS LAST'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_chat_sessions_user_updated', 'chat_sessions',
+        ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+    # Per-user session counters (category '' = all categories)
+    op.create_table(
+        'user_session_counters',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False, server_default=''),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('user_id', 'status', 'category')
+    )
+
+    # Backfill from existing sessions
+    op.execute(
+        """
+        INSERT INTO user_session_counters (user_id, status, category, count, updated_at)
+        SELECT user_id, status, '', COUNT(*), NOW()
+        FROM chat_sessions
+        WHERE status IS NOT NULL
+        GROUP BY user_id, status
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_session_counters (user_id, status, category, count, updated_at)
+        SELECT user_id, status, category, COUNT(*), NOW()
+        FROM chat_sessions
+        WHERE status IS NOT NULL AND category IS NOT NULL AND category <> ''
+        GROUP BY user_id, status, category
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('user_session_counters')
+    op.drop_index('ix_chat_sessions_user_updated', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_user_status_category_recent', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_user_status_recent', table_name='chat_sessions')
@@ -43,6 +43,11 @@ class Settings(BaseSettings):
     # Neon PostgreSQL (Primary)
     DATABASE_URL: str = Field(default="sqlite:///sql_app.db")
     DATABASE_URL_UNPOOLED: str = Field(default="")
+    # Connection pool (async engine; per process)
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    DB_POOL_TIMEOUT: float = Field(default=30.0)
+    DB_POOL_RECYCLE: int = Field(default=300)
     PGHOST: str = Field(default="")
     PGHOST_UNPOOLED: str = Field(default="")
     PGUSER: str = Field(default="")
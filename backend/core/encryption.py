@@ -0,0 +1,163 @@
+"""
+Field Encryption Service
+
+Enkripsi isi pesan chat (dan field sensitif lain) dengan Fernet:
+1. Key ring dibangun sekali per proses (MultiFernet) - bukan decode key +
+   konstruksi Fernet di setiap pesan
+2. Rotasi key: ENCRYPTION_KEY berisi daftar key dipisah koma, key pertama
+   dipakai untuk enkripsi, semua key dicoba saat dekripsi; rotate()
+   meng-enkripsi ulang token lama dengan key pertama
+3. Bulk decrypt: decrypt_many() untuk satu halaman history sekaligus, dan
+   decrypt_many_async() yang memindahkan batch besar ke thread pool agar
+   event loop tidak terblokir
+
+Jika ENCRYPTION_KEY tidak di-set (development), satu key acak dibuat per
+proses sehingga data tetap bisa dibaca selama proses hidup; di production
+ENCRYPTION_KEY wajib di-set.
+"""
+
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import threading
+from typing import Iterable, List, Optional, Sequence, Union
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+logger = logging.getLogger(__name__)
+
+# Batch dengan jumlah token di atas ini didekripsi di thread pool
+BULK_DECRYPT_THREAD_THRESHOLD = int(os.getenv("BULK_DECRYPT_THREAD_THRESHOLD", "100"))
+
+
+class EncryptionConfigError(Exception):
+    """ENCRYPTION_KEY tidak valid atau tidak di-set di production"""
+
+
+def _load_fernet(key: Union[str, bytes]) -> Fernet:
+    """
+    Fernet dari satu key
+
+    Menerima key Fernet standar (urlsafe base64 dari 32 byte) dan format
+    lama yang di-base64 sekali lagi (kompatibel dengan data yang sudah ada).
+    """
+    key = key.strip() if isinstance(key, str) else key
+    try:
+        return Fernet(key)
+    except (ValueError, binascii.Error):
+        pass
+    try:
+        return Fernet(base64.urlsafe_b64decode(key))
+    except (ValueError, binascii.Error) as e:
+        raise EncryptionConfigError("ENCRYPTION_KEY must be a Fernet key (32 url-safe base64-encoded bytes)") from e
+
+
+class EncryptionService:
+    """
+    Key ring Fernet untuk enkripsi field
+
+    Args:
+        keys: Key Fernet, terbaru dulu (key pertama untuk enkripsi)
+        thread_threshold: Batas ukuran batch sebelum decrypt di thread pool
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Union[str, bytes]],
+        thread_threshold: int = BULK_DECRYPT_THREAD_THRESHOLD
+    ):
+        if not keys:
+            raise EncryptionConfigError("At least one encryption key is required")
+        self._ring = MultiFernet([_load_fernet(key) for key in keys])
+        self.key_count = len(keys)
+        self.thread_threshold = thread_threshold
+
+    def encrypt(self, text: str) -> str:
+        """Enkripsi text dengan key utama"""
+        return self._ring.encrypt(text.encode()).decode()
+
+    def decrypt(self, token: str) -> str:
+        """
+        Dekripsi token (dicoba dengan semua key di ring)
+
+        Raises:
+            InvalidToken: Token rusak atau dienkripsi dengan key yang tidak dikenal
+        """
+        return self._ring.decrypt(token.encode()).decode()
+
+    def rotate(self, token: str) -> str:
+        """Enkripsi ulang token dengan key utama (untuk migrasi rotasi key)"""
+        return self._ring.rotate(token.encode()).decode()
+
+    def decrypt_many(self, tokens: Iterable[Optional[str]], default: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Dekripsi banyak token sekaligus
+
+        Args:
+            tokens: Token terenkripsi (None dilewati)
+            default: Nilai untuk token yang gagal didekripsi
+
+        Returns:
+            Plaintext dengan urutan yang sama dengan tokens
+        """
+        decrypt = self._ring.decrypt
+        results: List[Optional[str]] = []
+        failures = 0
+        for token in tokens:
+            if token is None:
+                results.append(None)
+                continue
+            try:
+                results.append(decrypt(token.encode()).decode())
+            except (InvalidToken, UnicodeDecodeError):
+                failures += 1
+                results.append(default)
+        if failures:
+            logger.error(f"Failed to decrypt {failures} value(s) in batch")
+        return results
+
+    async def decrypt_many_async(
+        self,
+        tokens: Sequence[Optional[str]],
+        default: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """decrypt_many; batch besar dikerjakan di thread pool"""
+        if len(tokens) <= self.thread_threshold:
+            return self.decrypt_many(tokens, default)
+        return await asyncio.to_thread(self.decrypt_many, list(tokens), default)
+
+
+def load_keys_from_env() -> List[str]:
+    """
+    Key dari ENCRYPTION_KEY ("key_baru,key_lama,...")
+
+    Tanpa ENCRYPTION_KEY: satu key acak per proses (development saja).
+    """
+    raw = os.getenv("ENCRYPTION_KEY", "")
+    keys = [key.strip() for key in raw.split(",") if key.strip()]
+    if keys:
+        return keys
+
+    if os.getenv("ENVIRONMENT", "development").lower() == "production":
+        raise EncryptionConfigError("ENCRYPTION_KEY must be set in production")
+    logger.warning(
+        "⚠️ ENCRYPTION_KEY not set - using a per-process generated key. "
+        "Encrypted data will be unreadable after restart."
+    )
+    return [Fernet.generate_key().decode()]
+
+
+_encryption_service: Optional[EncryptionService] = None
+_service_lock = threading.Lock()
+
+
+def get_encryption_service() -> EncryptionService:
+    """Get or create the process-wide encryption service"""
+    global _encryption_service
+    if _encryption_service is None:
+        with _service_lock:
+            if _encryption_service is None:
+                _encryption_service = EncryptionService(load_keys_from_env())
+    return _encryption_service
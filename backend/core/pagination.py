@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) Pagination
+
+Listing sesi diurutkan terbaru dulu pada (sort_value, id):
+1. Cursor opaque - base64url dari posisi item terakhir di halaman
+   sebelumnya, klien cukup mengirimkannya kembali apa adanya
+2. Halaman berikutnya diambil dengan WHERE (sort_value, id) < cursor,
+   bukan OFFSET, sehingga biaya query tidak bergantung pada kedalaman
+   halaman (didukung index komposit dengan urutan yang sama)
+3. sort_value boleh NULL (mis. sesi tanpa pesan) - baris NULL diletakkan
+   paling akhir (DESC NULLS LAST)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+# Batas ukuran halaman untuk endpoint listing
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """Cursor tidak bisa di-decode (rusak atau bukan buatan server)"""
+
+
+class KeysetCursor(NamedTuple):
+    """Posisi item terakhir yang sudah dikirim ke klien"""
+    sort_value: Optional[datetime]
+    last_id: str
+
+
+def encode_cursor(sort_value: Optional[datetime], last_id: Any) -> str:
+    """
+    Encode posisi (sort_value, id) menjadi cursor opaque
+
+    Args:
+        sort_value: Nilai kolom urutan item terakhir (boleh None)
+        last_id: ID item terakhir (tie-breaker)
+
+    Returns:
+        String base64url tanpa padding
+    """
+    payload = {"v": sort_value.isoformat() if sort_value else None, "id": str(last_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> KeysetCursor:
+    """
+    Decode cursor dari encode_cursor()
+
+    Raises:
+        InvalidCursorError: Cursor rusak
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        sort_value = payload["v"]
+        last_id = payload["id"]
+        if not isinstance(last_id, str) or not last_id:
+            raise ValueError("cursor id must be a non-empty string")
+        return KeysetCursor(
+            sort_value=datetime.fromisoformat(sort_value) if sort_value is not None else None,
+            last_id=last_id
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def keyset_order(sort_column, id_column) -> Tuple[Any, Any]:
+    """ORDER BY untuk keyset: sort_value DESC NULLS LAST, id DESC"""
+    return sort_column.desc().nullslast(), id_column.desc()
+
+
+def keyset_after(sort_column, id_column, sort_value: Optional[datetime], last_id: Any):
+    """
+    Kondisi WHERE untuk baris setelah cursor (urutan keyset_order)
+
+    Args:
+        sort_column: Kolom urutan (nullable)
+        id_column: Kolom tie-breaker unik
+        sort_value: sort_value dari cursor
+        last_id: ID dari cursor, sudah dikonversi ke tipe kolom
+
+    Returns:
+        Ekspresi SQLAlchemy
+    """
+    if sort_value is None:
+        # Sudah di blok NULL: lanjut dengan id yang lebih kecil
+        return and_(sort_column.is_(None), id_column < last_id)
+    return or_(
+        sort_column < sort_value,
+        and_(sort_column == sort_value, id_column < last_id),
+        sort_column.is_(None)
+    )
+
+
+def split_page(rows: Sequence[Any], limit: int, sort_attr: str, id_attr: str = "id") -> Tuple[List[Any], Optional[str]]:
+    """
+    Potong hasil query (diambil limit + 1) menjadi halaman + next cursor
+
+    Args:
+        rows: Baris hasil query dengan LIMIT limit + 1
+        limit: Ukuran halaman
+        sort_attr: Nama atribut/key nilai urutan
+        id_attr: Nama atribut/key ID
+
+    Returns:
+        (items, next_cursor) - next_cursor None jika tidak ada halaman berikutnya
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    if isinstance(last, dict):
+        return items, encode_cursor(last.get(sort_attr), last[id_attr])
+    return items, encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
@@ -0,0 +1,299 @@
+"""
+Clerk Token Verification Cache
+
+Fast path autentikasi:
+1. JWKSCache - signing keys Clerk di-cache per kid, di-refresh di background
+   sebelum TTL habis; kid yang belum dikenal memicu refetch (dibatasi
+   min interval agar token sampah tidak membanjiri Clerk)
+2. VerifiedTokenCache - LRU claims token yang sudah diverifikasi, key = hash
+   token, berlaku sampai claim exp
+3. Request principal - claims disimpan di request.state sehingga rate
+   limiter middleware dan dependency auth memverifikasi token sekali saja
+4. LastLoginThrottle - last_login_at ditulis maksimal sekali per interval
+   per user, bukan di setiap request
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import jwt
+from jwt import PyJWK, PyJWKClient, PyJWKSet
+
+logger = logging.getLogger(__name__)
+
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL", "https://api.clerk.com/v1/jwks")
+CLERK_JWKS_TTL_SECONDS = float(os.getenv("CLERK_JWKS_TTL_SECONDS", "3600"))
+CLERK_JWKS_MIN_REFETCH_SECONDS = float(os.getenv("CLERK_JWKS_MIN_REFETCH_SECONDS", "30"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_LAST_LOGIN_INTERVAL_SECONDS = float(os.getenv("AUTH_LAST_LOGIN_INTERVAL_SECONDS", "300"))
+
+# Refresh di background setelah umur JWKS melewati fraksi TTL ini
+JWKS_REFRESH_AHEAD = 0.8
+
+CLERK_ALGORITHMS = ["RS256"]
+
+
+class JWKSCache:
+    """
+    Cache signing keys (kid -> PyJWK)
+
+    Args:
+        url: JWKS endpoint
+        ttl: Umur maksimal key set sebelum refresh sinkron (detik)
+        min_refetch_interval: Jeda minimal antar fetch karena kid miss
+        fetcher: Callable yang mengembalikan JWKS dict (default: HTTP GET)
+    """
+
+    def __init__(
+        self,
+        url: str = CLERK_JWKS_URL,
+        ttl: float = CLERK_JWKS_TTL_SECONDS,
+        min_refetch_interval: float = CLERK_JWKS_MIN_REFETCH_SECONDS,
+        fetcher: Optional[Callable[[], Dict[str, Any]]] = None
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self._fetcher = fetcher or PyJWKClient(url, cache_jwk_set=False).fetch_data
+        self._keys: Dict[str, PyJWK] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = float("-inf")
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self) -> bool:
+        """Fetch ulang key set; key lama tetap dipakai jika fetch gagal"""
+        with self._lock:
+            self._last_attempt = time.monotonic()
+            try:
+                key_set = PyJWKSet.from_dict(self._fetcher())
+            except Exception as e:
+                logger.warning(f"⚠️ JWKS refresh failed ({self.url}): {e}")
+                return False
+            self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+            self._fetched_at = time.monotonic()
+            logger.info(f"🔑 JWKS refreshed ({len(self._keys)} keys)")
+            return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def get_signing_key(self, kid: Optional[str]) -> PyJWK:
+        """
+        Signing key untuk kid
+
+        Raises:
+            jwt.InvalidTokenError: kid kosong atau tidak ada di JWKS
+        """
+        if not kid:
+            raise jwt.InvalidTokenError("Token header has no kid")
+
+        now = time.monotonic()
+        can_refetch = now - self._last_attempt >= self.min_refetch_interval
+        key = self._keys.get(kid)
+        age = now - self._fetched_at
+        if key is not None:
+            if age >= self.ttl and can_refetch:
+                self.refresh()  # stale: refresh sinkron, gagal -> tetap pakai key lama
+                key = self._keys.get(kid, key)
+            elif age >= self.ttl * JWKS_REFRESH_AHEAD:
+                self._refresh_in_background()
+            return key
+
+        # Kid miss: key rotation di Clerk, refetch (throttled)
+        if can_refetch:
+            self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+
+class VerifiedTokenCache:
+    """
+    LRU claims token terverifikasi
+
+    Key adalah blake2b(token) sehingga token mentah tidak disimpan.
+    Entry dianggap tidak ada setelah claim exp; token tanpa exp tidak
+    di-cache.
+    """
+
+    def __init__(self, max_size: int = AUTH_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ClerkTokenVerifier:
+    """
+    Verifikasi Clerk JWT dengan JWKS cache + verified-token cache
+
+    Hot path (token sama dalam masa berlakunya) hanya berupa hash + dict
+    lookup; signature RSA diverifikasi sekali per token.
+    """
+
+    def __init__(
+        self,
+        jwks: Optional[JWKSCache] = None,
+        token_cache: Optional[VerifiedTokenCache] = None
+    ):
+        self.jwks = jwks if jwks is not None else JWKSCache()
+        self.token_cache = token_cache if token_cache is not None else VerifiedTokenCache()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Decode + verify token
+
+        Returns:
+            Claims token
+
+        Raises:
+            jwt.InvalidTokenError (termasuk ExpiredSignatureError)
+        """
+        claims = self.token_cache.get(token)
+        if claims is not None:
+            return claims
+
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") not in CLERK_ALGORITHMS:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {header.get('alg')}")
+        signing_key = self.jwks.get_signing_key(header.get("kid"))
+
+        claims = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=CLERK_ALGORITHMS,
+            options={"verify_exp": True}
+        )
+        self.token_cache.put(token, claims)
+        return claims
+
+
+class LastLoginThrottle:
+    """
+    Batasi penulisan last_login_at per user
+
+    Request paralel dari user yang sama dalam satu interval menghasilkan
+    satu write (per process).
+    """
+
+    def __init__(self, interval: float = AUTH_LAST_LOGIN_INTERVAL_SECONDS, max_users: int = 100_000):
+        self.interval = interval
+        self.max_users = max_users
+        self._written: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_write(self, user_id: str) -> bool:
+        """True jika last_login_at user perlu ditulis sekarang (dan tandai)"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._written.get(user_id)
+            if last is not None and now - last < self.interval:
+                return False
+            self._written[user_id] = now
+            self._written.move_to_end(user_id)
+            while len(self._written) > self.max_users:
+                self._written.popitem(last=False)
+            return True
+
+
+def bearer_token(request: Any) -> Optional[str]:
+    """Token dari header Authorization: Bearer <token>"""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return auth_header[len("Bearer "):].strip() or None
+
+
+def get_request_principal(request: Any) -> Optional[Dict[str, Any]]:
+    """
+    Claims Clerk untuk request ini, diverifikasi maksimal sekali per request
+
+    Hasil (termasuk None untuk token invalid) disimpan di request.state,
+    yang dipakai bersama oleh middleware dan dependency.
+    """
+    state = request.state
+    if hasattr(state, "principal"):
+        return state.principal
+
+    claims = None
+    token = bearer_token(request)
+    if token:
+        try:
+            claims = get_clerk_verifier().verify(token)
+        except jwt.PyJWTError as e:
+            logger.debug(f"Bearer token is not a valid Clerk token: {e}")
+    state.principal = claims
+    return claims
+
+
+# Singletons
+_clerk_verifier: Optional[ClerkTokenVerifier] = None
+_last_login_throttle: Optional[LastLoginThrottle] = None
+
+
+def get_clerk_verifier() -> ClerkTokenVerifier:
+    """Get singleton ClerkTokenVerifier instance"""
+    global _clerk_verifier
+    if _clerk_verifier is None:
+        _clerk_verifier = ClerkTokenVerifier()
+    return _clerk_verifier
+
+
+def get_last_login_throttle() -> LastLoginThrottle:
+    """Get singleton LastLoginThrottle instance"""
+    global _last_login_throttle
+    if _last_login_throttle is None:
+        _last_login_throttle = LastLoginThrottle()
+    return _last_login_throttle
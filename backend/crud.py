@@ -2,15 +2,14 @@ from sqlalchemy.orm import Session
 import models
 import schemas
 from core.security_updated import get_password_hash, verify_password
-from typing import List, Optional
+from core.encryption import get_encryption_service
+from core.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_after, keyset_order
+from typing import List, Optional, Sequence
 from datetime import datetime
 from uuid import UUID
 import logging
 import json
 from passlib.context import CryptContext
-from cryptography.fernet import Fernet
-import base64
-import os
 
 logger = logging.getLogger(__name__)
 
@@ -125,11 +124,39 @@ def get_chat_session(db: Session, session_id: UUID, user_id: UUID):
         models.ChatSession.user_id == user_id
     ).first()
 
-def get_user_chat_sessions(db: Session, user_id: UUID, skip: int = 0, limit: int = 10):
-    """Get all chat sessions for a user."""
-    return db.query(models.ChatSession).filter(
+def get_user_chat_sessions(db: Session, user_id: UUID, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
+    """
+    Get chat sessions for a user, most recently updated first.
+
+    With `cursor` (from session_page_cursor) the page is fetched by keyset
+    on (updated_at, id) instead of OFFSET; `skip` is kept for old clients.
+
+    Raises:
+        InvalidCursorError: cursor is malformed
+    """
+    query = db.query(models.ChatSession).filter(
         models.ChatSession.user_id == user_id
-    ).order_by(models.ChatSession.updated_at.desc()).offset(skip).limit(limit).all()
+    ).order_by(*keyset_order(models.ChatSession.updated_at, models.ChatSession.id))
+    if cursor:
+        query = query.filter(session_keyset_after(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def session_keyset_after(cursor: str):
+    """Keyset condition for sessions after `cursor` (ordered by updated_at, id)."""
+    position = decode_cursor(cursor)
+    try:
+        last_id = UUID(position.last_id)
+    except ValueError as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    return keyset_after(models.ChatSession.updated_at, models.ChatSession.id, position.sort_value, last_id)
+
+def session_page_cursor(sessions: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after `sessions`, or None when it was the last page."""
+    if not sessions or len(sessions) < limit:
+        return None
+    return encode_cursor(sessions[-1].updated_at, sessions[-1].id)
 
 def update_chat_session(db: Session, session_id: UUID, title: Optional[str] = None, status: Optional[str] = None):
     """Update a chat session."""
@@ -185,28 +212,12 @@ def create_chat_message(db: Session, session_id: UUID, role: str, content: str,
     return db_message
 
 def get_chat_messages(db: Session, session_id: UUID, skip: int = 0, limit: int = 50):
-    """Get messages for a chat session with decrypted content."""
+    """Get messages for a chat session (content decrypted lazily per page)."""
     messages = db.query(models.ChatMessage).filter(
         models.ChatMessage.session_id == session_id
     ).order_by(models.ChatMessage.created_at.asc()).offset(skip).limit(limit).all()
 
-    # Decrypt content and parse citations JSON
-    for message in messages:
-        # Decrypt the content
-        try:
-            message.content = decrypt_text(message.content)
-        except Exception as e:
-            logger.error(f"Failed to decrypt message {message.id}: {str(e)}")
-            message.content = "[Encrypted content unavailable]"
-
-        # Parse citations JSON
-        if message.citations:
-            try:
-                message.citations = json.loads(message.citations)
-            except:
-                message.citations = []
-
-    return messages
+    return ChatMessagePage(messages)
 
 def get_chat_history(db: Session, session_id: UUID, user_id: UUID):
     """Get complete chat history for a session."""
@@ -232,24 +243,83 @@ def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
     """Verify a PIN against its hash."""
     return pwd_context.verify(plain_pin, hashed_pin)
 
-def get_encryption_key() -> bytes:
-    """Get or generate encryption key. In production, use a secure key management system."""
-    key = os.getenv("ENCRYPTION_KEY")
-    if not key:
-        # Generate a key (in production, store this securely)
-        key = base64.urlsafe_b64encode(os.urandom(32)).decode()
-        logger.warning("Using generated encryption key. Set ENCRYPTION_KEY environment variable in production.")
-    return base64.urlsafe_b64decode(key)
-
 def encrypt_text(text: str) -> str:
-    """Encrypt text using Fernet."""
-    f = Fernet(get_encryption_key())
-    return f.encrypt(text.encode()).decode()
+    """Encrypt text using the process-wide key ring (core/encryption.py)."""
+    return get_encryption_service().encrypt(text)
 
 def decrypt_text(encrypted_text: str) -> str:
-    """Decrypt text using Fernet."""
-    f = Fernet(get_encryption_key())
-    return f.decrypt(encrypted_text.encode()).decode()
+    """Decrypt text using the process-wide key ring (core/encryption.py)."""
+    return get_encryption_service().decrypt(encrypted_text)
+
+UNAVAILABLE_CONTENT = "[Encrypted content unavailable]"
+
+class ChatMessageView:
+    """
+    Read-only view of a ChatMessage row with decrypted content.
+
+    The ORM row is never mutated, so plaintext can't be flushed back to the
+    database by a later commit. Other attributes are read from the row.
+    """
+
+    def __init__(self, page: "ChatMessagePage", index: int):
+        self._page = page
+        self._index = index
+
+    @property
+    def content(self) -> str:
+        return self._page.plaintext()[self._index]
+
+    @property
+    def citations(self) -> Optional[List[str]]:
+        raw = self._page.rows[self._index].citations
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except Exception:
+            return []
+
+    def __getattr__(self, name):
+        return getattr(self._page.rows[self._index], name)
+
+class ChatMessagePage(Sequence):
+    """
+    Page of chat messages decrypted in one batch on first content access.
+
+    Callers that never read `content` (listings, counts) never decrypt.
+    Async routes can call `await page.decrypt_async()` first so large
+    histories are decrypted in the thread pool.
+    """
+
+    def __init__(self, rows: List["models.ChatMessage"]):
+        self.rows = list(rows)
+        self._plaintext: Optional[List[str]] = None
+
+    def plaintext(self) -> List[str]:
+        if self._plaintext is None:
+            self._plaintext = get_encryption_service().decrypt_many(
+                [row.content for row in self.rows], default=UNAVAILABLE_CONTENT
+            )
+        return self._plaintext
+
+    async def decrypt_async(self) -> "ChatMessagePage":
+        if self._plaintext is None:
+            self._plaintext = await get_encryption_service().decrypt_many_async(
+                [row.content for row in self.rows], default=UNAVAILABLE_CONTENT
+            )
+        return self
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.rows)))]
+        if index < 0:
+            index += len(self.rows)
+        if not 0 <= index < len(self.rows):
+            raise IndexError(index)
+        return ChatMessageView(self, index)
+
+    def __len__(self) -> int:
+        return len(self.rows)
 
 # Enhanced Chat Session operations
 def update_chat_session_enhanced(db: Session, session_id: UUID, update_data: schemas.ChatSessionUpdate):
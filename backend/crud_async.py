@@ -0,0 +1,286 @@
+"""
+Async CRUD operations (AsyncSession)
+
+Port dari crud.py untuk async routes: query di-await sehingga event loop
+tidak terblokir selama round trip database. Helper non-DB (hashing,
+enkripsi) dipakai bersama dengan crud.py.
+"""
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+import schemas
+from core.security_updated import get_password_hash, verify_password
+from crud import ChatMessagePage, session_keyset_after, encrypt_text, hash_pin, verify_pin
+from core.pagination import keyset_order
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+
+# User CRUD operations
+async def get_user_by_email(db: AsyncSession, email: str):
+    """Fetch a single user by their email address."""
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+async def get_user(db: AsyncSession, user_id: UUID):
+    """Fetch a single user by their ID."""
+    return await db.get(models.User, user_id)
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """Fetch multiple users with pagination."""
+    result = await db.execute(select(models.User).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """Authenticate a user by email and password."""
+    try:
+        user = await get_user_by_email(db, email)
+        if not user:
+            logger.warning(f"User not found during authentication: {email}")
+            return False
+
+        if not verify_password(password, user.hashed_password):
+            logger.warning(f"Password verification failed for: {email}")
+            return False
+
+        return user
+
+    except Exception as e:
+        logger.error(f"Error during authentication: {str(e)}")
+        return False
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
+    """Create a new user in the database."""
+    db_user = models.User(
+        email=user.email,
+        hashed_password=get_password_hash(user.password),
+        full_name=user.full_name
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def update_user(db: AsyncSession, user_id: UUID, user_in: schemas.UserUpdate):
+    """Update user information."""
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return None
+
+    update_data = user_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        if field == "password" and value:
+            value = get_password_hash(value)
+        setattr(db_user, field, value)
+
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def delete_user(db: AsyncSession, user_id: UUID):
+    """Delete a user from the database."""
+    db_user = await get_user(db, user_id)
+    if db_user:
+        await db.delete(db_user)
+        await db.commit()
+        return True
+    return False
+
+async def create_admin_user(db: AsyncSession, email: str, password: str, full_name: str = "Admin"):
+    """Create an admin user in the database."""
+    db_user = models.User(
+        email=email,
+        hashed_password=get_password_hash(password),
+        full_name=full_name,
+        role=models.UserRole.ADMIN
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+# Chat Session CRUD operations
+async def create_chat_session(db: AsyncSession, user_id: UUID, title: Optional[str] = None):
+    """Create a new chat session."""
+    db_session = models.ChatSession(
+        user_id=user_id,
+        title=title
+    )
+    db.add(db_session)
+    await db.commit()
+    await db.refresh(db_session)
+    return db_session
+
+async def get_chat_session(db: AsyncSession, session_id: UUID, user_id: UUID):
+    """Get a specific chat session for a user."""
+    result = await db.execute(
+        select(models.ChatSession).where(
+            models.ChatSession.id == session_id,
+            models.ChatSession.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+async def get_user_chat_sessions(db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
+    """Get chat sessions for a user, most recently updated first (keyset with `cursor`)."""
+    query = (
+        select(models.ChatSession)
+        .where(models.ChatSession.user_id == user_id)
+        .order_by(*keyset_order(models.ChatSession.updated_at, models.ChatSession.id))
+    )
+    if cursor:
+        query = query.where(session_keyset_after(cursor))
+    elif skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+async def update_chat_session(db: AsyncSession, session_id: UUID, title: Optional[str] = None, status: Optional[str] = None):
+    """Update a chat session."""
+    db_session = await db.get(models.ChatSession, session_id)
+    if not db_session:
+        return None
+
+    if title is not None:
+        db_session.title = title
+    if status is not None:
+        db_session.status = status
+
+    await db.commit()
+    await db.refresh(db_session)
+    return db_session
+
+async def delete_chat_session(db: AsyncSession, session_id: UUID, user_id: UUID):
+    """Delete a chat session."""
+    db_session = await get_chat_session(db, session_id, user_id)
+    if db_session:
+        await db.delete(db_session)
+        await db.commit()
+        return True
+    return False
+
+# Chat Message CRUD operations
+async def create_chat_message(db: AsyncSession, session_id: UUID, role: str, content: str, citations: Optional[List[str]] = None):
+    """Create a new chat message with encrypted content."""
+    db_message = models.ChatMessage(
+        session_id=session_id,
+        role=role,
+        content=encrypt_text(content),  # Store encrypted content
+        citations=json.dumps(citations) if citations else None
+    )
+    db.add(db_message)
+
+    # Update session's updated_at (satu commit untuk message + session)
+    await db.execute(
+        update(models.ChatSession)
+        .where(models.ChatSession.id == session_id)
+        .values(updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    await db.refresh(db_message)
+
+    return db_message
+
+async def get_chat_messages(db: AsyncSession, session_id: UUID, skip: int = 0, limit: int = 50):
+    """Get messages for a chat session (content decrypted lazily per page)."""
+    result = await db.execute(
+        select(models.ChatMessage)
+        .where(models.ChatMessage.session_id == session_id)
+        .order_by(models.ChatMessage.created_at.asc())
+        .offset(skip).limit(limit)
+    )
+    return ChatMessagePage(result.scalars().all())
+
+async def get_chat_history(db: AsyncSession, session_id: UUID, user_id: UUID):
+    """Get complete chat history for a session."""
+    session = await get_chat_session(db, session_id, user_id)
+    if not session:
+        return None
+
+    # Full history is rendered: decrypt in one batch (thread pool if large)
+    messages = await (await get_chat_messages(db, session_id)).decrypt_async()
+    return {
+        "session_id": session_id,
+        "messages": messages,
+        "session": session
+    }
+
+# Enhanced Chat Session operations
+async def update_chat_session_enhanced(db: AsyncSession, session_id: UUID, update_data: schemas.ChatSessionUpdate):
+    """Update chat session with enhanced fields."""
+    db_session = await db.get(models.ChatSession, session_id)
+    if not db_session:
+        return None
+
+    update_dict = update_data.dict(exclude_unset=True)
+
+    # Handle PIN hashing
+    if "pin" in update_dict and update_dict["pin"]:
+        db_session.pin_hash = hash_pin(update_dict["pin"])
+        del update_dict["pin"]
+
+    # Handle consultation_data JSON
+    if "consultation_data" in update_dict and update_dict["consultation_data"]:
+        db_session.consultation_data = json.dumps(update_dict["consultation_data"].dict())
+        del update_dict["consultation_data"]
+
+    for field, value in update_dict.items():
+        setattr(db_session, field, value)
+
+    await db.commit()
+    await db.refresh(db_session)
+    return db_session
+
+async def verify_session_pin(db: AsyncSession, session_id: UUID, pin: str) -> bool:
+    """Verify PIN for session access."""
+    session = await db.get(models.ChatSession, session_id)
+    if not session or not session.pin_hash:
+        return False
+    return verify_pin(pin, session.pin_hash)
+
+async def get_session_with_access(db: AsyncSession, session_id: UUID, user_id: UUID, pin: Optional[str] = None):
+    """Get session with PIN verification if required."""
+    session = await get_chat_session(db, session_id, user_id)
+    if not session:
+        return None
+
+    # If PIN is set, require verification
+    if session.pin_hash and not verify_pin(pin or "", session.pin_hash):
+        return None
+
+    messages = await (await get_chat_messages(db, session_id)).decrypt_async()
+
+    consultation_data = None
+    if session.consultation_data:
+        try:
+            consultation_data = schemas.ConsultationData(**json.loads(session.consultation_data))
+        except Exception:
+            consultation_data = None
+
+    return {
+        "session": session,
+        "messages": messages,
+        "consultation_data": consultation_data
+    }
+
+async def get_user_sessions_with_pin_status(db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 10):
+    """Get user sessions with PIN status indicator."""
+    sessions = await get_user_chat_sessions(db, user_id, skip, limit)
+    for session in sessions:
+        session.has_pin = bool(session.pin_hash)
+    return sessions
+
+async def save_session_feedback(db: AsyncSession, session_id: UUID, rating: int, feedback: Optional[str] = None):
+    """Save feedback for a session."""
+    db_session = await db.get(models.ChatSession, session_id)
+    if not db_session:
+        return False
+
+    db_session.rating = rating
+    db_session.feedback = feedback
+    await db.commit()
+    return True
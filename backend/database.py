@@ -3,11 +3,13 @@ Database configuration and connection management for multiple databases
 """
 import logging
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from functools import lru_cache
 
 import motor.motor_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
@@ -30,6 +32,38 @@ from core.config import get_settings
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Sync driver -> async driver untuk AsyncEngine
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_database_url(url: str):
+    """
+    Konversi DATABASE_URL sync ke URL async + connect_args
+
+    asyncpg tidak mengenal parameter libpq (sslmode, channel_binding),
+    jadi sslmode dipindahkan ke connect_args["ssl"].
+
+    Returns:
+        Tuple (URL, connect_args)
+    """
+    parsed = make_url(url)
+    connect_args = {}
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    query = dict(parsed.query)
+    if drivername == "postgresql+asyncpg":
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    return parsed.set(drivername=drivername, query=query), connect_args
+
+
 class DatabaseConnections:
     """Manage all database connections."""
 
@@ -60,6 +94,17 @@ class DatabaseConnections:
             )
         )
 
+        # Async engine (AsyncSession) dibuat lazy agar driver async
+        # (asyncpg / aiosqlite) hanya dibutuhkan jika dipakai
+        self._pg_async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        self.pool_settings = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        }
+
         # MongoDB (Analytics Database) - Unstructured Data Block
         self.mongodb_url = settings.MONGODB_URI
         self.mongodb_name = settings.MONGO_DB_NAME
@@ -146,13 +191,52 @@ class DatabaseConnections:
         finally:
             db.close()
     
+    @property
+    def pg_async_engine(self) -> AsyncEngine:
+        """AsyncEngine untuk DATABASE_URL dengan pool eksplisit"""
+        if self._pg_async_engine is None:
+            url, connect_args = to_async_database_url(self.pg_url)
+            pool_kwargs = {} if url.database in (None, "", ":memory:") else self.pool_settings
+            self._pg_async_engine = create_async_engine(
+                url,
+                pool_pre_ping=True,
+                connect_args=connect_args,
+                **pool_kwargs
+            )
+            logger.info(f"Async database engine created ({url.drivername}, pool={pool_kwargs or 'default'})")
+        return self._pg_async_engine
+
+    @property
+    def AsyncPostgresSession(self) -> async_sessionmaker:
+        """
+        AsyncSession factory
+
+        expire_on_commit=False: atribut tetap bisa dibaca setelah commit
+        tanpa lazy load (yang tidak didukung AsyncSession).
+        """
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                self.pg_async_engine,
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        return self._async_session_factory
+
+    async def dispose_async(self):
+        """Tutup pool async engine (dipanggil saat shutdown)"""
+        if self._pg_async_engine is not None:
+            await self._pg_async_engine.dispose()
+            self._pg_async_engine = None
+            self._async_session_factory = None
+
     def get_mongodb(self) -> Optional[MongoClient]:
         """Get MongoDB database instance."""
         return self.mongodb_db
     
     def get_mongodb_async(self) -> Optional[motor.motor_asyncio.AsyncIOMotorDatabase]:
         """Get async MongoDB database instance."""
-        return self.mongodb_async_db
+        return getattr(self, "mongodb_async_db", None)
 
     @contextmanager
     def get_supabase_db(self) -> Generator:
@@ -225,6 +309,19 @@ def get_db():
     with get_db_connections().get_db() as db:
         yield db
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get async PostgreSQL session (tidak memblokir event loop)."""
+    async with get_db_connections().AsyncPostgresSession() as db:
+        try:
+            yield db
+        except SQLAlchemyError:
+            await db.rollback()
+            raise
+
+async def close_async_db():
+    """Dispose async engine pool."""
+    await get_db_connections().dispose_async()
+
 def get_supabase_db():
     """Dependency to get Supabase database session."""
     with get_db_connections().get_supabase_db() as db:
@@ -234,6 +331,10 @@ def get_mongodb():
     """Dependency to get MongoDB database instance."""
     return get_db_connections().get_mongodb()
 
+def get_mongodb_async():
+    """Dependency to get async (motor) MongoDB database instance."""
+    return get_db_connections().get_mongodb_async()
+
 def get_mongo_client():
     """Get MongoDB client for direct operations (sync).
     
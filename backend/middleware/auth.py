@@ -7,11 +7,16 @@ from typing import Optional, List
 from fastapi import HTTPException, Security, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from jwt import PyJWKClient
 from functools import wraps
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..core.token_cache import (
+    get_clerk_verifier,
+    get_last_login_throttle,
+    get_request_principal
+)
+from ..database import get_async_db
 from ..models.user import User, UserRole
 
 logger = logging.getLogger(__name__)
@@ -19,7 +24,6 @@ logger = logging.getLogger(__name__)
 # Clerk configuration
 CLERK_PUBLISHABLE_KEY = os.getenv("NEXT_PUBLIC_CLERK_PUBLISHABLE_KEY")
 CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
-CLERK_JWKS_URL = f"https://api.clerk.com/v1/jwks"
 
 # Security scheme
 security = HTTPBearer()
@@ -29,7 +33,8 @@ class ClerkAuth:
     """Clerk authentication handler"""
     
     def __init__(self):
-        self.jwks_client = PyJWKClient(CLERK_JWKS_URL)
+        # JWKS + verified token cache, dipakai bersama dengan rate limiter
+        self.verifier = get_clerk_verifier()
     
     def verify_token(self, token: str) -> dict:
         """
@@ -37,18 +42,8 @@ class ClerkAuth:
         Returns decoded token payload
         """
         try:
-            # Get signing key from Clerk JWKS
-            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
-            
-            # Decode and verify token
-            payload = jwt.decode(
-                token,
-                signing_key.key,
-                algorithms=["RS256"],
-                options={"verify_exp": True}
-            )
-            
-            return payload
+            # Cache hit: tanpa fetch JWKS maupun verifikasi RSA
+            return self.verifier.verify(token)
             
         except jwt.ExpiredSignatureError:
             logger.error("Token expired")
@@ -66,8 +61,9 @@ clerk_auth = ClerkAuth()
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Security(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get current authenticated user from Clerk token.
@@ -75,8 +71,9 @@ async def get_current_user(
     """
     token = credentials.credentials
     
-    # Verify token with Clerk
-    payload = clerk_auth.verify_token(token)
+    # Claims yang sudah diverifikasi middleware di request ini, atau verify
+    # (via cache) untuk mendapatkan error 401 yang spesifik
+    payload = get_request_principal(request) or clerk_auth.verify_token(token)
     
     # Extract user info from token
     user_id = payload.get("sub")  # Clerk user ID
@@ -86,7 +83,7 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Invalid token payload")
     
     # Get or create user in database
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     
     if not user:
         # First time login - create user
@@ -98,15 +95,16 @@ async def get_current_user(
             is_email_verified=payload.get("email_verified", False)
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         logger.info(f"New user created: {user_id} ({email})")
     
-    # Update last login
-    from datetime import datetime
-    user.last_login_at = datetime.utcnow()
-    db.commit()
+    # Update last login (maksimal sekali per interval per user)
+    if get_last_login_throttle().should_write(user_id):
+        from datetime import datetime
+        user.last_login_at = datetime.utcnow()
+        await db.commit()
     
     return user
 
@@ -124,23 +122,21 @@ async def get_current_active_user(
 
 async def get_optional_user(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Get user if authenticated, otherwise return None.
     Useful for endpoints that work for both authenticated and anonymous users.
     """
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        payload = get_request_principal(request)
+        if not payload:
             return None
         
-        token = auth_header.replace("Bearer ", "")
-        payload = clerk_auth.verify_token(token)
         user_id = payload.get("sub")
         
         if user_id:
-            return db.query(User).filter(User.id == user_id).first()
+            return (await db.execute(select(User).where(User.id == user_id))).scalars().first()
         
         return None
     except:
@@ -222,8 +218,7 @@ def require_subscription(tier: str = "premium"):
 
 
 async def check_query_limit(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ) -> User:
     """
     Check if user has remaining queries (for free tier)
@@ -247,6 +242,7 @@ async def check_query_limit(
 def log_action(action: str, resource_type: Optional[str] = None):
     """
     Decorator untuk log user actions ke audit log
+    Route harus memakai AsyncSession (Depends(get_async_db)) sebagai `db`
     """
     def decorator(func):
         @wraps(func)
@@ -259,42 +255,49 @@ def log_action(action: str, resource_type: Optional[str] = None):
             db = kwargs.get("db")
             request = kwargs.get("request")
             
+            # Dibaca sebelum route jalan: setelah rollback atribut ORM
+            # expired dan tidak bisa di-lazy load dari AsyncSession
+            actor = None
+            if db and current_user:
+                actor = {
+                    "user_id": current_user.id,
+                    "user_email": current_user.email,
+                    "user_role": current_user.role.value
+                }
+            ip_address = request.client.host if request else None
+            
             try:
                 result = await func(*args, **kwargs)
                 
                 # Log successful action
-                if db and current_user:
-                    audit_log = AuditLog(
-                        user_id=current_user.id,
-                        user_email=current_user.email,
-                        user_role=current_user.role.value,
+                if actor:
+                    db.add(AuditLog(
+                        **actor,
                         action=action,
                         resource_type=resource_type,
                         status="success",
-                        ip_address=request.client.host if request else None,
+                        ip_address=ip_address,
                         created_at=datetime.utcnow()
-                    )
-                    db.add(audit_log)
-                    db.commit()
+                    ))
+                    await db.commit()
                 
                 return result
                 
             except Exception as e:
                 # Log failed action
-                if db and current_user:
-                    audit_log = AuditLog(
-                        user_id=current_user.id,
-                        user_email=current_user.email,
-                        user_role=current_user.role.value,
+                if actor:
+                    # Perubahan route yang gagal tidak ikut ter-commit
+                    await db.rollback()
+                    db.add(AuditLog(
+                        **actor,
                         action=action,
                         resource_type=resource_type,
                         status="failure",
                         error_message=str(e),
-                        ip_address=request.client.host if request else None,
+                        ip_address=ip_address,
                         created_at=datetime.utcnow()
-                    )
-                    db.add(audit_log)
-                    db.commit()
+                    ))
+                    await db.commit()
                 
                 raise
         
@@ -1,170 +1,552 @@
 """
 Rate Limiting Middleware dengan Redis support dan fallback in-memory
+
+Algoritma:
+- sliding_window (default): sliding window counter (bobot window sebelumnya),
+  O(1) state per identifier
+- token_bucket: kapasitas = max_requests, refill max_requests / window_seconds
+
+Redis path memakai async client + Lua script (atomic, satu round trip,
+jam dari Redis TIME). In-memory path di-shard dengan timer wheel untuk
+expiry, jadi tidak ada full scan per request.
 """
+import math
+import threading
 import time
 import logging
-from typing import Dict, Callable, Optional, Any
-from contextlib import asynccontextmanager
-from fastapi import Request, HTTPException
+from dataclasses import dataclass
+from typing import Dict, Callable, Optional, Any, List, Tuple
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from backend.core.token_cache import bearer_token, get_request_principal
 
 logger = logging.getLogger(__name__)
 
 try:
-    import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available, using in-memory rate limiting")
 
+
+ALGORITHMS = ("sliding_window", "token_bucket")
+
+
+# ============================================================================
+# Lua scripts (atomic on Redis)
+# ============================================================================
+
+# KEYS[1] = hash {window_index -> count}; ARGV = limit, window, cost
+# Returns {allowed, prev_count, curr_count, now}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local idx = math.floor(now / window)
+local elapsed = now - idx * window
+
+local curr = tonumber(redis.call('HGET', key, tostring(idx)) or '0')
+local prev = tonumber(redis.call('HGET', key, tostring(idx - 1)) or '0')
+local weighted = prev * (window - elapsed) / window + curr
+
+local allowed = 0
+if weighted + cost <= limit then
+    allowed = 1
+    curr = redis.call('HINCRBY', key, tostring(idx), cost)
+    if curr == cost then
+        for _, field in ipairs(redis.call('HKEYS', key)) do
+            if tonumber(field) < idx - 1 then
+                redis.call('HDEL', key, field)
+            end
+        end
+    end
+    redis.call('EXPIRE', key, window * 2)
+end
+
+return {allowed, tostring(prev), tostring(curr), tostring(now)}
+"""
+
+# KEYS[1] = hash {tokens, ts}; ARGV = capacity, refill_rate (tokens/sec), cost
+# Returns {allowed, tokens_left, now}
+TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local data = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, math.ceil(capacity / rate) * 2)
+
+return {allowed, tostring(tokens), tostring(now)}
+"""
+
+
+# ============================================================================
+# Decision
+# ============================================================================
+
+@dataclass
+class RateLimitDecision:
+    """Hasil satu check: semua yang dibutuhkan untuk response headers"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float      # Unix time saat kuota penuh kembali / window berganti
+    retry_after: float   # Detik sampai request berikutnya boleh (0 jika allowed)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(math.ceil(self.reset_at))),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, int(math.ceil(self.retry_after))))
+        return headers
+
+
+def _sliding_window_decision(
+    allowed: bool,
+    prev: float,
+    curr: float,
+    now: float,
+    limit: int,
+    window: int,
+    cost: int = 1
+) -> RateLimitDecision:
+    """Build decision dari state sliding window (dipakai Redis & memory)"""
+    idx = math.floor(now / window)
+    window_end = (idx + 1) * window
+    elapsed = now - idx * window
+    weighted = prev * (window - elapsed) / window + curr
+
+    retry_after = 0.0
+    if not allowed:
+        budget = limit - cost
+        if curr <= budget and prev > 0:
+            # Tunggu sampai bobot window sebelumnya cukup turun
+            retry_after = window * (1 - (budget - curr) / prev) - elapsed
+        else:
+            # Window sekarang sudah penuh: di window berikutnya curr jadi prev
+            retry_after = (window_end - now) + max(0.0, window * (1 - budget / curr)) if curr > 0 else window_end - now
+        retry_after = max(0.0, retry_after)
+
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=limit,
+        remaining=max(0, int(limit - weighted)),
+        reset_at=window_end,
+        retry_after=retry_after
+    )
+
+
+def _token_bucket_decision(
+    allowed: bool,
+    tokens: float,
+    now: float,
+    capacity: int,
+    rate: float,
+    cost: int = 1
+) -> RateLimitDecision:
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=capacity,
+        remaining=max(0, int(tokens)),
+        reset_at=now + (capacity - tokens) / rate,
+        retry_after=0.0 if allowed else (cost - tokens) / rate
+    )
+
+
+# ============================================================================
+# In-memory backend
+# ============================================================================
+
+class _TimerWheel:
+    """
+    Hashed timer wheel untuk expiry.
+
+    Key dijadwalkan ke slot berdasarkan waktu expire; advance() hanya
+    memproses slot yang sudah lewat sejak tick terakhir. Entry yang
+    di-refresh dicek ulang secara lazy (dijadwalkan lagi jika belum expire).
+    """
+
+    def __init__(self, slots: int = 512, tick_seconds: float = 1.0):
+        self.tick_seconds = tick_seconds
+        self.slots: List[set] = [set() for _ in range(slots)]
+        self.current_tick: Optional[int] = None
+
+    def _tick(self, at: float) -> int:
+        return int(at // self.tick_seconds)
+
+    def schedule(self, key: str, expires_at: float) -> None:
+        self.slots[self._tick(expires_at) % len(self.slots)].add(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Keys di slot yang sudah lewat (kandidat expiry)"""
+        tick = self._tick(now)
+        if self.current_tick is None:
+            self.current_tick = tick
+            return []
+        if tick <= self.current_tick:
+            return []
+
+        due: List[str] = []
+        steps = min(tick - self.current_tick, len(self.slots))
+        for step in range(1, steps + 1):
+            slot = self.slots[(self.current_tick + step) % len(self.slots)]
+            if slot:
+                due.extend(slot)
+                slot.clear()
+        self.current_tick = tick
+        return due
+
+
+class _MemoryShard:
+    """Satu shard: dict state + timer wheel + lock"""
+
+    __slots__ = ("entries", "expires", "wheel", "lock")
+
+    def __init__(self, wheel_slots: int):
+        self.entries: Dict[str, List[float]] = {}
+        self.expires: Dict[str, float] = {}
+        self.wheel = _TimerWheel(slots=wheel_slots)
+        self.lock = threading.Lock()
+
+    def expire(self, now: float) -> None:
+        for key in self.wheel.advance(now):
+            expires_at = self.expires.get(key)
+            if expires_at is None:
+                continue
+            if expires_at <= now:
+                del self.expires[key]
+                self.entries.pop(key, None)
+            else:
+                self.wheel.schedule(key, expires_at)
+
+    def touch(self, key: str, expires_at: float) -> None:
+        if self.expires.get(key) != expires_at:
+            self.expires[key] = expires_at
+            self.wheel.schedule(key, expires_at)
+
+
+class InMemoryRateLimitStore:
+    """
+    Sharded in-memory store.
+
+    Sliding window state: [window_index, prev_count, curr_count]
+    Token bucket state: [tokens, last_refill_ts]
+    """
+
+    def __init__(self, shards: int = 16, wheel_slots: int = 512):
+        self._shards = [_MemoryShard(wheel_slots) for _ in range(shards)]
+
+    def _shard(self, key: str) -> _MemoryShard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def sliding_window(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        now: Optional[float] = None
+    ) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        idx = math.floor(now / window)
+        shard = self._shard(key)
+
+        with shard.lock:
+            shard.expire(now)
+
+            state = shard.entries.get(key)
+            if state is None:
+                state = shard.entries[key] = [idx, 0, 0]
+            elif state[0] != idx:
+                # Roll window: kemarin jadi "prev", atau reset jika lompat >1 window
+                state[1] = state[2] if state[0] == idx - 1 else 0
+                state[2] = 0
+                state[0] = idx
+
+            _, prev, curr = state
+            elapsed = now - idx * window
+            allowed = prev * (window - elapsed) / window + curr + cost <= limit
+            if allowed:
+                state[2] = curr = curr + cost
+
+            shard.touch(key, (idx + 2) * window)
+
+        return _sliding_window_decision(allowed, prev, curr, now, limit, window, cost)
+
+    def token_bucket(
+        self,
+        key: str,
+        capacity: int,
+        rate: float,
+        cost: int = 1,
+        now: Optional[float] = None
+    ) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        shard = self._shard(key)
+
+        with shard.lock:
+            shard.expire(now)
+
+            state = shard.entries.get(key)
+            if state is None:
+                state = shard.entries[key] = [float(capacity), now]
+
+            tokens = min(capacity, state[0] + max(0.0, now - state[1]) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            state[0], state[1] = tokens, now
+
+            shard.touch(key, now + math.ceil(capacity / rate) * 2)
+
+        return _token_bucket_decision(allowed, tokens, now, capacity, rate, cost)
+
+    def delete(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries.pop(key, None)
+            shard.expires.pop(key, None)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+# ============================================================================
+# Rate limiter
+# ============================================================================
+
 class RateLimiter:
     """Rate limiting dengan Redis support"""
 
-    def __init__(self, redis_url: str = None):
+    def __init__(
+        self,
+        redis_url: str = None,
+        algorithm: str = "sliding_window",
+        memory_shards: int = 16
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+
+        self.algorithm = algorithm
         self.redis_client = None
-        self.in_memory_store: Dict[str, Dict] = {}
+        self.memory_store = InMemoryRateLimitStore(shards=memory_shards)
+        self._scripts: Dict[str, Any] = {}
 
         if REDIS_AVAILABLE and redis_url:
             try:
-                self.redis_client = redis.from_url(redis_url)
+                self.redis_client = aioredis.from_url(redis_url)
+                self._scripts = {
+                    "sliding_window": self.redis_client.register_script(SLIDING_WINDOW_LUA),
+                    "token_bucket": self.redis_client.register_script(TOKEN_BUCKET_LUA),
+                }
                 logger.info("Redis rate limiting initialized")
             except Exception as e:
                 logger.error(f"Redis connection failed: {e}, falling back to in-memory")
+                self.redis_client = None
 
         if not self.redis_client:
             logger.info("Using in-memory rate limiting")
 
     def _get_redis_key(self, identifier: str, window_seconds: int) -> str:
-        """Generate Redis key berdasarkan identifier dan window"""
-        window_start = int(time.time() // window_seconds)
-        return f"rate_limit:{identifier}:{window_start}"
+        """Generate Redis key berdasarkan identifier, window dan algoritma"""
+        return f"rate_limit:{self.algorithm}:{identifier}:{window_seconds}"
 
     def _get_memory_key(self, identifier: str, window_seconds: int) -> str:
         """Generate in-memory key"""
-        return f"{identifier}:{int(time.time() // window_seconds)}"
+        return f"{self.algorithm}:{identifier}:{window_seconds}"
 
-    def _cleanup_expired_memory_entries(self):
-        """Cleanup expired entries dari in-memory store"""
-        current_time = time.time()
-        expired_keys = []
+    def _check_memory(
+        self,
+        identifier: str,
+        max_requests: int,
+        window_seconds: int,
+        cost: int
+    ) -> RateLimitDecision:
+        key = self._get_memory_key(identifier, window_seconds)
+        if self.algorithm == "token_bucket":
+            return self.memory_store.token_bucket(
+                key, max_requests, max_requests / window_seconds, cost
+            )
+        return self.memory_store.sliding_window(key, max_requests, window_seconds, cost)
 
-        for key, data in self.in_memory_store.items():
-            if current_time - data.get("window_start", 0) > 3600:  # 1 hour expiry
-                expired_keys.append(key)
+    async def _check_redis(
+        self,
+        identifier: str,
+        max_requests: int,
+        window_seconds: int,
+        cost: int
+    ) -> RateLimitDecision:
+        key = self._get_redis_key(identifier, window_seconds)
+
+        if self.algorithm == "token_bucket":
+            rate = max_requests / window_seconds
+            allowed, tokens, now = await self._scripts["token_bucket"](
+                keys=[key], args=[max_requests, rate, cost]
+            )
+            return _token_bucket_decision(
+                bool(int(allowed)), float(tokens), float(now), max_requests, rate, cost
+            )
 
-        for key in expired_keys:
-            del self.in_memory_store[key]
+        allowed, prev, curr, now = await self._scripts["sliding_window"](
+            keys=[key], args=[max_requests, window_seconds, cost]
+        )
+        return _sliding_window_decision(
+            bool(int(allowed)), float(prev), float(curr), float(now),
+            max_requests, window_seconds, cost
+        )
 
-    def check_limit(
+    async def hit(
         self,
         identifier: str,
         max_requests: int,
-        window_seconds: int = 60
-    ) -> bool:
+        window_seconds: int = 60,
+        cost: int = 1
+    ) -> RateLimitDecision:
         """
-        Check apakah request dalam rate limit
+        Consume kuota dan return keputusan lengkap (allowed + header values)
+        dalam satu round trip.
 
         Args:
             identifier: Unique identifier (e.g., IP address or user ID)
             max_requests: Maximum requests dalam window
             window_seconds: Window size dalam detik
-
-        Returns:
-            True jika limit belum tercapai, False jika sudah tercapai
+            cost: Jumlah kuota yang dipakai request ini
         """
-        try:
-            if self.redis_client:
-                # Redis-based rate limiting
-                key = self._get_redis_key(identifier, window_seconds)
-                current_count = self.redis_client.get(key)
-
-                if current_count is None:
-                    # First request in this window
-                    self.redis_client.setex(key, window_seconds, 1)
-                    return True
-                else:
-                    current_count = int(current_count)
-                    if current_count >= max_requests:
-                        return False
-
-                    # Increment counter
-                    self.redis_client.incr(key)
-                    return True
-
-            else:
-                # In-memory fallback
-                self._cleanup_expired_memory_entries()
-                key = self._get_memory_key(identifier, window_seconds)
-
-                if key not in self.in_memory_store:
-                    self.in_memory_store[key] = {
-                        "count": 1,
-                        "window_start": time.time()
-                    }
-                    return True
+        if self.redis_client:
+            try:
+                return await self._check_redis(identifier, max_requests, window_seconds, cost)
+            except Exception as e:
+                # Redis down - tetap batasi per-process daripada fail open
+                logger.error(f"Rate limiting error: {e}, using in-memory fallback")
 
-                data = self.in_memory_store[key]
-                if data["count"] >= max_requests:
-                    return False
+        return self._check_memory(identifier, max_requests, window_seconds, cost)
 
-                data["count"] += 1
-                return True
+    async def check_limit(
+        self,
+        identifier: str,
+        max_requests: int,
+        window_seconds: int = 60
+    ) -> bool:
+        """
+        Check apakah request dalam rate limit
 
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-            # Fail open - allow request if rate limiting fails
-            return True
+        Returns:
+            True jika limit belum tercapai, False jika sudah tercapai
+        """
+        decision = await self.hit(identifier, max_requests, window_seconds)
+        return decision.allowed
 
-    def get_remaining_requests(
+    async def get_remaining_requests(
         self,
         identifier: str,
         max_requests: int,
         window_seconds: int = 60
     ) -> int:
-        """Get remaining requests untuk user dalam window"""
+        """Get remaining requests untuk user dalam window (tanpa consume kuota)"""
         try:
-            if self.redis_client:
-                key = self._get_redis_key(identifier, window_seconds)
-                current_count = self.redis_client.get(key)
-                current_count = int(current_count) if current_count else 0
-                return max(0, max_requests - current_count)
-            else:
-                key = self._get_memory_key(identifier, window_seconds)
-                current_count = self.in_memory_store.get(key, {}).get("count", 0)
-                return max(0, max_requests - current_count)
+            decision = await self.hit(identifier, max_requests, window_seconds, cost=0)
+            return decision.remaining
         except Exception as e:
             logger.error(f"Error getting remaining requests: {e}")
             return max_requests
 
-    def reset_limit(self, identifier: str, window_seconds: int = 60):
+    async def reset_limit(self, identifier: str, window_seconds: int = 60):
         """Reset rate limit untuk identifier tertentu"""
         try:
             if self.redis_client:
-                key = self._get_redis_key(identifier, window_seconds)
-                self.redis_client.delete(key)
-            else:
-                key = self._get_memory_key(identifier, window_seconds)
-                if key in self.in_memory_store:
-                    del self.in_memory_store[key]
+                await self.redis_client.delete(self._get_redis_key(identifier, window_seconds))
+            self.memory_store.delete(self._get_memory_key(identifier, window_seconds))
 
             logger.info(f"Rate limit reset for {identifier}")
         except Exception as e:
             logger.error(f"Error resetting rate limit: {e}")
 
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.aclose()
+
+
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
+
+# Route-specific defaults used by setup_rate_limiting
+# (path, max_requests, window_seconds, per_user)
+DEFAULT_ROUTE_LIMITS: List[Tuple[str, int, int, bool]] = [
+    # Authentication endpoints - lebih permisif
+    ("/api/auth/login", 5, 300, False),  # 300 detik = 5 menit
+    ("/api/auth/register", 3, 3600, False),  # 1 jam
+    ("/api/auth/refresh-token", 10, 300, False),  # 5 menit
+
+    # Chat endpoints - tergantung authentication
+    ("/api/chat/*", 50, 60, True),
+
+    # Advanced AI endpoints - lebih ketat untuk authenticated users
+    ("/api/advanced-ai/*", 20, 60, True),
+
+    # File upload endpoints - rate limit berdasarkan file uploads
+    ("/api/documents/upload", 10, 3600, True),
+    ("/api/chat/enhanced", 30, 60, True),
+]
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """FastAPI middleware untuk rate limiting"""
 
-    def __init__(self, app, default_max_requests: int = 100, default_window_seconds: int = 60):
+    def __init__(
+        self,
+        app,
+        default_max_requests: int = 100,
+        default_window_seconds: int = 60,
+        route_limits: Optional[List[Tuple[str, int, int, bool]]] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
         super().__init__(app)
         self.default_max_requests = default_max_requests
         self.default_window_seconds = default_window_seconds
+        self.limiter = limiter
 
         # Route-specific rate limits
         self.route_limits: Dict[str, Dict[str, Any]] = {}
+        self._wildcard_limits: List[Tuple[str, Dict[str, Any]]] = []
+        self._default_config = {
+            "max_requests": default_max_requests,
+            "window_seconds": default_window_seconds,
+            "identifier_extractor": self._default_identifier_extractor
+        }
+
+        for path, max_requests, window_seconds, per_user in route_limits or []:
+            self.add_route_limit(
+                path,
+                max_requests,
+                window_seconds,
+                identifier_extractor=self._get_user_identifier if per_user else None
+            )
 
     def add_route_limit(
         self,
@@ -182,11 +564,20 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             window_seconds: Window size dalam detik
             identifier_extractor: Function untuk extract identifier dari request
         """
-        self.route_limits[path] = {
+        config = {
             "max_requests": max_requests,
             "window_seconds": window_seconds,
             "identifier_extractor": identifier_extractor or self._default_identifier_extractor
         }
+        self.route_limits[path] = config
+
+        if path.endswith("*"):
+            self._wildcard_limits = [
+                (prefix, cfg) for prefix, cfg in self._wildcard_limits if prefix != path[:-1]
+            ]
+            self._wildcard_limits.append((path[:-1], config))
+            # Longest prefix wins
+            self._wildcard_limits.sort(key=lambda item: len(item[0]), reverse=True)
 
     def _default_identifier_extractor(self, request: Request) -> str:
         """Default identifier extractor menggunakan IP address"""
@@ -202,15 +593,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     def _get_user_identifier(self, request: Request) -> str:
         """Extract user ID dari JWT token jika ada, fallback ke IP"""
         try:
-            # Try to get user ID from JWT token
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                # Parse JWT token to get user ID
+            # Clerk token: diverifikasi sekali (cached) dan disimpan di
+            # request.state untuk dipakai ulang oleh dependency auth
+            principal = get_request_principal(request)
+            if principal and principal.get("sub"):
+                return f"user_{principal['sub']}"  # Prefix untuk user-based limiting
+
+            # Token JWT lokal (login email/password)
+            token = bearer_token(request)
+            if token:
                 from backend.core.security_updated import verify_token
-                token = auth_header.replace("Bearer ", "")
                 subject = verify_token(token)
                 if subject:
-                    return f"user_{subject}"  # Prefix untuk user-based limiting
+                    return f"user_{subject}"
         except Exception as e:
             logger.debug(f"Could not extract user ID from token: {e}")
 
@@ -222,23 +617,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         path = request.url.path
 
         # Check exact path match first
-        if path in self.route_limits:
-            return self.route_limits[path]
+        config = self.route_limits.get(path)
+        if config is not None:
+            return config
 
         # Check pattern matches
-        for route_path, config in self.route_limits.items():
-            if route_path.endswith("*"):
-                # Wildcard matching
-                prefix = route_path[:-1]  # Remove *
-                if path.startswith(prefix):
-                    return config
+        for prefix, config in self._wildcard_limits:
+            if path.startswith(prefix):
+                return config
 
         # Return default config
-        return {
-            "max_requests": self.default_max_requests,
-            "window_seconds": self.default_window_seconds,
-            "identifier_extractor": self._default_identifier_extractor
-        }
+        return self._default_config
 
     async def dispatch(self, request: Request, call_next):
         """Middleware dispatch"""
@@ -249,80 +638,65 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         route_config = self._get_route_config(request)
         max_requests = route_config["max_requests"]
         window_seconds = route_config["window_seconds"]
-        identifier_extractor = route_config["identifier_extractor"]
 
         # Extract identifier
-        identifier = identifier_extractor(request)
+        identifier = route_config["identifier_extractor"](request)
 
-        # Check rate limit
-        if not rate_limiter.check_limit(identifier, max_requests, window_seconds):
-            # Rate limit exceeded
-            remaining_time = window_seconds - (int(time.time()) % window_seconds)
+        # Check rate limit (one round trip gives the header values too)
+        limiter = self.limiter or rate_limiter
+        decision = await limiter.hit(identifier, max_requests, window_seconds)
 
-            raise HTTPException(
+        if not decision.allowed:
+            # Rate limit exceeded
+            retry_after = max(1, int(math.ceil(decision.retry_after)))
+            return JSONResponse(
                 status_code=429,
-                detail={
-                    "error": "Rate limit exceeded",
-                    "message": ".2f",
-                    "retry_after": remaining_time,
-                    "limit": max_requests,
-                    "window_seconds": window_seconds
+                content={
+                    "detail": {
+                        "error": "Rate limit exceeded",
+                        "message": f"Terlalu banyak request. Coba lagi dalam {retry_after} detik.",
+                        "retry_after": retry_after,
+                        "limit": max_requests,
+                        "window_seconds": window_seconds
+                    }
                 },
-                headers={
-                    "Retry-After": str(remaining_time),
-                    "X-RateLimit-Limit": str(max_requests),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(time.time()) + remaining_time)
-                }
+                headers=decision.headers()
             )
 
-        # Get remaining requests for headers
-        remaining = rate_limiter.get_remaining_requests(identifier, max_requests, window_seconds)
-
         # Process request
         response = await call_next(request)
 
         # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining - 1)  # Minus this request
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + window_seconds - (int(time.time()) % window_seconds))
+        response.headers.update(decision.headers())
 
         return response
 
+
 # Convenience functions untuk setup
-def setup_rate_limiting(app, redis_url: Optional[str] = None):
+def setup_rate_limiting(
+    app,
+    redis_url: Optional[str] = None,
+    algorithm: str = "sliding_window"
+):
     """
     Setup rate limiting untuk FastAPI app
 
     Args:
         app: FastAPI app instance
         redis_url: Redis URL untuk production (optional)
+        algorithm: "sliding_window" atau "token_bucket"
     """
     global rate_limiter
-    rate_limiter = RateLimiter(redis_url)
-
-    # Setup middleware dengan sensible defaults
-    middleware = RateLimitMiddleware(app, default_max_requests=100, default_window_seconds=60)
-
-    # Setup route-specific limits
-    # Authentication endpoints - lebih permisif
-    middleware.add_route_limit("/api/auth/login", max_requests=5, window_seconds=300)  # 300 detik = 5 menit
-    middleware.add_route_limit("/api/auth/register", max_requests=3, window_seconds=3600)  # 1 jam
-    middleware.add_route_limit("/api/auth/refresh-token", max_requests=10, window_seconds=300)  # 5 menit
-
-    # Chat endpoints - tergantung authentication
-    middleware.add_route_limit("/api/chat/*", max_requests=50, window_seconds=60, identifier_extractor=middleware._get_user_identifier)
-
-    # Advanced AI endpoints - lebih ketat untuk authenticated users
-    middleware.add_route_limit("/api/advanced-ai/*", max_requests=20, window_seconds=60, identifier_extractor=middleware._get_user_identifier)
-
-    # File upload endpoints - rate limit berdasarkan file uploads
-    middleware.add_route_limit("/api/documents/upload", max_requests=10, window_seconds=3600, identifier_extractor=middleware._get_user_identifier)
-    middleware.add_route_limit("/api/chat/enhanced", max_requests=30, window_seconds=60, identifier_extractor=middleware._get_user_identifier)
-
-    # Add middleware ke app
-    app.add_middleware(RateLimitMiddleware, default_max_requests=100, default_window_seconds=60)
+    rate_limiter = RateLimiter(redis_url, algorithm=algorithm)
+
+    # Add middleware ke app dengan sensible defaults + route-specific limits
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_max_requests=100,
+        default_window_seconds=60,
+        route_limits=DEFAULT_ROUTE_LIMITS,
+        limiter=rate_limiter
+    )
     app.state.rate_limiter = rate_limiter
-    app.state.rate_limit_middleware = middleware
 
-    logger.info("Rate limiting initialized successfully")
\ No newline at end of file
+    logger.info("Rate limiting initialized successfully")
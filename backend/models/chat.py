@@ -4,8 +4,9 @@ Metadata sesi chat disimpan di Neon 2, transkrip lengkap di MongoDB
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, JSON, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, JSON, Float, Index, and_, event, inspect
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -67,6 +68,122 @@ class ChatSession(Base):
         return f"<ChatSession(id={self.id}, user_id={self.user_id}, title={self.title})>"
 
 
+# Index komposit untuk listing keyset (urutan sama dengan core.pagination.keyset_order)
+Index(
+    "ix_chat_sessions_user_status_recent",
+    ChatSession.user_id,
+    ChatSession.status,
+    ChatSession.last_message_at.desc().nullslast(),
+    ChatSession.id.desc()
+)
+Index(
+    "ix_chat_sessions_user_status_category_recent",
+    ChatSession.user_id,
+    ChatSession.status,
+    ChatSession.category,
+    ChatSession.last_message_at.desc().nullslast(),
+    ChatSession.id.desc()
+)
+Index(
+    "ix_chat_sessions_user_updated",
+    ChatSession.user_id,
+    ChatSession.updated_at.desc(),
+    ChatSession.id.desc()
+)
+
+
+# category "" = semua kategori
+ALL_CATEGORIES = ""
+
+
+class UserSessionCounter(Base):
+    """
+    Jumlah sesi per user, dipelihara saat write (bukan COUNT(*) saat read)
+    Satu baris per (user_id, status, category); category "" = semua kategori
+    """
+    __tablename__ = "user_session_counters"
+
+    user_id = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    category = Column(String, primary_key=True, default=ALL_CATEGORIES)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserSessionCounter(user_id={self.user_id}, status={self.status}, count={self.count})>"
+
+
+def _counter_keys(user_id, status, category):
+    """Baris counter yang terpengaruh oleh satu sesi"""
+    keys = [(str(user_id), status, ALL_CATEGORIES)]
+    if category:
+        keys.append((str(user_id), status, category))
+    return keys
+
+
+def _bump_session_counters(connection, keys, delta: int):
+    """
+    Tambah/kurangi counter di dalam transaksi flush yang sama
+
+    Increment memakai upsert (INSERT ... ON CONFLICT) agar aman untuk
+    sesi pertama user yang dibuat bersamaan; decrement cukup UPDATE.
+    """
+    table = UserSessionCounter.__table__
+    now = datetime.utcnow()
+    dialect = connection.dialect.name
+    for user_id, status, category in keys:
+        if status is None:
+            continue
+        key_filter = and_(table.c.user_id == user_id, table.c.status == status, table.c.category == category)
+        if delta < 0 or dialect not in ("postgresql", "sqlite"):
+            result = connection.execute(
+                table.update().where(key_filter).values(count=table.c.count + delta, updated_at=now)
+            )
+            if result.rowcount or delta < 0:
+                continue
+            connection.execute(table.insert().values(
+                user_id=user_id, status=status, category=category, count=delta, updated_at=now
+            ))
+            continue
+
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert(table).values(user_id=user_id, status=status, category=category, count=delta, updated_at=now)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.status, table.c.category],
+            set_={"count": table.c.count + delta, "updated_at": now}
+        ))
+
+
+def _counted_values_before_flush(target):
+    """(user_id, status, category) sebelum perubahan yang sedang di-flush"""
+    state = inspect(target)
+    values = []
+    for attr in ("user_id", "status", "category"):
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if history.deleted else getattr(target, attr))
+    return tuple(values)
+
+
+@event.listens_for(ChatSession, "after_insert")
+def _count_inserted_session(mapper, connection, target):
+    _bump_session_counters(connection, _counter_keys(target.user_id, target.status, target.category), 1)
+
+
+@event.listens_for(ChatSession, "after_update")
+def _recount_updated_session(mapper, connection, target):
+    before = _counted_values_before_flush(target)
+    after = (target.user_id, target.status, target.category)
+    if before == after:
+        return
+    _bump_session_counters(connection, _counter_keys(*before), -1)
+    _bump_session_counters(connection, _counter_keys(*after), 1)
+
+
+@event.listens_for(ChatSession, "after_delete")
+def _uncount_deleted_session(mapper, connection, target):
+    _bump_session_counters(connection, _counter_keys(*_counted_values_before_flush(target)), -1)
+
+
 class DocumentMetadata(Base):
     """
     Document metadata (Neon PostgreSQL Instance 2)
@@ -2,13 +2,14 @@
 Authentication Router dengan Clerk Integration
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 import logging
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.user import User, UserRole, SubscriptionTier, VerificationStatus
 from ..middleware.auth import (
     get_current_user,
@@ -94,7 +95,7 @@ async def get_current_user_info(
 async def update_current_user(
     update_data: UserUpdateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -112,8 +113,8 @@ async def update_current_user(
     
     current_user.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     
     return UserResponse(
         id=current_user.id,
@@ -137,14 +138,14 @@ async def update_current_user(
 @router.post("/sync", tags=["Authentication"])
 async def sync_user_from_clerk(
     sync_data: SyncUserRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sync user data from Clerk webhook.
     Called by Clerk when user is created/updated.
     """
     # Check if user exists
-    user = db.query(User).filter(User.id == sync_data.clerk_user_id).first()
+    user = (await db.execute(select(User).where(User.id == sync_data.clerk_user_id))).scalars().first()
     
     if user:
         # Update existing user
@@ -154,8 +155,8 @@ async def sync_user_from_clerk(
         user.is_email_verified = sync_data.email_verified
         user.updated_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         logger.info(f"User synced from Clerk: {user.id}")
         return {"status": "updated", "user_id": user.id}
@@ -173,8 +174,8 @@ async def sync_user_from_clerk(
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
         logger.info(f"New user created from Clerk: {new_user.id}")
         return {"status": "created", "user_id": new_user.id}
@@ -184,7 +185,7 @@ async def sync_user_from_clerk(
 @log_action("user.delete", "user")
 async def delete_current_user(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -195,7 +196,7 @@ async def delete_current_user(
     current_user.is_active = False
     current_user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     logger.info(f"User account deactivated: {current_user.id}")
     
@@ -241,24 +242,25 @@ async def list_users(
     limit: int = 100,
     role: Optional[str] = None,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all users (Admin only)
     """
-    query = db.query(User)
+    conditions = []
     
     if role:
         try:
             role_enum = UserRole(role)
-            query = query.filter(User.role == role_enum)
+            conditions.append(User.role == role_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid role")
     
-    users = query.offset(skip).limit(limit).all()
+    users = (await db.execute(select(User).where(*conditions).offset(skip).limit(limit))).scalars().all()
+    total = await db.scalar(select(func.count()).select_from(User).where(*conditions))
     
     return {
-        "total": query.count(),
+        "total": total,
         "users": [
             UserResponse(
                 id=user.id,
@@ -288,7 +290,7 @@ async def update_user_role(
     user_id: str,
     new_role: str,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -301,7 +303,7 @@ async def update_user_role(
         raise HTTPException(status_code=400, detail="Invalid role")
     
     # Get target user
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -310,8 +312,8 @@ async def update_user_role(
     target_user.role = role_enum
     target_user.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(target_user)
+    await db.commit()
+    await db.refresh(target_user)
     
     logger.info(f"User role updated: {user_id} from {old_role} to {new_role} by {current_user.id}")
     
@@ -329,20 +331,20 @@ async def update_user_status(
     user_id: str,
     is_active: bool,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
     Activate/deactivate user (Admin only)
     """
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
     target_user.is_active = is_active
     target_user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     logger.info(f"User status updated: {user_id} active={is_active} by {current_user.id}")
     
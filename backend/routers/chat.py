@@ -2,7 +2,9 @@
 Enhanced Chat Router dengan BytePlus Ark AI Integration
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -10,15 +12,21 @@ import uuid
 import hashlib
 import logging
 
-from ..database import get_db, get_mongodb
+from ..database import get_async_db, get_mongodb_async
 from ..models.user import User
-from ..models.chat import ChatSession, AIQueryLog, SessionAnalytics
+from ..models.chat import ChatSession, AIQueryLog, SessionAnalytics, UserSessionCounter, ALL_CATEGORIES
 from ..middleware.auth import (
     get_current_active_user,
     check_query_limit,
     log_action
 )
+from ..core.pagination import (
+    MAX_PAGE_SIZE, InvalidCursorError, decode_cursor, keyset_after, keyset_order, split_page
+)
 from ..services.ark_ai_service import ark_ai_service
+from ..services.ai.streaming import format_sse, SSE_MEDIA_TYPE, SSE_HEADERS
+from ..services.ai.context_builder import assemble_chat_context, get_context_builder
+from ..services.transcript_store import TranscriptStore, get_transcript_store
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +39,7 @@ class ChatMessageRequest(BaseModel):
     session_id: Optional[str] = None
     persona: Optional[str] = "default"
     category: Optional[str] = None
+    stream: bool = False  # Respond with text/event-stream token deltas
 
 
 class ChatMessageResponse(BaseModel):
@@ -71,20 +80,22 @@ class SessionResponse(BaseModel):
 async def send_message(
     message_request: ChatMessageRequest,
     current_user: User = Depends(check_query_limit),
-    db: Session = Depends(get_db),
-    mongodb = Depends(get_mongodb),
+    db: AsyncSession = Depends(get_async_db),
+    mongodb = Depends(get_mongodb_async),
     request: Request = None
 ):
     """
     Send message to AI and get response.
     Creates new session if session_id not provided.
+    
+    With `stream: true` the response is `text/event-stream`: a `session`
+    event, `delta` events as tokens arrive, then a `done` event with the
+    same payload as the non-streaming response. Persistence happens after
+    the stream completes.
     """
     # Get or create session
     if message_request.session_id:
-        session = db.query(ChatSession).filter(
-            ChatSession.id == uuid.UUID(message_request.session_id),
-            ChatSession.user_id == current_user.id
-        ).first()
+        session = await _get_user_session(db, message_request.session_id, current_user.id)
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -99,20 +110,35 @@ async def send_message(
             mongodb_transcript_id=str(uuid.uuid4())
         )
         db.add(session)
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        await db.refresh(session)
         
         logger.info(f"New chat session created: {session.id} for user {current_user.id}")
     
-    # Get conversation history from MongoDB
-    transcript = mongodb.chat_transcripts.find_one({"_id": session.mongodb_transcript_id})
+    # Conversation history dari MongoDB: rolling summary + turn terbaru
+    # dalam token budget (lihat services/ai/context_builder.py)
+    transcripts = get_transcript_store(mongodb)
     
     conversation_history = []
-    if transcript:
-        conversation_history = [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in transcript.get("messages", [])
-        ]
+    if transcripts:
+        context = await assemble_chat_context(
+            transcripts, session.mongodb_transcript_id, owner_id=str(current_user.id)
+        )
+        conversation_history = context.messages
+    
+    if message_request.stream:
+        return StreamingResponse(
+            _stream_message(
+                db=db,
+                transcripts=transcripts,
+                session_id=session.id,
+                user_id=current_user.id,
+                message_request=message_request,
+                conversation_history=conversation_history
+            ),
+            media_type=SSE_MEDIA_TYPE,
+            headers=SSE_HEADERS
+        )
     
     # Get AI response
     ai_result = await ark_ai_service.legal_consultation(
@@ -127,10 +153,91 @@ async def send_message(
             detail=f"AI service error: {ai_result.get('error', 'Unknown error')}"
         )
     
+    await _persist_exchange(
+        db=db,
+        transcripts=transcripts,
+        session=session,
+        current_user=current_user,
+        user_content=message_request.content,
+        ai_result=ai_result
+    )
+    
+    return _build_message_response(session, ai_result)
+
+
+async def _stream_message(
+    db: AsyncSession,
+    transcripts: Optional[TranscriptStore],
+    session_id: uuid.UUID,
+    user_id,
+    message_request: ChatMessageRequest,
+    conversation_history: List[Dict[str, str]]
+):
+    """
+    SSE generator for streaming chat replies.
+    
+    Runs after the endpoint has returned, so the session and user are
+    re-loaded instead of reusing instances from the request scope.
+    """
+    yield format_sse("session", {"session_id": str(session_id)})
+    
+    ai_result = None
+    async for event in ark_ai_service.legal_consultation_stream(
+        user_query=message_request.content,
+        conversation_history=conversation_history,
+        persona=message_request.persona
+    ):
+        if event["type"] == "delta":
+            yield format_sse("delta", {"content": event["content"]})
+        elif event["type"] == "done":
+            ai_result = event
+        else:
+            yield format_sse("error", {
+                "detail": f"AI service error: {event.get('error', 'Unknown error')}"
+            })
+            return
+    
+    if ai_result is None:
+        yield format_sse("error", {"detail": "AI service error: stream ended unexpectedly"})
+        return
+    
+    try:
+        session = await db.get(ChatSession, session_id)
+        current_user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        
+        await _persist_exchange(
+            db=db,
+            transcripts=transcripts,
+            session=session,
+            current_user=current_user,
+            user_content=message_request.content,
+            ai_result=ai_result
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to persist streamed chat message: {e}", exc_info=True)
+        yield format_sse("error", {"detail": "Failed to save message"})
+        return
+    
+    response = _build_message_response(session, ai_result)
+    yield format_sse("done", response.model_dump(mode="json"))
+
+
+async def _persist_exchange(
+    db: AsyncSession,
+    transcripts: Optional[TranscriptStore],
+    session: ChatSession,
+    current_user: User,
+    user_content: str,
+    ai_result: Dict[str, Any]
+) -> None:
+    """
+    Save user + assistant messages and update session, query log and quotas.
+    """
     # Create message objects
     user_message = {
         "role": "user",
-        "content": message_request.content,
+        "content": user_content,
         "timestamp": datetime.utcnow().isoformat()
     }
     
@@ -144,29 +251,14 @@ async def send_message(
         "citations": ai_result.get("citations", [])
     }
     
-    # Update MongoDB transcript
-    if transcript:
-        mongodb.chat_transcripts.update_one(
-            {"_id": session.mongodb_transcript_id},
-            {
-                "$push": {
-                    "messages": {"$each": [user_message, assistant_message]}
-                },
-                "$set": {
-                    "updated_at": datetime.utcnow()
-                }
-            }
+    # Update MongoDB transcript (bucket terakhir; transcript dibuat jika belum ada)
+    if transcripts:
+        await transcripts.append(
+            session.mongodb_transcript_id,
+            [user_message, assistant_message],
+            user_id=current_user.id,
+            session_id=str(session.id)
         )
-    else:
-        # Create new transcript
-        mongodb.chat_transcripts.insert_one({
-            "_id": session.mongodb_transcript_id,
-            "user_id": current_user.id,
-            "session_id": str(session.id),
-            "messages": [user_message, assistant_message],
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        })
     
     # Update session metadata
     session.message_count += 2
@@ -200,8 +292,22 @@ async def send_message(
     current_user.ai_queries_this_month += 1
     current_user.last_query_at = datetime.utcnow()
     
-    db.commit()
-    
+    await db.commit()
+
+
+async def _get_user_session(db: AsyncSession, session_id: str, user_id) -> Optional[ChatSession]:
+    """Chat session milik user (None jika tidak ada)"""
+    result = await db.execute(
+        select(ChatSession).where(
+            ChatSession.id == uuid.UUID(session_id),
+            ChatSession.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+def _build_message_response(session: ChatSession, ai_result: Dict[str, Any]) -> ChatMessageResponse:
+    """Build API response for an assistant reply"""
     return ChatMessageResponse(
         message_id=str(uuid.uuid4()),
         session_id=str(session.id),
@@ -215,11 +321,19 @@ async def send_message(
     )
 
 
+@router.get("/context/stats", tags=["Chat"])
+async def get_context_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Prompt token usage vs. full history for this worker process"""
+    return get_context_builder().metrics.to_dict()
+
+
 @router.post("/sessions", response_model=SessionResponse, tags=["Chat"])
 async def create_session(
     session_request: SessionCreateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new chat session"""
     session = ChatSession(
@@ -239,8 +353,8 @@ async def create_session(
         session.is_pin_protected = True
     
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     
     return SessionResponse(
         id=str(session.id),
@@ -257,26 +371,57 @@ async def create_session(
 
 @router.get("/sessions", tags=["Chat"])
 async def list_sessions(
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
     category: Optional[str] = None,
     status: str = "active",
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List user's chat sessions"""
-    query = db.query(ChatSession).filter(
+    """
+    List user's chat sessions (terbaru dulu, keyset pagination)
+
+    Kirim `next_cursor` dari respons sebelumnya sebagai `cursor` untuk
+    halaman berikutnya. `skip` hanya untuk kompatibilitas klien lama.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conditions = [
         ChatSession.user_id == current_user.id,
         ChatSession.status == status
-    )
+    ]
     
     if category:
-        query = query.filter(ChatSession.category == category)
+        conditions.append(ChatSession.category == category)
     
-    sessions = query.order_by(ChatSession.last_message_at.desc()).offset(skip).limit(limit).all()
+    query = select(ChatSession).where(*conditions).order_by(
+        *keyset_order(ChatSession.last_message_at, ChatSession.id)
+    )
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            last_id = uuid.UUID(position.last_id)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(keyset_after(ChatSession.last_message_at, ChatSession.id, position.sort_value, last_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    sessions, next_cursor = split_page(rows, limit, "last_message_at")
+    
+    # Total dari counter per user (dipelihara saat write), bukan COUNT(*)
+    total = await db.scalar(
+        select(UserSessionCounter.count).where(
+            UserSessionCounter.user_id == current_user.id,
+            UserSessionCounter.status == status,
+            UserSessionCounter.category == (category or ALL_CATEGORIES)
+        )
+    )
     
     return {
-        "total": query.count(),
+        "total": total or 0,
+        "next_cursor": next_cursor,
         "sessions": [
             SessionResponse(
                 id=str(s.id),
@@ -299,14 +444,11 @@ async def get_session(
     session_id: str,
     pin: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
-    mongodb = Depends(get_mongodb)
+    db: AsyncSession = Depends(get_async_db),
+    mongodb = Depends(get_mongodb_async)
 ):
     """Get session details with full transcript"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == uuid.UUID(session_id),
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = await _get_user_session(db, session_id, current_user.id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -321,11 +463,11 @@ async def get_session(
             raise HTTPException(status_code=403, detail="Invalid PIN")
     
     # Get transcript from MongoDB
-    transcript = mongodb.chat_transcripts.find_one({"_id": session.mongodb_transcript_id})
+    transcripts = get_transcript_store(mongodb)
     
     messages = []
-    if transcript:
-        messages = transcript.get("messages", [])
+    if transcripts:
+        messages = await transcripts.load_all(session.mongodb_transcript_id)
     
     return {
         "session": SessionResponse(
@@ -356,13 +498,10 @@ async def update_session(
     rating: Optional[int] = None,
     feedback: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update session metadata"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == uuid.UUID(session_id),
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = await _get_user_session(db, session_id, current_user.id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -379,7 +518,7 @@ async def update_session(
         session.feedback = feedback
     
     session.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return {"status": "success", "message": "Session updated"}
 
@@ -388,14 +527,10 @@ async def update_session(
 async def delete_session(
     session_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
-    mongodb = Depends(get_mongodb)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete session (soft delete)"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == uuid.UUID(session_id),
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = await _get_user_session(db, session_id, current_user.id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -403,6 +538,6 @@ async def delete_session(
     # Soft delete
     session.status = "deleted"
     session.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return {"status": "success", "message": "Session deleted"}
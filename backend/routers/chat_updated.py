@@ -3,7 +3,7 @@ Router untuk handle chat dengan AI - Updated Version
 """
 import logging
 import json
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 import crud
 import schemas
 import models
+from core.pagination import MAX_PAGE_SIZE, InvalidCursorError
 from core.security_updated import get_current_user
 from database import get_db
 from services.ai_service_enhanced import ai_service_enhanced as ai_service
@@ -153,6 +154,8 @@ async def konsultasi_ai(
 
 @router.get("/history", response_model=List[schemas.ChatSession])
 async def get_chat_history(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
     current_user: models.User = Depends(get_current_user),
@@ -160,8 +163,18 @@ async def get_chat_history(
 ):
     """
     Dapatkan riwayat sesi chat pengguna
+
+    Halaman berikutnya: kirim header X-Next-Cursor sebagai `cursor`.
     """
-    return crud.get_user_chat_sessions(db, current_user.id, skip, limit)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        sessions = crud.get_user_chat_sessions(db, current_user.id, skip, limit, cursor=cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+    next_cursor = crud.session_page_cursor(sessions, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sessions
 
 @router.get("/session/{session_id}", response_model=schemas.ChatHistory)
 async def get_chat_session_detail(
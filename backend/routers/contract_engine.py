@@ -7,18 +7,22 @@ Router untuk Contract Intelligence Engine
 """
 import logging
 import asyncio
+import os
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 
-from ..services.ai_service import AdvancedAIService
+from ..services.ai_service import ai_service
+from ..services.ai.stage_graph import Stage, StageGraph, StageMemo
 from ..core.security import get_current_user_optional
 from ..models import User
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/contract-engine", tags=["Contract Intelligence"])
-ai_service = AdvancedAIService()
+
+# Timeout per stage analisis kontrak (detik)
+CONTRACT_STAGE_TIMEOUT = float(os.getenv("CONTRACT_STAGE_TIMEOUT", "45"))
 
 # Pydantic Models
 class ContractAnalysisRequest(BaseModel):
@@ -81,6 +85,7 @@ class ContractIntelligenceReport(BaseModel):
     negotiation_simulation: Dict[str, Any]
     final_scorecard: Dict[str, Any]
     generated_at: str
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Timing trace per stage pipeline")
 
 class ContractComparisonRequest(BaseModel):
     """Model untuk perbandingan kontrak"""
@@ -146,23 +151,20 @@ async def analyze_contract_intelligence(
 
         logger.info(f"Starting contract intelligence analysis: {analysis_id}")
 
-        # Step 1: Dual AI contract analysis
-        ark_analysis = await _analyze_contract_ark(request.contract_text, request.contract_type, request.jurisdiction)
-        groq_analysis = await _analyze_contract_groq(request.contract_text, request.contract_type, request.jurisdiction)
-
-        # Step 2: Optimization suggestions engine
-        optimization_suggestions = await _generate_optimization_suggestions(ark_analysis, groq_analysis, request.contract_type)
-
-        # Step 3: Risk assessment with dual AI
-        risk_assessment = await _contract_risk_assessment(ark_analysis, groq_analysis, request.risk_tolerance or "medium")
-
-        # Step 4: Outcome prediction modeling
-        outcome_prediction = await _predict_contract_outcome(request.contract_text, request.contract_type, ark_analysis.get("performance_indicators", {}))
-
-        # Step 5: Negotiation simulation (if requested)
-        negotiation_simulation = {}
-        if request.include_negotiation_simulator:
-            negotiation_simulation = await _simulate_negotiation(request.contract_text, request.contract_type)
+        # Ark & Groq paralel, lalu optimization/risk/outcome paralel
+        run = await _get_contract_graph().run({
+            "contract_text": request.contract_text,
+            "contract_type": request.contract_type,
+            "jurisdiction": request.jurisdiction,
+            "risk_tolerance": request.risk_tolerance or "medium",
+            "include_negotiation": request.include_negotiation_simulator
+        })
+        ark_analysis = run.results["ark_analysis"]
+        groq_analysis = run.results["groq_analysis"]
+        optimization_suggestions = run.results["optimization_suggestions"]
+        risk_assessment = run.results["risk_assessment"]
+        outcome_prediction = run.results["outcome_prediction"]
+        negotiation_simulation = run.results["negotiation_simulation"]
 
         # Step 6: Final intelligence scorecard
         final_scorecard = _generate_contract_scorecard(optimization_suggestions, risk_assessment, outcome_prediction)
@@ -195,7 +197,8 @@ async def analyze_contract_intelligence(
             outcome_prediction=outcome_prediction,
             negotiation_simulation=negotiation_simulation,
             final_scorecard=final_scorecard,
-            generated_at=datetime.now().isoformat()
+            generated_at=datetime.now().isoformat(),
+            metadata={"pipeline": run.to_metadata()}
         )
 
         return report
@@ -326,6 +329,52 @@ async def get_contract_templates(contract_type: Optional[str] = None):
         logger.error(f"Template retrieval error: {str(e)}")
         raise HTTPException(status_code=500, detail="Gagal retrieve templates")
 
+# Contract analysis pipeline DAG
+_contract_graph: Optional[StageGraph] = None
+
+async def _maybe_simulate_negotiation(contract_text: str, contract_type: str, include_negotiation: bool) -> Dict[str, Any]:
+    """Negotiation simulation hanya jika diminta"""
+    if not include_negotiation:
+        return {}
+    return await _simulate_negotiation(contract_text, contract_type)
+
+def _get_contract_graph() -> StageGraph:
+    """
+    Get or create the contract analysis graph.
+
+    ark + groq + negotiation (paralel) -> optimization/risk/outcome (paralel)
+
+    Hanya stage deterministik (tanpa panggilan AI) yang di-memoize: memo
+    dipakai bersama oleh semua user.
+    """
+    global _contract_graph
+    if _contract_graph is None:
+        _contract_graph = StageGraph(
+            [
+                Stage("ark_analysis", _analyze_contract_ark,
+                      inputs=["contract_text", "contract_type", "jurisdiction"], fallback={}),
+                Stage("groq_analysis", _analyze_contract_groq,
+                      inputs=["contract_text", "contract_type", "jurisdiction"], fallback={}),
+                Stage("negotiation_simulation", _maybe_simulate_negotiation,
+                      inputs=["contract_text", "contract_type", "include_negotiation"], fallback={}),
+                Stage("optimization_suggestions",
+                      lambda contract_type, ark, groq: _generate_optimization_suggestions(ark, groq, contract_type),
+                      inputs=["contract_type"], deps=["ark_analysis", "groq_analysis"], fallback=[]),
+                Stage("risk_assessment",
+                      lambda risk_tolerance, ark, groq: _contract_risk_assessment(ark, groq, risk_tolerance),
+                      inputs=["risk_tolerance"], deps=["ark_analysis", "groq_analysis"], fallback={}),
+                Stage("outcome_prediction",
+                      lambda contract_text, contract_type, ark: _predict_contract_outcome(
+                          contract_text, contract_type, ark.get("performance_indicators", {})
+                      ),
+                      inputs=["contract_text", "contract_type"], deps=["ark_analysis"], fallback={}, memoize=True),
+            ],
+            default_timeout=CONTRACT_STAGE_TIMEOUT,
+            memo=StageMemo(max_entries=64),
+            name="contract_engine"
+        )
+    return _contract_graph
+
 # Internal helper functions
 async def _analyze_contract_ark(contract_text: str, contract_type: str, jurisdiction: str) -> Dict[str, Any]:
     """BytePlus Ark: Legal structure and compliance analysis"""
@@ -781,5 +830,4 @@ async def _optimize_contract_clause_dual(
         "recommended": {"text": "Best optimized version", "confidence": 0.88},
         "power_analysis": {"negotiating_power": "strong", "key_levers": ["Timeline flexibility", "Payment terms"]},
         "alternatives": ["Alternative clause options for different scenarios"]
-    }</content>
-</xai:function_call">Contract Intelligence Engine
\ No newline at end of file
+    }
@@ -11,7 +11,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from bson import ObjectId
@@ -20,7 +20,8 @@ from backend.core.security_updated import get_current_user
 from backend.core.config import get_settings
 from backend.services.blockchain_databases import get_mongodb_cursor
 from backend.services.ai_service_enhanced import ai_service_enhanced as ai_service
-from backend.services.document_service import document_service
+from backend.services.blob_store import BLOB_GC_GRACE_SECONDS, BlobTooLargeError, get_blob_store
+from backend.services.jobs import enqueue_job
 from backend.models import User
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ class DocumentUploadResponse(BaseModel):
     upload_timestamp: str
     status: str
     analysis_status: str = "pending"
+    job_id: Optional[str] = None  # Status/progress via GET /api/jobs/{job_id}
 
 class DocumentAnalysisResponse(BaseModel):
     document_id: str
@@ -46,6 +48,7 @@ class DocumentAnalysisResponse(BaseModel):
     summary: Optional[str] = None
     risk_assessment: Optional[str] = None
     analysis_timestamp: Optional[str] = None
+    extraction_progress: Optional[Dict[str, int]] = None  # {"pages_done", "pages_total"}
 
 class DocumentListResponse(BaseModel):
     documents: List[Dict[str, Any]]
@@ -55,7 +58,8 @@ class DocumentListResponse(BaseModel):
 
 # File validation
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.jpg', '.jpeg', '.png', '.tiff'}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+# File di-stream ke blob store (bukan ke memory / MongoDB), jadi scan PDF besar aman
+MAX_FILE_SIZE = int(os.getenv("DOCUMENT_MAX_UPLOAD_MB", "200")) * 1024 * 1024
 
 def validate_file(file: UploadFile) -> None:
     """Validate uploaded file"""
@@ -112,51 +116,18 @@ async def get_from_mongodb(document_id: str) -> Dict[str, Any]:
         logger.error(f"MongoDB retrieval error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve document")
 
-async def process_document_background(
-    document_id: str,
-    file_content: bytes,
-    file_type: str,
-    filename: str
-):
-    """Background task untuk document processing"""
-    try:
-        mongodb = get_mongodb_cursor()
-        if not mongodb:
-            logger.error("MongoDB not available for background processing")
-            return
-
-        db = mongodb["pasalku_ai_analytics"]
-        collection = db["documents"]
-
-        # Process document
-        success = await document_service.process_document_async(
-            document_id=document_id,
-            file_content=file_content,
-            file_type=file_type,
-            filename=filename,
-            mongodb_collection=collection
-        )
-
-        if success:
-            logger.info(f"Background processing completed for document: {document_id}")
-        else:
-            logger.error(f"Background processing failed for document: {document_id}")
-
-    except Exception as e:
-        logger.error(f"Background processing error: {str(e)}")
-
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user: User = Depends(get_current_user)
 ):
     """
     Upload dokumen hukum untuk analisis AI
     - Validasi file type dan size
-    - Extract text (untuk image/doc menggunakan OCR)
-    - AI-powered analysis
-    - Store di MongoDB
+    - Stream file ke blob store (content-addressed, dedup SHA-256)
+    - Enqueue job "documents.process" (extract text/OCR + AI analysis)
+      yang dikerjakan oleh job worker process
+    - Store metadata + referensi blob di MongoDB
     """
     try:
         # Validate file
@@ -165,8 +136,14 @@ async def upload_document(
         # Generate unique document ID
         document_id = str(uuid.uuid4())
 
-        # Read file content
-        file_content = await file.read()
+        # Stream file ke disk per chunk (tidak dibaca utuh ke memory)
+        try:
+            blob = await get_blob_store().save_upload(file, max_size=MAX_FILE_SIZE)
+        except BlobTooLargeError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large. Maximum size: {MAX_FILE_SIZE/1024/1024}MB"
+            )
 
         # Basic document metadata
         document_data = {
@@ -175,13 +152,13 @@ async def upload_document(
             "filename": file.filename,
             "original_filename": file.filename,
             "content_type": file.content_type,
-            "file_size": len(file_content),
+            "file_size": blob.size,
             "user_id": str(user.id),
             "user_email": user.email,
             "upload_timestamp": datetime.utcnow(),
             "status": "uploaded",
             "analysis_status": "pending",
-            "file_content": file_content,  # Store binary data
+            "blob": blob.to_dict(),  # Referensi ke blob store, bukan binary data
             "metadata": {
                 "processed": False,
                 "extracted_text": None,
@@ -192,13 +169,19 @@ async def upload_document(
         # Save to MongoDB
         await save_to_mongodb(document_data)
 
-        # Trigger async document analysis
-        background_tasks.add_task(
-            process_document_background,
-            document_id=document_id,
-            file_content=file_content,
-            file_type=file.content_type,
-            filename=file.filename
+        # Analysis dikerjakan job worker (durable, retry + progress)
+        job = await enqueue_job(
+            "documents.process",
+            {
+                "document_id": document_id,
+                # Key blob, bukan path: worker me-resolve sendiri dari root blob store
+                "blob_sha256": blob.sha256,
+                "file_type": file.content_type,
+                "filename": file.filename
+            },
+            queue="documents",
+            idempotency_key=f"document:{document_id}",
+            owner_id=str(user.id)
         )
 
         logger.info(f"Document uploaded: {document_id} by user {user.email}")
@@ -206,11 +189,12 @@ async def upload_document(
         return DocumentUploadResponse(
             document_id=document_id,
             filename=file.filename,
-            file_size=len(file_content),
+            file_size=blob.size,
             content_type=file.content_type,
             upload_timestamp=document_data["upload_timestamp"].isoformat(),
             status="uploaded",
-            analysis_status="pending"
+            analysis_status="pending",
+            job_id=job.id
         )
 
     except HTTPException:
@@ -226,7 +210,8 @@ async def get_document_analysis(
 ):
     """
     Get document analysis hasil
-    - Status analysis
+    - Status analysis (extracting -> analyzing -> completed/failed)
+    - Progress ekstraksi per halaman
     - Extracted text
     - AI insights & legal references
     - Risk assessment
@@ -247,7 +232,8 @@ async def get_document_analysis(
             legal_references=document.get("metadata", {}).get("legal_references", []),
             summary=document.get("metadata", {}).get("summary"),
             risk_assessment=document.get("metadata", {}).get("risk_assessment"),
-            analysis_timestamp=document.get("analysis_timestamp")
+            analysis_timestamp=document.get("analysis_timestamp"),
+            extraction_progress=document.get("extraction_progress")
         )
 
     except HTTPException:
@@ -315,6 +301,7 @@ async def delete_document(
     """
     Delete document dan semua analysis terkait
     - Hard delete dari MongoDB
+    - Hapus file di blob store jika tidak dipakai dokumen lain
     - Check ownership sebelum delete
     """
     try:
@@ -334,6 +321,21 @@ async def delete_document(
             if result.deleted_count == 0:
                 raise HTTPException(status_code=404, detail="Document not found")
 
+            # Blob di-share antar dokumen dengan isi sama (dedup). Cek referensi
+            # + hapus di job setelah grace period, bukan di sini: upload
+            # paralel dengan isi sama bisa sedang memakai blob ini
+            sha256 = (document.get("blob") or {}).get("sha256")
+            if sha256:
+                try:
+                    await enqueue_job(
+                        "documents.release_blob",
+                        {"blob_sha256": sha256},
+                        queue="documents",
+                        delay=BLOB_GC_GRACE_SECONDS
+                    )
+                except Exception as e:
+                    logger.warning(f"Blob release not scheduled for {sha256}: {e}")
+
         logger.info(f"Document deleted: {document_id} by user {user.email}")
         return {"message": "Document deleted successfully"}
 
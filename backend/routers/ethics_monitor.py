@@ -3,7 +3,7 @@ AI Ethics and Compliance Monitoring System - Pasalku.ai Platform
 Enterprise-grade ethics monitoring with real-time governance controls
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Literal
 from datetime import datetime, timedelta
@@ -12,6 +12,8 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import json
 
+from backend.services.jobs import enqueue_job
+
 router = APIRouter(prefix="/ethics", tags=["Ethics & Compliance"])
 
 class EthicsCategory(str, Enum):
@@ -379,10 +381,10 @@ async def get_compliance_report():
     }
 
 @router.post("/background-audit", status_code=202)
-async def start_background_audit(request: EthicsAuditRequest, background_tasks: BackgroundTasks):
-    """Start background ethics monitoring"""
-    background_tasks.add_task(ethics_monitor.audit_session, request)
-    return {"status": "audit_started", "message": "Background ethics audit initiated"}
+async def start_background_audit(request: EthicsAuditRequest):
+    """Start background ethics monitoring (hasil via GET /api/jobs/{job_id})"""
+    job = await enqueue_job("ethics.audit", request.dict(), queue="ethics")
+    return {"status": "audit_started", "message": "Background ethics audit initiated", "job_id": job.id}
 
 print("🎯 PASALKU.AI ETHICS MONITORING SYSTEM READY")
 print("🔒 Enterprise-grade AI governance and compliance monitoring")
@@ -0,0 +1,89 @@
+"""
+Background Jobs API
+Status, progress, dan pembatalan job yang dikerjakan job worker
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.security import OAuth2PasswordBearer
+
+from backend.core.security_updated import get_current_user
+from backend.models import User
+from backend.services.jobs import Job, JobStatus, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["Background Jobs"])
+
+# Token opsional: job anonim (tanpa owner_id) tetap bisa diakses lewat job ID
+_optional_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+
+def get_optional_user(token: Optional[str] = Depends(_optional_oauth2)) -> Optional[User]:
+    """User yang login jika ada bearer token (token tidak valid tetap 401)"""
+    if not token:
+        return None
+    return get_current_user(db=None, token=token)
+
+
+def _authorize_job(job: Optional[Job], user: Optional[User]) -> Job:
+    """
+    Job milik user (owner_id) hanya untuk pemiliknya; job tanpa owner_id
+    cukup dengan job ID (UUID acak sebagai capability)
+    """
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.owner_id is not None:
+        if user is None:
+            raise HTTPException(status_code=401, detail="Authentication required", headers={"WWW-Authenticate": "Bearer"})
+        if str(user.id) != job.owner_id:
+            # 404, bukan 403: jangan bocorkan keberadaan job user lain
+            raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/stats")
+async def get_job_stats(user: User = Depends(get_current_user)) -> Dict[str, Dict[str, int]]:
+    """Jumlah job per queue per status"""
+    return await asyncio.to_thread(get_job_queue().stats)
+
+
+@router.get("")
+async def list_my_jobs(
+    queue: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    limit: int = Query(50, ge=1, le=200),
+    user: User = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """Job milik user yang login, terbaru dulu"""
+    jobs = await asyncio.to_thread(
+        get_job_queue().list_jobs, queue=queue, status=status, owner_id=str(user.id), limit=limit
+    )
+    return [job.to_dict() for job in jobs]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, user: Optional[User] = Depends(get_optional_user)) -> Dict[str, Any]:
+    """
+    Status + progress + hasil job
+
+    Job dengan owner_id hanya bisa dilihat pemiliknya. Job anonim (research,
+    audit) memakai job ID (UUID acak) sebagai capability.
+    """
+    job = _authorize_job(await asyncio.to_thread(get_job_queue().get, job_id), user)
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, user: Optional[User] = Depends(get_optional_user)) -> Dict[str, Any]:
+    """Batalkan job (queued -> cancelled, running -> dihentikan worker)"""
+    job_queue = get_job_queue()
+    _authorize_job(await asyncio.to_thread(job_queue.get, job_id), user)
+    job = await asyncio.to_thread(job_queue.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    logger.info(f"🚫 Cancel requested for job {job_id} (status={job.status.value})")
+    return job.to_dict()
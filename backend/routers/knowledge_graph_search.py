@@ -4,7 +4,7 @@ Knowledge Graph API Router
 REST API endpoints for semantic search, citation extraction, and legal document queries.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import time
@@ -14,6 +14,8 @@ from services.knowledge_graph.search_engine import (
     SearchResult,
     CitationInfo
 )
+from services.knowledge_graph.inverted_index import IndexRebuildInProgress, get_legal_document_index
+from services.edgedb.connection import get_edgedb_manager
 from services.knowledge_graph.citation_extractor import (
     get_citation_extractor,
     ExtractedCitation
@@ -22,6 +24,8 @@ from services.knowledge_graph.relevance_ranker import (
     get_relevance_ranker,
     RankedResult
 )
+from ..middleware.auth import require_admin
+from ..models.user import User
 
 
 # Request/Response Models
@@ -391,6 +395,7 @@ async def get_statistics():
                 "court_case": 0,
                 "article": 0
             },
+            "search_index": get_legal_document_index().get_statistics(),
             "note": "Statistics will be populated when data is imported"
         }
         
@@ -399,3 +404,31 @@ async def get_statistics():
             status_code=500,
             detail=f"Failed to get statistics: {str(e)}"
         )
+
+
+@router.post("/index/rebuild", tags=["Admin - Knowledge Graph"])
+async def rebuild_search_index(current_user: User = Depends(require_admin)):
+    """
+    Rebuild the full-text inverted index from every LegalDocument (Admin only).
+    
+    Only needed for the initial build or after bulk imports that bypass
+    LegalDocumentRepository.create; the index is persisted to disk and
+    reloaded on restart.
+    """
+    try:
+        start_time = time.time()
+        indexed = await get_legal_document_index().build_from_edgedb(get_edgedb_manager())
+        
+        return {
+            "status": "success",
+            "indexed_documents": indexed,
+            "build_time": time.time() - start_time
+        }
+
+    except IndexRebuildInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Index rebuild failed: {str(e)}"
+        )
@@ -3,7 +3,7 @@ API Endpoint untuk AI Orchestrator - WORKING CODE!
 """
 
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -18,6 +18,7 @@ from backend.services.negotiation_simulator import negotiation_simulator
 from backend.services.report_generator import report_generator
 from backend.services.conversation_storage import conversation_storage
 from backend.models.orchestrator_conversation import ConversationSession, ConversationMessage
+from backend.services.ai.streaming import format_sse, SSE_MEDIA_TYPE, SSE_HEADERS
 from uuid import uuid4
 
 router = APIRouter(prefix="/api/orchestrator", tags=["AI Orchestrator"])
@@ -37,6 +38,7 @@ class OrchestrationRequest(BaseModel):
     context: Optional[Dict[str, Any]] = {}
     session_id: Optional[str] = None  # For continuing existing conversation
     user_id: Optional[str] = None  # For authenticated users
+    stream: bool = False  # Respond with text/event-stream (meta, delta, done)
 
 
 class OrchestrationResponse(BaseModel):
@@ -78,6 +80,13 @@ async def analyze_conversation(request: OrchestrationRequest):
         history = [{"role": msg.role, "content": msg.content} 
                   for msg in request.conversation_history]
         
+        if request.stream:
+            return StreamingResponse(
+                _stream_analysis(request, session_id, history),
+                media_type=SSE_MEDIA_TYPE,
+                headers=SSE_HEADERS
+            )
+        
         # Call orchestrator (NOW ASYNC WITH REAL AI!)
         result = await orchestrator.orchestrate(
             user_message=request.message,
@@ -86,67 +95,111 @@ async def analyze_conversation(request: OrchestrationRequest):
             context=request.context or {}
         )
         
-        # Format AI response berdasarkan type
-        ai_response = format_ai_response(result)
-        
         # ====== SAVE TO DATABASE ======
-        if conversation_storage.initialized:
-            # Load or create session
-            session = await conversation_storage.get_conversation(session_id)
-            
-            if not session:
-                # New conversation
-                session = ConversationSession(
-                    session_id=session_id,
-                    user_id=request.user_id,
-                    user_tier=request.user_tier,
-                    legal_area=result["legal_area"],
-                    current_stage=result["stage"]
-                )
-            
-            # Add user message
-            session.messages.append(ConversationMessage(
-                role="user",
-                content=request.message,
-                timestamp=datetime.utcnow()
-            ))
-            
-            # Add AI response
-            session.messages.append(ConversationMessage(
-                role="assistant",
-                content=result["message"],
-                timestamp=datetime.utcnow(),
-                metadata={
-                    "response_type": result["response_type"],
-                    "ai_powered": result.get("ai_powered", False)
-                }
-            ))
-            
-            # Update context
-            session.legal_area = result["legal_area"]
-            session.current_stage = result["stage"]
-            session.detected_signals = result.get("signals", {})
-            session.suggested_features = result.get("features", [])
-            
-            # Save
-            await conversation_storage.save_conversation(session)
+        await _save_exchange(request, session_id, result)
         
-        return OrchestrationResponse(
-            stage=result["stage"],
-            legal_area=result["legal_area"],
-            response_type=result["response_type"],
-            message=result["message"],
-            questions=result.get("questions"),
-            features=result.get("features"),
-            signals=result.get("signals"),
-            ai_response=ai_response,
-            session_id=session_id  # Return session ID for frontend
-        )
+        return _build_orchestration_response(result, session_id)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_analysis(
+    request: OrchestrationRequest,
+    session_id: str,
+    history: List[Dict[str, str]]
+):
+    """
+    SSE generator for /analyze with stream=true.
+    
+    Events: `meta` (stage, legal_area, questions/features) as soon as the
+    turn is planned, `delta` per AI token, then `done` with the full
+    OrchestrationResponse after the conversation is saved.
+    """
+    try:
+        async for event in orchestrator.orchestrate_stream(
+            user_message=request.message,
+            conversation_history=history,
+            user_tier=request.user_tier,
+            context=request.context or {}
+        ):
+            event_type = event.pop("type")
+            if event_type == "meta":
+                yield format_sse("meta", {**event, "session_id": session_id})
+            elif event_type == "delta":
+                yield format_sse("delta", {"content": event["content"]})
+            elif event_type == "done":
+                await _save_exchange(request, session_id, event)
+                response = _build_orchestration_response(event, session_id)
+                yield format_sse("done", response.model_dump(mode="json"))
+    except Exception as e:
+        yield format_sse("error", {"detail": str(e)})
+
+
+async def _save_exchange(
+    request: OrchestrationRequest,
+    session_id: str,
+    result: Dict[str, Any]
+) -> None:
+    """Append user + assistant messages to the stored conversation"""
+    if not conversation_storage.initialized:
+        return
+    
+    # Load or create session
+    session = await conversation_storage.get_conversation(session_id)
+    
+    if not session:
+        # New conversation
+        session = ConversationSession(
+            session_id=session_id,
+            user_id=request.user_id,
+            user_tier=request.user_tier,
+            legal_area=result["legal_area"],
+            current_stage=result["stage"]
+        )
+    
+    # Add user message
+    session.messages.append(ConversationMessage(
+        role="user",
+        content=request.message,
+        timestamp=datetime.utcnow()
+    ))
+    
+    # Add AI response
+    session.messages.append(ConversationMessage(
+        role="assistant",
+        content=result["message"],
+        timestamp=datetime.utcnow(),
+        metadata={
+            "response_type": result["response_type"],
+            "ai_powered": result.get("ai_powered", False)
+        }
+    ))
+    
+    # Update context
+    session.legal_area = result["legal_area"]
+    session.current_stage = result["stage"]
+    session.detected_signals = result.get("signals", {})
+    session.suggested_features = result.get("features", [])
+    
+    # Save
+    await conversation_storage.save_conversation(session)
+
+
+def _build_orchestration_response(result: Dict[str, Any], session_id: str) -> OrchestrationResponse:
+    return OrchestrationResponse(
+        stage=result["stage"],
+        legal_area=result["legal_area"],
+        response_type=result["response_type"],
+        message=result["message"],
+        questions=result.get("questions"),
+        features=result.get("features"),
+        signals=result.get("signals"),
+        ai_response=format_ai_response(result),  # Format AI response berdasarkan type
+        session_id=session_id  # Return session ID for frontend
+    )
+
+
 def format_ai_response(result: Dict[str, Any]) -> str:
     """Format hasil orchestrator jadi response text yang bagus"""
     
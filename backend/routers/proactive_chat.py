@@ -22,13 +22,15 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import uuid
 
-from ..database import get_db, get_mongodb
+from ..database import get_db, get_mongodb, get_mongodb_async
 from ..models.user import User
 from ..models.chat import ChatSession, AIQueryLog
 from ..core.security_updated import get_current_user
 from ..services.conversation_orchestrator import ConversationOrchestrator, ConversationStage
 from ..services.ark_ai_service import ark_ai_service
 from ..services.report_generator import report_generator
+from ..services.transcript_store import get_transcript_store
+from ..services.ai.context_builder import assemble_chat_context
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/proactive-chat", tags=["Proactive AI Chat"])
@@ -85,7 +87,7 @@ async def send_proactive_message(
     request: ProactiveChatRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    mongodb = Depends(get_mongodb)
+    mongodb = Depends(get_mongodb_async)
 ):
     """
     **🧠 PROACTIVE CHAT - AI Konsultan yang Cerdas**
@@ -131,14 +133,14 @@ async def send_proactive_message(
             
             logger.info(f"New proactive session created: {session.id}")
         
-        # Get conversation history from MongoDB
-        transcript = mongodb.chat_transcripts.find_one({"_id": session.mongodb_transcript_id})
+        # Get conversation history from MongoDB (hanya N pesan terakhir)
+        transcripts = get_transcript_store(mongodb)
         
         conversation_history = []
-        if transcript:
+        if transcripts:
             conversation_history = [
                 {"role": msg["role"], "content": msg["content"]}
-                for msg in transcript.get("messages", [])
+                for msg in await transcripts.load_tail(session.mongodb_transcript_id)
             ]
         
         # Initialize orchestrator
@@ -160,10 +162,19 @@ async def send_proactive_message(
         
         # Jika bukan tahap INITIAL_INQUIRY, tambahkan actual AI analysis
         if orchestration_result["stage"] not in ["initial_inquiry", "clarification"]:
+            # History untuk AI: rolling summary + turn terbaru dalam token budget
+            # (orchestrator tetap menerima tail untuk deteksi stage)
+            prompt_history = conversation_history
+            if transcripts:
+                context = await assemble_chat_context(
+                    transcripts, session.mongodb_transcript_id, owner_id=str(current_user.id)
+                )
+                prompt_history = context.messages
+            
             # Call actual AI untuk legal analysis
             ai_result = await ark_ai_service.legal_consultation(
                 user_query=request.message,
-                conversation_history=conversation_history,
+                conversation_history=prompt_history,
                 persona="konsultan_hukum"
             )
             
@@ -190,19 +201,13 @@ async def send_proactive_message(
             "features_offered": [f["feature_id"] for f in orchestration_result.get("feature_offerings", [])]
         }
         
-        if transcript:
-            mongodb.chat_transcripts.update_one(
-                {"_id": session.mongodb_transcript_id},
-                {"$push": {"messages": {"$each": [user_message, assistant_message]}}}
+        if transcripts:
+            await transcripts.append(
+                session.mongodb_transcript_id,
+                [user_message, assistant_message],
+                user_id=current_user.id,
+                session_id=str(session.id)
             )
-        else:
-            mongodb.chat_transcripts.insert_one({
-                "_id": session.mongodb_transcript_id,
-                "session_id": str(session.id),
-                "messages": [user_message, assistant_message],
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            })
         
         # Update session metadata
         session.message_count += 2
@@ -333,7 +338,7 @@ async def get_proactive_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    mongodb = Depends(get_mongodb)
+    mongodb = Depends(get_mongodb_async)
 ):
     """
     Get session details dengan orchestration metadata
@@ -348,14 +353,15 @@ async def get_proactive_session(
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Get transcript
-    transcript = mongodb.chat_transcripts.find_one({"_id": session.mongodb_transcript_id})
+    transcripts = get_transcript_store(mongodb)
+    messages = await transcripts.load_all(session.mongodb_transcript_id) if transcripts else []
     
     return {
         "session_id": str(session.id),
         "title": session.title,
         "created_at": session.created_at,
         "message_count": session.message_count,
-        "messages": transcript.get("messages", []) if transcript else [],
+        "messages": messages,
         "metadata": {
             "model": session.ai_model,
             "persona": session.ai_persona
@@ -8,18 +8,24 @@ Router untuk Automated Legal Research Assistant
 """
 import logging
 import asyncio
+import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
-from ..services.ai_service import AdvancedAIService
+from ..services.ai_service import ai_service
+from ..services.ai.stage_graph import Stage, StageGraph, StageMemo
+from ..services.jobs import enqueue_job
 from ..core.security import get_current_user_optional
 from ..models import User
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/research-assistant", tags=["Research Assistant"])
-ai_service = AdvancedAIService()
+
+# Timeout per stage & memo hasil stage (detik)
+RESEARCH_STAGE_TIMEOUT = float(os.getenv("RESEARCH_STAGE_TIMEOUT", "45"))
+RESEARCH_MEMO_TTL = float(os.getenv("RESEARCH_MEMO_TTL", "600"))
 
 # Pydantic Models
 class ResearchQuery(BaseModel):
@@ -48,6 +54,7 @@ class ResearchReport(BaseModel):
     source_quality_score: float
     research_confidence: float
     generated_at: str
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Timing trace per stage pipeline")
 
 class PrecedentSearchResult(BaseModel):
     """Model hasil pencarian precedent"""
@@ -92,10 +99,7 @@ class ComparativeResearch(BaseModel):
     recommendation: str
 
 @router.post("/conduct-research", response_model=ResearchReport)
-async def conduct_legal_research(
-    research: ResearchQuery,
-    background_tasks: BackgroundTasks
-):
+async def conduct_legal_research(research: ResearchQuery):
     """
     **🔬 AUTOMATED LEGAL RESEARCH ASSISTANT - DUAL AI RESEARCH POWER**
 
@@ -154,50 +158,28 @@ async def conduct_legal_research(
 
         logger.info(f"Initiating comprehensive legal research: {research_id}")
 
-        start_time = datetime.now()
-
-        # Step 1: Dual AI research execution
-        research_findings = await _execute_dual_ai_research(research)
-
-        # Step 2: Precedent analysis and synthesis
-        precedent_analysis = await _analyze_precedents(research, research_findings)
-
-        # Step 3: Legal gap identification
-        legal_gaps = await _identify_legal_gaps(research, research_findings)
+        # Stage independen (gaps/opportunity/risk, predictive/quality) jalan paralel
+        run = await _get_research_graph().run({"research": research})
+        stages = run.results
 
-        # Step 4: Opportunity and risk analysis
-        opportunity_analysis = await _analyze_opportunities(research, research_findings)
-        risk_assessment = await _assess_research_risks(research, research_findings)
-
-        # Step 5: Predictive outcome modeling
-        predictive_outcomes = await _predict_outcomes(research, precedent_analysis)
-
-        # Step 6: Argumentation framework generation
-        argumentation_framework = await _generate_argumentation_framework(
-            research, precedent_analysis, predictive_outcomes
-        )
-
-        # Step 7: Executive synthesis and recommendations
-        executive_recommendations = await _generate_strategic_recommendations(
-            research, precedent_analysis, legal_gaps, predictive_outcomes
-        )
-
-        # Step 8: Quality scoring and confidence assessment
-        quality_scores = await _calculate_research_quality(research_findings, precedent_analysis)
-
-        processing_time = (datetime.now() - start_time).total_seconds()
+        research_findings = stages["research_findings"]
+        precedent_analysis = stages["precedent_analysis"]
+        predictive_outcomes = stages["predictive_outcomes"]
+        quality_scores = stages["quality_scores"]
 
         # Save research for analytics
         await _save_research_to_db(research_id, research, quality_scores)
 
-        # Background tasks for extended research
+        # Extended research dikerjakan job worker
+        metadata = {"pipeline": run.to_metadata()}
         if research.research_depth == "exhaustive":
-            background_tasks.add_task(
-                _perform_exhaustive_research,
-                research_id,
-                research,
-                research_findings
+            job = await enqueue_job(
+                "research.exhaustive",
+                {"research_id": research_id, "research": research.dict(), "findings": research_findings},
+                queue="research",
+                idempotency_key=f"research:{research_id}"
             )
+            metadata["exhaustive_research_job_id"] = job.id
 
         return ResearchReport(
             research_id=research_id,
@@ -207,15 +189,16 @@ async def conduct_legal_research(
             ),
             key_findings=research_findings.get("key_insights", []),
             precedent_analysis=precedent_analysis,
-            legal_gaps_identified=legal_gaps,
-            opportunity_analysis=opportunity_analysis,
-            risk_assessment=risk_assessment,
-            strategic_recommendations=executive_recommendations,
+            legal_gaps_identified=stages["legal_gaps"],
+            opportunity_analysis=stages["opportunity_analysis"],
+            risk_assessment=stages["risk_assessment"],
+            strategic_recommendations=stages["strategic_recommendations"],
             predictive_outcomes=predictive_outcomes,
-            argumentation_framework=argumentation_framework,
+            argumentation_framework=stages["argumentation_framework"],
             source_quality_score=quality_scores.get("source_quality", 0.9),
             research_confidence=quality_scores.get("overall_confidence", 0.85),
-            generated_at=datetime.now().isoformat()
+            generated_at=datetime.now().isoformat(),
+            metadata=metadata
         )
 
     except Exception as e:
@@ -354,6 +337,48 @@ async def get_research_trends(legal_domain: Optional[str] = None, time_period: s
         logger.error(f"Research trends error: {str(e)}")
         raise HTTPException(status_code=500, detail="Gagal menganalisis research trends")
 
+# Research pipeline DAG
+_research_graph: Optional[StageGraph] = None
+
+def _get_research_graph() -> StageGraph:
+    """
+    Get or create the research pipeline graph.
+
+    findings -> precedent/gaps/opportunity/risk (paralel)
+    precedent -> predictive/quality -> argumentation/recommendations
+
+    Hanya stage deterministik (tanpa panggilan AI) yang di-memoize: memo
+    dipakai bersama oleh semua user.
+    """
+    global _research_graph
+    if _research_graph is None:
+        _research_graph = StageGraph(
+            [
+                Stage("research_findings", _execute_dual_ai_research, inputs=["research"],
+                      fallback={"research_completeness": 0.0}),
+                Stage("precedent_analysis", _analyze_precedents, inputs=["research"],
+                      deps=["research_findings"], fallback={}),
+                Stage("legal_gaps", _identify_legal_gaps, inputs=["research"],
+                      deps=["research_findings"], fallback=[]),
+                Stage("opportunity_analysis", _analyze_opportunities, inputs=["research"],
+                      deps=["research_findings"], fallback={}, memoize=True),
+                Stage("risk_assessment", _assess_research_risks, inputs=["research"],
+                      deps=["research_findings"], fallback={}, memoize=True),
+                Stage("predictive_outcomes", _predict_outcomes, inputs=["research"],
+                      deps=["precedent_analysis"], fallback={}, memoize=True),
+                Stage("argumentation_framework", _generate_argumentation_framework, inputs=["research"],
+                      deps=["precedent_analysis", "predictive_outcomes"], fallback={}, memoize=True),
+                Stage("strategic_recommendations", _generate_strategic_recommendations, inputs=["research"],
+                      deps=["precedent_analysis", "legal_gaps", "predictive_outcomes"], fallback=[], memoize=True),
+                Stage("quality_scores", _calculate_research_quality,
+                      deps=["research_findings", "precedent_analysis"], fallback={}, memoize=True),
+            ],
+            default_timeout=RESEARCH_STAGE_TIMEOUT,
+            memo=StageMemo(max_entries=128, ttl_seconds=RESEARCH_MEMO_TTL),
+            name="research_assistant"
+        )
+    return _research_graph
+
 # Internal helper functions
 async def _execute_dual_ai_research(research: ResearchQuery) -> Dict[str, Any]:
     """Step 1: Execute dual AI research with comprehensive analysis"""
@@ -423,8 +448,8 @@ PROVIDE STRATEGIC BUSINESS ANALYSIS:
 
         # Synthesize findings
         return {
-            "ark_legal_analysis": ark_response.get("analysis", {}),
-            "groq_business_analysis": groq_response.get("analysis", {}),
+            "ark_legal_analysis": {"answer": ark_response.answer, "citations": ark_response.citations},
+            "groq_business_analysis": {"answer": groq_response.answer, "citations": groq_response.citations},
             "synthesized_insights": await _synthesize_dual_research(
                 ark_response, groq_response
             ),
@@ -445,9 +470,9 @@ async def _synthesize_dual_research(ark_response, groq_response) -> Dict[str, An
 
     synthesis_prompt = f"""DUAL AI RESEARCH SYNTHESIS
 
-LEGAL FINDINGS (Ark): {ark_response.get('answer', 'No legal analysis')[:1000]}...
+LEGAL FINDINGS (Ark): {(ark_response.answer or 'No legal analysis')[:1000]}...
 
-BUSINESS FINDINGS (Groq): {groq_response.get('answer', 'No business analysis')[:1000]}...
+BUSINESS FINDINGS (Groq): {(groq_response.answer or 'No business analysis')[:1000]}...
 
 SYNTHESIS REQUIREMENTS:
 - Identify complementary insights between legal dan strategic analysis
@@ -930,5 +955,4 @@ async def _analyze_research_trends(legal_domain: Optional[str], time_period: str
             "International cooperation frameworks development",
             "Technology regulation catching up debates"
         ]
-    }</content>
-</xai:function_call">Automated Legal Research Assistant
\ No newline at end of file
+    }
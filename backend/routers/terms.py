@@ -53,20 +53,19 @@ async def get_term_details(term_name: str):
     Used when user hovers/clicks on a highlighted term
     """
     try:
-        # Search for term in detector's database
-        term_name_normalized = term_name.lower().replace("-", " ")
+        # Search for term in detector's database (by name or URL slug)
+        entry = detector.get_term(term_name)
         
-        for pattern, term_data in detector.legal_terms_patterns.items():
-            if term_data['term'].lower() == term_name_normalized:
-                return {
-                    'term': term_data['term'],
-                    'definition_formal': term_data['definition_formal'],
-                    'definition_simple': term_data['definition_simple'],
-                    'analogy': term_data['analogy'],
-                    'category': term_data['category'],
-                    'related_articles': term_data['related_articles'],
-                    'learn_more_url': f'/sumber-daya/kamus/{term_name}'
-                }
+        if entry is not None:
+            return {
+                'term': entry.term,
+                'definition_formal': entry.definition_formal,
+                'definition_simple': entry.definition_simple,
+                'analogy': entry.analogy,
+                'category': entry.category,
+                'related_articles': list(entry.related_articles),
+                'learn_more_url': entry.learn_more_url
+            }
         
         raise HTTPException(status_code=404, detail=f"Term '{term_name}' not found")
     
@@ -86,14 +85,14 @@ async def search_terms(q: str, limit: int = 10):
         results = []
         query_lower = q.lower()
         
-        for pattern, term_data in detector.legal_terms_patterns.items():
-            if query_lower in term_data['term'].lower() or \
-               query_lower in term_data['definition_simple'].lower():
+        for entry in detector.terms:
+            if query_lower in entry.term.lower() or \
+               query_lower in entry.definition_simple.lower():
                 results.append({
-                    'term': term_data['term'],
-                    'definition_simple': term_data['definition_simple'],
-                    'category': term_data['category'],
-                    'url': f'/sumber-daya/kamus/{term_data["term"].lower().replace(" ", "-")}'
+                    'term': entry.term,
+                    'definition_simple': entry.definition_simple,
+                    'category': entry.category,
+                    'url': entry.learn_more_url
                 })
                 
                 if len(results) >= limit:
@@ -113,14 +112,29 @@ async def get_term_categories():
     """
     Get all available term categories
     """
-    categories = set()
-    for term_data in detector.legal_terms_patterns.values():
-        categories.add(term_data['category'])
+    categories = {entry.category for entry in detector.terms}
     
     return {
         'categories': list(categories),
         'total': len(categories)
     }
 
+@router.post("/reload")
+async def reload_terms():
+    """
+    Reload the term dictionary from its data file
+    
+    The detector also picks up file changes on its own every few seconds.
+    """
+    reloaded = detector.reload(force=True)
+    if not reloaded:
+        raise HTTPException(status_code=500, detail="Failed to reload legal terms")
+    
+    return {
+        'reloaded': True,
+        'terms_count': len(detector.terms),
+        'path': detector.terms_path
+    }
+
 # Register this router in your main FastAPI app:
 # app.include_router(router)
@@ -107,11 +107,11 @@ async def detect_language(request: DetectRequest):
             confidence=result.confidence,
             alternatives=[
                 {
-                    "language": alt.language.value,
-                    "language_name": detector.get_language_name(alt.language, "id"),
-                    "confidence": alt.confidence
+                    "language": code,
+                    "language_name": detector.get_language_name(SupportedLanguage(code), "id"),
+                    "confidence": confidence
                 }
-                for alt in result.alternative_languages
+                for code, confidence in result.alternative_languages
             ]
         )
     
@@ -154,14 +154,15 @@ async def translate_text(request: TranslateRequest):
                 timestamp=cached.timestamp.isoformat()
             )
         
-        # Translate
+        # Translate (teks panjang dipecah per kalimat, TM per kalimat)
         translator = get_translator()
-        result = translator.translate(
+        result = await translator.translate_async(
             request.text,
             request.source_lang,
             request.target_lang,
             request.preserve_legal_terms,
-            request.use_ai
+            request.use_ai,
+            memory=memory
         )
         
         # Add to memory
@@ -203,60 +204,30 @@ async def batch_translate(request: BatchTranslateRequest):
         translator = get_translator()
         memory = get_translation_memory()
         
-        results = []
+        # Sentence split + dedup + TM-first + concurrent multi-segment model calls
+        translations = await translator.translate_batch_async(
+            request.texts,
+            request.source_lang,
+            request.target_lang,
+            request.preserve_legal_terms,
+            memory=memory
+        )
         
-        for text in request.texts:
-            # Check cache
-            cached = memory.get_translation(
-                text,
-                request.source_lang,
-                request.target_lang
+        results = [
+            TranslationResponse(
+                source_text=result.source_text,
+                translated_text=result.translated_text,
+                source_lang=result.source_lang,
+                target_lang=result.target_lang,
+                quality=result.quality.value,
+                confidence=result.confidence,
+                preserved_terms=result.preserved_terms,
+                translator_used=result.translator_used,
+                from_cache=result.translator_used == "cache",
+                timestamp=result.timestamp.isoformat()
             )
-            
-            if cached:
-                results.append(TranslationResponse(
-                    source_text=cached.source_text,
-                    translated_text=cached.translated_text,
-                    source_lang=cached.source_lang,
-                    target_lang=cached.target_lang,
-                    quality=cached.quality or "GOOD",
-                    confidence=cached.confidence or 0.9,
-                    preserved_terms=[],
-                    translator_used="cache",
-                    from_cache=True,
-                    timestamp=cached.timestamp.isoformat()
-                ))
-            else:
-                # Translate
-                result = translator.translate(
-                    text,
-                    request.source_lang,
-                    request.target_lang,
-                    request.preserve_legal_terms
-                )
-                
-                # Add to memory
-                memory.add_translation(
-                    result.source_text,
-                    result.translated_text,
-                    result.source_lang,
-                    result.target_lang,
-                    result.quality.value,
-                    result.confidence
-                )
-                
-                results.append(TranslationResponse(
-                    source_text=result.source_text,
-                    translated_text=result.translated_text,
-                    source_lang=result.source_lang,
-                    target_lang=result.target_lang,
-                    quality=result.quality.value,
-                    confidence=result.confidence,
-                    preserved_terms=result.preserved_terms,
-                    translator_used=result.translator_used,
-                    from_cache=False,
-                    timestamp=result.timestamp.isoformat()
-                ))
+            for result in translations
+        ]
         
         return results
     
@@ -3,14 +3,15 @@ Professional Verification Router
 Untuk upgrade dari masyarakat umum ke profesional hukum
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 import logging
 import uuid
 
-from ..database import get_db, get_mongodb
+from ..database import get_async_db, get_mongodb
 from ..models.user import (
     User, UserRole, VerificationRequest, VerificationStatus
 )
@@ -66,7 +67,7 @@ async def request_professional_verification(
     bio: Optional[str] = Form(None),
     documents: List[UploadFile] = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     mongodb = Depends(get_mongodb),
     request: Request = None
 ):
@@ -75,10 +76,12 @@ async def request_professional_verification(
     Requires upload dokumen verifikasi (kartu advokat, surat izin praktik, dll).
     """
     # Check if user already has pending request
-    existing_request = db.query(VerificationRequest).filter(
-        VerificationRequest.user_id == current_user.id,
-        VerificationRequest.status == VerificationStatus.PENDING
-    ).first()
+    existing_request = (await db.execute(
+        select(VerificationRequest).where(
+            VerificationRequest.user_id == current_user.id,
+            VerificationRequest.status == VerificationStatus.PENDING
+        )
+    )).scalars().first()
     
     if existing_request:
         raise HTTPException(
@@ -139,8 +142,8 @@ async def request_professional_verification(
     current_user.verification_requested_at = datetime.utcnow()
     current_user.verification_documents = uploaded_docs
     
-    db.commit()
-    db.refresh(verification_request)
+    await db.commit()
+    await db.refresh(verification_request)
     
     logger.info(f"Verification request submitted: {verification_request.id} by user {current_user.id}")
     
@@ -155,14 +158,16 @@ async def request_professional_verification(
 @router.get("/my-requests", response_model=List[VerificationRequestResponse], tags=["Professional Verification"])
 async def get_my_verification_requests(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's verification requests
     """
-    requests = db.query(VerificationRequest).filter(
-        VerificationRequest.user_id == current_user.id
-    ).order_by(VerificationRequest.created_at.desc()).all()
+    requests = (await db.execute(
+        select(VerificationRequest)
+        .where(VerificationRequest.user_id == current_user.id)
+        .order_by(VerificationRequest.created_at.desc())
+    )).scalars().all()
     
     return [
         VerificationRequestResponse(
@@ -206,25 +211,36 @@ async def get_verification_status(
     }
 
 
+async def _get_users_by_id(db: AsyncSession, user_ids: List) -> dict:
+    """Satu query IN untuk semua user di halaman (bukan satu query per request)"""
+    if not user_ids:
+        return {}
+    users = (await db.execute(select(User).where(User.id.in_(set(user_ids))))).scalars().all()
+    return {user.id: user for user in users}
+
+
 # Admin endpoints
 @router.get("/pending", tags=["Admin - Verification"])
 async def get_pending_verifications(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all pending verification requests (Admin only)
     """
-    requests = db.query(VerificationRequest).filter(
-        VerificationRequest.status == VerificationStatus.PENDING
-    ).order_by(VerificationRequest.created_at.asc()).offset(skip).limit(limit).all()
+    pending = VerificationRequest.status == VerificationStatus.PENDING
+    requests = (await db.execute(
+        select(VerificationRequest).where(pending)
+        .order_by(VerificationRequest.created_at.asc()).offset(skip).limit(limit)
+    )).scalars().all()
+    users = await _get_users_by_id(db, [req.user_id for req in requests])
     
     result = []
     for req in requests:
         # Get user info
-        user = db.query(User).filter(User.id == req.user_id).first()
+        user = users[req.user_id]
         
         result.append({
             "request_id": str(req.id),
@@ -243,9 +259,7 @@ async def get_pending_verifications(
         })
     
     return {
-        "total": db.query(VerificationRequest).filter(
-            VerificationRequest.status == VerificationStatus.PENDING
-        ).count(),
+        "total": await db.scalar(select(func.count()).select_from(VerificationRequest).where(pending)),
         "requests": result
     }
 
@@ -256,25 +270,29 @@ async def get_all_verifications(
     limit: int = 100,
     status: Optional[str] = None,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all verification requests with optional status filter (Admin only)
     """
-    query = db.query(VerificationRequest)
+    conditions = []
     
     if status:
         try:
             status_enum = VerificationStatus(status)
-            query = query.filter(VerificationRequest.status == status_enum)
+            conditions.append(VerificationRequest.status == status_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status")
     
-    requests = query.order_by(VerificationRequest.created_at.desc()).offset(skip).limit(limit).all()
+    requests = (await db.execute(
+        select(VerificationRequest).where(*conditions)
+        .order_by(VerificationRequest.created_at.desc()).offset(skip).limit(limit)
+    )).scalars().all()
+    users = await _get_users_by_id(db, [req.user_id for req in requests])
     
     result = []
     for req in requests:
-        user = db.query(User).filter(User.id == req.user_id).first()
+        user = users[req.user_id]
         
         result.append({
             "request_id": str(req.id),
@@ -296,7 +314,7 @@ async def get_all_verifications(
         })
     
     return {
-        "total": query.count(),
+        "total": await db.scalar(select(func.count()).select_from(VerificationRequest).where(*conditions)),
         "requests": result
     }
 
@@ -307,7 +325,7 @@ async def review_verification_request(
     request_id: str,
     review: VerificationReviewRequest,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """
@@ -318,9 +336,7 @@ async def review_verification_request(
         raise HTTPException(status_code=400, detail="Status must be 'approved' or 'rejected'")
     
     # Get verification request
-    verification_req = db.query(VerificationRequest).filter(
-        VerificationRequest.id == uuid.UUID(request_id)
-    ).first()
+    verification_req = await db.get(VerificationRequest, uuid.UUID(request_id))
     
     if not verification_req:
         raise HTTPException(status_code=404, detail="Verification request not found")
@@ -329,7 +345,7 @@ async def review_verification_request(
         raise HTTPException(status_code=400, detail="Request has already been reviewed")
     
     # Get user
-    user = db.query(User).filter(User.id == verification_req.user_id).first()
+    user = (await db.execute(select(User).where(User.id == verification_req.user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -362,7 +378,7 @@ async def review_verification_request(
         
         message = "Verification rejected."
     
-    db.commit()
+    await db.commit()
     
     # TODO: Send notification to user (email/SMS via Supabase)
     
@@ -381,7 +397,7 @@ async def download_verification_document(
     request_id: str,
     document_id: str,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     mongodb = Depends(get_mongodb)
 ):
     """
@@ -391,9 +407,7 @@ async def download_verification_document(
     import io
     
     # Verify request exists and belongs to admin's review
-    verification_req = db.query(VerificationRequest).filter(
-        VerificationRequest.id == uuid.UUID(request_id)
-    ).first()
+    verification_req = await db.get(VerificationRequest, uuid.UUID(request_id))
     
     if not verification_req:
         raise HTTPException(status_code=404, detail="Verification request not found")
@@ -21,15 +21,22 @@ class ChatMessage(BaseModel):
 
 class ChatTranscript(BaseModel):
     """
-    Full chat transcript stored in MongoDB
+    Chat transcript header stored in MongoDB
     Collection: chat_transcripts
+    
+    Pesan disimpan di chat_transcript_buckets (lihat ChatTranscriptBucket,
+    services/transcript_store.py); header hanya menyimpan counter + preview.
     """
     _id: str = Field(alias="_id")  # Same as session_id from Neon
     user_id: str
     session_id: str
     
-    # Messages array
-    messages: List[ChatMessage] = []
+    # Denormalized counters & previews
+    message_count: int = 0
+    bucket_count: int = 0
+    first_user_preview: Optional[str] = None
+    last_message_preview: Optional[str] = None
+    last_role: Optional[str] = None
     
     # Session context
     context: Optional[Dict[str, Any]] = None
@@ -43,6 +50,24 @@ class ChatTranscript(BaseModel):
         populate_by_name = True
 
 
+class ChatTranscriptBucket(BaseModel):
+    """
+    Fixed-size bucket of transcript messages
+    Collection: chat_transcript_buckets
+    """
+    _id: str = Field(alias="_id")  # "<transcript_id>:<seq 6 digit>"
+    transcript_id: str
+    seq: int  # 0-based bucket number
+    count: int = 0
+    messages: List[ChatMessage] = []  # setiap pesan punya field `n` (index global)
+    
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        populate_by_name = True
+
+
 class DocumentContent(BaseModel):
     """
     Document content stored in MongoDB GridFS
@@ -275,6 +300,7 @@ class FeatureFlagCache(BaseModel):
 # MongoDB Collection Names
 COLLECTIONS = {
     "chat_transcripts": "chat_transcripts",
+    "chat_transcript_buckets": "chat_transcript_buckets",
     "document_analyses": "document_analyses",
     "verification_documents": "verification_documents",
     "ai_response_cache": "ai_response_cache",
@@ -292,6 +318,9 @@ INDEXES = {
         ("session_id", 1),
         ("created_at", -1)
     ],
+    "chat_transcript_buckets": [
+        ("transcript_id", 1)
+    ],
     "document_analyses": [
         ("user_id", 1),
         ("document_id", 1),
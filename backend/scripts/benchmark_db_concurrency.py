@@ -0,0 +1,161 @@
+"""
+Load test: throughput request concurrent dengan sync Session vs AsyncSession
+
+Setiap request meniru hot path auth lama (SELECT user + UPDATE + COMMIT)
+di dalam handler `async def`. Latency jaringan ke database disimulasikan
+per request (sqlite: fungsi sleep_ms di thread driver, postgres: pg_sleep)
+sehingga terlihat efek sync driver yang memblokir event loop:
+
+- sync:  throughput ~ 1 / latency, berapapun concurrency-nya
+- async: throughput ~ min(concurrency, pool_size) / latency
+
+Usage:
+    python scripts/benchmark_db_concurrency.py [--requests 500] [--concurrency 50]
+        [--latency-ms 5] [--pool-size 10] [--database-url postgresql://...]
+
+Butuh driver async: aiosqlite (default, file sqlite sementara) atau asyncpg.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add backend directory to path (database.py memakai import top-level)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, event, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import to_async_database_url
+
+metadata = MetaData()
+bench_users = Table(
+    "bench_users",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("email", String, nullable=False),
+    Column("last_login_at", DateTime, nullable=True),
+)
+
+USER_COUNT = 100
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def _install_sqlite_sleep(sync_engine):
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, _):
+        dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def _latency(dialect: str, latency_ms: float):
+    """Kolom yang menahan query selama latency_ms di sisi database"""
+    if dialect == "sqlite":
+        return func.sleep_ms(latency_ms)
+    return func.pg_sleep(latency_ms / 1000)
+
+
+def build_app(database_url: str, latency_ms: float, pool_size: int):
+    sync_engine = create_engine(database_url, pool_size=pool_size, max_overflow=0, pool_timeout=60)
+    async_url, connect_args = to_async_database_url(database_url)
+    async_engine = create_async_engine(
+        async_url, pool_size=pool_size, max_overflow=0, pool_timeout=60, connect_args=connect_args
+    )
+    dialect = sync_engine.dialect.name
+    if dialect == "sqlite":
+        _install_sqlite_sleep(sync_engine)
+        _install_sqlite_sleep(async_engine.sync_engine)
+
+    metadata.drop_all(sync_engine)
+    metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        if dialect == "sqlite":
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.execute(bench_users.insert(), [{"id": i, "email": f"user{i}@example.com"} for i in range(USER_COUNT)])
+
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+    latency = _latency(dialect, latency_ms)
+
+    app = FastAPI()
+
+    @app.get("/sync/{user_id}")
+    async def sync_lookup(user_id: int):
+        # Pola lama: sync Session di dalam async handler
+        with SyncSession() as db:
+            row = db.execute(select(bench_users.c.email, latency).where(bench_users.c.id == user_id)).first()
+            db.execute(update(bench_users).where(bench_users.c.id == user_id).values(last_login_at=datetime.utcnow()))
+            db.commit()
+        return {"email": row.email}
+
+    @app.get("/async/{user_id}")
+    async def async_lookup(user_id: int):
+        async with AsyncSession() as db:
+            row = (await db.execute(select(bench_users.c.email, latency).where(bench_users.c.id == user_id))).first()
+            await db.execute(update(bench_users).where(bench_users.c.id == user_id).values(last_login_at=datetime.utcnow()))
+            await db.commit()
+        return {"email": row.email}
+
+    async def close():
+        await async_engine.dispose()
+        sync_engine.dispose()
+
+    return app, close
+
+
+async def run(app: FastAPI, mode: str, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        counter = iter(range(total))
+
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.get(f"/{mode}/{i % USER_COUNT}")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return total / elapsed, statistics.median(latencies) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated DB round trip per request")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--database-url", default=None, help="Default: file sqlite sementara")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.sqlite3"
+        app, close = build_app(database_url, args.latency_ms, args.pool_size)
+        print(
+            f"{args.requests} requests, concurrency {args.concurrency}, "
+            f"db latency {args.latency_ms}ms, pool {args.pool_size} ({database_url.split(':')[0]})"
+        )
+        try:
+            for mode, label in (("sync", "sync Session (before)"), ("async", "AsyncSession (after)")):
+                await run(app, mode, min(50, args.requests), args.concurrency)  # warm-up
+                rps, p50 = await run(app, mode, args.requests, args.concurrency)
+                print(f"  {label:<24} {rps:>8,.0f} req/s   p50 {p50:>7.1f} ms")
+        finally:
+            await close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Microbenchmark: requests/sec melalui RateLimitMiddleware
+
+Membandingkan app tanpa middleware, in-memory limiter, dan (jika REDIS_URL
+di-set) Redis Lua limiter. Request dikirim lewat ASGI transport (tanpa
+network) supaya yang terukur adalah overhead middleware.
+
+Usage:
+    python scripts/benchmark_rate_limiting.py [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import httpx
+from fastapi import FastAPI
+
+from backend.middleware.rate_limiting import RateLimiter, RateLimitMiddleware
+
+
+def build_app(limiter=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/chat/ping")
+    async def ping():
+        return {"ok": True}
+
+    if limiter is not None:
+        app.add_middleware(
+            RateLimitMiddleware,
+            default_max_requests=10**9,
+            route_limits=[("/api/chat/*", 10**9, 60, False)],
+            limiter=limiter
+        )
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int, identifiers: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        counter = iter(range(total))
+
+        async def worker():
+            for i in counter:
+                await client.get(
+                    "/api/chat/ping",
+                    headers={"X-Forwarded-For": f"10.0.{i % identifiers // 256}.{i % 256}"}
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--identifiers", type=int, default=1000)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("no middleware", None),
+        ("in-memory sliding_window", RateLimiter()),
+        ("in-memory token_bucket", RateLimiter(algorithm="token_bucket")),
+    ]
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        scenarios.append(("redis sliding_window", RateLimiter(redis_url)))
+        scenarios.append(("redis token_bucket", RateLimiter(redis_url, algorithm="token_bucket")))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.identifiers} identifiers")
+    for name, limiter in scenarios:
+        app = build_app(limiter)
+        await run(app, min(500, args.requests), args.concurrency, args.identifiers)  # warm-up
+        rps = await run(app, args.requests, args.concurrency, args.identifiers)
+        print(f"  {name:<28} {rps:>10,.0f} req/s")
+        if limiter is not None:
+            await limiter.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Microbenchmark: protected-term masking dan dictionary translation pada statuta panjang
+
+Membandingkan implementasi lama (re.finditer per pola + str.replace per
+istilah, re.sub/re.findall per kata) dengan ProtectedTermMasker
+(satu regex gabungan, span list, str.join) dan translate_tokens.
+
+Usage:
+    python scripts/benchmark_term_masker.py [--pasal 2000] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.translation.translator import Translator
+from backend.services.translation.text_spans import tokenize, translate_tokens
+
+
+SENTENCES = [
+    "Setiap pekerja berhak atas upah yang layak sesuai dengan peraturan perundang-undangan.",
+    "Pengusaha dilarang melakukan pemutusan hubungan kerja dengan alasan pekerja sedang sakit.",
+    "Ketentuan sebagaimana dimaksud dalam Pasal {a} ayat ({b}) berlaku juga bagi tenaga kerja asing.",
+    "Sengketa diselesaikan melalui pengadilan negeri atau Mahkamah Agung sesuai UU No. {a} Tahun {y}.",
+    "Pelanggaran terhadap ketentuan ini dikenakan sanksi pidana menurut KUHP dan KUHAP.",
+    "Perjanjian kerja dibuat secara tertulis dan tidak boleh bertentangan dengan PP No. {b} Tahun {y}.",
+]
+
+
+def make_statute(pasal_count: int, rng: random.Random) -> str:
+    parts = []
+    for n in range(1, pasal_count + 1):
+        parts.append(f"Pasal {n}")
+        for ayat in range(1, rng.randint(2, 4)):
+            sentence = rng.choice(SENTENCES).format(a=rng.randint(1, 500), b=rng.randint(1, 9), y=rng.randint(1945, 2024))
+            parts.append(f"({ayat}) {sentence}")
+    return "\n".join(parts)
+
+
+def legacy_protect(patterns, text):
+    protected_terms = []
+    protected_text = text
+    for term_pattern in patterns:
+        for match in re.finditer(term_pattern, text, re.IGNORECASE):
+            term = match.group()
+            if term not in protected_terms:
+                protected_terms.append(term)
+                placeholder = f"__LEGAL_TERM_{len(protected_terms)}__"
+                protected_text = protected_text.replace(term, placeholder, 1)
+    return protected_text, protected_terms
+
+
+def legacy_restore(text, protected_terms):
+    restored = text
+    for i, term in enumerate(protected_terms, 1):
+        restored = restored.replace(f"__LEGAL_TERM_{i}__", term)
+    return restored
+
+
+def legacy_dictionary(text, dictionary):
+    translated_words = []
+    for word in text.split():
+        clean_word = re.sub(r'[^\w\s]', '', word).lower()
+        if clean_word in dictionary:
+            translated_word = dictionary[clean_word]
+            if word[0].isupper():
+                translated_word = translated_word.capitalize()
+            punctuation = re.findall(r'[^\w\s]', word)
+            if punctuation:
+                translated_word += ''.join(punctuation)
+            translated_words.append(translated_word)
+        else:
+            translated_words.append(word)
+    return ' '.join(translated_words)
+
+
+def bench(label: str, func, repeat: int, size_mb: float) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<34} {best * 1000:>10.1f} {size_mb / best:>10.2f}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark protected-term masking")
+    parser.add_argument("--pasal", type=int, default=2000, help="Jumlah pasal statuta sintetis")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    translator = Translator()
+    dictionary = translator.dictionaries["id_en"]
+    text = make_statute(args.pasal, random.Random(42))
+    size_mb = len(text.encode("utf-8")) / 1e6
+
+    masked, terms = translator._protect_legal_terms(text)
+    legacy_masked, legacy_terms = legacy_protect(translator.protected_terms, text)
+    assert translator._restore_protected_terms(masked, terms) == text
+    print(f"Statute: {args.pasal} pasal, {size_mb:.2f} MB, {len(terms)} unique terms "
+          f"({masked.count('__LEGAL_TERM_')} masked spans; legacy masked {legacy_masked.count('__LEGAL_TERM_')})")
+
+    print(f"\n{'step':<34} {'ms':>10} {'MB/s':>10}")
+    old = bench("mask (legacy)", lambda: legacy_protect(translator.protected_terms, text), args.repeat, size_mb)
+    new = bench("mask (single pass)", lambda: translator._protect_legal_terms(text), args.repeat, size_mb)
+    print(f"{'  speedup':<34} {old / new:>10.1f}x")
+
+    old = bench("restore (legacy)", lambda: legacy_restore(legacy_masked, legacy_terms), args.repeat, size_mb)
+    new = bench("restore (single pass)", lambda: translator._restore_protected_terms(masked, terms), args.repeat, size_mb)
+    print(f"{'  speedup':<34} {old / new:>10.1f}x")
+
+    old = bench("dictionary (legacy)", lambda: legacy_dictionary(masked, dictionary), args.repeat, size_mb)
+    new = bench("dictionary (tokens)", lambda: translate_tokens(tokenize(masked), dictionary), args.repeat, size_mb)
+    print(f"{'  speedup':<34} {old / new:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Microbenchmark: fuzzy lookup TranslationMemory (trigram index + banded edit distance)
+
+Segmen sintetis bergaya pasal undang-undang dimasukkan ke satu language
+pair, lalu diukur:
+
+- exact lookup   : hash index
+- fuzzy lookup   : get_translation dengan query yang diubah sedikit (hit)
+- fuzzy miss     : query yang tidak punya padanan di memory
+- find_similar   : top-5 dengan threshold 0.7
+
+Usage:
+    python scripts/benchmark_translation_memory.py [--n 100000] [--queries 300]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.translation.translation_memory import TranslationMemory
+
+
+SUBJECTS = ["Setiap orang", "Pengusaha", "Pekerja/buruh", "Pemerintah daerah", "Menteri", "Hakim", "Penyidik", "Notaris"]
+VERBS = ["wajib", "dilarang", "berhak", "dapat", "tidak boleh"]
+OBJECTS = [
+    "membayar upah lembur", "memberikan cuti tahunan", "membuat perjanjian kerja tertulis",
+    "menetapkan peraturan perusahaan", "melakukan pemutusan hubungan kerja", "menyimpan akta asli",
+    "menahan tersangka", "memeriksa saksi", "mengumumkan putusan", "mencabut izin usaha",
+]
+TAILS = ["sesuai ketentuan Pasal {n}", "paling lambat {n} hari kerja", "sebagaimana dimaksud pada ayat ({m})",
+         "dengan denda paling banyak Rp{n}.000.000,00", "dalam jangka waktu {m} bulan"]
+
+
+def make_segment(rng: random.Random) -> str:
+    return " ".join([
+        rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(OBJECTS),
+        rng.choice(TAILS).format(n=rng.randint(1, 500), m=rng.randint(1, 12)),
+        rng.choice(TAILS).format(n=rng.randint(1, 500), m=rng.randint(1, 12)),
+    ])
+
+
+def mutate(text: str, rng: random.Random, edits: int = 3) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(chars)
+
+
+def timed(label: str, queries, func) -> None:
+    hits = 0
+    start = time.perf_counter()
+    for query in queries:
+        hits += bool(func(query))
+    elapsed = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{label:<28} {elapsed:>10.3f} {hits:>6}/{len(queries)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TranslationMemory fuzzy lookup")
+    parser.add_argument("--n", type=int, default=100000, help="Jumlah segmen")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    memory = TranslationMemory(ttl_days=0, max_entries=args.n * 2)
+    segments = []
+    start = time.perf_counter()
+    while len(segments) < args.n:
+        segment = make_segment(rng)
+        memory.add_translation(segment, f"EN: {segment}", "id", "en")
+        segments.append(segment)
+    print(f"Indexed {memory.stats['total_entries']:,} segments in {time.perf_counter() - start:.1f}s")
+
+    picked = rng.sample(segments, args.queries)
+    fuzzy = [mutate(s, rng) for s in picked]
+    misses = [mutate(make_segment(rng), rng, edits=25) for _ in range(args.queries)]
+
+    print(f"\n{'lookup':<28} {'ms/query':>10} {'hits':>13}")
+    timed("exact", picked, lambda q: memory.get_translation(q, "id", "en"))
+    timed("fuzzy (0.9, hit)", fuzzy, lambda q: memory.get_translation(q, "id", "en", fuzzy_threshold=0.9))
+    timed("fuzzy (0.9, miss)", misses, lambda q: memory.get_translation(q, "id", "en", fuzzy_threshold=0.9))
+    timed("find_similar (0.7, top 5)", fuzzy, lambda q: memory.find_similar(q, "id", "en", threshold=0.7))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/bin/sh
+# Jalankan job worker di background lalu API (argumen script) di process yang sama.
+# Worker dan API harus berbagi filesystem karena antrian job adalah file SQLite
+# (JOB_QUEUE_DB_PATH). Set RUN_JOB_WORKER=false jika worker dijalankan terpisah
+# (mis. service "worker" di docker-compose yang berbagi volume).
+#
+# Usage: sh backend/scripts/start_api_with_worker.sh uvicorn backend.server:app --port 8000
+
+ROOT_DIR="$(cd "$(dirname "$0")/../.." && pwd)"
+WORKER_PID=""
+
+if [ "${RUN_JOB_WORKER:-true}" != "false" ]; then
+    (cd "$ROOT_DIR" && exec python -m backend.services.jobs.worker \
+        --queues "${JOB_WORKER_QUEUES:-documents,research,ethics,chat}") &
+    WORKER_PID=$!
+fi
+
+"$@" &
+API_PID=$!
+
+trap 'kill -TERM $API_PID $WORKER_PID 2>/dev/null' INT TERM
+wait $API_PID
+STATUS=$?
+# wait terputus oleh sinyal: tunggu API selesai shutdown
+if kill -0 $API_PID 2>/dev/null; then
+    wait $API_PID
+    STATUS=$?
+fi
+
+# Worker menyelesaikan job yang sedang berjalan sebelum keluar (SIGTERM)
+if [ -n "$WORKER_PID" ]; then
+    kill -TERM $WORKER_PID 2>/dev/null
+    wait $WORKER_PID
+fi
+exit $STATUS
@@ -1,5 +1,6 @@
 import os
 import asyncio
+import inspect
 import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -50,7 +51,7 @@ except ImportError:
 except Exception as e:
     sentry_available = False
     logger.warning(f"Sentry initialization failed: {str(e)}")
-from database import init_db, get_db, get_db_connections
+from database import init_db, get_db, get_db_connections, close_async_db
 from routers import auth_router, users_router, chat_router, consultation_router, payments, analytics, terms, legal_ai
 # Import all models to ensure they are registered with SQLAlchemy
 # Import models to register mappers
@@ -65,6 +66,12 @@ except Exception:
     pass
 from services.ai_service import ai_service
 from services.analytics_service import AnalyticsService
+from services.ai.http_pool import get_provider_pool, close_provider_pool
+# Same module path as routers/analytics.py so we close the instance it used
+from backend.services.analytics_tracker import close_tracker as close_analytics_tracker
+# Same module path as routers/citations.py (relative import of backend.services.citation)
+from backend.services.citation.citation_tracker import close_tracker as close_citation_tracker
+from backend.services.document_workers import close_extraction_pool
 
 mongo_available = False
 mongo_client = None
@@ -81,6 +88,34 @@ if settings.MONGODB_URI:
         logger.warning(f"MongoDB not available: {str(e)}")
         mongo_available = False
 
+# ----- Lifespan -----
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    # AI provider connection pools are application-lifetime
+    get_provider_pool()
+    yield
+    # Each step runs even if an earlier one fails
+    shutdown_steps = [
+        ("AI provider pool", close_provider_pool),
+        # Flush buffered analytics events before exit
+        ("analytics tracker", close_analytics_tracker),
+        # Flush buffered citation usages to CITATION_TRACKER_DB
+        ("citation tracker", close_citation_tracker),
+        # Stop OCR/PDF worker processes (no-op if no document was processed)
+        ("document extraction pool", close_extraction_pool),
+        # Release pooled async DB connections
+        ("async database", close_async_db),
+    ]
+    for name, close in shutdown_steps:
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception(f"❌ Shutdown: closing {name} failed")
+
+
 # ----- App -----
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -88,6 +123,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # ----- Helpers -----
@@ -111,6 +147,14 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ Proactive Chat Router not available: {e}")
 
+# Import and register background jobs router (status/progress/cancel)
+try:
+    from backend.routers.jobs import router as jobs_router
+    app.include_router(jobs_router)
+    logger.info("✅ Background Jobs Router registered successfully")
+except ImportError as e:
+    logger.warning(f"⚠️ Background Jobs Router not available: {e}")
+
 # Import and register AI Orchestrator router
 try:
     from routers.orchestrator_api import router as orchestrator_router
@@ -341,6 +385,11 @@ async def health():
         }
     }
 
+@app.get("/api/health/ai-pool", tags=["Health"])
+async def ai_pool_metrics():
+    """Connection pool metrics for AI providers (in-use, idle, wait time)."""
+    return get_provider_pool().get_metrics()
+
 # ===== WORKING CONSULTATION ENDPOINT =====
 # Public consultation endpoint (no auth required)
 # Uses the basic AIService for simple legal queries
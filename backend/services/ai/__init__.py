@@ -5,6 +5,9 @@ This module provides AI services including:
 - Dual AI Consensus Engine
 - BytePlus Ark integration
 - Groq AI integration
+- Response caching
+- Stage-graph pipeline executor
+- Token-budgeted conversation context builder
 """
 
 from .consensus_engine import (
@@ -23,6 +26,44 @@ from .groq_service import (
     get_groq_service
 )
 
+from .http_pool import (
+    ProviderHTTPPool,
+    ProviderPoolConfig,
+    get_provider_pool,
+    close_provider_pool
+)
+
+from .response_cache import (
+    ResponseCache,
+    InMemoryResponseCache,
+    RedisResponseCache,
+    get_response_cache
+)
+
+from .streaming import (
+    iter_chat_completion_events,
+    collect_chat_completion,
+    format_sse,
+    SSE_MEDIA_TYPE,
+    SSE_HEADERS
+)
+
+from .stage_graph import (
+    Stage,
+    StageGraph,
+    StageRun,
+    StageMemo
+)
+
+from .context_builder import (
+    ConversationContextBuilder,
+    ContextSummary,
+    ContextWindow,
+    TokenCounter,
+    get_context_builder,
+    get_token_counter
+)
+
 __all__ = [
     # Consensus Engine
     "DualAIConsensusEngine",
@@ -33,6 +74,39 @@ __all__ = [
     # Groq Service
     "GroqAIService",
     "get_groq_service",
+    
+    # HTTP Pool
+    "ProviderHTTPPool",
+    "ProviderPoolConfig",
+    "get_provider_pool",
+    "close_provider_pool",
+    
+    # Response Cache
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "RedisResponseCache",
+    "get_response_cache",
+    
+    # Streaming
+    "iter_chat_completion_events",
+    "collect_chat_completion",
+    "format_sse",
+    "SSE_MEDIA_TYPE",
+    "SSE_HEADERS",
+    
+    # Stage Graph
+    "Stage",
+    "StageGraph",
+    "StageRun",
+    "StageMemo",
+    
+    # Context Builder
+    "ConversationContextBuilder",
+    "ContextSummary",
+    "ContextWindow",
+    "TokenCounter",
+    "get_context_builder",
+    "get_token_counter",
 ]
 
 __version__ = "1.0.0"
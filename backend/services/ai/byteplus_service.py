@@ -6,10 +6,13 @@ Deep reasoning AI engine for Pasalku.ai
 import os
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import httpx
 from datetime import datetime
 
+from .http_pool import get_provider_pool
+from .streaming import iter_chat_completion_events, collect_chat_completion
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,12 +43,17 @@ class BytePlusArkService:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream response
+            stream: Read the response as SSE (use stream_chat_completion for deltas)
             **kwargs: Additional parameters
 
         Returns:
             Dict with response data
         """
+        if stream:
+            return await collect_chat_completion(
+                self.stream_chat_completion(messages, temperature, max_tokens, **kwargs)
+            )
+
         start_time = time.time()
 
         try:
@@ -62,19 +70,20 @@ class BytePlusArkService:
                 "messages": messages,
                 "temperature": temperature,
                 "max_tokens": max_tokens,
-                "stream": stream,
+                "stream": False,
                 **kwargs
             }
 
-            async with httpx.AsyncClient(timeout=120.0) as client:  # Longer timeout for deep reasoning
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
+            response = await get_provider_pool().post(
+                "byteplus",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=120.0  # Longer timeout for deep reasoning
+            )
 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
 
             elapsed_time = time.time() - start_time
 
@@ -95,6 +104,81 @@ class BytePlusArkService:
             logger.error(f"BytePlus Ark API error: {str(e)}")
             raise
 
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream chat completion tokens from BytePlus Ark AI
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters
+
+        Yields:
+            {"type": "delta", "content": str} events, then one
+            {"type": "done", ...} event with full content and usage
+        """
+        start_time = time.time()
+        first_token_time = None
+
+        if not self.api_key:
+            raise ValueError("ARK_API_KEY not configured")
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": self.model_id,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            **kwargs
+        }
+
+        try:
+            async with get_provider_pool().stream(
+                "byteplus",
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=120.0  # Longer timeout for deep reasoning
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+
+                async for event in iter_chat_completion_events(response, self.model_id):
+                    if event["type"] == "delta" and first_token_time is None:
+                        first_token_time = time.time()
+                    elif event["type"] == "done":
+                        event["response_time_ms"] = int((time.time() - start_time) * 1000)
+                        event["time_to_first_token_ms"] = (
+                            int((first_token_time - start_time) * 1000) if first_token_time else None
+                        )
+                        logger.info(
+                            f"✅ BytePlus Ark stream completed "
+                            f"(model: {self.model_id}, time: {time.time() - start_time:.2f}s)"
+                        )
+                    yield event
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"BytePlus Ark API HTTP error: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"BytePlus Ark API error: {e.response.status_code}")
+        except httpx.TimeoutException:
+            logger.error("BytePlus Ark API timeout")
+            raise Exception("BytePlus Ark API timeout")
+
     async def simple_query(
         self,
         prompt: str,
@@ -10,16 +10,23 @@ Key Features:
 - Confidence scoring
 - Intelligent consensus merging
 - Fallback mechanisms
+- Two-tier response cache (exact + near-duplicate)
+- Latency-aware execution (hedged / first-acceptable-wins) with background audit
 """
 
 import asyncio
 import logging
+import os
 import time
+from collections import deque
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from difflib import SequenceMatcher
 import numpy as np
 
+from .model_config import CONSENSUS_STRATEGIES
+from .response_cache import ResponseCache, get_response_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +61,21 @@ class AIModelResponse:
             "metadata": self.metadata,
             "timestamp": self.timestamp.isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AIModelResponse":
+        """Rebuild from to_dict() output"""
+        response = cls(
+            content=data["content"],
+            model_name=data["model_name"],
+            confidence=data["confidence"],
+            response_time=data["response_time"],
+            tokens_used=data.get("tokens_used", 0),
+            metadata=data.get("metadata")
+        )
+        if data.get("timestamp"):
+            response.timestamp = datetime.fromisoformat(data["timestamp"])
+        return response
 
 
 class ConsensusResult:
@@ -67,7 +89,8 @@ class ConsensusResult:
         byteplus_response: AIModelResponse,
         groq_response: AIModelResponse,
         similarity_score: float,
-        total_time: float
+        total_time: float,
+        cache_info: Optional[Dict[str, Any]] = None
     ):
         self.final_content = final_content
         self.consensus_confidence = consensus_confidence
@@ -76,8 +99,13 @@ class ConsensusResult:
         self.groq_response = groq_response
         self.similarity_score = similarity_score
         self.total_time = total_time
+        self.cache_info = cache_info  # Set when served from the response cache
         self.timestamp = datetime.now()
     
+    @property
+    def from_cache(self) -> bool:
+        return self.cache_info is not None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
@@ -88,8 +116,61 @@ class ConsensusResult:
             "groq_response": self.groq_response.to_dict(),
             "similarity_score": self.similarity_score,
             "total_time": self.total_time,
+            "cache": self.cache_info,
             "timestamp": self.timestamp.isoformat()
         }
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        cache_info: Optional[Dict[str, Any]] = None
+    ) -> "ConsensusResult":
+        """Rebuild from to_dict() output"""
+        result = cls(
+            final_content=data["final_content"],
+            consensus_confidence=data["consensus_confidence"],
+            consensus_method=data["consensus_method"],
+            byteplus_response=AIModelResponse.from_dict(data["byteplus_response"]),
+            groq_response=AIModelResponse.from_dict(data["groq_response"]),
+            similarity_score=data["similarity_score"],
+            total_time=data["total_time"],
+            cache_info=cache_info
+        )
+        if data.get("timestamp"):
+            result.timestamp = datetime.fromisoformat(data["timestamp"])
+        return result
+
+
+class LatencyTracker:
+    """Rolling latency window per provider (for hedge delays)"""
+    
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = {}
+        self.window = window
+    
+    def record(self, provider: str, seconds: float) -> None:
+        samples = self._samples.get(provider)
+        if samples is None:
+            samples = self._samples[provider] = deque(maxlen=self.window)
+        samples.append(seconds)
+    
+    def percentile(self, provider: str, q: float) -> Optional[float]:
+        """q-th percentile (0-100), None until enough samples"""
+        samples = self._samples.get(provider)
+        if not samples or len(samples) < 5:
+            return None
+        return float(np.percentile(np.fromiter(samples, dtype=float), q))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            provider: {
+                "samples": len(samples),
+                "p50": self.percentile(provider, 50),
+                "p95": self.percentile(provider, 95),
+            }
+            for provider, samples in self._samples.items()
+        }
 
 
 class DualAIConsensusEngine:
@@ -110,11 +191,22 @@ class DualAIConsensusEngine:
     BYTEPLUS_WEIGHT = 0.6  # BytePlus is primary for deep reasoning
     GROQ_WEIGHT = 0.4      # Groq is secondary for speed & validation
     
+    # Execution modes
+    # - parallel: wait for both models, full consensus (default)
+    # - first_acceptable: start both, return first response passing the bar
+    # - hedged: start primary, start secondary only after the primary's p95
+    EXECUTION_MODES = ("parallel", "first_acceptable", "hedged")
+    HEDGE_DEFAULT_DELAY = 2.0  # Seconds, until there are enough latency samples
+    
     def __init__(
         self,
         byteplus_service: Any,
         groq_service: Any,
-        enable_parallel: bool = True
+        enable_parallel: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+        execution_mode: str = "parallel",
+        strategy: str = "complex_legal",
+        audit_background: bool = True
     ):
         """
         Initialize consensus engine.
@@ -123,10 +215,26 @@ class DualAIConsensusEngine:
             byteplus_service: BytePlus Ark AI service instance
             groq_service: Groq AI service instance
             enable_parallel: Whether to run models in parallel
+            response_cache: Optional cache for repeated prompts
+            execution_mode: "parallel", "first_acceptable" or "hedged"
+            strategy: Key in CONSENSUS_STRATEGIES (max_response_time, similarity_threshold)
+            audit_background: Let the losing call finish and score consensus
+                asynchronously instead of cancelling it
         """
+        if execution_mode not in self.EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
+        
         self.byteplus_service = byteplus_service
         self.groq_service = groq_service
         self.enable_parallel = enable_parallel
+        self.response_cache = response_cache
+        self.execution_mode = execution_mode
+        self.strategy = strategy
+        self.audit_background = audit_background
+        
+        self.latency = LatencyTracker()
+        self.audit_records: deque = deque(maxlen=200)
+        self._background_tasks: set = set()
         
         logger.info("🤖 Dual AI Consensus Engine initialized")
     
@@ -136,7 +244,10 @@ class DualAIConsensusEngine:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        execution_mode: Optional[str] = None,
+        strategy: Optional[str] = None
     ) -> ConsensusResult:
         """
         Get consensus response from both AI models.
@@ -147,14 +258,38 @@ class DualAIConsensusEngine:
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             context: Additional context for the query
+            use_cache: Serve/store through the response cache (if configured)
+            execution_mode: Override the engine's execution mode for this call
+            strategy: Override the engine's consensus strategy for this call
         
         Returns:
             ConsensusResult with final merged response
         """
         start_time = time.time()
         
+        cache = self.response_cache if use_cache else None
+        if cache is not None:
+            hit = await cache.lookup(prompt, system_prompt, temperature, self._model_ids(), max_tokens)
+            if hit is not None:
+                logger.info(
+                    f"💾 Consensus cache {hit['tier']} hit "
+                    f"(similarity: {hit['similarity']:.2%}, hits: {hit['hits']})"
+                )
+                return ConsensusResult.from_dict(
+                    hit["value"],
+                    cache_info={k: v for k, v in hit.items() if k != "value"}
+                )
+        
         logger.info(f"🔄 Starting dual AI consensus for prompt: {prompt[:100]}...")
         
+        mode = execution_mode or self.execution_mode
+        if mode != "parallel" and self.enable_parallel:
+            return await self._get_fast_response(
+                prompt, system_prompt, temperature, max_tokens,
+                mode, CONSENSUS_STRATEGIES.get(strategy or self.strategy, CONSENSUS_STRATEGIES["complex_legal"]),
+                cache, start_time
+            )
+        
         try:
             # Execute both models
             if self.enable_parallel:
@@ -191,7 +326,7 @@ class DualAIConsensusEngine:
                 f"(confidence: {consensus_confidence:.2%}, time: {total_time:.2f}s)"
             )
             
-            return ConsensusResult(
+            result = ConsensusResult(
                 final_content=final_content,
                 consensus_confidence=consensus_confidence,
                 consensus_method=method,
@@ -201,10 +336,56 @@ class DualAIConsensusEngine:
                 total_time=total_time
             )
             
+            # Don't cache degraded answers (one model failed)
+            if cache is not None and not groq_response.metadata.get("is_fallback"):
+                await cache.store(
+                    prompt,
+                    system_prompt,
+                    temperature,
+                    self._model_ids(),
+                    self._cacheable_dict(result),
+                    provenance={
+                        "consensus_method": method,
+                        "consensus_confidence": consensus_confidence,
+                        "similarity_score": similarity,
+                        "models": [byteplus_response.model_name, groq_response.model_name],
+                        "tokens_used": byteplus_response.tokens_used + groq_response.tokens_used,
+                    },
+                    max_tokens=max_tokens
+                )
+            
+            return result
+            
         except Exception as e:
             logger.error(f"❌ Consensus error: {e}")
             raise
     
+    def _model_ids(self) -> List[str]:
+        """Model identifiers that go into the cache key"""
+        ids = []
+        for service in (self.byteplus_service, self.groq_service):
+            ids.append(str(
+                getattr(service, "model_id", None)
+                or getattr(service, "model", None)
+                or type(service).__name__
+            ))
+        return ids
+    
+    def _cacheable_dict(self, result: ConsensusResult) -> Dict[str, Any]:
+        """to_dict() without raw provider payloads"""
+        data = result.to_dict()
+        for key in ("byteplus_response", "groq_response"):
+            data[key]["metadata"] = {
+                k: v for k, v in data[key]["metadata"].items() if k != "raw_response"
+            }
+        return data
+    
+    async def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Response cache hit/miss statistics (None when caching is off)"""
+        if self.response_cache is None:
+            return None
+        return await self.response_cache.get_stats()
+    
     async def _execute_parallel(
         self,
         prompt: str,
@@ -238,6 +419,301 @@ class DualAIConsensusEngine:
         
         return byteplus_response, groq_response
     
+    # ------------------------------------------------------------------
+    # Latency-aware execution
+    # ------------------------------------------------------------------
+    
+    def _strategy_providers(self, strategy: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """Map strategy model keys onto our two providers ("byteplus"/"groq")"""
+        primary = "byteplus" if strategy.get("primary", "").startswith("byteplus") else "groq"
+        if strategy.get("fallback_only"):
+            return primary, None
+        return primary, "groq" if primary == "byteplus" else "byteplus"
+    
+    def _start_provider(
+        self,
+        provider: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> asyncio.Task:
+        execute = self._execute_byteplus if provider == "byteplus" else self._execute_groq
+        return asyncio.create_task(execute(prompt, system_prompt, temperature, max_tokens))
+    
+    def _hedge_delay(self, provider: str, max_response_time: float) -> float:
+        """Wait this long for the primary before hedging (its p95 latency)"""
+        p95 = self.latency.percentile(provider, 95)
+        delay = p95 if p95 is not None else self.HEDGE_DEFAULT_DELAY
+        return min(delay, max_response_time)
+    
+    async def _get_fast_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        mode: str,
+        strategy: Dict[str, Any],
+        cache: Optional[ResponseCache],
+        start_time: float
+    ) -> ConsensusResult:
+        """
+        Hedged / first-acceptable-wins execution.
+        
+        Returns the first response whose confidence reaches the strategy's
+        similarity_threshold. After max_response_time the bar drops and the
+        best completed response wins. The other call is either cancelled or
+        left running so consensus can be scored in the background (audit).
+        """
+        max_response_time = strategy.get("max_response_time", 90.0)
+        min_confidence = strategy.get("similarity_threshold", self.MODERATE_SIMILARITY_THRESHOLD)
+        primary, secondary = self._strategy_providers(strategy)
+        deadline = start_time + max_response_time
+        
+        providers: Dict[asyncio.Task, str] = {}
+        
+        def start(provider: str) -> None:
+            task = self._start_provider(provider, prompt, system_prompt, temperature, max_tokens)
+            providers[task] = provider
+            pending.add(task)
+        
+        pending: set = set()
+        start(primary)
+        hedge_at = None
+        if secondary is not None:
+            if mode == "hedged":
+                hedge_at = time.time() + self._hedge_delay(primary, max_response_time)
+            else:
+                start(secondary)
+        
+        completed: List[Tuple[str, AIModelResponse]] = []
+        winner: Optional[Tuple[str, AIModelResponse]] = None
+        errors: List[BaseException] = []
+        
+        try:
+            while True:
+                now = time.time()
+                
+                # Hedge once the primary is slower than its p95 (or already failed/unacceptable)
+                if hedge_at is not None and (now >= hedge_at or not pending):
+                    logger.info(f"⏩ Hedging {primary} with {secondary}")
+                    start(secondary)
+                    hedge_at = None
+                
+                if not pending:
+                    break
+                
+                # Past the deadline: take the best response we already have
+                if now >= deadline and completed:
+                    break
+                
+                timeouts = []
+                if hedge_at is not None:
+                    timeouts.append(hedge_at - now)
+                if now < deadline:
+                    timeouts.append(deadline - now)
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, min(timeouts)) if timeouts else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    if task.exception() is not None:
+                        logger.error(f"{providers[task]} error: {task.exception()}")
+                        errors.append(task.exception())
+                    else:
+                        completed.append((providers[task], task.result()))
+                
+                acceptable = [c for c in completed if c[1].confidence >= min_confidence]
+                if acceptable:
+                    winner = max(acceptable, key=lambda c: c[1].confidence)
+                    break
+            
+            if winner is None:
+                if not completed:
+                    raise errors[0] if errors else RuntimeError("No AI model responded")
+                winner = max(completed, key=lambda c: c[1].confidence)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        
+        provider, response = winner
+        others = [c for c in completed if c is not winner]
+        
+        # Both already finished - regular consensus, nothing to audit
+        if others:
+            byteplus_response, groq_response = (
+                (response, others[0][1]) if provider == "byteplus" else (others[0][1], response)
+            )
+            similarity = self._calculate_semantic_similarity(byteplus_response.content, groq_response.content)
+            final_content, consensus_confidence, method = self._apply_consensus(
+                byteplus_response, groq_response, similarity
+            )
+            return ConsensusResult(
+                final_content=final_content,
+                consensus_confidence=consensus_confidence,
+                consensus_method=method,
+                byteplus_response=byteplus_response,
+                groq_response=groq_response,
+                similarity_score=similarity,
+                total_time=time.time() - start_time
+            )
+        
+        placeholder = AIModelResponse(
+            content="",
+            model_name="Pending audit" if pending and self.audit_background else "Not used",
+            confidence=0.0,
+            response_time=0.0,
+            metadata={"is_pending": bool(pending and self.audit_background)}
+        )
+        byteplus_response, groq_response = (
+            (response, placeholder) if provider == "byteplus" else (placeholder, response)
+        )
+        
+        if pending:
+            if self.audit_background:
+                self._spawn_audit(
+                    prompt, system_prompt, temperature, provider, response,
+                    pending, cache, max_response_time, max_tokens
+                )
+            else:
+                for task in pending:
+                    task.cancel()
+        
+        total_time = time.time() - start_time
+        logger.info(
+            f"⚡ {mode} winner: {provider} "
+            f"(confidence: {response.confidence:.2%}, time: {total_time:.2f}s)"
+        )
+        
+        return ConsensusResult(
+            final_content=response.content,
+            consensus_confidence=response.confidence,
+            consensus_method=f"{mode}_{provider}",
+            byteplus_response=byteplus_response,
+            groq_response=groq_response,
+            similarity_score=0.0,  # Unknown until the audit finishes
+            total_time=total_time
+        )
+    
+    def _spawn_audit(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        provider: str,
+        response: AIModelResponse,
+        pending: set,
+        cache: Optional[ResponseCache],
+        max_response_time: float,
+        max_tokens: Optional[int] = None
+    ) -> None:
+        task = asyncio.create_task(self._audit_consensus(
+            prompt, system_prompt, temperature, provider, response,
+            pending, cache, max_response_time, max_tokens
+        ))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _audit_consensus(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        provider: str,
+        response: AIModelResponse,
+        pending: set,
+        cache: Optional[ResponseCache],
+        max_response_time: float,
+        max_tokens: Optional[int] = None
+    ) -> None:
+        """Finish the losing call, score consensus and record it for audit"""
+        done, still_pending = await asyncio.wait(pending, timeout=max_response_time)
+        for task in still_pending:
+            task.cancel()
+        
+        other = None
+        for task in done:
+            if task.exception() is None:
+                other = task.result()
+        
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "prompt": prompt[:200],
+            "winner": provider,
+            "winner_confidence": response.confidence,
+            "completed": other is not None
+        }
+        
+        if other is not None:
+            byteplus_response, groq_response = (
+                (response, other) if provider == "byteplus" else (other, response)
+            )
+            similarity = self._calculate_semantic_similarity(byteplus_response.content, groq_response.content)
+            final_content, consensus_confidence, method = self._apply_consensus(
+                byteplus_response, groq_response, similarity
+            )
+            record.update({
+                "similarity_score": similarity,
+                "consensus_method": method,
+                "consensus_confidence": consensus_confidence
+            })
+            
+            if similarity < self.MODERATE_SIMILARITY_THRESHOLD:
+                logger.warning(
+                    f"⚠️ Audit: served {provider} answer disagrees with other model "
+                    f"(similarity: {similarity:.2%})"
+                )
+            
+            # Cache the full consensus, not the single-model answer
+            if cache is not None:
+                result = ConsensusResult(
+                    final_content=final_content,
+                    consensus_confidence=consensus_confidence,
+                    consensus_method=method,
+                    byteplus_response=byteplus_response,
+                    groq_response=groq_response,
+                    similarity_score=similarity,
+                    total_time=max(byteplus_response.response_time, groq_response.response_time)
+                )
+                await cache.store(
+                    prompt,
+                    system_prompt,
+                    temperature,
+                    self._model_ids(),
+                    self._cacheable_dict(result),
+                    provenance={
+                        "consensus_method": method,
+                        "consensus_confidence": consensus_confidence,
+                        "similarity_score": similarity,
+                        "models": [byteplus_response.model_name, groq_response.model_name],
+                        "tokens_used": byteplus_response.tokens_used + groq_response.tokens_used,
+                        "audited": True,
+                    },
+                    max_tokens=max_tokens
+                )
+        
+        self.audit_records.append(record)
+    
+    async def drain_background(self) -> None:
+        """Wait for background audits (tests / shutdown)"""
+        if self._background_tasks:
+            await asyncio.gather(*list(self._background_tasks), return_exceptions=True)
+    
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Per-provider latency percentiles and recent audit records"""
+        return {
+            "execution_mode": self.execution_mode,
+            "strategy": self.strategy,
+            "providers": self.latency.to_dict(),
+            "background_audits": len(self._background_tasks),
+            "recent_audits": list(self.audit_records)[-10:]
+        }
+    
     async def _execute_byteplus(
         self,
         prompt: str,
@@ -269,6 +745,8 @@ class DualAIConsensusEngine:
             content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
             tokens = response.get("usage", {}).get("total_tokens", 0)
             
+            self.latency.record("byteplus", response_time)
+            
             # Calculate confidence (based on response quality indicators)
             confidence = self._calculate_confidence(response, "byteplus")
             
@@ -316,6 +794,8 @@ class DualAIConsensusEngine:
             content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
             tokens = response.get("usage", {}).get("total_tokens", 0)
             
+            self.latency.record("groq", response_time)
+            
             # Calculate confidence
             confidence = self._calculate_confidence(response, "groq")
             
@@ -559,7 +1039,11 @@ def get_consensus_engine(
         _consensus_engine = DualAIConsensusEngine(
             byteplus_service=byteplus_service,
             groq_service=groq_service,
-            enable_parallel=True
+            enable_parallel=True,
+            response_cache=get_response_cache(),
+            execution_mode=os.getenv("CONSENSUS_EXECUTION_MODE", "parallel"),
+            strategy=os.getenv("CONSENSUS_STRATEGY", "complex_legal"),
+            audit_background=os.getenv("CONSENSUS_AUDIT_BACKGROUND", "true").lower() == "true"
         )
     
     return _consensus_engine
@@ -0,0 +1,506 @@
+"""
+Conversation Context Builder for Pasalku.ai
+
+Keeps per-turn prompt size bounded regardless of session length:
+
+1. Recent window: the newest turns are sent verbatim, newest first until
+   the token budget is used
+2. Rolling summary: older turns are folded into a summary that is updated
+   incrementally (previous summary + newly aged-out turns) by the
+   `chat.summarize_context` background job, never on the request path
+3. Pinned facts: law references, amounts, dates and documents (regex
+   patterns from EntityExtractor) plus assistant citations survive
+   summarization verbatim
+
+The summary state lives on the transcript header (`context_summary`) next
+to the denormalized counters, so the request path costs one header read
+plus the tail buckets. Tokens are counted locally (tiktoken when
+installed, otherwise a character heuristic).
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "3000"))
+CHAT_RECENT_WINDOW_TOKENS = int(os.getenv("CHAT_RECENT_WINDOW_TOKENS", "1500"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "600"))
+# Unsummarized tokens beyond the recent window before a summary job is due
+# (batches summarization instead of one model call per turn)
+CHAT_SUMMARY_BATCH_TOKENS = int(os.getenv("CHAT_SUMMARY_BATCH_TOKENS", "500"))
+CHAT_PINNED_FACTS_PER_TYPE = int(os.getenv("CHAT_PINNED_FACTS_PER_TYPE", "8"))
+
+# Per-message framing overhead (role + separators) in chat-format prompts
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_JOB = "chat.summarize_context"
+
+PINNED_LABELS = {
+    "law_reference": "Dasar hukum",
+    "citation": "Sitasi",
+    "money": "Nominal",
+    "date": "Tanggal",
+    "document": "Dokumen",
+}
+
+SUMMARY_SYSTEM_PROMPT = """Anda merangkum percakapan konsultasi hukum untuk dipakai sebagai konteks jawaban berikutnya.
+Perbarui ringkasan yang sudah ada dengan percakapan baru. Pertahankan fakta perkara, pihak yang terlibat,
+pertanyaan pengguna yang belum terjawab, dan kesimpulan/saran yang sudah diberikan. Tulis dalam bahasa
+Indonesia, ringkas, berupa poin-poin, tanpa pembukaan."""
+
+
+# ============================================================================
+# Token counting
+# ============================================================================
+
+class TokenCounter:
+    """
+    Local token counter.
+
+    Uses tiktoken's cl100k_base encoding when available; otherwise ~4
+    characters per token, which is close enough for budgeting.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, using heuristic token count: {e}")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, len(text) // 4)
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        return self.count(message.get("content")) + MESSAGE_OVERHEAD_TOKENS
+
+    def count_messages(self, messages: Sequence[Dict[str, Any]]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get or create the process-wide token counter"""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
+
+
+# ============================================================================
+# Summary state & pinned facts
+# ============================================================================
+
+@dataclass
+class ContextSummary:
+    """Rolling summary stored on the transcript header"""
+    text: str = ""
+    covered_until: int = 0  # messages with index n < covered_until are summarized
+    pinned: Dict[str, List[str]] = field(default_factory=dict)
+    tokens: int = 0
+    updated_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ContextSummary":
+        if not data:
+            return cls()
+        return cls(
+            text=data.get("text", ""),
+            covered_until=data.get("covered_until", 0),
+            pinned=data.get("pinned") or {},
+            tokens=data.get("tokens", 0),
+            updated_at=data.get("updated_at")
+        )
+
+    def render(self, max_tokens: int, counter: Optional[TokenCounter] = None) -> Optional[str]:
+        """
+        System message body: summary + pinned facts, trimmed to max_tokens.
+
+        Pinned facts are dropped oldest-first before the summary is cut.
+        """
+        if not self.text and not any(self.pinned.values()):
+            return None
+        counter = counter or get_token_counter()
+
+        pinned = {kind: list(values) for kind, values in self.pinned.items() if values}
+        while True:
+            parts = []
+            if self.text:
+                parts.append(f"Ringkasan percakapan sebelumnya:\n{self.text}")
+            if pinned:
+                lines = [
+                    f"- {PINNED_LABELS.get(kind, kind)}: {', '.join(values)}"
+                    for kind, values in pinned.items()
+                ]
+                parts.append("Fakta penting yang harus tetap diperhatikan:\n" + "\n".join(lines))
+            rendered = "\n\n".join(parts)
+
+            if counter.count(rendered) <= max_tokens or not pinned:
+                break
+            longest = max(pinned, key=lambda kind: len(pinned[kind]))
+            pinned[longest].pop(0)
+            if not pinned[longest]:
+                del pinned[longest]
+
+        if counter.count(rendered) > max_tokens:
+            # Rough cut; the summarizer is asked to stay under the same budget
+            rendered = rendered[: max_tokens * 4]
+        return rendered
+
+
+def extract_pinned_facts(messages: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Facts from messages that must survive summarization verbatim.
+
+    Uses the regex pass of EntityExtractor (no AI call) on message content
+    and the citations attached to assistant messages.
+    """
+    from ..legal_flow.entity_extractor import EntityExtractor, EntityType
+
+    pinned_types = {
+        EntityType.LAW_REFERENCE: "law_reference",
+        EntityType.MONEY: "money",
+        EntityType.DATE: "date",
+        EntityType.DOCUMENT: "document",
+    }
+    facts: Dict[str, List[str]] = {}
+    for message in messages:
+        content = message.get("content") or ""
+        for entity_type, kind in pinned_types.items():
+            for pattern in EntityExtractor.PATTERNS.get(entity_type, []):
+                for match in re.finditer(pattern, content, re.IGNORECASE):
+                    facts.setdefault(kind, []).append(" ".join(match.group(0).split()))
+        for citation in message.get("citations") or []:
+            if isinstance(citation, dict) and citation.get("text"):
+                facts.setdefault("citation", []).append(" ".join(citation["text"].split()))
+    return facts
+
+
+def merge_pinned_facts(
+    existing: Dict[str, List[str]],
+    new: Dict[str, List[str]],
+    per_type: int = CHAT_PINNED_FACTS_PER_TYPE
+) -> Dict[str, List[str]]:
+    """Case-insensitive dedupe, most recent last, capped per type"""
+    merged: Dict[str, List[str]] = {}
+    for kind in {**existing, **new}:
+        seen = {}
+        for value in list(existing.get(kind, [])) + list(new.get(kind, [])):
+            key = value.lower()
+            seen.pop(key, None)
+            seen[key] = value
+        merged[kind] = list(seen.values())[-per_type:]
+    return merged
+
+
+# ============================================================================
+# Context assembly
+# ============================================================================
+
+@dataclass
+class ContextWindow:
+    """Prompt history for one turn"""
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    full_tokens: int  # tokens the full verbatim history would have cost
+    recent_messages: int
+    summary_used: bool
+    dropped_messages: int  # unsummarized turns that did not fit the budget
+    summarize_until: Optional[int] = None  # schedule summary up to this index
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.full_tokens - self.prompt_tokens)
+
+
+@dataclass
+class ContextMetrics:
+    """Per-process prompt size counters"""
+    requests: int = 0
+    prompt_tokens: int = 0
+    full_tokens: int = 0
+    tokens_saved: int = 0
+    summarized_requests: int = 0
+    dropped_messages: int = 0
+    summaries_scheduled: int = 0
+
+    def record(self, window: ContextWindow):
+        self.requests += 1
+        self.prompt_tokens += window.prompt_tokens
+        self.full_tokens += window.full_tokens
+        self.tokens_saved += window.tokens_saved
+        self.summarized_requests += int(window.summary_used)
+        self.dropped_messages += window.dropped_messages
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else 0.0,
+            "avg_tokens_saved": round(self.tokens_saved / self.requests, 1) if self.requests else 0.0,
+            "saved_ratio": round(self.tokens_saved / self.full_tokens, 4) if self.full_tokens else 0.0,
+        }
+
+
+class ConversationContextBuilder:
+    """
+    Assemble bounded prompt history from a rolling summary + recent turns.
+
+    Args:
+        token_budget: Max history tokens per prompt (summary + verbatim turns)
+        recent_window_tokens: Verbatim tokens to keep when summarizing
+        summary_max_tokens: Budget for the summary/pinned-facts message
+        summary_batch_tokens: Unsummarized tokens beyond the recent window
+            that trigger a summary update
+        counter: Token counter (default: process-wide)
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+        recent_window_tokens: int = CHAT_RECENT_WINDOW_TOKENS,
+        summary_max_tokens: int = CHAT_SUMMARY_MAX_TOKENS,
+        summary_batch_tokens: int = CHAT_SUMMARY_BATCH_TOKENS,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.token_budget = token_budget
+        self.recent_window_tokens = min(recent_window_tokens, token_budget)
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_batch_tokens = summary_batch_tokens
+        self.counter = counter or get_token_counter()
+        self.metrics = ContextMetrics()
+        self._lock = threading.Lock()
+
+    def history_token_budget(self, summary: ContextSummary) -> int:
+        """Tokens available for verbatim turns after the summary message"""
+        summary_tokens = min(summary.tokens, self.summary_max_tokens) if summary.text or summary.pinned else 0
+        return max(self.recent_window_tokens, self.token_budget - summary_tokens)
+
+    def build(
+        self,
+        history: Sequence[Dict[str, Any]],
+        summary: Optional[ContextSummary] = None,
+        total_tokens: Optional[int] = None
+    ) -> ContextWindow:
+        """
+        Build prompt history.
+
+        Args:
+            history: Unsummarized messages in chronological order (index `n`
+                when loaded from the transcript store)
+            summary: Rolling summary state (None = no summary yet)
+            total_tokens: Token count of the whole transcript when known
+                (for the tokens-saved metric); defaults to summary + history
+
+        Returns:
+            ContextWindow; `summarize_until` is set when the unsummarized
+            turns exceed the recent window by summary_batch_tokens
+        """
+        summary = summary or ContextSummary()
+        history = [m for m in history if m.get("n", summary.covered_until) >= summary.covered_until]
+
+        messages: List[Dict[str, str]] = []
+        rendered = summary.render(self.summary_max_tokens, self.counter)
+        if rendered:
+            messages.append({"role": "system", "content": rendered})
+        budget = self.token_budget - (self.counter.count_message(messages[0]) if messages else 0)
+
+        # Newest first until the budget is used (always keep the last turn)
+        recent: List[Dict[str, Any]] = []
+        used = 0
+        for message in reversed(history):
+            cost = self.counter.count_message(message)
+            if recent and used + cost > budget:
+                break
+            recent.append(message)
+            used += cost
+        recent.reverse()
+
+        history_tokens = self.counter.count_messages(history)
+        messages.extend({"role": m["role"], "content": m["content"]} for m in recent)
+        prompt_tokens = self.counter.count_messages(messages)
+
+        summarize_until = None
+        if history_tokens > self.recent_window_tokens + self.summary_batch_tokens:
+            # Age out everything except the newest recent_window_tokens
+            kept = 0
+            for message in reversed(history):
+                kept += self.counter.count_message(message)
+                if kept > self.recent_window_tokens:
+                    break
+                summarize_until = message.get("n")
+            if summarize_until is None and history:
+                summarize_until = history[-1].get("n")
+
+        # Transcripts without a header token counter only count what was loaded
+        full_tokens = total_tokens if total_tokens is not None else history_tokens
+        window = ContextWindow(
+            messages=messages,
+            prompt_tokens=prompt_tokens,
+            full_tokens=max(full_tokens, prompt_tokens),
+            recent_messages=len(recent),
+            summary_used=bool(rendered),
+            dropped_messages=len(history) - len(recent),
+            summarize_until=summarize_until if summarize_until and summarize_until > summary.covered_until else None
+        )
+        with self._lock:
+            self.metrics.record(window)
+        return window
+
+    def record_summary_scheduled(self):
+        with self._lock:
+            self.metrics.summaries_scheduled += 1
+
+
+_context_builder: Optional[ConversationContextBuilder] = None
+
+
+def get_context_builder() -> ConversationContextBuilder:
+    """Get or create the process-wide context builder"""
+    global _context_builder
+    if _context_builder is None:
+        _context_builder = ConversationContextBuilder()
+    return _context_builder
+
+
+# ============================================================================
+# Request path & background summarization
+# ============================================================================
+
+async def assemble_chat_context(store, transcript_id: str, owner_id: Optional[str] = None) -> ContextWindow:
+    """
+    Prompt history for the next turn of a stored transcript.
+
+    Reads the header (summary state + token counter) and only the tail
+    buckets that fit the budget; schedules a summary update job when turns
+    have aged out of the recent window.
+
+    Args:
+        store: TranscriptStore
+        transcript_id: ChatSession.mongodb_transcript_id
+        owner_id: User ID recorded on the summary job
+    """
+    builder = get_context_builder()
+    header = await store.get_summary(transcript_id) or {}
+    summary = ContextSummary.from_dict(header.get("context_summary"))
+
+    history = await store.load_tail(
+        transcript_id,
+        max_messages=None,
+        token_budget=builder.history_token_budget(summary),
+        since=summary.covered_until
+    )
+    window = builder.build(history, summary, total_tokens=header.get("token_count"))
+
+    if window.summarize_until is not None:
+        await schedule_summary(transcript_id, window.summarize_until, owner_id)
+        builder.record_summary_scheduled()
+
+    logger.debug(
+        f"Context {transcript_id}: {window.prompt_tokens} prompt tokens "
+        f"({window.tokens_saved} saved, {window.recent_messages} recent, summary={window.summary_used})"
+    )
+    return window
+
+
+async def schedule_summary(transcript_id: str, until: int, owner_id: Optional[str] = None):
+    """Enqueue a rolling summary update; failures never break the chat turn"""
+    try:
+        from ..jobs import enqueue_job
+
+        await enqueue_job(
+            SUMMARY_JOB,
+            {"transcript_id": transcript_id, "until": until},
+            queue="chat",
+            idempotency_key=f"chat-summary:{transcript_id}:{until}",
+            owner_id=owner_id
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to schedule context summary for {transcript_id}: {e}")
+
+
+async def update_rolling_summary(store, transcript_id: str, until: int, ai_service=None) -> ContextSummary:
+    """
+    Fold messages [covered_until, until) into the stored rolling summary.
+
+    Args:
+        store: TranscriptStore
+        transcript_id: Transcript to summarize
+        until: Exclusive message index to summarize up to
+        ai_service: Service with `chat_completion` (default: ark_ai_service)
+
+    Returns:
+        The stored (or already up-to-date) summary
+    """
+    header = await store.get_summary(transcript_id) or {}
+    summary = ContextSummary.from_dict(header.get("context_summary"))
+    if until <= summary.covered_until:
+        return summary
+
+    messages = await store.load_range(transcript_id, summary.covered_until, until)
+    if not messages:
+        return summary
+
+    if ai_service is None:
+        from ..ark_ai_service import ark_ai_service as ai_service
+
+    counter = get_token_counter()
+    transcript_text = "\n".join(f"{m['role']}: {m.get('content', '')}" for m in messages)
+    prompt = (
+        f"Ringkasan sejauh ini:\n{summary.text or '(belum ada)'}\n\n"
+        f"Percakapan baru:\n{transcript_text}\n\n"
+        f"Tulis ringkasan terbaru (maksimal sekitar {CHAT_SUMMARY_MAX_TOKENS} token)."
+    )
+    result = await ai_service.chat_completion(
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,
+        max_tokens=CHAT_SUMMARY_MAX_TOKENS
+    )
+    if not result.get("success"):
+        raise RuntimeError(f"Summary generation failed: {result.get('error', 'unknown error')}")
+
+    text = result["content"].strip()
+    updated = ContextSummary(
+        text=text,
+        covered_until=max(m.get("n", 0) for m in messages) + 1,
+        pinned=merge_pinned_facts(summary.pinned, extract_pinned_facts(messages)),
+        tokens=0,
+        updated_at=datetime.utcnow()
+    )
+    updated.tokens = counter.count(updated.render(CHAT_SUMMARY_MAX_TOKENS, counter))
+
+    await store.save_context_summary(transcript_id, updated.to_dict())
+    logger.info(
+        f"📝 Context summary {transcript_id}: {len(messages)} messages folded, "
+        f"covered until {updated.covered_until}"
+    )
+    return updated
@@ -0,0 +1,296 @@
+"""
+Provider HTTP Pool for Pasalku.ai
+
+Application-lifetime HTTP transport shared by every AI provider client.
+Keeps one pooled keep-alive httpx.AsyncClient per provider so LLM calls
+reuse DNS/TCP/TLS state instead of paying connection setup on every request.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderPoolConfig:
+    """Connection pool settings for one AI provider"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    max_concurrency: int = 16  # In-flight requests allowed per provider
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+
+
+# Default pool settings per provider
+PROVIDER_POOL_CONFIGS: Dict[str, ProviderPoolConfig] = {
+    "byteplus": ProviderPoolConfig(
+        max_connections=int(os.getenv("BYTEPLUS_POOL_MAX_CONNECTIONS", "20")),
+        max_concurrency=int(os.getenv("BYTEPLUS_MAX_CONCURRENCY", "16")),
+        timeout=120.0  # Longer timeout for deep reasoning
+    ),
+    "groq": ProviderPoolConfig(
+        max_connections=int(os.getenv("GROQ_POOL_MAX_CONNECTIONS", "20")),
+        max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", "16")),
+        timeout=60.0
+    ),
+}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 requires the optional `h2` package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _ProviderStats:
+    """Counters for one provider pool"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_wait_ms": round(self.total_wait_time / self.requests * 1000, 2) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait_time * 1000, 2),
+        }
+
+
+class ProviderHTTPPool:
+    """
+    Shared pooled HTTP clients for AI providers.
+
+    Features:
+    - One keep-alive connection pool per provider (bounded per host)
+    - HTTP/2 when the `h2` package is installed
+    - Per-provider concurrency limits with wait-time accounting
+    - Pool metrics (in-use, idle, wait time) for sizing
+    - Clean shutdown from the FastAPI lifespan
+    """
+
+    def __init__(self, configs: Optional[Dict[str, ProviderPoolConfig]] = None):
+        """
+        Initialize pool.
+
+        Args:
+            configs: Pool settings per provider (default: PROVIDER_POOL_CONFIGS)
+        """
+        self.configs = dict(configs or PROVIDER_POOL_CONFIGS)
+        self.http2 = _http2_available()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, _ProviderStats] = {}
+        self._closed = False
+
+    def _get_config(self, provider: str) -> ProviderPoolConfig:
+        if provider not in self.configs:
+            self.configs[provider] = ProviderPoolConfig()
+        return self.configs[provider]
+
+    def get_client(self, provider: str) -> httpx.AsyncClient:
+        """
+        Get (or lazily create) the pooled client for a provider.
+        """
+        client = self._clients.get(provider)
+        if client is not None and not client.is_closed:
+            return client
+
+        config = self._get_config(provider)
+        client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout)
+        )
+        self._clients[provider] = client
+        self._closed = False
+
+        logger.info(
+            f"Created HTTP pool for {provider} "
+            f"(max_connections={config.max_connections}, http2={self.http2})"
+        )
+        return client
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._get_config(provider).max_concurrency)
+            self._semaphores[provider] = semaphore
+        return semaphore
+
+    def _get_stats(self, provider: str) -> _ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats[provider] = _ProviderStats()
+        return stats
+
+    @asynccontextmanager
+    async def acquire(self, provider: str) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Acquire a concurrency slot for a provider and yield its client.
+
+        Usage:
+            async with pool.acquire("groq") as client:
+                response = await client.post(...)
+        """
+        semaphore = self._get_semaphore(provider)
+        stats = self._get_stats(provider)
+
+        wait_start = time.perf_counter()
+        stats.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+
+        wait_time = time.perf_counter() - wait_start
+        stats.requests += 1
+        stats.total_wait_time += wait_time
+        stats.max_wait_time = max(stats.max_wait_time, wait_time)
+        stats.in_flight += 1
+
+        try:
+            yield self.get_client(provider)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            semaphore.release()
+
+    async def post(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        """
+        POST through the provider pool.
+
+        Args:
+            provider: Provider name (e.g. "byteplus", "groq")
+            url: Request URL
+            **kwargs: Passed to httpx.AsyncClient.post (headers, json, timeout)
+
+        Returns:
+            httpx.Response (body already read)
+        """
+        async with self.acquire(provider) as client:
+            return await client.post(url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming request through the provider pool.
+
+        The concurrency slot and connection are held until the caller
+        leaves the context, so read the body inside it.
+
+        Usage:
+            async with pool.stream("groq", "POST", url, json=payload) as response:
+                async for line in response.aiter_lines():
+                    ...
+        """
+        async with self.acquire(provider) as client:
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+    def _connection_counts(self, client: httpx.AsyncClient) -> Dict[str, int]:
+        """Best-effort in-use/idle counts from the underlying httpcore pool"""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {"connections": 0, "idle": 0, "in_use": 0}
+
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "in_use": len(connections) - idle,
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get pool metrics per provider.
+
+        Returns:
+            Dict with configuration, connection counts and wait statistics
+        """
+        providers = {}
+        for provider in set(self._clients) | set(self._stats):
+            config = self._get_config(provider)
+            client = self._clients.get(provider)
+
+            metrics = {
+                "max_connections": config.max_connections,
+                "max_concurrency": config.max_concurrency,
+                **self._get_stats(provider).to_dict(),
+            }
+            if client is not None and not client.is_closed:
+                metrics.update(self._connection_counts(client))
+            providers[provider] = metrics
+
+        return {
+            "http2": self.http2,
+            "closed": self._closed,
+            "providers": providers,
+        }
+
+    async def aclose(self) -> None:
+        """Close every provider client (called on application shutdown)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._semaphores.clear()
+
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP pool client: {e}")
+
+        self._closed = True
+        logger.info("AI provider HTTP pools closed")
+
+
+# Singleton instance
+_provider_pool: Optional[ProviderHTTPPool] = None
+
+
+def get_provider_pool() -> ProviderHTTPPool:
+    """Get singleton provider HTTP pool"""
+    global _provider_pool
+    if _provider_pool is None:
+        _provider_pool = ProviderHTTPPool()
+    return _provider_pool
+
+
+async def close_provider_pool() -> None:
+    """Close singleton provider HTTP pool"""
+    global _provider_pool
+    if _provider_pool is not None:
+        await _provider_pool.aclose()
+        _provider_pool = None
@@ -0,0 +1,635 @@
+"""
+Response Cache for Pasalku.ai
+
+Two-tier cache for consensus responses so repeated (FAQ-style) legal
+questions do not trigger two paid model calls each time.
+
+Tiers:
+1. Exact: hash of normalized prompt + system prompt + temperature +
+   max_tokens + model ids
+2. Near-duplicate (opt-in, off by default): embeddings from a real
+   embedding model, cosine similarity above a configurable threshold, only
+   within the same scope. Hits whose numbers, magnitude words or negations
+   differ from the cached prompt are rejected ("5 tahun" vs "9 tahun",
+   "boleh" vs "tidak boleh" are lexically near-identical but legally
+   different questions)
+
+Backends:
+- InMemoryResponseCache: OrderedDict LRU + TTL (per process)
+- RedisResponseCache: shared across workers, TTL via SETEX, LRU via a
+  sorted set of last-access times
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Keys & Embeddings
+# ============================================================================
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s\?\!\.\,;:]+$")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Token yang mengubah arti pertanyaan walau embedding-nya hampir sama
+NEGATION_TOKENS = frozenset({
+    "tidak", "tak", "bukan", "belum", "jangan", "tanpa", "kecuali", "non",
+    "not", "no", "never", "without", "except",
+})
+MAGNITUDE_TOKENS = frozenset({
+    "ribu", "rb", "juta", "jt", "miliar", "milyar", "triliun", "persen",
+    "hari", "minggu", "bulan", "tahun",
+})
+
+
+def normalize_prompt(text: Optional[str]) -> str:
+    """
+    Normalize prompt text for cache keys.
+
+    Lowercases, applies NFKC, collapses whitespace and drops trailing
+    punctuation so "Berapa pesangon PHK 5 tahun?" and
+    "berapa  pesangon phk 5 tahun" share a key.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def make_scope(
+    system_prompt: Optional[str],
+    temperature: float,
+    model_ids: Sequence[str],
+    max_tokens: Optional[int] = None
+) -> str:
+    """
+    Hash of everything except the prompt (near-duplicates only match within a scope)
+
+    max_tokens is part of the scope so a short (possibly truncated)
+    completion is never served to a caller that asked for a longer one.
+    """
+    raw = json.dumps(
+        [normalize_prompt(system_prompt), round(float(temperature), 3), list(model_ids), max_tokens],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(
+    prompt: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    model_ids: Sequence[str],
+    max_tokens: Optional[int] = None
+) -> str:
+    """Exact-tier cache key"""
+    scope = make_scope(system_prompt, temperature, model_ids, max_tokens)
+    digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    return f"{scope}:{digest}"
+
+
+def prompt_guard(prompt: str) -> str:
+    """
+    Meaning-critical tokens of a prompt: numbers, magnitude/duration words
+    and negations. A near-duplicate hit is only served when its guard is
+    identical to the query's.
+    """
+    text = normalize_prompt(prompt)
+    words = _WORD_RE.findall(text)
+    return json.dumps([
+        sorted(_NUMBER_RE.findall(text)),
+        sorted(w for w in words if w in MAGNITUDE_TOKENS),
+        sorted(w for w in words if w in NEGATION_TOKENS),
+    ])
+
+
+def _sentence_transformer_embedder(model_name: str) -> Optional[Callable[[str], np.ndarray]]:
+    """Use sentence-transformers when installed (same model family as the RAG pipeline)"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers not installed, near-duplicate response cache unavailable")
+        return None
+
+    model = SentenceTransformer(model_name)
+
+    def embed(text: str) -> np.ndarray:
+        return np.asarray(
+            model.encode(normalize_prompt(text), normalize_embeddings=True),
+            dtype=np.float32
+        )
+
+    return embed
+
+
+# ============================================================================
+# Entries & Stats
+# ============================================================================
+
+@dataclass
+class CacheEntry:
+    """One cached response with provenance"""
+    key: str
+    scope: str
+    value: Dict[str, Any]
+    provenance: Dict[str, Any]
+    created_at: float
+    expires_at: float
+    hits: int = 0
+    embedding: Optional[List[float]] = None
+    guard: Optional[str] = None
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CacheEntry":
+        return cls(**json.loads(raw))
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters"""
+    exact_hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        hits = self.exact_hits + self.near_hits
+        return {
+            **asdict(self),
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ============================================================================
+# Backends
+# ============================================================================
+
+class InMemoryResponseCache:
+    """
+    Per-process backend: OrderedDict LRU with TTL.
+
+    Embeddings are kept per scope and stacked into a matrix lazily, so a
+    near-duplicate lookup is one matrix-vector product.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._scope_keys: Dict[str, Dict[str, np.ndarray]] = {}
+        self._scope_matrix: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        vectors = self._scope_keys.get(entry.scope)
+        if vectors and vectors.pop(key, None) is not None:
+            self._scope_matrix.pop(entry.scope, None)
+            if not vectors:
+                del self._scope_keys[entry.scope]
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired():
+            self._drop(key)
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        return entry
+
+    async def set(self, entry: CacheEntry) -> None:
+        self._drop(entry.key)
+        self._entries[entry.key] = entry
+        if entry.embedding is not None:
+            self._scope_keys.setdefault(entry.scope, {})[entry.key] = np.asarray(
+                entry.embedding, dtype=np.float32
+            )
+            self._scope_matrix.pop(entry.scope, None)
+        self.stats.sets += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+    async def find_similar(
+        self,
+        scope: str,
+        embedding: np.ndarray,
+        threshold: float,
+        accept: Optional[Callable[[CacheEntry], bool]] = None
+    ) -> Optional[Tuple[CacheEntry, float]]:
+        vectors = self._scope_keys.get(scope)
+        if not vectors:
+            return None
+
+        cached = self._scope_matrix.get(scope)
+        if cached is None:
+            keys = list(vectors)
+            cached = (keys, np.stack([vectors[k] for k in keys]))
+            self._scope_matrix[scope] = cached
+        keys, matrix = cached
+
+        scores = matrix @ embedding
+        for index in np.argsort(-scores):
+            score = float(scores[index])
+            if score < threshold:
+                break
+            candidate = self._entries.get(keys[index])
+            if candidate is not None and accept is not None and not accept(candidate):
+                continue
+            entry = await self.get(keys[index])
+            if entry is not None:
+                return entry, score
+        return None
+
+    async def delete(self, key: str) -> bool:
+        existed = key in self._entries
+        self._drop(key)
+        return existed
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._scope_keys.clear()
+        self._scope_matrix.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisResponseCache:
+    """
+    Shared backend on Redis.
+
+    Layout (under `prefix`):
+    - {prefix}:entry:{key}   JSON entry, expires via SETEX
+    - {prefix}:lru           sorted set key -> last access time
+    - {prefix}:emb:{scope}   hash key -> float32 embedding bytes
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        max_entries: int = 10000,
+        prefix: str = "pasalku:response_cache"
+    ):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is not installed")
+
+        self.client = aioredis.from_url(redis_url)
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _emb_key(self, scope: str) -> str:
+        return f"{self.prefix}:emb:{scope}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}:lru"
+
+    async def _forget(self, key: str, scope: Optional[str] = None) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(self._entry_key(key))
+        pipe.zrem(self._lru_key, key)
+        if scope:
+            pipe.hdel(self._emb_key(scope), key)
+        await pipe.execute()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self.client.get(self._entry_key(key))
+        if raw is None:
+            # Expired by Redis TTL (or never stored) - keep LRU index tidy
+            if await self.client.zrem(self._lru_key, key):
+                self.stats.expirations += 1
+            return None
+
+        entry = CacheEntry.from_json(raw)
+        entry.hits += 1
+        await self.client.zadd(self._lru_key, {key: time.time()})
+        return entry
+
+    async def set(self, entry: CacheEntry) -> None:
+        ttl = max(1, int(entry.expires_at - time.time()))
+
+        pipe = self.client.pipeline()
+        pipe.setex(self._entry_key(entry.key), ttl, entry.to_json())
+        pipe.zadd(self._lru_key, {entry.key: time.time()})
+        if entry.embedding is not None:
+            pipe.hset(
+                self._emb_key(entry.scope),
+                entry.key,
+                np.asarray(entry.embedding, dtype=np.float32).tobytes()
+            )
+        await pipe.execute()
+        self.stats.sets += 1
+
+        overflow = await self.client.zcard(self._lru_key) - self.max_entries
+        if overflow > 0:
+            for old_key in await self.client.zrange(self._lru_key, 0, overflow - 1):
+                old_key = old_key.decode() if isinstance(old_key, bytes) else old_key
+                scope = old_key.split(":", 1)[0]
+                await self._forget(old_key, scope)
+                self.stats.evictions += 1
+
+    async def find_similar(
+        self,
+        scope: str,
+        embedding: np.ndarray,
+        threshold: float,
+        accept: Optional[Callable[[CacheEntry], bool]] = None
+    ) -> Optional[Tuple[CacheEntry, float]]:
+        stored = await self.client.hgetall(self._emb_key(scope))
+        if not stored:
+            return None
+
+        keys = [k.decode() if isinstance(k, bytes) else k for k in stored]
+        matrix = np.stack([np.frombuffer(v, dtype=np.float32) for v in stored.values()])
+
+        scores = matrix @ embedding
+        for index in np.argsort(-scores):
+            score = float(scores[index])
+            if score < threshold:
+                break
+            entry = await self.get(keys[index])
+            if entry is not None:
+                if accept is not None and not accept(entry):
+                    continue
+                return entry, score
+            # Entry expired - drop its embedding too
+            await self.client.hdel(self._emb_key(scope), keys[index])
+        return None
+
+    async def delete(self, key: str) -> bool:
+        existed = bool(await self.client.exists(self._entry_key(key)))
+        await self._forget(key, key.split(":", 1)[0])
+        return existed
+
+    async def clear(self) -> None:
+        keys = [k async for k in self.client.scan_iter(match=f"{self.prefix}:*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def size(self) -> int:
+        return await self.client.zcard(self._lru_key)
+
+
+# ============================================================================
+# Cache Facade
+# ============================================================================
+
+class ResponseCache:
+    """
+    Two-tier response cache used by DualAIConsensusEngine.
+
+    Usage:
+        cache = ResponseCache(InMemoryResponseCache())
+        hit = await cache.lookup(prompt, system_prompt, 0.7, model_ids)
+        if hit is None:
+            ...
+            await cache.store(prompt, system_prompt, 0.7, model_ids, value, provenance)
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        ttl_seconds: int = 3600,
+        near_duplicate: bool = False,
+        similarity_threshold: float = 0.92,
+        embedder: Optional[Callable[[str], np.ndarray]] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            backend: InMemoryResponseCache or RedisResponseCache
+            ttl_seconds: Entry lifetime
+            near_duplicate: Enable the embedding tier (requires embedder)
+            similarity_threshold: Minimum cosine similarity for a near-duplicate hit
+            embedder: text -> L2-normalized vector
+
+        Raises:
+            ValueError: near_duplicate without an embedder
+        """
+        if near_duplicate and embedder is None:
+            raise ValueError("near_duplicate response cache requires an embedder")
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicate = near_duplicate
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    async def lookup(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        model_ids: Sequence[str],
+        max_tokens: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Dict with "value", "provenance", "tier" ("exact"/"near_duplicate"),
+            "similarity" and "hits", or None on miss
+        """
+        key = make_cache_key(prompt, system_prompt, temperature, model_ids, max_tokens)
+
+        try:
+            entry = await self.backend.get(key)
+            if entry is not None:
+                self.stats.exact_hits += 1
+                return self._hit(entry, "exact", 1.0)
+
+            if self.near_duplicate:
+                scope = make_scope(system_prompt, temperature, model_ids, max_tokens)
+                guard = prompt_guard(prompt)
+                embedding = await asyncio.to_thread(self.embedder, prompt)
+                match = await self.backend.find_similar(
+                    scope, embedding, self.similarity_threshold,
+                    accept=lambda entry: entry.guard == guard
+                )
+                if match is not None:
+                    self.stats.near_hits += 1
+                    return self._hit(match[0], "near_duplicate", match[1])
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+
+        self.stats.misses += 1
+        return None
+
+    def _hit(self, entry: CacheEntry, tier: str, similarity: float) -> Dict[str, Any]:
+        return {
+            "value": entry.value,
+            "provenance": entry.provenance,
+            "tier": tier,
+            "similarity": round(similarity, 4),
+            "hits": entry.hits,
+            "cached_at": entry.created_at,
+        }
+
+    async def store(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        model_ids: Sequence[str],
+        value: Dict[str, Any],
+        provenance: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None
+    ) -> None:
+        """Store a response (errors are logged, never raised)"""
+        try:
+            # Embedding model CPU-bound: jangan blok event loop
+            embedding = (await asyncio.to_thread(self.embedder, prompt)).tolist() if self.near_duplicate else None
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+            return
+
+        now = time.time()
+        entry = CacheEntry(
+            key=make_cache_key(prompt, system_prompt, temperature, model_ids, max_tokens),
+            scope=make_scope(system_prompt, temperature, model_ids, max_tokens),
+            value=value,
+            provenance={
+                "prompt": prompt[:200],
+                "model_ids": list(model_ids),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                **(provenance or {}),
+            },
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            embedding=embedding,
+            guard=prompt_guard(prompt) if self.near_duplicate else None,
+        )
+
+        try:
+            await self.backend.set(entry)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and backend size"""
+        try:
+            size = await self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": type(self.backend).__name__,
+            "size": size,
+            "ttl_seconds": self.ttl_seconds,
+            "near_duplicate": self.near_duplicate,
+            "similarity_threshold": self.similarity_threshold,
+            **self.stats.to_dict(),
+        }
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get singleton response cache configured from environment.
+
+    Env:
+        RESPONSE_CACHE_ENABLED (default true), RESPONSE_CACHE_BACKEND
+        (memory|redis), REDIS_URL, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES,
+        RESPONSE_CACHE_NEAR_DUPLICATE (default false), RESPONSE_CACHE_SIMILARITY,
+        RESPONSE_CACHE_EMBEDDING_MODEL (sentence-transformers model; required
+        for the near-duplicate tier - a lexical hashing embedder scores
+        "5 tahun" vs "9 tahun" above any useful threshold)
+    """
+    global _response_cache
+
+    if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    if _response_cache is None:
+        max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+        backend: Any = None
+
+        if os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower() == "redis":
+            redis_url = os.getenv("REDIS_URL")
+            if REDIS_AVAILABLE and redis_url:
+                try:
+                    backend = RedisResponseCache(redis_url, max_entries=max_entries)
+                    logger.info("✅ Response cache using Redis backend")
+                except Exception as e:
+                    logger.error(f"Redis response cache failed: {e}, falling back to in-memory")
+            else:
+                logger.warning("Redis not configured, using in-memory response cache")
+
+        if backend is None:
+            backend = InMemoryResponseCache(max_entries=max_entries)
+
+        embedder = None
+        near_duplicate = os.getenv("RESPONSE_CACHE_NEAR_DUPLICATE", "false").lower() == "true"
+        if near_duplicate:
+            model_name = os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL")
+            embedder = _sentence_transformer_embedder(model_name) if model_name else None
+            if embedder is None:
+                logger.warning(
+                    "⚠️ RESPONSE_CACHE_NEAR_DUPLICATE needs RESPONSE_CACHE_EMBEDDING_MODEL "
+                    "(sentence-transformers) - near-duplicate tier disabled"
+                )
+                near_duplicate = False
+
+        _response_cache = ResponseCache(
+            backend=backend,
+            ttl_seconds=int(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+            near_duplicate=near_duplicate,
+            similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92")),
+            embedder=embedder
+        )
+
+    return _response_cache
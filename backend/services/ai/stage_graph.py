@@ -0,0 +1,334 @@
+"""
+Stage Graph Executor for Pasalku.ai
+
+Declarative dependency-graph runner for multi-step AI pipelines
+(research assistant, contract engine, ...). Each stage declares the
+pipeline inputs and upstream stages it needs; a stage starts as soon as
+all of its dependencies are done, so independent stages (e.g. gap,
+opportunity and risk analysis) run concurrently instead of one await at
+a time.
+
+Features:
+- Per-stage timeout with a fallback value -> the run returns partial
+  results instead of failing the whole request
+- Opt-in memoization of deterministic stages, keyed by a hash of the
+  stage name and its arguments (LRU + TTL, per graph). The cache is
+  shared by every caller of the graph, so LLM stages are never memoized
+  by default
+- Per-stage timing trace that routers can attach to response metadata
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+# ============================================================================
+# Declarations
+# ============================================================================
+
+@dataclass
+class Stage:
+    """
+    One node of a StageGraph.
+
+    The stage function is called positionally with the values of
+    ``inputs`` (names of pipeline inputs) followed by the results of
+    ``deps`` (names of upstream stages), in declaration order.
+
+    Args:
+        name: Unique stage name (also the key in StageRun.results)
+        func: Async (or plain) callable
+        deps: Upstream stages whose results are passed to func
+        inputs: Pipeline inputs passed to func before the dependencies
+        timeout: Seconds before the stage is abandoned (None = graph default)
+        fallback: Value used on timeout/error; without a fallback (or
+            fallback_factory), dependent stages are skipped
+        fallback_factory: callable(exc) -> value, used instead of fallback
+        memoize: Cache successful results by argument hash. Only for
+            deterministic stages: the cache is shared across users/sessions
+    """
+    name: str
+    func: Callable[..., Any]
+    deps: Sequence[str] = ()
+    inputs: Sequence[str] = ()
+    timeout: Optional[float] = None
+    fallback: Any = MISSING
+    fallback_factory: Optional[Callable[[BaseException], Any]] = None
+    memoize: bool = False
+
+    def resolve_fallback(self, exc: BaseException) -> Any:
+        if self.fallback_factory is not None:
+            return self.fallback_factory(exc)
+        return self.fallback
+
+
+@dataclass
+class StageRun:
+    """Result of StageGraph.run()"""
+    results: Dict[str, Any]
+    trace: List[Dict[str, Any]]
+    total_ms: float
+    partial: bool = False
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Timing trace in a shape suitable for response metadata"""
+        return {
+            "stages": self.trace,
+            "total_ms": self.total_ms,
+            "partial": self.partial,
+            "errors": dict(self.errors)
+        }
+
+
+# ============================================================================
+# Memoization
+# ============================================================================
+
+def _canonical(value: Any) -> Any:
+    """Convert stage arguments to JSON-serializable form for hashing"""
+    if hasattr(value, "model_dump"):  # pydantic v2
+        return _canonical(value.model_dump())
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(v) for v in value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Unhashable stage argument: {type(value).__name__}")
+
+
+def make_stage_key(name: str, args: Sequence[Any]) -> Optional[str]:
+    """
+    Hash of stage name + arguments.
+
+    Returns:
+        Hex digest, or None if an argument cannot be canonicalized
+        (the stage then simply runs without memoization)
+    """
+    try:
+        raw = json.dumps([name, _canonical(list(args))], sort_keys=True, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class StageMemo:
+    """Small LRU + TTL cache for stage results (per process)"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ============================================================================
+# Executor
+# ============================================================================
+
+class StageGraph:
+    """
+    Dependency-graph executor for async pipeline stages.
+
+    Usage:
+        graph = StageGraph([
+            Stage("findings", research, inputs=["query"]),
+            Stage("precedents", analyze_precedents, inputs=["query"], deps=["findings"]),
+            Stage("gaps", identify_gaps, inputs=["query"], deps=["findings"], fallback=[]),
+        ], default_timeout=30)
+        run = await graph.run({"query": query})
+        run.results["gaps"], run.to_metadata()
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        default_timeout: Optional[float] = None,
+        memo: Optional[StageMemo] = None,
+        name: str = "pipeline"
+    ):
+        self.name = name
+        self.default_timeout = default_timeout
+        self.memo = memo if memo is not None else StageMemo()
+        self.stages: "OrderedDict[str, Stage]" = OrderedDict()
+
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; raises ValueError on cycles"""
+        remaining = {name: set(stage.deps) for name, stage in self.stages.items()}
+        order: List[str] = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle detected between stages: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None) -> StageRun:
+        """
+        Execute the graph.
+
+        Args:
+            inputs: Values for the names referenced in Stage.inputs
+
+        Returns:
+            StageRun with results (stages that failed without a fallback
+            or were skipped are absent), timing trace and error summary
+        """
+        inputs = inputs or {}
+        for stage in self.stages.values():
+            for key in stage.inputs:
+                if key not in inputs:
+                    raise KeyError(f"Stage '{stage.name}' requires missing input '{key}'")
+
+        run_start = time.perf_counter()
+        results: Dict[str, Any] = {}
+        trace: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        failed: set = set()
+        pending: Dict[asyncio.Task, str] = {}
+        waiting = list(self.order)
+
+        def _schedule_ready() -> None:
+            for name in list(waiting):
+                stage = self.stages[name]
+                if any(dep in failed for dep in stage.deps):
+                    waiting.remove(name)
+                    failed.add(name)
+                    trace[name] = self._trace_entry(stage, "skipped", run_start, time.perf_counter(), cached=False)
+                    continue
+                if all(dep in results for dep in stage.deps):
+                    waiting.remove(name)
+                    args = [inputs[key] for key in stage.inputs] + [results[dep] for dep in stage.deps]
+                    task = asyncio.ensure_future(self._run_stage(stage, args, run_start))
+                    pending[task] = name
+
+        try:
+            _schedule_ready()
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    status, value, entry, error = task.result()
+                    trace[name] = entry
+                    if status == "ok" or value is not MISSING:
+                        results[name] = value
+                    else:
+                        failed.add(name)
+                    if error:
+                        errors[name] = error
+                _schedule_ready()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        total_ms = round((time.perf_counter() - run_start) * 1000, 2)
+        ordered_trace = [trace[name] for name in self.order if name in trace]
+        partial = any(entry["status"] != "ok" for entry in ordered_trace)
+        if partial:
+            logger.warning(f"⚠️ {self.name}: partial result ({errors or 'skipped stages'})")
+        logger.info(f"🧩 {self.name}: {len(ordered_trace)} stages in {total_ms}ms")
+
+        return StageRun(results=results, trace=ordered_trace, total_ms=total_ms, partial=partial, errors=errors)
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        args: List[Any],
+        run_start: float
+    ) -> Tuple[str, Any, Dict[str, Any], Optional[str]]:
+        """Run one stage; never raises (errors become fallback/trace entries)"""
+        started = time.perf_counter()
+
+        key = make_stage_key(stage.name, args) if stage.memoize else None
+        if key is not None:
+            cached = self.memo.get(key)
+            if cached is not MISSING:
+                return "ok", cached, self._trace_entry(stage, "ok", run_start, started, cached=True), None
+
+        timeout = stage.timeout if stage.timeout is not None else self.default_timeout
+        try:
+            value = stage.func(*args)
+            if inspect.isawaitable(value):
+                value = await asyncio.wait_for(value, timeout) if timeout else await value
+        except asyncio.TimeoutError as exc:
+            logger.warning(f"⏱️ {self.name}.{stage.name} timed out after {timeout}s")
+            fallback = stage.resolve_fallback(exc)
+            return "timeout", fallback, self._trace_entry(stage, "timeout", run_start, started, cached=False), f"timeout after {timeout}s"
+        except Exception as exc:
+            logger.error(f"❌ {self.name}.{stage.name} failed: {exc}")
+            fallback = stage.resolve_fallback(exc)
+            return "error", fallback, self._trace_entry(stage, "error", run_start, started, cached=False), str(exc)
+
+        if key is not None:
+            self.memo.set(key, value)
+        return "ok", value, self._trace_entry(stage, "ok", run_start, started, cached=False), None
+
+    @staticmethod
+    def _trace_entry(stage: Stage, status: str, run_start: float, started: float, cached: bool) -> Dict[str, Any]:
+        now = time.perf_counter()
+        return {
+            "stage": stage.name,
+            "status": status,
+            "cached": cached,
+            "deps": list(stage.deps),
+            "start_ms": round((started - run_start) * 1000, 2),
+            "duration_ms": round((now - started) * 1000, 2)
+        }
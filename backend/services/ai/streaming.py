@@ -0,0 +1,126 @@
+"""
+Streaming Helpers for Pasalku.ai
+
+Parses OpenAI-compatible Server-Sent Events from AI providers and formats
+SSE frames for our own `text/event-stream` endpoints.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Headers that stop proxies (nginx, Vercel) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+async def iter_chat_completion_chunks(
+    response: httpx.Response
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse provider SSE body into chat completion chunk dicts.
+
+    Each `data:` line holds one JSON chunk; `data: [DONE]` ends the stream.
+    Malformed lines are skipped rather than aborting the response.
+    """
+    async for line in response.aiter_lines():
+        if not line or not line.startswith("data:"):
+            continue
+
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed stream chunk: {data[:100]}")
+
+
+async def iter_chat_completion_events(
+    response: httpx.Response,
+    default_model: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Convert provider chunks into Pasalku stream events.
+
+    Yields:
+        {"type": "delta", "content": str} for every content fragment, then a
+        single {"type": "done", ...} event with the full content, model,
+        finish_reason and usage (when the provider reports it).
+    """
+    parts = []
+    model = default_model
+    finish_reason: Optional[str] = None
+    usage: Dict[str, int] = {}
+
+    async for chunk in iter_chat_completion_chunks(response):
+        model = chunk.get("model") or model
+        if chunk.get("usage"):
+            usage = chunk["usage"]
+
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                parts.append(content)
+                yield {"type": "delta", "content": content}
+            if choice.get("finish_reason"):
+                finish_reason = choice["finish_reason"]
+
+    yield {
+        "type": "done",
+        "content": "".join(parts),
+        "model": model,
+        "finish_reason": finish_reason,
+        "usage": {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0)
+        }
+    }
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Format one Server-Sent Event frame.
+
+    Args:
+        event: Event name (e.g. "delta", "done", "error")
+        data: JSON-serializable payload
+    """
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def collect_chat_completion(
+    events: AsyncIterator[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Drain a stream of events into an OpenAI-style completion dict.
+
+    Lets `chat_completion(stream=True)` keep returning a regular response
+    for callers that do not consume deltas.
+    """
+    done: Dict[str, Any] = {}
+    async for event in events:
+        if event["type"] == "done":
+            done = event
+
+    return {
+        "model": done.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": done.get("content", "")},
+            "finish_reason": done.get("finish_reason")
+        }],
+        "usage": done.get("usage", {})
+    }
@@ -3,11 +3,12 @@ AI Service for Pasalku.ai - Handles BytePlus Ark API integration
 """
 import logging
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator
 import httpx
 from pydantic import BaseModel
 
 from backend.core.config import settings
+from backend.services.ai.streaming import iter_chat_completion_events
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +101,84 @@ class AIService:
                 disclaimer="Tidak dapat memproses permintaan saat ini."
             )
 
+    def _is_configured(self) -> bool:
+        return bool(self.ark_api_key) and "your_ark_api_key_here" not in self.ark_api_key
+
+    async def get_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> Dict[str, Any]:
+        """
+        Raw chat completion for callers that build their own prompts
+        
+        Returns:
+            Dict with "response" (assistant content), "model" and "usage"
+        """
+        if not self._is_configured():
+            raise ValueError("ARK API key not configured")
+        
+        payload = {
+            "model": self.ark_model_id,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        
+        response = await self.client.post(
+            f"{self.ark_base_url}/chat/completions",
+            json=payload
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        return {
+            "response": result.get("choices", [{}])[0].get("message", {}).get("content", ""),
+            "model": result.get("model", self.ark_model_id),
+            "usage": result.get("usage", {})
+        }
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of get_chat_completion
+        
+        Yields:
+            {"type": "delta", "content": ...} events, then one {"type": "done", ...}
+        """
+        if not self._is_configured():
+            raise ValueError("ARK API key not configured")
+        
+        payload = {
+            "model": self.ark_model_id,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        
+        async with self.client.stream(
+            "POST",
+            f"{self.ark_base_url}/chat/completions",
+            json=payload
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise httpx.HTTPStatusError(
+                    f"ARK API error: {response.status_code} - {body.decode(errors='replace')[:200]}",
+                    request=response.request,
+                    response=response
+                )
+            
+            async for event in iter_chat_completion_events(response, self.ark_model_id):
+                yield event
+
     async def test_connection(self) -> bool:
         """
         Test the connection to the BytePlus Ark API
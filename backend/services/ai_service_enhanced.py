@@ -7,12 +7,13 @@ import json
 import time
 from typing import Dict, List, Any, Optional, AsyncGenerator
 from datetime import datetime, timedelta
-import aiohttp
-from aiohttp import ClientTimeout
+import httpx
 import backoff
 import re
 
 from core.config import settings
+from services.ai.http_pool import get_provider_pool
+from services.ai.streaming import iter_chat_completion_events
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ class AIService:
         self.base_url = settings.ARK_BASE_URL
         self.api_key = settings.ARK_API_KEY
         self.model_id = settings.ARK_MODEL_ID
-        self.timeout = ClientTimeout(total=30)
+        self.timeout = 30.0
         self.max_retries = 3
         self.rate_limit_window = 60  # seconds
         self.max_requests_per_window = 100  # requests per minute
@@ -66,7 +67,7 @@ class AIService:
 
     @backoff.on_exception(
         backoff.expo,
-        (aiohttp.ClientError, asyncio.TimeoutError),
+        (httpx.HTTPError, asyncio.TimeoutError),
         max_tries=3,
         jitter=backoff.random_jitter
     )
@@ -77,18 +78,18 @@ class AIService:
             "Content-Type": "application/json"
         }
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"AI service error: {response.status} - {error_text}")
-                    raise aiohttp.ClientError(f"AI service returned {response.status}")
+        response = await get_provider_pool().post(
+            "byteplus",
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            logger.error(f"AI service error: {response.status_code} - {response.text}")
+            response.raise_for_status()
 
-                return await response.json()
+        return response.json()
 
     async def test_connection(self) -> bool:
         """Test connection to AI service."""
@@ -124,7 +125,8 @@ class AIService:
             stream: Whether to stream the response
 
         Returns:
-            Dict containing answer, citations, and disclaimer
+            Dict containing answer, citations, and disclaimer, or an async
+            generator of text fragments when stream=True
         """
         try:
             # Check rate limiting (skip for now, implement per user later)
@@ -195,8 +197,8 @@ Pertanyaan pengguna: {query}"""
             logger.info(f"Sending request to AI service for query: {query[:50]}...")
 
             if stream:
-                # Handle streaming response
-                return await self._get_streaming_response(payload)
+                # Handle streaming response (caller iterates the generator)
+                return self._get_streaming_response(payload)
             else:
                 # Handle regular response
                 response_data = await self._make_request(payload)
@@ -260,15 +262,32 @@ Pertanyaan pengguna: {query}"""
             raise Exception(f"Failed to get AI response: {str(e)}")
 
     async def _get_streaming_response(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """Get streaming response from AI service."""
-        # For now, return non-streaming response
-        # Streaming implementation would require SSE or WebSocket
-        response_data = await self._make_request(payload)
-
-        if "choices" in response_data and response_data["choices"]:
-            ai_response = response_data["choices"][0]["message"]["content"]
-            yield ai_response
-        else:
+        """Stream response text fragments from AI service as they are generated."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {**payload, "stream": True}
+
+        try:
+            async with get_provider_pool().stream(
+                "byteplus",
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=self.timeout
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    logger.error(f"AI service error: {response.status_code} - {response.text}")
+                    response.raise_for_status()
+
+                async for event in iter_chat_completion_events(response, self.model_id):
+                    if event["type"] == "delta":
+                        yield event["content"]
+        except httpx.HTTPError as e:
+            logger.error(f"AI streaming error: {str(e)}")
             yield "Maaf, terjadi kesalahan dalam memproses permintaan Anda."
 
     def _extract_citations(self, response: str) -> List[str]:
@@ -0,0 +1,562 @@
+"""
+Analytics Event Store - columnar, date-partitioned storage for AnalyticsTracker
+
+Layout di disk:
+    <storage_path>/<YYYY-MM-DD>/seg-<ns>.npz   segmen hasil flush (hari berjalan)
+    <storage_path>/<YYYY-MM-DD>/part.npz       partisi hari yang sudah ditutup (hasil compaction)
+
+Setiap file berisi satu array NumPy per kolom. Kolom string disimpan sebagai
+dictionary codes (int32) + array nilai unik, sehingga agregasi cukup
+np.bincount tanpa mem-parse event satu per satu. Query dengan rentang
+tanggal hanya membuka partisi di rentang itu (partition pruning).
+
+Beberapa proses (worker uvicorn/gunicorn) boleh berbagi satu direktori:
+flush hanya menambah segmen baru, sedangkan compaction, retention dan
+migrasi format lama memegang lock file eksklusif (<storage_path>/.maintenance.lock).
+Segmen yang tergabung dua kali (mis. crash di tengah compaction) di-dedupe
+dengan event_id saat dibaca.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya lock antar thread di proses ini
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+US_PER_HOUR = 3600 * 10**6
+US_PER_DAY = 24 * US_PER_HOUR
+
+# Field metadata yang disimpan sebagai kolom sendiri (sisanya hanya di blob JSON)
+NUMERIC_FIELDS = ("response_time_ms", "confidence", "success", "is_valid")
+CATEGORICAL_FIELDS = ("language", "document_type", "law_name")
+KEYWORDS_FIELD = "query_keywords"
+
+PARTITION_FILE = "part.npz"
+MAINTENANCE_LOCK_FILE = ".maintenance.lock"
+
+
+def to_us(dt: datetime) -> int:
+    """Naive-UTC (atau aware) datetime -> mikrodetik sejak epoch"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def from_us(ts: int) -> datetime:
+    """Mikrodetik sejak epoch -> naive UTC datetime"""
+    return EPOCH + timedelta(microseconds=int(ts))
+
+
+def partition_key(ts: int) -> str:
+    return from_us(ts).strftime("%Y-%m-%d")
+
+
+def _str_array(values: List[str]) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.empty(0, dtype="<U1")
+
+
+def _dictionary_encode(values: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode nilai menjadi (codes int32, nilai unik); None -> -1"""
+    lookup: Dict[str, int] = {}
+    codes = [-1 if v is None else lookup.setdefault(str(v), len(lookup)) for v in values]
+    return np.array(codes, dtype=np.int32), _str_array(list(lookup))
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return np.nan
+
+
+def encode_events(events: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+    """
+    Encode (timestamp_us, event) menjadi kolom NumPy.
+
+    Returns:
+        Dict nama kolom -> array (format yang sama dengan isi file .npz)
+    """
+    metadata = [event.get("metadata") or {} for _, event in events]
+    columns: Dict[str, np.ndarray] = {
+        "ts": np.array([ts for ts, _ in events], dtype=np.int64),
+        "event_id": _str_array([event["event_id"] for _, event in events]),
+    }
+    columns["event_type"], columns["event_type__values"] = _dictionary_encode(
+        event["event_type"] for _, event in events
+    )
+    columns["user_id"], columns["user_id__values"] = _dictionary_encode(
+        event["user_id"] for _, event in events
+    )
+
+    for name in NUMERIC_FIELDS:
+        columns[f"num__{name}"] = np.array([_to_number(m.get(name)) for m in metadata], dtype=np.float64)
+
+    for name in CATEGORICAL_FIELDS:
+        columns[f"cat__{name}"], columns[f"cat__{name}__values"] = _dictionary_encode(
+            m.get(name) for m in metadata
+        )
+
+    # Multi-valued keywords: satu baris per (event, keyword)
+    kw_rows = []
+    kw_values = []
+    for row, m in enumerate(metadata):
+        keywords = m.get(KEYWORDS_FIELD)
+        if isinstance(keywords, list):
+            for keyword in keywords:
+                if keyword is not None:
+                    kw_rows.append(row)
+                    kw_values.append(keyword)
+    columns["kw_rows"] = np.array(kw_rows, dtype=np.int32)
+    columns["kw_codes"], columns["kw_codes__values"] = _dictionary_encode(kw_values)
+
+    blobs = [json.dumps(m, ensure_ascii=False).encode("utf-8") for m in metadata]
+    columns["metadata"] = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    columns["metadata_offsets"] = np.cumsum([0] + [len(b) for b in blobs], dtype=np.int64)
+
+    return columns
+
+
+def _merge_dictionary(codes_list: List[np.ndarray], values_list: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gabungkan beberapa kolom dictionary-encoded ke satu dictionary"""
+    lookup: Dict[str, int] = {}
+    remapped = []
+    for codes, values in zip(codes_list, values_list):
+        # elemen terakhir = -1 supaya code -1 (kosong) tetap -1
+        mapping = np.array(
+            [lookup.setdefault(v, len(lookup)) for v in values.tolist()] + [-1],
+            dtype=np.int32
+        )
+        remapped.append(mapping[codes])
+    return np.concatenate(remapped), _str_array(list(lookup))
+
+
+def concat_columns(blocks: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Gabungkan beberapa blok kolumnar (segmen) menjadi satu partisi"""
+    if len(blocks) == 1:
+        return blocks[0]
+
+    columns: Dict[str, np.ndarray] = {
+        "ts": np.concatenate([b["ts"] for b in blocks]),
+        "event_id": np.concatenate([b["event_id"] for b in blocks]),
+    }
+    for name in ["event_type", "user_id", "kw_codes"] + [f"cat__{f}" for f in CATEGORICAL_FIELDS]:
+        columns[name], columns[f"{name}__values"] = _merge_dictionary(
+            [b[name] for b in blocks], [b[f"{name}__values"] for b in blocks]
+        )
+    for name in NUMERIC_FIELDS:
+        columns[f"num__{name}"] = np.concatenate([b[f"num__{name}"] for b in blocks])
+
+    row_offsets = np.cumsum([0] + [len(b["ts"]) for b in blocks[:-1]])
+    columns["kw_rows"] = np.concatenate([b["kw_rows"] + offset for b, offset in zip(blocks, row_offsets)]).astype(np.int32)
+
+    byte_offsets = np.cumsum([0] + [len(b["metadata"]) for b in blocks[:-1]])
+    columns["metadata"] = np.concatenate([b["metadata"] for b in blocks])
+    columns["metadata_offsets"] = np.concatenate(
+        [blocks[0]["metadata_offsets"][:1]]
+        + [b["metadata_offsets"][1:] + offset for b, offset in zip(blocks, byte_offsets)]
+    )
+    return columns
+
+
+def dedupe_events(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Buang baris dengan event_id yang sudah muncul (kemunculan pertama dipertahankan)"""
+    event_ids = columns["event_id"]
+    _, first = np.unique(event_ids, return_index=True)
+    if len(first) == len(event_ids):
+        return columns
+    keep = np.zeros(len(event_ids), dtype=bool)
+    keep[first] = True
+    return EventPartition(columns).select(keep)
+
+
+class EventPartition:
+    """Satu blok kolumnar read-only (partisi harian atau buffer yang belum di-flush)"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.ts = columns["ts"]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def range_mask(self, start_us: Optional[int], end_us: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(self.ts), dtype=bool)
+        if start_us is not None:
+            mask &= self.ts >= start_us
+        if end_us is not None:
+            mask &= self.ts <= end_us
+        return mask
+
+    def equals(self, column: str, value: str) -> np.ndarray:
+        """Mask baris dengan kolom dictionary == value"""
+        values = self.columns[f"{column}__values"]
+        hits = np.nonzero(values == value)[0]
+        if not len(hits):
+            return np.zeros(len(self.ts), dtype=bool)
+        return self.columns[column] == hits[0]
+
+    def value_counts(self, column: str, mask: np.ndarray, missing: Optional[str] = None) -> Counter:
+        """Jumlah per nilai kolom dictionary untuk baris di mask"""
+        values = self.columns[f"{column}__values"]
+        codes = self.columns[column][mask]
+        counts = np.bincount(codes + 1, minlength=len(values) + 1)
+        result = Counter({value: int(c) for value, c in zip(values.tolist(), counts[1:]) if c})
+        if missing is not None and counts[0]:
+            result[missing] += int(counts[0])
+        return result
+
+    def numeric(self, name: str, mask: np.ndarray) -> np.ndarray:
+        return self.columns[f"num__{name}"][mask]
+
+    def keyword_counts(self, mask: np.ndarray) -> Counter:
+        rows = self.columns["kw_rows"]
+        codes = self.columns["kw_codes"][mask[rows]] if len(rows) else rows
+        values = self.columns["kw_codes__values"]
+        counts = np.bincount(codes, minlength=len(values))
+        return Counter({value: int(c) for value, c in zip(values.tolist(), counts) if c})
+
+    def bucket_counts(self, mask: np.ndarray, width_us: int) -> Dict[Tuple[int, str], int]:
+        """Jumlah per (bucket waktu, event_type)"""
+        types = self.columns["event_type__values"]
+        if not len(types):
+            return {}
+        keys = (self.ts[mask] // width_us) * len(types) + self.columns["event_type"][mask]
+        unique, counts = np.unique(keys, return_counts=True)
+        return {
+            (int(key // len(types)), str(types[key % len(types)])): int(count)
+            for key, count in zip(unique, counts)
+        }
+
+    def rows(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Decode baris tertentu menjadi event dict (format asli)"""
+        c = self.columns
+        blob = c["metadata"]
+        offsets = c["metadata_offsets"]
+        types = c["event_type__values"]
+        users = c["user_id__values"]
+        events = []
+        for i in indices:
+            events.append({
+                "event_id": str(c["event_id"][i]),
+                "event_type": str(types[c["event_type"][i]]),
+                "timestamp": from_us(self.ts[i]).isoformat(),
+                "user_id": str(users[c["user_id"][i]]),
+                "metadata": json.loads(blob[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8"))
+            })
+        return events
+
+    def select(self, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """Kolom untuk subset baris (dipakai saat retention memotong partisi)"""
+        indices = np.nonzero(mask)[0]
+        return encode_events([(int(self.ts[i]), event) for i, event in zip(indices, self.rows(indices))])
+
+
+class ColumnarEventStore:
+    """
+    Event store dengan buffered writes dan partisi harian kolumnar.
+
+    `append` hanya menambah ke buffer in-memory; thread background mem-flush
+    buffer ke segmen .npz setiap `flush_interval` detik atau saat buffer
+    mencapai `flush_size`. Partisi hari yang sudah lewat di-compact menjadi
+    satu file dan di-cache (LRU) karena tidak berubah lagi.
+    """
+
+    def __init__(
+        self,
+        storage_path: str,
+        flush_interval: Optional[float] = 2.0,
+        flush_size: int = 1000,
+        cache_partitions: int = 64
+    ):
+        """
+        Args:
+            storage_path: Direktori root partisi
+            flush_interval: Detik antar flush background (None = hanya flush() manual)
+            flush_size: Jumlah event di buffer yang memicu flush lebih awal
+            cache_partitions: Jumlah partisi harian yang disimpan di memory
+        """
+        self.path = Path(storage_path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+        self.cache_partitions = cache_partitions
+
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self._pending_view: Optional[EventPartition] = None
+        self._lock = threading.Lock()  # buffer
+        self._files_lock = threading.RLock()  # file partisi + cache
+        self._cache: "OrderedDict[str, Tuple[Tuple, EventPartition]]" = OrderedDict()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._maintenance_thread_lock = threading.Lock()
+
+        self._migrate_jsonl()
+
+        self._writer: Optional[threading.Thread] = None
+        if flush_interval is not None:
+            self._flush_interval = flush_interval
+            self._writer = threading.Thread(target=self._run_writer, name="analytics-writer", daemon=True)
+            self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, ts_us: int, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append((ts_us, event))
+            self._pending_view = None
+            full = len(self._pending) >= self.flush_size
+        if full:
+            if self._writer is not None:
+                self._wakeup.set()
+            else:
+                self.flush()
+
+    def flush(self) -> int:
+        """Tulis buffer ke segmen per tanggal; return jumlah event yang ditulis"""
+        with self._files_lock:
+            with self._lock:
+                pending = list(self._pending)
+                if not pending:
+                    return 0
+
+            by_partition: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+            for item in pending:
+                by_partition.setdefault(partition_key(item[0]), []).append(item)
+
+            for key, events in by_partition.items():
+                self._write_file(self.path / key / f"seg-{time.time_ns()}.npz", encode_events(events))
+
+            # Buffer baru dilepas setelah segmen tertulis, supaya query tidak
+            # pernah melihat event hilang di antara keduanya
+            with self._lock:
+                del self._pending[:len(pending)]
+                self._pending_view = None
+
+        return len(pending)
+
+    def _write_file(self, path: Path, columns: Dict[str, np.ndarray]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _maintenance(self):
+        """
+        Lock eksklusif untuk operasi yang menulis ulang / menghapus file.
+
+        flock mengunci antar proses yang berbagi storage_path; lock thread
+        menjaga urutan di dalam satu proses (dan menjadi satu-satunya lock
+        di platform tanpa fcntl).
+        """
+        with self._maintenance_thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path / MAINTENANCE_LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _run_writer(self) -> None:
+        last_compaction = ""
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                today = partition_key(to_us(datetime.utcnow()))
+                if today != last_compaction:
+                    self.compact(before=today)
+                    last_compaction = today
+            except Exception as e:
+                logger.error(f"Analytics flush failed: {e}")
+
+    def compact(self, before: str) -> int:
+        """Gabungkan segmen partisi yang tanggalnya < `before` menjadi part.npz"""
+        compacted = 0
+        with self._maintenance(), self._files_lock:
+            # Daftar file dibaca ulang di dalam lock: proses lain mungkin
+            # baru saja meng-compact partisi yang sama
+            for key in self.partition_keys():
+                if key >= before:
+                    continue
+                files = self._partition_files(key)
+                if len(files) == 1 and files[0].name == PARTITION_FILE:
+                    continue
+                partition = self._load(key)
+                self._write_file(self.path / key / PARTITION_FILE, partition.columns)
+                for f in files:
+                    if f.name != PARTITION_FILE:
+                        f.unlink()
+                self._cache.pop(key, None)
+                compacted += 1
+        if compacted:
+            logger.info(f"Compacted {compacted} analytics partitions")
+        return compacted
+
+    def close(self) -> None:
+        """Hentikan writer thread dan flush sisa buffer"""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def partition_keys(self) -> List[str]:
+        return sorted(
+            entry.name for entry in os.scandir(self.path)
+            if entry.is_dir() and len(entry.name) == 10
+        )
+
+    def _partition_files(self, key: str) -> List[Path]:
+        return sorted((self.path / key).glob("*.npz"))
+
+    def _load(self, key: str) -> EventPartition:
+        """Load partisi (cache di-invalidate otomatis jika file berubah)"""
+        with self._files_lock:
+            files = self._partition_files(key)
+            fingerprint = tuple((f.name, f.stat().st_mtime_ns) for f in files)
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+            blocks = []
+            for f in files:
+                try:
+                    with np.load(f) as data:
+                        blocks.append({name: data[name] for name in data.files})
+                except FileNotFoundError:
+                    # Segmen baru saja digabung ke part.npz oleh proses lain
+                    continue
+            if not blocks:
+                partition = EventPartition(encode_events([]))
+            elif len(blocks) == 1:
+                partition = EventPartition(blocks[0])
+            else:
+                partition = EventPartition(dedupe_events(concat_columns(blocks)))
+
+            self._cache[key] = (fingerprint, partition)
+            while len(self._cache) > self.cache_partitions:
+                self._cache.popitem(last=False)
+            return partition
+
+    def _pending_partition(self) -> Optional[EventPartition]:
+        with self._lock:
+            if not self._pending:
+                return None
+            if self._pending_view is None:
+                self._pending_view = EventPartition(encode_events(list(self._pending)))
+            return self._pending_view
+
+    def iter_scan(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[Tuple[EventPartition, np.ndarray]]:
+        """
+        Partisi + mask rentang waktu, terbaru dulu (buffer, lalu tanggal menurun).
+
+        Hanya partisi yang tanggalnya beririsan dengan [start, end] dibuka,
+        dan baru dibuka saat diiterasi - query dengan limit bisa berhenti
+        lebih awal. Tanpa lock di luar, flush di tengah iterasi bisa membuat
+        event muncul dua kali (buffer lalu segmen); dedupe dengan event_id.
+        """
+        start_us = to_us(start) if start else None
+        end_us = to_us(end) if end else None
+        first = partition_key(start_us) if start_us is not None else ""
+        last = partition_key(end_us) if end_us is not None else "9999-99-99"
+
+        with self._files_lock:
+            pending = self._pending_partition()
+            keys = [key for key in reversed(self.partition_keys()) if first <= key <= last]
+
+        if pending is not None:
+            yield pending, pending.range_mask(start_us, end_us)
+        for key in keys:
+            partition = self._load(key)
+            yield partition, partition.range_mask(start_us, end_us)
+
+    def scan(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Tuple[EventPartition, np.ndarray]]:
+        """Snapshot konsisten dari iter_scan (untuk agregasi)"""
+        with self._files_lock:
+            return list(self.iter_scan(start, end))
+
+    # ------------------------------------------------------------------
+    # Retention / migration
+    # ------------------------------------------------------------------
+
+    def delete_before(self, cutoff: datetime) -> None:
+        """Hapus event dengan timestamp < cutoff"""
+        self.flush()
+        cutoff_us = to_us(cutoff)
+        boundary = partition_key(cutoff_us)
+        with self._maintenance(), self._files_lock:
+            for key in self.partition_keys():
+                if key < boundary:
+                    shutil.rmtree(self.path / key, ignore_errors=True)
+                    self._cache.pop(key, None)
+                elif key == boundary:
+                    partition = self._load(key)
+                    keep = partition.ts >= cutoff_us
+                    if keep.all():
+                        continue
+                    files = self._partition_files(key)
+                    self._write_file(self.path / key / PARTITION_FILE, partition.select(keep))
+                    for f in files:
+                        if f.name != PARTITION_FILE:
+                            f.unlink()
+                    self._cache.pop(key, None)
+
+    def _migrate_jsonl(self) -> None:
+        """Konversi file events_YYYY-MM-DD.jsonl format lama ke partisi kolumnar"""
+        if not any(self.path.glob("events_*.jsonl")):
+            return
+        with self._maintenance():
+            # glob ulang di dalam lock: proses lain mungkin sudah memigrasi
+            for legacy in sorted(self.path.glob("events_*.jsonl")):
+                self._migrate_jsonl_file(legacy)
+
+    def _migrate_jsonl_file(self, legacy: Path) -> None:
+        """Migrasi satu file legacy; caller memegang maintenance lock"""
+        events = []
+        with open(legacy, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    event = json.loads(line)
+                    events.append((to_us(datetime.fromisoformat(event["timestamp"])), event))
+        by_partition: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for item in events:
+            by_partition.setdefault(partition_key(item[0]), []).append(item)
+        for key, items in by_partition.items():
+            self._write_file(self.path / key / f"seg-{time.time_ns()}.npz", encode_events(items))
+        legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+        logger.info(f"Migrated {len(events)} analytics events from {legacy.name}")
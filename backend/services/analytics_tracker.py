@@ -1,25 +1,42 @@
 """
 Analytics Tracker - Track usage events and metrics
 Tracks: chat queries, citations, predictions, documents, translations
+
+Events disimpan di ColumnarEventStore (partisi harian kolumnar, buffered
+writes); semua agregasi dashboard dihitung vektor per partisi.
 """
 
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from collections import defaultdict
-import json
-from pathlib import Path
+from collections import Counter
+
+import numpy as np
+
+from backend.services.analytics_store import (
+    ColumnarEventStore,
+    US_PER_DAY,
+    US_PER_HOUR,
+    from_us,
+    to_us
+)
 
 
 class AnalyticsTracker:
     """Track all usage events for analytics"""
     
-    def __init__(self, storage_path: str = "analytics_data"):
-        self.storage_path = Path(storage_path)
-        self.storage_path.mkdir(exist_ok=True)
-        
-        # In-memory cache for quick access
-        self.events_cache: List[Dict[str, Any]] = []
-        self.metrics_cache: Dict[str, Any] = {}
+    def __init__(
+        self,
+        storage_path: str = "analytics_data",
+        flush_interval: Optional[float] = 2.0
+    ):
+        """
+        Args:
+            storage_path: Root directory for date partitions
+            flush_interval: Seconds between background flushes (None = flush() manually)
+        """
+        self.storage_path = storage_path
+        self.store = ColumnarEventStore(storage_path, flush_interval=flush_interval)
         
     def track_event(
         self,
@@ -38,19 +55,17 @@ class AnalyticsTracker:
         - translation_performed: Text translated
         - export_performed: Chat exported
         """
+        now = datetime.utcnow()
         event = {
             "event_id": self._generate_event_id(),
             "event_type": event_type,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now.isoformat(),
             "user_id": user_id or "anonymous",
             "metadata": metadata or {}
         }
         
-        # Add to cache
-        self.events_cache.append(event)
-        
-        # Save to disk (append mode)
-        self._save_event(event)
+        # Buffered; ditulis ke disk oleh writer background
+        self.store.append(to_us(now), event)
         
         return event
     
@@ -173,6 +188,39 @@ class AnalyticsTracker:
             }
         )
     
+    def _scan(
+        self,
+        event_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[tuple]:
+        """(partition, mask) untuk partisi di rentang tanggal, difilter event_type"""
+        selected = []
+        for partition, mask in self.store.scan(start_date, end_date):
+            if event_type:
+                mask = mask & partition.equals("event_type", event_type)
+            if mask.any():
+                selected.append((partition, mask))
+        return selected
+    
+    def _scan_days(self, event_type: Optional[str], days: int) -> List[tuple]:
+        return self._scan(event_type=event_type, start_date=datetime.utcnow() - timedelta(days=days))
+    
+    @staticmethod
+    def _numeric(selected: List[tuple], name: str, default: float = 0.0) -> np.ndarray:
+        """Kolom numerik gabungan dari semua partisi (missing -> default)"""
+        if not selected:
+            return np.empty(0)
+        values = np.concatenate([partition.numeric(name, mask) for partition, mask in selected])
+        return np.where(np.isnan(values), default, values)
+    
+    @staticmethod
+    def _value_counts(selected: List[tuple], column: str, missing: Optional[str] = None) -> Counter:
+        counts: Counter = Counter()
+        for partition, mask in selected:
+            counts.update(partition.value_counts(column, mask, missing=missing))
+        return counts
+    
     def get_events(
         self,
         event_type: Optional[str] = None,
@@ -181,40 +229,28 @@ class AnalyticsTracker:
         end_date: Optional[datetime] = None,
         limit: int = 1000
     ) -> List[Dict[str, Any]]:
-        """Get events with filters"""
-        # Load from disk if cache is empty
-        if not self.events_cache:
-            self._load_events()
-        
-        events = self.events_cache
-        
-        # Apply filters
-        if event_type:
-            events = [e for e in events if e["event_type"] == event_type]
-        
-        if user_id:
-            events = [e for e in events if e["user_id"] == user_id]
-        
-        if start_date:
-            events = [
-                e for e in events
-                if datetime.fromisoformat(e["timestamp"]) >= start_date
-            ]
-        
-        if end_date:
-            events = [
-                e for e in events
-                if datetime.fromisoformat(e["timestamp"]) <= end_date
-            ]
-        
-        # Sort by timestamp (newest first)
-        events = sorted(
-            events,
-            key=lambda x: x["timestamp"],
-            reverse=True
-        )
-        
-        return events[:limit]
+        """Get events with filters (newest first)"""
+        candidates = []
+        seen = set()
+        for partition, mask in self.store.iter_scan(start_date, end_date):
+            if event_type:
+                mask &= partition.equals("event_type", event_type)
+            if user_id:
+                mask &= partition.equals("user_id", user_id)
+            indices = np.nonzero(mask)[0]
+            # Top-N terbaru di partisi ini saja yang di-decode
+            for i in indices[np.argsort(partition.ts[indices])[::-1][:limit]]:
+                event_id = partition.columns["event_id"][i]
+                if event_id not in seen:
+                    seen.add(event_id)
+                    candidates.append((int(partition.ts[i]), partition, int(i)))
+            # Partisi berikutnya (buffer dulu, lalu tanggal menurun) selalu
+            # lebih lama dari semua kandidat yang sudah terkumpul
+            if len(candidates) >= limit:
+                break
+        
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return [partition.rows([i])[0] for _, partition, i in candidates[:limit]]
     
     def get_event_counts(
         self,
@@ -222,13 +258,7 @@ class AnalyticsTracker:
         end_date: Optional[datetime] = None
     ) -> Dict[str, int]:
         """Get event counts by type"""
-        events = self.get_events(start_date=start_date, end_date=end_date)
-        
-        counts = defaultdict(int)
-        for event in events:
-            counts[event["event_type"]] += 1
-        
-        return dict(counts)
+        return dict(self._value_counts(self._scan(start_date=start_date, end_date=end_date), "event_type"))
     
     def get_popular_topics(
         self,
@@ -236,27 +266,14 @@ class AnalyticsTracker:
         days: int = 30
     ) -> List[Dict[str, Any]]:
         """Get most popular query topics"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        chat_events = self.get_events(
-            event_type="chat_query",
-            start_date=start_date
-        )
-        
-        # Count keywords
-        keyword_counts = defaultdict(int)
-        for event in chat_events:
-            keywords = event["metadata"].get("query_keywords", [])
-            for keyword in keywords:
-                keyword_counts[keyword] += 1
+        keyword_counts: Counter = Counter()
+        for partition, mask in self._scan_days("chat_query", days):
+            keyword_counts.update(partition.keyword_counts(mask))
         
-        # Sort and format
-        topics = [
+        return [
             {"topic": keyword, "count": count}
-            for keyword, count in keyword_counts.items()
+            for keyword, count in keyword_counts.most_common(limit)
         ]
-        topics.sort(key=lambda x: x["count"], reverse=True)
-        
-        return topics[:limit]
     
     def get_success_rate(
         self,
@@ -264,13 +281,9 @@ class AnalyticsTracker:
         days: int = 30
     ) -> Dict[str, Any]:
         """Calculate success rate for event type"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        events = self.get_events(
-            event_type=event_type,
-            start_date=start_date
-        )
+        success = self._numeric(self._scan_days(event_type, days), "success")
         
-        if not events:
+        if not len(success):
             return {
                 "total": 0,
                 "successful": 0,
@@ -278,17 +291,13 @@ class AnalyticsTracker:
                 "success_rate": 0.0
             }
         
-        successful = sum(
-            1 for e in events
-            if e["metadata"].get("success", False)
-        )
-        failed = len(events) - successful
+        successful = int(np.count_nonzero(success))
         
         return {
-            "total": len(events),
+            "total": len(success),
             "successful": successful,
-            "failed": failed,
-            "success_rate": (successful / len(events)) * 100
+            "failed": len(success) - successful,
+            "success_rate": (successful / len(success)) * 100
         }
     
     def get_average_response_time(
@@ -296,24 +305,15 @@ class AnalyticsTracker:
         days: int = 30
     ) -> Dict[str, float]:
         """Get average response times"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        chat_events = self.get_events(
-            event_type="chat_query",
-            start_date=start_date
-        )
+        response_times = self._numeric(self._scan_days("chat_query", days), "response_time_ms")
         
-        if not chat_events:
+        if not len(response_times):
             return {"average_ms": 0.0, "min_ms": 0.0, "max_ms": 0.0}
         
-        response_times = [
-            e["metadata"].get("response_time_ms", 0)
-            for e in chat_events
-        ]
-        
         return {
-            "average_ms": sum(response_times) / len(response_times),
-            "min_ms": min(response_times),
-            "max_ms": max(response_times)
+            "average_ms": float(response_times.mean()),
+            "min_ms": float(response_times.min()),
+            "max_ms": float(response_times.max())
         }
     
     def get_language_distribution(
@@ -321,31 +321,17 @@ class AnalyticsTracker:
         days: int = 30
     ) -> Dict[str, int]:
         """Get distribution of languages used"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        chat_events = self.get_events(
-            event_type="chat_query",
-            start_date=start_date
-        )
-        
-        lang_counts = defaultdict(int)
-        for event in chat_events:
-            lang = event["metadata"].get("language", "unknown")
-            lang_counts[lang] += 1
-        
-        return dict(lang_counts)
+        return dict(self._value_counts(self._scan_days("chat_query", days), "cat__language", missing="unknown"))
     
     def get_prediction_accuracy(
         self,
         days: int = 30
     ) -> Dict[str, Any]:
         """Calculate prediction confidence statistics"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        pred_events = self.get_events(
-            event_type="prediction_requested",
-            start_date=start_date
-        )
+        confidences = self._numeric(self._scan_days("prediction_requested", days), "confidence")
+        total = len(confidences)
         
-        if not pred_events:
+        if not total:
             return {
                 "total_predictions": 0,
                 "average_confidence": 0.0,
@@ -354,24 +340,19 @@ class AnalyticsTracker:
                 "low_confidence_count": 0
             }
         
-        confidences = [
-            e["metadata"].get("confidence", 0.0)
-            for e in pred_events
-        ]
-        
-        high_conf = sum(1 for c in confidences if c >= 0.8)
-        medium_conf = sum(1 for c in confidences if 0.6 <= c < 0.8)
-        low_conf = sum(1 for c in confidences if c < 0.6)
+        high_conf = int(np.count_nonzero(confidences >= 0.8))
+        medium_conf = int(np.count_nonzero((confidences >= 0.6) & (confidences < 0.8)))
+        low_conf = int(np.count_nonzero(confidences < 0.6))
         
         return {
-            "total_predictions": len(pred_events),
-            "average_confidence": sum(confidences) / len(confidences),
+            "total_predictions": total,
+            "average_confidence": float(confidences.mean()),
             "high_confidence_count": high_conf,
             "medium_confidence_count": medium_conf,
             "low_confidence_count": low_conf,
-            "high_confidence_percentage": (high_conf / len(pred_events)) * 100,
-            "medium_confidence_percentage": (medium_conf / len(pred_events)) * 100,
-            "low_confidence_percentage": (low_conf / len(pred_events)) * 100
+            "high_confidence_percentage": (high_conf / total) * 100,
+            "medium_confidence_percentage": (medium_conf / total) * 100,
+            "low_confidence_percentage": (low_conf / total) * 100
         }
     
     def get_document_type_distribution(
@@ -379,31 +360,20 @@ class AnalyticsTracker:
         days: int = 30
     ) -> Dict[str, int]:
         """Get distribution of document types generated"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        doc_events = self.get_events(
-            event_type="document_generated",
-            start_date=start_date
-        )
-        
-        type_counts = defaultdict(int)
-        for event in doc_events:
-            doc_type = event["metadata"].get("document_type", "unknown")
-            type_counts[doc_type] += 1
-        
-        return dict(type_counts)
+        return dict(self._value_counts(
+            self._scan_days("document_generated", days), "cat__document_type", missing="unknown"
+        ))
     
     def get_citation_statistics(
         self,
         days: int = 30
     ) -> Dict[str, Any]:
         """Get citation detection statistics"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        citation_events = self.get_events(
-            event_type="citation_detected",
-            start_date=start_date
-        )
+        selected = self._scan_days("citation_detected", days)
+        is_valid = self._numeric(selected, "is_valid")
+        total = len(is_valid)
         
-        if not citation_events:
+        if not total:
             return {
                 "total_citations": 0,
                 "valid_citations": 0,
@@ -412,30 +382,18 @@ class AnalyticsTracker:
                 "most_cited_laws": []
             }
         
-        valid = sum(
-            1 for e in citation_events
-            if e["metadata"].get("is_valid", False)
-        )
-        invalid = len(citation_events) - valid
-        
-        # Count most cited laws
-        law_counts = defaultdict(int)
-        for event in citation_events:
-            law = event["metadata"].get("law_name", "unknown")
-            law_counts[law] += 1
-        
-        most_cited = [
-            {"law": law, "count": count}
-            for law, count in law_counts.items()
-        ]
-        most_cited.sort(key=lambda x: x["count"], reverse=True)
+        valid = int(np.count_nonzero(is_valid))
+        law_counts = self._value_counts(selected, "cat__law_name", missing="unknown")
         
         return {
-            "total_citations": len(citation_events),
+            "total_citations": total,
             "valid_citations": valid,
-            "invalid_citations": invalid,
-            "validation_rate": (valid / len(citation_events)) * 100,
-            "most_cited_laws": most_cited[:10]
+            "invalid_citations": total - valid,
+            "validation_rate": (valid / total) * 100,
+            "most_cited_laws": [
+                {"law": law, "count": count}
+                for law, count in law_counts.most_common(10)
+            ]
         }
     
     def get_usage_timeline(
@@ -444,45 +402,33 @@ class AnalyticsTracker:
         granularity: str = "day"  # day, hour
     ) -> List[Dict[str, Any]]:
         """Get usage over time"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        events = self.get_events(start_date=start_date)
-        
-        # Group by time period
-        timeline = defaultdict(lambda: defaultdict(int))
-        
-        for event in events:
-            timestamp = datetime.fromisoformat(event["timestamp"])
-            
-            if granularity == "day":
-                key = timestamp.strftime("%Y-%m-%d")
-            else:  # hour
-                key = timestamp.strftime("%Y-%m-%d %H:00")
-            
-            timeline[key][event["event_type"]] += 1
-            timeline[key]["total"] += 1
-        
-        # Convert to list
-        result = [
-            {"timestamp": key, **counts}
-            for key, counts in timeline.items()
+        width = US_PER_DAY if granularity == "day" else US_PER_HOUR
+        key_format = "%Y-%m-%d" if granularity == "day" else "%Y-%m-%d %H:00"
+        
+        # Group by time period (vectorized per partisi)
+        buckets: Dict[int, Counter] = {}
+        for partition, mask in self._scan_days(None, days):
+            for (bucket, event_type), count in partition.bucket_counts(mask, width).items():
+                counts = buckets.setdefault(bucket, Counter())
+                counts[event_type] += count
+                counts["total"] += count
+        
+        return [
+            {"timestamp": from_us(bucket * width).strftime(key_format), **buckets[bucket]}
+            for bucket in sorted(buckets)
         ]
-        
-        # Sort by timestamp
-        result.sort(key=lambda x: x["timestamp"])
-        
-        return result
     
     def clear_old_events(self, days: int = 90):
         """Clear events older than specified days"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        self.events_cache = [
-            e for e in self.events_cache
-            if datetime.fromisoformat(e["timestamp"]) >= cutoff_date
-        ]
-        
-        # Save cleaned cache
-        self._save_all_events()
+        self.store.delete_before(datetime.utcnow() - timedelta(days=days))
+    
+    def flush(self):
+        """Write buffered events to disk now"""
+        self.store.flush()
+    
+    def close(self):
+        """Stop the background writer and flush remaining events"""
+        self.store.close()
     
     # Helper methods
     
@@ -505,44 +451,6 @@ class AnalyticsTracker:
         found_keywords = [kw for kw in keywords if kw in text_lower]
         
         return found_keywords
-    
-    def _save_event(self, event: Dict[str, Any]):
-        """Save single event to disk"""
-        # Append to daily file
-        date_str = datetime.utcnow().strftime("%Y-%m-%d")
-        file_path = self.storage_path / f"events_{date_str}.jsonl"
-        
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
-    
-    def _save_all_events(self):
-        """Save all cached events"""
-        # Group by date
-        events_by_date = defaultdict(list)
-        for event in self.events_cache:
-            timestamp = datetime.fromisoformat(event["timestamp"])
-            date_str = timestamp.strftime("%Y-%m-%d")
-            events_by_date[date_str].append(event)
-        
-        # Write each date file
-        for date_str, events in events_by_date.items():
-            file_path = self.storage_path / f"events_{date_str}.jsonl"
-            
-            with open(file_path, "w", encoding="utf-8") as f:
-                for event in events:
-                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
-    
-    def _load_events(self):
-        """Load events from disk"""
-        self.events_cache = []
-        
-        # Load all event files
-        for file_path in self.storage_path.glob("events_*.jsonl"):
-            with open(file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        event = json.loads(line)
-                        self.events_cache.append(event)
 
 
 # Global tracker instance
@@ -553,5 +461,13 @@ def get_tracker() -> AnalyticsTracker:
     """Get global analytics tracker instance"""
     global _tracker
     if _tracker is None:
-        _tracker = AnalyticsTracker()
+        _tracker = AnalyticsTracker(storage_path=os.getenv("ANALYTICS_STORAGE_PATH", "analytics_data"))
     return _tracker
+
+
+def close_tracker():
+    """Flush and stop the global tracker (app shutdown)"""
+    global _tracker
+    if _tracker is not None:
+        _tracker.close()
+        _tracker = None
@@ -5,10 +5,13 @@ Primary AI engine untuk Pasalku.ai
 import os
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import httpx
 from datetime import datetime
 
+from .ai.http_pool import get_provider_pool
+from .ai.streaming import iter_chat_completion_events
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,61 +42,69 @@ class ArkAIService:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream response
+            stream: Read the response as SSE (use stream_chat_completion for deltas)
             **kwargs: Additional parameters
         
         Returns:
             Dict with response data
         """
+        if stream:
+            result = {}
+            async for event in self.stream_chat_completion(messages, temperature, max_tokens, **kwargs):
+                if event["type"] != "delta":
+                    result = event
+            return result
+        
         start_time = time.time()
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                payload = {
-                    "model": self.model_id,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                    "stream": stream,
-                    **kwargs
-                }
-                
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                response_time_ms = int((time.time() - start_time) * 1000)
-                
-                # Extract response data
-                choice = result.get("choices", [{}])[0]
-                message = choice.get("message", {})
-                usage = result.get("usage", {})
-                
-                return {
-                    "success": True,
-                    "content": message.get("content", ""),
-                    "role": message.get("role", "assistant"),
-                    "model": result.get("model", self.model_id),
-                    "usage": {
-                        "prompt_tokens": usage.get("prompt_tokens", 0),
-                        "completion_tokens": usage.get("completion_tokens", 0),
-                        "total_tokens": usage.get("total_tokens", 0)
-                    },
-                    "response_time_ms": response_time_ms,
-                    "finish_reason": choice.get("finish_reason"),
-                    "raw_response": result
-                }
-                
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "model": self.model_id,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": False,
+                **kwargs
+            }
+            
+            response = await get_provider_pool().post(
+                "byteplus",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=60.0
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            response_time_ms = int((time.time() - start_time) * 1000)
+            
+            # Extract response data
+            choice = result.get("choices", [{}])[0]
+            message = choice.get("message", {})
+            usage = result.get("usage", {})
+            
+            return {
+                "success": True,
+                "content": message.get("content", ""),
+                "role": message.get("role", "assistant"),
+                "model": result.get("model", self.model_id),
+                "usage": {
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0)
+                },
+                "response_time_ms": response_time_ms,
+                "finish_reason": choice.get("finish_reason"),
+                "raw_response": result
+            }
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"Ark AI HTTP error: {e.response.status_code} - {e.response.text}")
             return {
@@ -110,6 +121,91 @@ class ArkAIService:
                 "response_time_ms": int((time.time() - start_time) * 1000)
             }
     
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream chat completion tokens from Ark AI
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters
+        
+        Yields:
+            {"type": "delta", "content": str} for each token batch, then one
+            {"type": "done", "success": True, ...} event shaped like the
+            chat_completion result, or {"type": "error", "success": False, ...}
+        """
+        start_time = time.time()
+        first_token_time = None
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model_id,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            **kwargs
+        }
+        
+        try:
+            async with get_provider_pool().stream(
+                "byteplus",
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=60.0
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                
+                async for event in iter_chat_completion_events(response, self.model_id):
+                    if event["type"] == "delta":
+                        if first_token_time is None:
+                            first_token_time = time.time()
+                    else:
+                        event.update({
+                            "success": True,
+                            "role": "assistant",
+                            "response_time_ms": int((time.time() - start_time) * 1000),
+                            "time_to_first_token_ms": (
+                                int((first_token_time - start_time) * 1000) if first_token_time else None
+                            )
+                        })
+                    yield event
+                
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ark AI HTTP error: {e.response.status_code} - {e.response.text}")
+            yield {
+                "type": "error",
+                "success": False,
+                "error": f"HTTP {e.response.status_code}",
+                "error_detail": e.response.text,
+                "response_time_ms": int((time.time() - start_time) * 1000)
+            }
+        except Exception as e:
+            logger.error(f"Ark AI stream error: {str(e)}")
+            yield {
+                "type": "error",
+                "success": False,
+                "error": str(e),
+                "response_time_ms": int((time.time() - start_time) * 1000)
+            }
+    
     async def legal_consultation(
         self,
         user_query: str,
@@ -133,6 +229,76 @@ class ArkAIService:
         Returns:
             Dict with consultation response
         """
+        messages = self._build_consultation_messages(
+            user_query=user_query,
+            conversation_history=conversation_history,
+            legal_context=legal_context,
+            persona=persona,
+            conversation_stage=conversation_stage,
+            user_context=user_context
+        )
+        
+        # Get AI response
+        result = await self.chat_completion(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000
+        )
+        
+        if result["success"]:
+            # Extract citations from response
+            citations = self._extract_citations(result["content"])
+            result["citations"] = citations
+            
+            # Calculate confidence score (simple heuristic)
+            result["confidence_score"] = self._calculate_confidence(result)
+        
+        return result
+    
+    async def legal_consultation_stream(
+        self,
+        user_query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        legal_context: Optional[Dict[str, Any]] = None,
+        persona: str = "konsultan_hukum",
+        conversation_stage: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of legal_consultation
+        
+        Yields delta events as tokens arrive. The final "done" event carries
+        the same fields as legal_consultation (citations, confidence_score).
+        """
+        messages = self._build_consultation_messages(
+            user_query=user_query,
+            conversation_history=conversation_history,
+            legal_context=legal_context,
+            persona=persona,
+            conversation_stage=conversation_stage,
+            user_context=user_context
+        )
+        
+        async for event in self.stream_chat_completion(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000
+        ):
+            if event["type"] == "done":
+                event["citations"] = self._extract_citations(event["content"])
+                event["confidence_score"] = self._calculate_confidence(event)
+            yield event
+    
+    def _build_consultation_messages(
+        self,
+        user_query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        legal_context: Optional[Dict[str, Any]],
+        persona: str,
+        conversation_stage: Optional[str],
+        user_context: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """Build system prompt + history + query for a legal consultation"""
         # Import orchestrator prompt
         try:
             from ..prompts.orchestrator_system_prompt import get_orchestrator_prompt
@@ -186,22 +352,7 @@ Fokus pada penyelesaian sengketa dan win-win solution."""
         # Add current query
         messages.append({"role": "user", "content": user_query})
         
-        # Get AI response
-        result = await self.chat_completion(
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        if result["success"]:
-            # Extract citations from response
-            citations = self._extract_citations(result["content"])
-            result["citations"] = citations
-            
-            # Calculate confidence score (simple heuristic)
-            result["confidence_score"] = self._calculate_confidence(result)
-        
-        return result
+        return messages
     
     def _format_legal_context(self, context: Dict[str, Any]) -> str:
         """Format legal context for system prompt"""
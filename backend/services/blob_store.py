@@ -0,0 +1,216 @@
+"""
+Content-Addressed Blob Store
+
+Penyimpanan file upload (dokumen hukum, scan PDF) di local disk:
+- Upload di-stream per chunk ke file sementara sambil menghitung SHA-256,
+  tidak pernah dibaca utuh ke memory
+- File disimpan dengan nama = SHA-256 isinya (root/ab/cd/<sha256>);
+  upload yang isinya sama otomatis berbagi satu file (dedup)
+- MongoDB hanya menyimpan referensi (BlobRef.to_dict), bukan bytes file,
+  sehingga dokumen besar tidak lagi menabrak batas 16 MB BSON
+- Blob tidak dihapus langsung saat dokumen dihapus: release() (dari job
+  "documents.release_blob") menghapusnya jika sudah tidak direferensikan
+  dan tidak disentuh upload selama grace period. Upload yang dedup
+  menyegarkan mtime blob, jadi blob yang baru saja di-dedup (dokumennya
+  belum ter-insert) tidak ikut terhapus
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Optional
+
+# Root repo; path relatif di-resolve dari sini, bukan dari cwd proses
+# (API di Railway jalan dari backend/, job worker dari root repo)
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def resolve_blob_store_path(path: Optional[str] = None) -> Path:
+    """Root blob store absolut; default backend/data/document_blobs, relatif terhadap root repo"""
+    if not path:
+        return _PROJECT_ROOT / "backend" / "data" / "document_blobs"
+    if Path(path).is_absolute():
+        return Path(path)
+    return _PROJECT_ROOT / path
+
+
+BLOB_STORE_PATH = resolve_blob_store_path(os.getenv("DOCUMENT_BLOB_PATH"))
+CHUNK_SIZE = 1024 * 1024  # 1 MiB per read/write
+# Blob yang disentuh (upload / dedup) dalam jendela ini tidak dihapus release()
+BLOB_GC_GRACE_SECONDS = float(os.getenv("DOCUMENT_BLOB_GC_GRACE", "3600"))
+
+
+class BlobTooLargeError(Exception):
+    """Upload melebihi max_size; file sementara sudah dihapus"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"Blob exceeds maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class BlobRef:
+    """Referensi ke blob yang tersimpan"""
+    sha256: str
+    size: int
+    path: Path
+    deduplicated: bool = False  # True jika isi yang sama sudah ada sebelumnya
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representasi untuk MongoDB (tanpa path absolut)"""
+        return {"storage": "local", "sha256": self.sha256, "size": self.size}
+
+
+class BlobStore:
+    """
+    Local-disk content-addressed blob store
+
+    Args:
+        root: Direktori root blob store
+        chunk_size: Ukuran chunk saat streaming
+    """
+
+    def __init__(self, root: Optional[str] = None, chunk_size: int = CHUNK_SIZE):
+        self.root = resolve_blob_store_path(root) if root else BLOB_STORE_PATH
+        self.chunk_size = chunk_size
+        self._tmp_dir = self.root / ".tmp"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha256: str) -> Path:
+        """Lokasi blob untuk digest tertentu (dua level fan-out direktori)"""
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).is_file()
+
+    def open(self, sha256: str) -> BinaryIO:
+        """Buka blob untuk dibaca (caller wajib close)"""
+        return open(self.path_for(sha256), "rb")
+
+    def save_fileobj(self, fileobj: BinaryIO, max_size: Optional[int] = None) -> BlobRef:
+        """
+        Stream file object ke blob store
+
+        Args:
+            fileobj: File object yang dibaca per chunk (mis. UploadFile.file)
+            max_size: Batas ukuran dalam bytes (None = tanpa batas)
+
+        Returns:
+            BlobRef
+
+        Raises:
+            BlobTooLargeError: Jika isi melebihi max_size
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLargeError(max_size)
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            sha256 = digest.hexdigest()
+            target = self.path_for(sha256)
+            if target.is_file():
+                try:
+                    os.utime(target)  # segarkan mtime: release() membiarkan blob ini
+                except FileNotFoundError:
+                    pass  # sedang dihapus release(): tulis ulang di bawah
+                else:
+                    os.unlink(tmp_name)
+                    return BlobRef(sha256=sha256, size=size, path=target, deduplicated=True)
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, target)
+            return BlobRef(sha256=sha256, size=size, path=target)
+
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def save_bytes(self, data: bytes) -> BlobRef:
+        """Simpan bytes yang sudah ada di memory (mis. hasil generate dokumen)"""
+        return self.save_fileobj(io.BytesIO(data))
+
+    async def save_upload(self, upload: Any, max_size: Optional[int] = None) -> BlobRef:
+        """
+        Stream FastAPI UploadFile ke blob store tanpa memblokir event loop
+
+        Seluruh loop baca/tulis berjalan di satu worker thread.
+        """
+        await upload.seek(0)
+        return await asyncio.to_thread(self.save_fileobj, upload.file, max_size)
+
+    def delete(self, sha256: str) -> bool:
+        """
+        Hapus blob tanpa syarat
+
+        Caller bertanggung jawab memastikan tidak ada dokumen lain yang
+        masih mereferensikan digest yang sama (lihat dedup); untuk dokumen
+        yang dihapus user pakai release().
+        """
+        try:
+            self.path_for(sha256).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def release(
+        self,
+        sha256: str,
+        is_referenced: Callable[[str], Awaitable[bool]],
+        grace_seconds: float = BLOB_GC_GRACE_SECONDS
+    ) -> bool:
+        """
+        Hapus blob jika tidak direferensikan dan tidak disentuh selama grace_seconds
+
+        Aman terhadap upload dedup yang berjalan bersamaan (di proses mana
+        pun): blob dipindah ke nama sementara sebelum mtime dicek ulang.
+        Upload yang dedup sebelum rename sudah menyegarkan mtime (blob
+        dikembalikan); upload sesudah rename tidak menemukan blob dan
+        menulis ulang isinya.
+
+        Returns:
+            True jika blob dihapus
+        """
+        path = self.path_for(sha256)
+        if not path.is_file() or await is_referenced(sha256):
+            return False
+
+        tombstone = path.with_name(path.name + ".release")
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            return False
+        if time.time() - tombstone.stat().st_mtime < grace_seconds:
+            os.replace(tombstone, path)  # isi identik jika upload sempat menulis ulang
+            return False
+        os.unlink(tombstone)
+        return True
+
+
+# Singleton
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get singleton BlobStore instance"""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
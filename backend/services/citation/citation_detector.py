@@ -16,7 +16,7 @@ Jenis sitasi yang didukung:
 """
 
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import logging
@@ -106,13 +106,16 @@ class CitationDetector:
     PASAL_PATTERNS = [
         # Pasal 1 ayat (2)
         r"Pasal\s+(\d+)\s+ayat\s*\((\d+)\)",
-        # Pasal 378
-        r"Pasal\s+(\d+)(?!\s+ayat)",
         # Pasal 1 huruf a
-        r"Pasal\s+(\d+)\s+huruf\s+([a-z])",
-        # Pasal 1 sampai 5
-        r"Pasal\s+(\d+)\s+(?:sampai|hingga|s\.?d\.?)\s+(?:Pasal\s+)?(\d+)",
+        r"Pasal\s+(\d+)\s+huruf\s+([a-z])\b",
+        # Pasal 1 sampai (dengan) Pasal 5 - menjadi dua sitasi; tidak dipakai jika
+        # ujung range punya ayat/huruf (ujungnya dideteksi sebagai sitasi sendiri)
+        r"Pasal\s+(\d+)\s+(?:sampai(?:\s+dengan)?|hingga|s\.?d\.?)\s+(?:Pasal\s+)?(\d+)\b(?!\s*ayat|\s+huruf)",
+        # Pasal 378 (paling umum, dicoba terakhir)
+        r"Pasal\s+(\d+)(?!\s+ayat)",
     ]
+    # Bentuk tiap PASAL_PATTERNS (urutan sama) - menentukan arti group kedua
+    PASAL_FORMS = ["ayat", "huruf", "range", "single"]
     
     # Pattern untuk Putusan
     PUTUSAN_PATTERNS = [
@@ -151,25 +154,76 @@ class CitationDetector:
         r"Instruksi\s+Presiden\s+(?:Nomor|No\.?)\s*(\d+)\s+Tahun\s+(\d{4})",
     ]
     
+    # Urutan prioritas di master regex: pada posisi yang sama, jenis/pattern
+    # yang lebih awal menang (pattern spesifik sebelum yang umum)
+    TYPE_PRIORITY = [
+        (CitationType.UU, "UU_PATTERNS"),
+        (CitationType.PP, "PP_PATTERNS"),
+        (CitationType.PERPRES, "PERPRES_PATTERNS"),
+        (CitationType.PERMEN, "PERMEN_PATTERNS"),
+        (CitationType.PASAL, "PASAL_PATTERNS"),
+        (CitationType.PUTUSAN, "PUTUSAN_PATTERNS"),
+        (CitationType.KUHP, "KUH_PATTERNS"),
+        (CitationType.PERDA, "PERDA_PATTERNS"),
+        (CitationType.KEPRES, "KEPRES_PATTERNS"),
+        (CitationType.INPRES, "INPRES_PATTERNS"),
+    ]
+    
+    # Semua pattern di atas diawali salah satu prefix ini. Dipakai sebagai
+    # lookahead di depan master regex supaya posisi yang jelas bukan awal
+    # sitasi langsung dilewati tanpa mencoba semua alternatif.
+    # WAJIB diperbarui jika menambah pattern dengan awalan baru.
+    PATTERN_PREFIXES = ["UU", "Undang", "PP", "Pe", "Pa", "Pu", "No", "KUH", "Ke", "In"]
+    
+    LEGAL_KEYWORDS = [
+        "berdasarkan", "sesuai", "menurut", "mengacu", "merujuk",
+        "pasal", "ayat", "undang-undang", "peraturan", "ketentuan",
+        "hukum", "pidana", "perdata", "putusan", "pengadilan"
+    ]
+    
+    # Karakter konteks di kiri/kanan sitasi untuk confidence scoring
+    CONTEXT_WINDOW = 50
+    
+    # Ekor buffer yang ditahan di detect_iter sebelum match dianggap final
+    # (harus > panjang sitasi terpanjang + CONTEXT_WINDOW)
+    STREAM_OVERLAP = 512
+    
     def __init__(self):
         """Inisialisasi Citation Detector"""
         self._compile_patterns()
         logger.info("Citation Detector initialized")
     
     def _compile_patterns(self):
-        """Compile semua regex patterns untuk performa lebih baik"""
-        self.compiled_patterns = {
-            CitationType.UU: [re.compile(p, re.IGNORECASE) for p in self.UU_PATTERNS],
-            CitationType.PP: [re.compile(p, re.IGNORECASE) for p in self.PP_PATTERNS],
-            CitationType.PERPRES: [re.compile(p, re.IGNORECASE) for p in self.PERPRES_PATTERNS],
-            CitationType.PERMEN: [re.compile(p, re.IGNORECASE) for p in self.PERMEN_PATTERNS],
-            CitationType.PASAL: [re.compile(p, re.IGNORECASE) for p in self.PASAL_PATTERNS],
-            CitationType.PUTUSAN: [re.compile(p, re.IGNORECASE) for p in self.PUTUSAN_PATTERNS],
-            CitationType.KUHP: [re.compile(p, re.IGNORECASE) for p in self.KUH_PATTERNS],
-            CitationType.PERDA: [re.compile(p, re.IGNORECASE) for p in self.PERDA_PATTERNS],
-            CitationType.KEPRES: [re.compile(p, re.IGNORECASE) for p in self.KEPRES_PATTERNS],
-            CitationType.INPRES: [re.compile(p, re.IGNORECASE) for p in self.INPRES_PATTERNS],
-        }
+        """
+        Compile semua pattern menjadi satu master regex.
+        
+        Setiap pattern dibungkus satu capturing group luar; `match.lastindex`
+        menunjuk ke group luar tersebut sehingga kita tahu jenis sitasi dan
+        posisi group internal pattern itu tanpa menjalankan ulang regex.
+        """
+        self.compiled_patterns = {}
+        alternatives = []
+        # group index luar -> (jenis sitasi, jumlah group internal, bentuk Pasal)
+        self._alternatives: Dict[int, Tuple[CitationType, int, Optional[str]]] = {}
+        group_index = 1
+        
+        for citation_type, attr in self.TYPE_PRIORITY:
+            patterns = getattr(self, attr)
+            self.compiled_patterns[citation_type] = [re.compile(p, re.IGNORECASE) for p in patterns]
+            
+            for i, compiled in enumerate(self.compiled_patterns[citation_type]):
+                alternatives.append(f"({compiled.pattern})")
+                form = self.PASAL_FORMS[i] if citation_type == CitationType.PASAL else None
+                self._alternatives[group_index] = (citation_type, compiled.groups, form)
+                group_index += 1 + compiled.groups
+        
+        first_chars = "".join(sorted({prefix[0] for prefix in self.PATTERN_PREFIXES}))
+        prefilter = f"(?=[{first_chars}])(?=" + "|".join(self.PATTERN_PREFIXES) + ")"
+        self._master = re.compile(prefilter + "(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+        # Lookahead supaya keyword yang bersinggungan tetap terhitung semua
+        self._keyword_regex = re.compile(
+            "(?=(" + "|".join(re.escape(kw) for kw in self.LEGAL_KEYWORDS) + "))"
+        )
     
     def detect(self, text: str) -> List[DetectedCitation]:
         """
@@ -181,62 +235,126 @@ class CitationDetector:
         Returns:
             List sitasi yang terdeteksi
         """
-        citations: List[DetectedCitation] = []
-        
-        # Deteksi untuk setiap jenis sitasi
-        for citation_type, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                for match in pattern.finditer(text):
-                    citation = self._create_citation(
-                        text=match.group(0),
-                        type=citation_type,
-                        match=match,
-                        full_text=text
-                    )
-                    citations.append(citation)
-        
-        # Sort berdasarkan posisi
-        citations.sort(key=lambda c: c.start_pos)
-        
-        # Remove duplicates (sitasi yang overlap)
-        citations = self._remove_overlaps(citations)
+        citations = list(self.detect_iter(text))
         
         logger.info(f"Detected {len(citations)} citations in text")
         
         return citations
     
-    def _create_citation(
+    def detect_iter(
         self,
-        text: str,
-        type: CitationType,
-        match: re.Match,
-        full_text: str
-    ) -> DetectedCitation:
-        """Buat objek DetectedCitation dari match"""
-        # Normalisasi teks
-        normalized = self._normalize_citation(text, type, match)
+        source: Union[str, Iterable[str]]
+    ) -> Iterator[DetectedCitation]:
+        """
+        Deteksi sitasi secara streaming, kiri ke kanan.
         
-        # Ekstrak metadata
-        metadata = self._extract_metadata(text, type, match)
+        Master regex hanya melewati teks satu kali dan hasilnya otomatis
+        tidak overlap (match berikutnya dimulai setelah match sebelumnya).
+        Untuk dokumen sangat besar (teks UU lengkap), berikan iterable of
+        chunks (mis. file yang dibaca per blok) - memori yang dipakai hanya
+        sebesar satu chunk plus STREAM_OVERLAP.
+        
+        Args:
+            source: Teks lengkap atau iterable potongan teks
         
-        # Hitung confidence
-        confidence = self._calculate_confidence(text, type, match, full_text)
+        Yields:
+            DetectedCitation dengan start_pos/end_pos relatif ke seluruh teks
+        """
+        if isinstance(source, str):
+            for match in self._master.finditer(source):
+                yield from self._create_citations(match, source, 0)
+            return
+        
+        buffer = ""
+        offset = 0  # posisi absolut buffer[0]
+        pos = 0  # posisi scan berikutnya di buffer
+        
+        for chunk in source:
+            if not chunk:
+                continue
+            buffer += chunk
+            safe_end = len(buffer) - self.STREAM_OVERLAP
+            if safe_end <= pos:
+                continue
+            
+            resume = safe_end
+            for match in self._master.finditer(buffer, pos):
+                if match.end() > safe_end:
+                    # Bisa jadi masih bersambung di chunk berikutnya
+                    resume = min(match.start(), safe_end)
+                    break
+                yield from self._create_citations(match, buffer, offset)
+            
+            # Buang teks yang sudah final, sisakan konteks kiri
+            drop = max(0, resume - self.CONTEXT_WINDOW)
+            buffer = buffer[drop:]
+            offset += drop
+            pos = resume - drop
+        
+        for match in self._master.finditer(buffer, pos):
+            yield from self._create_citations(match, buffer, offset)
+    
+    def _create_citations(
+        self,
+        match: re.Match,
+        full_text: str,
+        offset: int = 0
+    ) -> List[DetectedCitation]:
+        """
+        Buat DetectedCitation dari match master regex
         
+        Range "Pasal 5 sampai Pasal 9" menghasilkan dua sitasi (Pasal 5 dan
+        Pasal 9), sama seperti deteksi per-pattern sebelumnya.
+        """
+        outer = match.lastindex
+        type, group_count, form = self._alternatives[outer]
+        groups = match.groups()[outer:outer + group_count]
+        
+        if form != "range":
+            return [self._build_citation(
+                full_text, match.start(), match.end(), type, groups, form, offset
+            )]
+        
+        first_end = match.end(outer + 1)
+        last_start = match.start(outer + 2)
+        # Ujung range ditulis "Pasal 9" atau hanya "9"
+        prefix = re.search(r"Pasal\s+$", full_text[first_end:last_start], re.IGNORECASE)
+        if prefix:
+            last_start = first_end + prefix.start()
+        
+        first = self._build_citation(full_text, match.start(), first_end, type, groups[:1], "single", offset)
+        last = self._build_citation(full_text, last_start, match.end(), type, groups[1:], "single", offset)
+        first.metadata["range_end"] = groups[1]
+        last.metadata["range_start"] = groups[0]
+        return [first, last]
+    
+    def _build_citation(
+        self,
+        full_text: str,
+        start: int,
+        end: int,
+        type: CitationType,
+        groups: Tuple[Optional[str], ...],
+        form: Optional[str],
+        offset: int
+    ) -> DetectedCitation:
+        text = full_text[start:end]
         return DetectedCitation(
             text=text,
             type=type,
-            normalized=normalized,
-            start_pos=match.start(),
-            end_pos=match.end(),
-            confidence=confidence,
-            metadata=metadata
+            normalized=self._normalize_citation(text, type, groups, form),
+            start_pos=offset + start,
+            end_pos=offset + end,
+            confidence=self._calculate_confidence(text, type, groups, full_text, start, end),
+            metadata=self._extract_metadata(text, type, groups, form)
         )
     
     def _normalize_citation(
         self,
         text: str,
         type: CitationType,
-        match: re.Match
+        groups: Tuple[Optional[str], ...],
+        form: Optional[str] = None
     ) -> str:
         """
         Normalisasi format sitasi.
@@ -246,24 +364,22 @@ class CitationDetector:
         - "Pasal 378" -> "Pasal 378"
         """
         if type == CitationType.UU:
-            groups = match.groups()
             if len(groups) >= 2:
                 return f"UU No. {groups[0]} Tahun {groups[1]}"
         
         elif type == CitationType.PP:
-            groups = match.groups()
             if len(groups) >= 2:
                 return f"PP No. {groups[0]} Tahun {groups[1]}"
         
         elif type == CitationType.PERPRES:
-            groups = match.groups()
             if len(groups) >= 2:
                 return f"Perpres No. {groups[0]} Tahun {groups[1]}"
         
         elif type == CitationType.PASAL:
-            groups = match.groups()
-            if len(groups) >= 2 and "ayat" in text.lower():
+            if form == "ayat":
                 return f"Pasal {groups[0]} ayat ({groups[1]})"
+            elif form == "huruf":
+                return f"Pasal {groups[0]} huruf {groups[1].lower()}"
             elif len(groups) >= 1:
                 return f"Pasal {groups[0]}"
         
@@ -274,11 +390,11 @@ class CitationDetector:
         self,
         text: str,
         type: CitationType,
-        match: re.Match
+        groups: Tuple[Optional[str], ...],
+        form: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Ekstrak metadata dari sitasi"""
+        """Ekstrak metadata dari sitasi (form: bentuk Pasal yang match)"""
         metadata = {"raw_text": text}
-        groups = match.groups()
         
         if type == CitationType.UU:
             if len(groups) >= 2:
@@ -298,8 +414,10 @@ class CitationDetector:
         elif type == CitationType.PASAL:
             if len(groups) >= 1:
                 metadata["pasal"] = groups[0]
-                if len(groups) >= 2:
-                    metadata["ayat"] = groups[1]
+            if form == "ayat":
+                metadata["ayat"] = groups[1]
+            elif form == "huruf":
+                metadata["huruf"] = groups[1].lower()
         
         elif type == CitationType.PUTUSAN:
             if len(groups) >= 1:
@@ -317,8 +435,10 @@ class CitationDetector:
         self,
         text: str,
         type: CitationType,
-        match: re.Match,
-        full_text: str
+        groups: Tuple[Optional[str], ...],
+        full_text: str,
+        start: int,
+        end: int
     ) -> float:
         """
         Hitung confidence score berdasarkan:
@@ -329,7 +449,6 @@ class CitationDetector:
         score = 0.0
         
         # 1. Kelengkapan format (0.5)
-        groups = match.groups()
         if type in [CitationType.UU, CitationType.PP, CitationType.PERPRES]:
             # Harus punya nomor dan tahun
             if len(groups) >= 2 and groups[0] and groups[1]:
@@ -344,18 +463,9 @@ class CitationDetector:
                 score += 0.25
         
         # 2. Konteks sekitar (0.3)
-        # Cek kata-kata hukum di sekitar sitasi
-        context_start = max(0, match.start() - 50)
-        context_end = min(len(full_text), match.end() + 50)
-        context = full_text[context_start:context_end].lower()
-        
-        legal_keywords = [
-            "berdasarkan", "sesuai", "menurut", "mengacu", "merujuk",
-            "pasal", "ayat", "undang-undang", "peraturan", "ketentuan",
-            "hukum", "pidana", "perdata", "putusan", "pengadilan"
-        ]
-        
-        context_score = sum(1 for kw in legal_keywords if kw in context)
+        # Satu pass keyword regex di window +-CONTEXT_WINDOW karakter
+        context = full_text[max(0, start - self.CONTEXT_WINDOW):end + self.CONTEXT_WINDOW].lower()
+        context_score = len(set(self._keyword_regex.findall(context)))
         score += min(0.3, context_score * 0.05)
         
         # 3. Pattern quality (0.2)
@@ -367,36 +477,6 @@ class CitationDetector:
         
         return min(1.0, score)
     
-    def _remove_overlaps(
-        self,
-        citations: List[DetectedCitation]
-    ) -> List[DetectedCitation]:
-        """
-        Hapus sitasi yang overlap.
-        Pertahankan sitasi dengan confidence tertinggi.
-        """
-        if not citations:
-            return []
-        
-        result = []
-        current = citations[0]
-        
-        for next_citation in citations[1:]:
-            # Cek overlap
-            if next_citation.start_pos < current.end_pos:
-                # Ada overlap, pilih yang confidence lebih tinggi
-                if next_citation.confidence > current.confidence:
-                    current = next_citation
-            else:
-                # Tidak overlap, simpan current dan lanjut ke next
-                result.append(current)
-                current = next_citation
-        
-        # Jangan lupa citation terakhir
-        result.append(current)
-        
-        return result
-    
     def detect_by_type(
         self,
         text: str,
@@ -3,13 +3,26 @@ Citation Tracker
 
 Melacak penggunaan sitasi hukum untuk analytics dan statistik.
 Membantu memahami hukum mana yang paling sering dirujuk.
+
+Storage dibuat bounded:
+- Rollup jumlah per jam / per hari (per sitasi, hukum dan jenis) sehingga
+  statistik dan trending cukup menjumlahkan bucket, bukan memindai event.
+- Ring buffer untuk usage terbaru (global dan per user).
+- Raw log kolumnar (array-backed) yang di-flush batch ke SQLite jika
+  CITATION_TRACKER_DB di-set; rollup dibangun ulang dari sana saat start.
+  Flush dilakukan writer thread setiap flush_interval detik atau saat
+  batch penuh, dan terakhir kali saat close_tracker() (app shutdown).
 """
 
-import asyncio
-from typing import Dict, Any, Optional, List
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Deque, Dict, Any, Iterable, Iterator, NamedTuple, Optional, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
+from collections import Counter, OrderedDict, deque
 import logging
 
 from .citation_detector import DetectedCitation, CitationType
@@ -17,6 +30,9 @@ from .citation_linker import LinkedCitation
 
 logger = logging.getLogger(__name__)
 
+HOUR = 3600
+DAY = 24 * HOUR
+
 
 @dataclass
 class CitationUsage:
@@ -48,6 +64,229 @@ class CitationStats:
     generated_at: datetime = field(default_factory=datetime.now)
 
 
+class RollupKey(NamedTuple):
+    """Dimensi yang dihitung di setiap bucket rollup"""
+    citation_text: str
+    citation_type: CitationType
+    law_id: Optional[str]
+    law_title: Optional[str]
+
+
+class _BucketRollup:
+    """Counter per time bucket: bucket start (epoch detik) -> Counter[RollupKey]"""
+    
+    def __init__(self, width: int):
+        self.width = width
+        self.buckets: Dict[int, Counter] = {}
+    
+    def bucket_of(self, ts: float) -> int:
+        return int(ts // self.width) * self.width
+    
+    def add(self, ts: float, key: RollupKey, count: int = 1) -> None:
+        bucket = self.bucket_of(ts)
+        counter = self.buckets.get(bucket)
+        if counter is None:
+            counter = self.buckets[bucket] = Counter()
+        counter[key] += count
+    
+    def collect(self, start: int, end: float, into: Counter) -> Counter:
+        """Tambahkan semua bucket dengan start di [start, end) ke `into`"""
+        for bucket, counter in self.buckets.items():
+            if start <= bucket < end:
+                into.update(counter)
+        return into
+    
+    def prune(self, before: int) -> int:
+        """Hapus bucket yang dimulai sebelum `before`"""
+        stale = [bucket for bucket in self.buckets if bucket < before]
+        for bucket in stale:
+            del self.buckets[bucket]
+        return len(stale)
+
+
+class _QualityTotals:
+    """Running aggregate untuk get_citation_quality_metrics (O(1) per event)"""
+    
+    __slots__ = ("total", "linked", "confidence_sum", "confidence_count", "high", "medium", "low")
+    
+    def __init__(self):
+        self.total = 0
+        self.linked = 0
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+        self.high = 0
+        self.medium = 0
+        self.low = 0
+    
+    def add(self, linked: bool, confidence: Optional[float], count: int = 1) -> None:
+        self.total += count
+        if linked:
+            self.linked += count
+        if confidence is not None:
+            self.confidence_sum += confidence * count
+            self.confidence_count += count
+            if confidence >= 0.8:
+                self.high += count
+            elif confidence >= 0.5:
+                self.medium += count
+            else:
+                self.low += count
+
+
+class CitationUsageLog:
+    """
+    Raw log kolumnar: satu array per kolom, bukan list of objects.
+    
+    Dipakai sebagai write buffer sebelum di-flush batch ke SQLite;
+    timestamp dan confidence disimpan di array('d') yang padat.
+    """
+    
+    COLUMNS = (
+        "citation_text", "citation_type", "law_id", "law_title", "context",
+        "user_id", "session_id", "source", "link_status"
+    )
+    
+    def __init__(self):
+        self.timestamps = array("d")
+        self.confidences = array("d")
+        self.linked = array("b")
+        self.columns: Dict[str, List[Optional[str]]] = {name: [] for name in self.COLUMNS}
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def append(self, usage: CitationUsage) -> None:
+        self.timestamps.append(usage.timestamp.timestamp())
+        self.confidences.append(usage.metadata.get("confidence", -1.0))
+        self.linked.append(1 if usage.metadata.get("linked") else 0)
+        columns = self.columns
+        columns["citation_text"].append(usage.citation_text)
+        columns["citation_type"].append(usage.citation_type.value)
+        columns["law_id"].append(usage.law_id)
+        columns["law_title"].append(usage.law_title)
+        columns["context"].append(usage.context)
+        columns["user_id"].append(usage.user_id)
+        columns["session_id"].append(usage.session_id)
+        columns["source"].append(usage.source)
+        columns["link_status"].append(usage.metadata.get("link_status"))
+    
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Row tuples sesuai urutan kolom tabel SQLite"""
+        return zip(
+            self.timestamps, *(self.columns[name] for name in self.COLUMNS),
+            self.confidences, self.linked
+        )
+    
+    def clear(self) -> None:
+        self.timestamps = array("d")
+        self.confidences = array("d")
+        self.linked = array("b")
+        for values in self.columns.values():
+            values.clear()
+
+
+class SQLiteCitationStore:
+    """Persistent backend untuk raw citation usage (stdlib sqlite3)"""
+    
+    FIELDS = ("ts",) + CitationUsageLog.COLUMNS + ("confidence", "linked")
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS citation_usage ("
+            "ts REAL NOT NULL, citation_text TEXT NOT NULL, citation_type TEXT NOT NULL, "
+            "law_id TEXT, law_title TEXT, context TEXT, user_id TEXT, session_id TEXT, "
+            "source TEXT, link_status TEXT, confidence REAL, linked INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_citation_usage_ts ON citation_usage (ts)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_citation_usage_user ON citation_usage (user_id, ts)"
+        )
+        self._conn.commit()
+    
+    def write(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        placeholders = ", ".join("?" for _ in self.FIELDS)
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO citation_usage ({', '.join(self.FIELDS)}) VALUES ({placeholders})",
+                rows
+            )
+            self._conn.commit()
+    
+    def rollup(self, width: int, since: float, per_user: bool = False) -> List[Tuple[Any, ...]]:
+        """Jumlah per (bucket, [user], sitasi, jenis, hukum) sejak `since`"""
+        user_column = "user_id, " if per_user else ""
+        user_filter = "AND user_id IS NOT NULL " if per_user else ""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT CAST(ts / {width} AS INTEGER) * {width} AS bucket, {user_column}"
+                "citation_text, citation_type, law_id, law_title, COUNT(*) "
+                f"FROM citation_usage WHERE ts >= ? {user_filter}"
+                f"GROUP BY bucket, {user_column}citation_text, citation_type, law_id, law_title",
+                (since,)
+            ).fetchall()
+    
+    def totals(self) -> List[Tuple[Any, ...]]:
+        """Jumlah all-time per (sitasi, jenis, hukum)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT citation_text, citation_type, law_id, law_title, COUNT(*) "
+                "FROM citation_usage GROUP BY citation_text, citation_type, law_id, law_title"
+            ).fetchall()
+    
+    def quality(self) -> List[Tuple[Any, ...]]:
+        """Jumlah per (linked, confidence) untuk quality metrics"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT linked, confidence, COUNT(*) FROM citation_usage GROUP BY linked, confidence"
+            ).fetchall()
+    
+    def recent(self, limit: int, user_id: Optional[str] = None) -> List[CitationUsage]:
+        """Usage terbaru (desc), opsional per user"""
+        query = f"SELECT {', '.join(self.FIELDS)} FROM citation_usage "
+        params: Tuple[Any, ...] = ()
+        if user_id is not None:
+            query += "WHERE user_id = ? "
+            params = (user_id,)
+        query += "ORDER BY ts DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [self._to_usage(row) for row in rows]
+    
+    def delete_before(self, cutoff: float) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM citation_usage WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        return deleted
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _to_usage(row: Tuple[Any, ...]) -> CitationUsage:
+        (ts, text, type_value, law_id, law_title, context, user_id,
+         session_id, source, link_status, confidence, linked) = row
+        metadata: Dict[str, Any] = {"linked": bool(linked), "link_status": link_status}
+        if confidence is not None and confidence >= 0:
+            metadata["confidence"] = confidence
+        return CitationUsage(
+            citation_text=text,
+            citation_type=CitationType(type_value),
+            law_id=law_id,
+            law_title=law_title,
+            timestamp=datetime.fromtimestamp(ts),
+            context=context or "",
+            user_id=user_id,
+            session_id=session_id,
+            source=source or "api",
+            metadata=metadata
+        )
+
+
 class CitationTracker:
     """
     Melacak dan menganalisis penggunaan sitasi.
@@ -57,18 +296,76 @@ class CitationTracker:
     - Trending: Hukum yang sedang trending
     - User behavior: Pattern penggunaan per user
     - Quality: Evaluasi kualitas linking
+    
+    Semua struktur in-memory bounded; query statistik biayanya O(buckets).
     """
     
-    def __init__(self):
-        """Inisialisasi Citation Tracker"""
-        # In-memory storage (bisa dipindah ke database nanti)
-        self.usage_history: List[CitationUsage] = []
-        self.usage_by_law: Dict[str, List[CitationUsage]] = defaultdict(list)
-        self.usage_by_type: Dict[CitationType, List[CitationUsage]] = defaultdict(list)
-        self.usage_by_user: Dict[str, List[CitationUsage]] = defaultdict(list)
+    def __init__(
+        self,
+        store: Optional[SQLiteCitationStore] = None,
+        hourly_retention_days: int = 15,
+        daily_retention_days: int = 400,
+        recent_size: int = 1000,
+        user_history_size: int = 100,
+        max_users: int = 10000,
+        flush_batch_size: int = 500,
+        flush_interval: Optional[float] = 5.0
+    ):
+        """
+        Inisialisasi Citation Tracker
+        
+        Args:
+            store: Persistent backend (None = in-memory saja)
+            hourly_retention_days: Berapa lama bucket per jam disimpan
+            daily_retention_days: Berapa lama bucket per hari disimpan
+            recent_size: Ukuran ring buffer usage terbaru
+            user_history_size: Ukuran ring buffer per user
+            max_users: Jumlah user yang rollup/history-nya disimpan (LRU)
+            flush_batch_size: Jumlah usage per batch insert ke store
+            flush_interval: Detik antar flush background (None = hanya saat batch penuh / flush() manual)
+        """
+        self.store = store
+        self.hourly_retention = hourly_retention_days * DAY
+        self.daily_retention = daily_retention_days * DAY
+        self.user_history_size = user_history_size
+        self.max_users = max_users
+        self.flush_batch_size = flush_batch_size
+        
+        self.hourly = _BucketRollup(HOUR)
+        self.daily = _BucketRollup(DAY)
+        self.totals: Counter = Counter()
+        self.quality = _QualityTotals()
+        self.recent: Deque[CitationUsage] = deque(maxlen=recent_size)
+        self.user_rollups: "OrderedDict[str, _BucketRollup]" = OrderedDict()
+        self.user_recent: Dict[str, Deque[CitationUsage]] = {}
+        self.pending = CitationUsageLog()
+        self._pending_lock = threading.Lock()  # write buffer
+        self._flush_lock = threading.Lock()  # satu batch ditulis sekaligus
+        
+        # Bucket per jam paling awal yang masih disimpan (selalu awal hari)
+        self._hourly_horizon = self._horizon(time.time())
+        self._last_prune_hour = self.hourly.bucket_of(time.time())
+        
+        if store is not None:
+            self._load_from_store()
+        
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        if store is not None and flush_interval is not None:
+            self._flush_interval = flush_interval
+            self._writer = threading.Thread(target=self._run_writer, name="citation-tracker-writer", daemon=True)
+            self._writer.start()
         
         logger.info("Citation Tracker initialized")
     
+    def _horizon(self, now: float) -> int:
+        return self.daily.bucket_of(now - self.hourly_retention)
+    
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    
     def track_citation(
         self,
         citation: DetectedCitation,
@@ -109,21 +406,117 @@ class CitationTracker:
             }
         )
         
-        # Simpan ke storage
-        self.usage_history.append(usage)
-        
-        if usage.law_id:
-            self.usage_by_law[usage.law_id].append(usage)
-        
-        self.usage_by_type[citation.type].append(usage)
-        
-        if user_id:
-            self.usage_by_user[user_id].append(usage)
+        self.record_usage(usage)
         
         logger.debug(f"Tracked citation: {citation.text}")
         
         return usage
     
+    def record_usage(self, usage: CitationUsage) -> None:
+        """Masukkan satu usage ke rollup, ring buffer dan write buffer"""
+        ts = usage.timestamp.timestamp()
+        key = RollupKey(usage.citation_text, usage.citation_type, usage.law_id, usage.law_title)
+        
+        self.hourly.add(ts, key)
+        self.daily.add(ts, key)
+        self.totals[key] += 1
+        self.quality.add(bool(usage.metadata.get("linked")), usage.metadata.get("confidence"))
+        self.recent.append(usage)
+        
+        if usage.user_id:
+            self._user_rollup(usage.user_id).add(ts, key)
+            history = self.user_recent.get(usage.user_id)
+            if history is None:
+                history = self.user_recent[usage.user_id] = deque(maxlen=self.user_history_size)
+            history.append(usage)
+        
+        if self.store is not None:
+            with self._pending_lock:
+                self.pending.append(usage)
+                full = len(self.pending) >= self.flush_batch_size
+            if full:
+                if self._writer is not None:
+                    self._wakeup.set()
+                else:
+                    self.flush()
+        
+        hour = self.hourly.bucket_of(ts)
+        if hour > self._last_prune_hour:
+            self._last_prune_hour = hour
+            self._prune(ts)
+    
+    def _user_rollup(self, user_id: str) -> _BucketRollup:
+        rollup = self.user_rollups.get(user_id)
+        if rollup is None:
+            rollup = self.user_rollups[user_id] = _BucketRollup(DAY)
+            if len(self.user_rollups) > self.max_users:
+                evicted, _ = self.user_rollups.popitem(last=False)
+                self.user_recent.pop(evicted, None)
+        else:
+            self.user_rollups.move_to_end(user_id)
+        return rollup
+    
+    def _prune(self, now: float) -> None:
+        """Buang bucket di luar retention (dipanggil sekali per jam baru)"""
+        self._hourly_horizon = self._horizon(now)
+        self.hourly.prune(self._hourly_horizon)
+        daily_cutoff = self.daily.bucket_of(now - self.daily_retention)
+        self.daily.prune(daily_cutoff)
+        for rollup in self.user_rollups.values():
+            rollup.prune(daily_cutoff)
+    
+    def flush(self) -> None:
+        """Tulis write buffer ke persistent store (batch insert)"""
+        if self.store is None:
+            return
+        with self._flush_lock:
+            with self._pending_lock:
+                if not len(self.pending):
+                    return
+                batch, self.pending = self.pending, CitationUsageLog()
+            try:
+                self.store.write(batch.rows())
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} citation usages: {e}")
+    
+    def _run_writer(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
+    
+    def _load_from_store(self) -> None:
+        """Bangun ulang rollup dan ring buffer dari persistent store"""
+        now = time.time()
+        self._hourly_horizon = self._horizon(now)
+        
+        def key_of(row):
+            text, type_value, law_id, law_title = row
+            return RollupKey(text, CitationType(type_value), law_id, law_title)
+        
+        try:
+            for bucket, *dims, count in self.store.rollup(HOUR, self._hourly_horizon):
+                self.hourly.add(bucket, key_of(dims), count)
+            daily_since = self.daily.bucket_of(now - self.daily_retention)
+            for bucket, *dims, count in self.store.rollup(DAY, daily_since):
+                self.daily.add(bucket, key_of(dims), count)
+            for bucket, user_id, *dims, count in self.store.rollup(DAY, daily_since, per_user=True):
+                self._user_rollup(user_id).add(bucket, key_of(dims), count)
+            for *dims, count in self.store.totals():
+                self.totals[key_of(dims)] += count
+            for linked, confidence, count in self.store.quality():
+                self.quality.add(
+                    bool(linked),
+                    confidence if confidence is not None and confidence >= 0 else None,
+                    count
+                )
+            self.recent.extend(reversed(self.store.recent(self.recent.maxlen)))
+        except Exception as e:
+            logger.error(f"Failed to load citation usage from {self.store.path}: {e}")
+            return
+        
+        logger.info(f"Loaded {self.quality.total} citation usages from {self.store.path}")
+    
     def track_citations(
         self,
         citations: List[DetectedCitation],
@@ -157,6 +550,39 @@ class CitationTracker:
         
         return usages
     
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    
+    def _collect(
+        self,
+        start: Optional[float],
+        end: float,
+        user_id: Optional[str] = None
+    ) -> Counter:
+        """
+        Jumlahkan rollup untuk rentang [start, end).
+        
+        Bucket per jam dipakai selama masih di-retain, lebih lama dari itu
+        pakai bucket per hari. Presisi batas rentang = lebar bucket.
+        """
+        if user_id:
+            rollup = self.user_rollups.get(user_id)
+            if rollup is None:
+                return Counter()
+            since = rollup.bucket_of(start) if start is not None else -1
+            return rollup.collect(since, end, Counter())
+        
+        if start is None:
+            return self.totals
+        
+        counts: Counter = Counter()
+        hour_start = self.hourly.bucket_of(start)
+        if hour_start < self._hourly_horizon:
+            self.daily.collect(self.daily.bucket_of(start), self._hourly_horizon, counts)
+            hour_start = self._hourly_horizon
+        return self.hourly.collect(hour_start, end, counts)
+    
     def get_statistics(
         self,
         time_range: Optional[timedelta] = None,
@@ -174,38 +600,29 @@ class CitationTracker:
         Returns:
             CitationStats
         """
-        # Filter usage berdasarkan criteria
-        filtered_usage = self.usage_history
-        
-        if time_range:
-            cutoff = datetime.now() - time_range
-            filtered_usage = [u for u in filtered_usage if u.timestamp >= cutoff]
-        
-        if user_id:
-            filtered_usage = [u for u in filtered_usage if u.user_id == user_id]
+        now = time.time()
+        cutoff = now - time_range.total_seconds() if time_range else None
+        counts = self._collect(cutoff, float("inf"), user_id)
         
         if citation_type:
-            filtered_usage = [u for u in filtered_usage if u.citation_type == citation_type]
-        
-        # Hitung statistik
-        total_citations = len(filtered_usage)
-        unique_citations = len(set(u.citation_text for u in filtered_usage))
-        total_laws = len(set(u.law_id for u in filtered_usage if u.law_id))
-        
-        # By type
-        type_counter = Counter(u.citation_type.value for u in filtered_usage)
-        by_type = dict(type_counter)
-        
-        # By law
-        law_counter = Counter(
-            (u.law_id, u.law_title) 
-            for u in filtered_usage 
-            if u.law_id
-        )
-        by_law = {law_id: count for (law_id, _), count in law_counter.items()}
+            counts = Counter({k: v for k, v in counts.items() if k.citation_type == citation_type})
+        
+        # Hitung statistik dari rollup
+        total_citations = sum(counts.values())
+        citation_counter: Counter = Counter()
+        type_counter: Counter = Counter()
+        law_counter: Counter = Counter()
+        for key, count in counts.items():
+            citation_counter[key.citation_text] += count
+            type_counter[key.citation_type.value] += count
+            if key.law_id:
+                law_counter[(key.law_id, key.law_title)] += count
+        
+        by_law: Dict[str, int] = Counter()
+        for (law_id, _), count in law_counter.items():
+            by_law[law_id] += count
         
         # Top citations (by frequency)
-        citation_counter = Counter(u.citation_text for u in filtered_usage)
         top_citations = [
             {
                 "text": text,
@@ -226,12 +643,17 @@ class CitationTracker:
             for (law_id, law_title), count in law_counter.most_common(10)
         ]
         
-        # Recent citations (last 10)
-        recent_citations = sorted(
-            filtered_usage,
-            key=lambda u: u.timestamp,
-            reverse=True
-        )[:10]
+        # Recent citations (last 10) dari ring buffer
+        source = self.user_recent.get(user_id, ()) if user_id else self.recent
+        recent_citations = []
+        for usage in reversed(source):
+            if cutoff is not None and usage.timestamp.timestamp() < cutoff:
+                break
+            if citation_type and usage.citation_type != citation_type:
+                continue
+            recent_citations.append(usage)
+            if len(recent_citations) == 10:
+                break
         
         # Time range description
         if time_range:
@@ -241,10 +663,10 @@ class CitationTracker:
         
         return CitationStats(
             total_citations=total_citations,
-            unique_citations=unique_citations,
-            total_laws=total_laws,
-            by_type=by_type,
-            by_law=by_law,
+            unique_citations=len(citation_counter),
+            total_laws=len(by_law),
+            by_type=dict(type_counter),
+            by_law=dict(by_law),
             top_citations=top_citations,
             top_laws=top_laws,
             recent_citations=recent_citations,
@@ -266,19 +688,18 @@ class CitationTracker:
         Returns:
             List trending citations
         """
-        cutoff = datetime.now() - time_range
-        recent_usage = [u for u in self.usage_history if u.timestamp >= cutoff]
+        now = time.time()
+        cutoff = now - time_range.total_seconds()
+        previous_cutoff = cutoff - time_range.total_seconds()
         
-        # Count frequency
-        citation_counter = Counter(u.citation_text for u in recent_usage)
+        citation_counter: Counter = Counter()
+        for key, count in self._collect(cutoff, float("inf")).items():
+            citation_counter[key.citation_text] += count
         
         # Calculate trend (compare dengan periode sebelumnya)
-        previous_cutoff = cutoff - time_range
-        previous_usage = [
-            u for u in self.usage_history 
-            if previous_cutoff <= u.timestamp < cutoff
-        ]
-        previous_counter = Counter(u.citation_text for u in previous_usage)
+        previous_counter: Counter = Counter()
+        for key, count in self._collect(previous_cutoff, self.hourly.bucket_of(cutoff)).items():
+            previous_counter[key.citation_text] += count
         
         trending = []
         for text, current_count in citation_counter.most_common(limit):
@@ -318,12 +739,13 @@ class CitationTracker:
         Returns:
             List CitationUsage
         """
-        user_usage = self.usage_by_user.get(user_id, [])
-        
-        # Sort by timestamp descending
-        sorted_usage = sorted(user_usage, key=lambda u: u.timestamp, reverse=True)
+        history = self.user_recent.get(user_id, ())
+        if limit > len(history) and self.store is not None:
+            # Ring buffer tidak cukup, ambil dari persistent store
+            self.flush()
+            return self.store.recent(limit, user_id=user_id)
         
-        return sorted_usage[:limit]
+        return list(reversed(history))[:limit]
     
     def get_law_popularity(
         self,
@@ -335,18 +757,13 @@ class CitationTracker:
         Returns:
             List hukum yang paling populer
         """
-        # Filter by time range
-        filtered_usage = self.usage_history
-        if time_range:
-            cutoff = datetime.now() - time_range
-            filtered_usage = [u for u in filtered_usage if u.timestamp >= cutoff]
+        cutoff = time.time() - time_range.total_seconds() if time_range else None
         
         # Count by law
-        law_counter = Counter(
-            (u.law_id, u.law_title)
-            for u in filtered_usage
-            if u.law_id
-        )
+        law_counter: Counter = Counter()
+        for key, count in self._collect(cutoff, float("inf")).items():
+            if key.law_id:
+                law_counter[(key.law_id, key.law_title)] += count
         
         total = sum(law_counter.values())
         
@@ -370,9 +787,9 @@ class CitationTracker:
         Returns:
             Dictionary dengan metrics kualitas
         """
-        total = len(self.usage_history)
+        quality = self.quality
         
-        if total == 0:
+        if quality.total == 0:
             return {
                 "total_citations": 0,
                 "link_rate": 0.0,
@@ -380,32 +797,17 @@ class CitationTracker:
                 "quality_distribution": {}
             }
         
-        # Count linked
-        linked = sum(1 for u in self.usage_history if u.law_id is not None)
-        link_rate = linked / total
-        
-        # Average confidence
-        confidences = [
-            u.metadata.get("confidence", 0.0)
-            for u in self.usage_history
-            if "confidence" in u.metadata
-        ]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-        
-        # Quality distribution
-        high_quality = sum(1 for c in confidences if c >= 0.8)
-        medium_quality = sum(1 for c in confidences if 0.5 <= c < 0.8)
-        low_quality = sum(1 for c in confidences if c < 0.5)
-        
         return {
-            "total_citations": total,
-            "linked_citations": linked,
-            "link_rate": link_rate,
-            "average_confidence": avg_confidence,
+            "total_citations": quality.total,
+            "linked_citations": quality.linked,
+            "link_rate": quality.linked / quality.total,
+            "average_confidence": (
+                quality.confidence_sum / quality.confidence_count if quality.confidence_count else 0.0
+            ),
             "quality_distribution": {
-                "high": high_quality,
-                "medium": medium_quality,
-                "low": low_quality
+                "high": quality.high,
+                "medium": quality.medium,
+                "low": quality.low
             }
         }
     
@@ -413,29 +815,36 @@ class CitationTracker:
         """
         Cleanup data lama untuk menghemat memory.
         
+        Rollup per jam/hari juga dipangkas otomatis sesuai retention;
+        ini untuk memangkas lebih agresif dan menghapus raw log di store.
+        
         Args:
             days: Data lebih lama dari X hari akan dihapus
         """
-        cutoff = datetime.now() - timedelta(days=days)
-        
-        # Filter usage history
-        before_count = len(self.usage_history)
-        self.usage_history = [u for u in self.usage_history if u.timestamp >= cutoff]
-        after_count = len(self.usage_history)
-        
-        # Rebuild indexes
-        self.usage_by_law.clear()
-        self.usage_by_type.clear()
-        self.usage_by_user.clear()
-        
-        for usage in self.usage_history:
-            if usage.law_id:
-                self.usage_by_law[usage.law_id].append(usage)
-            self.usage_by_type[usage.citation_type].append(usage)
-            if usage.user_id:
-                self.usage_by_user[usage.user_id].append(usage)
-        
-        logger.info(f"Cleaned up {before_count - after_count} old citation records")
+        now = time.time()
+        cutoff = now - days * DAY
+        
+        removed = self.hourly.prune(self.hourly.bucket_of(cutoff))
+        removed += self.daily.prune(self.daily.bucket_of(cutoff))
+        for rollup in self.user_rollups.values():
+            rollup.prune(rollup.bucket_of(cutoff))
+        
+        deleted = 0
+        if self.store is not None:
+            self.flush()
+            deleted = self.store.delete_before(cutoff)
+        
+        logger.info(f"Cleaned up {removed} citation rollup buckets and {deleted} stored records")
+    
+    def close(self) -> None:
+        """Hentikan writer thread, flush write buffer dan tutup store"""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+        if self.store is not None:
+            self.store.close()
 
 
 # Singleton instance
@@ -447,6 +856,28 @@ def get_citation_tracker() -> CitationTracker:
     global _citation_tracker
     
     if _citation_tracker is None:
-        _citation_tracker = CitationTracker()
+        db_path = os.getenv("CITATION_TRACKER_DB")
+        store = None
+        if db_path:
+            try:
+                store = SQLiteCitationStore(db_path)
+            except Exception as e:
+                logger.error(f"Citation tracker store unavailable ({db_path}), using memory only: {e}")
+        _citation_tracker = CitationTracker(
+            store=store,
+            hourly_retention_days=int(os.getenv("CITATION_TRACKER_HOURLY_DAYS", "15")),
+            daily_retention_days=int(os.getenv("CITATION_TRACKER_DAILY_DAYS", "400")),
+            recent_size=int(os.getenv("CITATION_TRACKER_RECENT_SIZE", "1000")),
+            flush_interval=float(os.getenv("CITATION_TRACKER_FLUSH_INTERVAL", "5"))
+        )
     
     return _citation_tracker
+
+
+def close_tracker() -> None:
+    """Flush dan tutup Citation Tracker global (app shutdown)"""
+    global _citation_tracker
+    
+    if _citation_tracker is not None:
+        _citation_tracker.close()
+        _citation_tracker = None
@@ -13,9 +13,64 @@ from models.orchestrator_conversation import (
     COLLECTION_NAME
 )
 from core.config import get_settings
+from core.pagination import decode_cursor, encode_cursor
 
 settings = get_settings()
 
+PREVIEW_LENGTH = 100
+
+# Preview pesan user pertama, dihitung dari array `messages` (backfill
+# untuk dokumen lama tanpa field first_message_preview)
+_LEGACY_FIRST_USER_PREVIEW = {"$let": {
+    "vars": {"first_user": {"$arrayElemAt": [
+        {"$filter": {
+            "input": {"$ifNull": ["$messages", []]},
+            "as": "m",
+            "cond": {"$eq": ["$$m.role", "user"]}
+        }},
+        0
+    ]}},
+    "in": {"$cond": [
+        {"$ifNull": ["$$first_user", False]},
+        {"$substrCP": ["$$first_user.content", 0, PREVIEW_LENGTH]},
+        None
+    ]}
+}}
+
+# Listing dihitung di server: tanpa array `messages` ikut terkirim.
+# Dokumen lama tanpa counter denormalisasi di-fallback ke $size / $filter.
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "session_id": 1,
+    "user_id": 1,
+    "legal_area": 1,
+    "current_stage": 1,
+    "created_at": 1,
+    "last_activity": 1,
+    "status": 1,
+    "message_count": {
+        "$ifNull": ["$message_count", {"$size": {"$ifNull": ["$messages", []]}}]
+    },
+    "first_message_preview": {
+        "$ifNull": ["$first_message_preview", _LEGACY_FIRST_USER_PREVIEW]
+    }
+}
+
+
+def _first_user_preview(messages) -> Optional[str]:
+    """Preview pesan user pertama (untuk field denormalisasi)"""
+    for msg in messages:
+        if msg.role == "user":
+            return msg.content[:PREVIEW_LENGTH]
+    return None
+
+
+def conversation_page_cursor(summaries: List[ConversationSummary], limit: int) -> Optional[str]:
+    """Cursor untuk halaman setelah summaries (None jika halaman terakhir)"""
+    if not summaries or len(summaries) < limit:
+        return None
+    return encode_cursor(summaries[-1].last_activity, summaries[-1].session_id)
+
 
 class ConversationStorage:
     """Service for managing conversation persistence"""
@@ -43,6 +98,7 @@ class ConversationStorage:
             await self.collection.create_index("created_at")
             await self.collection.create_index("last_activity")
             await self.collection.create_index([("user_id", 1), ("created_at", -1)])
+            await self.collection.create_index([("user_id", 1), ("last_activity", -1), ("session_id", -1)])
             
             self.initialized = True
             print("✅ Conversation storage initialized")
@@ -64,8 +120,10 @@ class ConversationStorage:
             session.updated_at = datetime.utcnow()
             session.last_activity = datetime.utcnow()
             
-            # Convert to dict
+            # Convert to dict (+ counter denormalisasi untuk listing)
             session_dict = session.dict()
+            session_dict["message_count"] = len(session.messages)
+            session_dict["first_message_preview"] = _first_user_preview(session.messages)
             
             # Upsert
             await self.collection.update_one(
@@ -103,36 +161,52 @@ class ConversationStorage:
         self,
         user_id: str,
         limit: int = 20,
-        skip: int = 0
+        skip: int = 0,
+        cursor: Optional[str] = None
     ) -> List[ConversationSummary]:
-        """Get all conversations for a user"""
+        """
+        Get conversations for a user, most recent activity first
+
+        Args:
+            user_id: Owner
+            limit: Page size
+            skip: Offset (klien lama; gunakan cursor)
+            cursor: Cursor dari conversation_page_cursor() - keyset pada
+                (last_activity, session_id), tanpa skip dokumen
+
+        Raises:
+            InvalidCursorError: cursor rusak
+        """
         if not self.initialized:
             return []
         
+        query: Dict[str, Any] = {"user_id": user_id}
+        if cursor:
+            position = decode_cursor(cursor)
+            query["$or"] = [
+                {"last_activity": {"$lt": position.sort_value}},
+                {"last_activity": position.sort_value, "session_id": {"$lt": position.last_id}}
+            ]
+        
         try:
-            cursor = self.collection.find(
-                {"user_id": user_id}
-            ).sort("last_activity", -1).skip(skip).limit(limit)
+            cursor = self.collection.find(query, SUMMARY_PROJECTION).sort(
+                [("last_activity", -1), ("session_id", -1)]
+            ).limit(limit)
+            if skip and "$or" not in query:
+                cursor = cursor.skip(skip)
             
             summaries = []
             async for doc in cursor:
-                # Create summary
-                first_user_msg = None
-                for msg in doc.get("messages", []):
-                    if msg.get("role") == "user":
-                        first_user_msg = msg.get("content", "")[:100]
-                        break
-                
                 summary = ConversationSummary(
                     session_id=doc["session_id"],
                     user_id=doc.get("user_id"),
                     legal_area=doc.get("legal_area", "general"),
                     current_stage=doc.get("current_stage", 1),
-                    message_count=len(doc.get("messages", [])),
+                    message_count=doc.get("message_count", 0),
                     created_at=doc.get("created_at"),
                     last_activity=doc.get("last_activity"),
                     status=doc.get("status", "active"),
-                    first_message_preview=first_user_msg
+                    first_message_preview=doc.get("first_message_preview") or None
                 )
                 summaries.append(summary)
             
@@ -161,15 +235,28 @@ class ConversationStorage:
                 metadata=metadata
             )
             
+            # Pipeline update: push + counter dalam satu operasi atomik,
+            # counter/preview dokumen lama di-backfill dari array. $literal
+            # agar isi pesan yang diawali "$" tidak dibaca sebagai field path.
             await self.collection.update_one(
                 {"session_id": session_id},
-                {
-                    "$push": {"messages": message.dict()},
-                    "$set": {
+                [
+                    {"$set": {
+                        "message_count": {"$add": [
+                            {"$ifNull": ["$message_count", {"$size": {"$ifNull": ["$messages", []]}}]},
+                            1
+                        ]},
+                        "messages": {"$concatArrays": [
+                            {"$ifNull": ["$messages", []]},
+                            {"$literal": [message.dict()]}
+                        ]},
                         "updated_at": datetime.utcnow(),
                         "last_activity": datetime.utcnow()
-                    }
-                }
+                    }},
+                    {"$set": {
+                        "first_message_preview": {"$ifNull": ["$first_message_preview", _LEGACY_FIRST_USER_PREVIEW]}
+                    }}
+                ]
             )
             
             return True
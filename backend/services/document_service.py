@@ -10,7 +10,6 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
-import io
 import tempfile
 import os
 
@@ -43,9 +42,19 @@ except ImportError:
     docx2txt = None
 
 from backend.services.ai_service_enhanced import ai_service_enhanced as ai_service
+from backend.services.document_workers import ProgressCallback, get_extraction_pool
 
 logger = logging.getLogger(__name__)
 
+
+def read_plain_text(file_path: str) -> str:
+    """Baca file sebagai UTF-8 text"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except UnicodeDecodeError:
+        return "Tidak dapat mengekstrak teks dari dokumen ini."
+
 class DocumentService:
     """Service untuk processing dokumen hukum"""
 
@@ -57,93 +66,75 @@ class DocumentService:
 
     async def extract_text_from_document(
         self,
-        file_content: bytes,
+        file_content: Optional[bytes],
         file_type: str,
-        filename: str
+        filename: str,
+        file_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> str:
         """
         Extract text dari berbagai format dokumen
-        - PDF: PyMuPDF
+        - PDF: PyMuPDF per halaman di worker pool (OCR hanya untuk halaman scan)
         - DOCX: docx2txt
-        - Images: OCR via tesseract
+        - Images: OCR via tesseract di worker pool
+
+        Args:
+            file_content: Bytes file (legacy; hanya dipakai jika file_path kosong)
+            file_type: MIME type
+            filename: Nama file asli
+            file_path: Path file di disk (mis. blob store), dibaca langsung
+            progress: Callback (pages_done, pages_total) untuk PDF
         """
+        if file_path is None:
+            if file_content is None:
+                raise ValueError("file_content atau file_path wajib diisi")
+            # Caller lama yang masih mengirim bytes: tulis sekali ke temp file
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_path = os.path.join(temp_dir, Path(filename).name or "document")
+                with open(temp_path, "wb") as temp_file:
+                    temp_file.write(file_content)
+                return await self.extract_text_from_document(
+                    None, file_type, filename, file_path=temp_path, progress=progress
+                )
+
         try:
             if file_type == 'application/pdf' and HAS_FITZ:
-                return await self._extract_pdf_text(file_content)
+                return await self._extract_pdf_text(file_path, progress)
             elif file_type in ['application/vnd.openxmlformats-officedocument.wordprocessingml.document',
                               'application/msword'] and HAS_DOCX2TXT:
-                return await self._extract_docx_text(file_content, filename)
+                return await self._extract_docx_text(file_path, filename)
             elif file_type.startswith('image/') and HAS_PILLOW and HAS_TESSERACT:
-                return await self._extract_image_text(file_content)
+                return await self._extract_image_text(file_path)
             else:
                 # Fallback: treat as plain text
-                try:
-                    return file_content.decode('utf-8')
-                except UnicodeDecodeError:
-                    return "Tidak dapat mengekstrak teks dari dokumen ini."
+                return await asyncio.to_thread(read_plain_text, file_path)
 
         except Exception as e:
             logger.error(f"Error extracting text from document {filename}: {str(e)}")
             return f"Error dalam ekstraksi teks: {str(e)}"
 
-    async def _extract_pdf_text(self, file_content: bytes) -> str:
-        """Extract text dari PDF menggunakan PyMuPDF"""
+    async def _extract_pdf_text(self, file_path: str, progress: Optional[ProgressCallback] = None) -> str:
+        """Extract text dari PDF menggunakan PyMuPDF (paralel per halaman)"""
         if not HAS_FITZ:
             raise Exception("PyMuPDF tidak tersedia")
 
-        text = ""
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-            try:
-                temp_file.write(file_content)
-                temp_file.flush()
-
-                doc = fitz.open(temp_file.name)
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    page_text = page.get_text()
-                    text += f"\n--- Halaman {page_num + 1} ---\n{page_text}"
-
-                doc.close()
-
-            finally:
-                os.unlink(temp_file.name)
+        return await get_extraction_pool().extract_pdf(file_path, progress=progress)
 
-        return text.strip()
-
-    async def _extract_docx_text(self, file_content: bytes, filename: str) -> str:
+    async def _extract_docx_text(self, file_path: str, filename: str) -> str:
         """Extract text dari DOCX menggunakan docx2txt"""
         if not HAS_DOCX2TXT:
             raise Exception("docx2txt tidak tersedia")
 
-        with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as temp_file:
-            try:
-                temp_file.write(file_content)
-                temp_file.flush()
-
-                text = docx2txt.process(temp_file.name)
-
-            finally:
-                os.unlink(temp_file.name)
-
+        text = await asyncio.to_thread(docx2txt.process, file_path)
         return text.strip() if text else "Tidak dapat mengekstrak teks dari dokumen DOCX."
 
-    async def _extract_image_text(self, file_content: bytes) -> str:
+    async def _extract_image_text(self, file_path: str) -> str:
         """Extract text dari image menggunakan OCR"""
         if not HAS_PILLOW or not HAS_TESSERACT:
             raise Exception("Pillow atau tesseract tidak tersedia")
 
         try:
-            # Open image from bytes
-            image = Image.open(io.BytesIO(file_content))
-
-            # Preprocessing for better OCR
-            # Convert to grayscale if needed
-            if image.mode != 'L':
-                image = image.convert('L')
-
-            # Extract text with Indonesian language support if available
-            text = pytesseract.image_to_string(image, lang='ind+eng')
-
+            text = await get_extraction_pool().extract_image(file_path)
             return text.strip() if text else "Tidak dapat mendeteksi teks dalam gambar."
 
         except Exception as e:
@@ -294,23 +285,33 @@ class DocumentService:
     async def process_document_async(
         self,
         document_id: str,
-        file_content: bytes,
+        file_content: Optional[bytes],
         file_type: str,
         filename: str,
-        mongodb_collection
+        mongodb_collection,
+        file_path: Optional[str] = None
     ) -> bool:
         """
         Async processing untuk dokumen
-        - Extract text
+        - Extract text (dari file_path di blob store, atau bytes untuk caller lama)
         - AI analysis
         - Update MongoDB
+
+        analysis_status berjalan: "extracting" (dengan extraction_progress
+        per halaman PDF) -> "analyzing" -> "completed" / "failed".
         """
         try:
             logger.info(f"Starting async processing for document: {document_id}")
 
             # Step 1: Extract text
             extracted_text = await self.extract_text_from_document(
-                file_content, file_type, filename
+                file_content, file_type, filename, file_path=file_path,
+                progress=self._progress_reporter(document_id, mongodb_collection)
+            )
+
+            await mongodb_collection.update_one(
+                {"document_id": document_id},
+                {"$set": {"analysis_status": "analyzing"}}
             )
 
             # Step 2: AI analysis
@@ -360,5 +361,34 @@ class DocumentService:
 
             return False
 
+    @staticmethod
+    def _progress_reporter(document_id: str, mongodb_collection, steps: int = 20) -> ProgressCallback:
+        """
+        Callback progress ekstraksi yang menulis ke MongoDB
+
+        Ditulis paling banyak ~steps kali per dokumen (plus awal dan akhir),
+        bukan sekali per halaman.
+        """
+        last_reported = -1
+
+        async def report(done: int, total: int):
+            nonlocal last_reported
+            step = max(1, total // steps)
+            if done not in (0, total) and done - last_reported < step:
+                return
+            last_reported = done
+            try:
+                await mongodb_collection.update_one(
+                    {"document_id": document_id},
+                    {"$set": {
+                        "analysis_status": "extracting",
+                        "extraction_progress": {"pages_done": done, "pages_total": total}
+                    }}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to report extraction progress for {document_id}: {str(e)}")
+
+        return report
+
 # Global instance
 document_service = DocumentService()
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Document Extraction Workers
+
+CPU worker pool untuk ekstraksi teks dokumen (PyMuPDF + tesseract OCR):
+- PDF dipecah menjadi task per halaman dan dikerjakan paralel di
+  ProcessPoolExecutor, jadi event loop API tidak ikut terblokir selama
+  scan besar diproses. Default jumlah proses = core / WEB_CONCURRENCY:
+  setiap worker uvicorn punya pool sendiri, tanpa pembagian ini N worker
+  API x cpu_count proses berebut core yang sama
+- Halaman yang sudah punya text layer tidak di-OCR
+- Hasil OCR di-cache di disk per hash isi halaman (content stream + raw
+  image streams); halaman identik di upload ulang / dokumen lain tidak
+  di-OCR dua kali. Cache berbasis file sehingga dipakai bersama oleh
+  semua worker process
+- Progress (halaman selesai, total halaman) dilaporkan lewat callback
+
+Semua fungsi yang dijalankan di worker adalah fungsi module-level agar
+bisa di-pickle (ProcessPoolExecutor memakai context "spawn").
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional
+
+try:
+    import fitz  # PyMuPDF for PDF processing
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+    fitz = None
+
+try:
+    from PIL import Image
+    HAS_PILLOW = True
+except ImportError:
+    HAS_PILLOW = False
+    Image = None
+
+try:
+    import pytesseract
+    HAS_TESSERACT = True
+except ImportError:
+    HAS_TESSERACT = False
+    pytesseract = None
+
+HAS_OCR = HAS_PILLOW and HAS_TESSERACT
+
+logger = logging.getLogger(__name__)
+
+# WEB_CONCURRENCY juga dibaca uvicorn sebagai jumlah worker default
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+OCR_LANG = os.getenv("DOCUMENT_OCR_LANG", "ind+eng")
+OCR_DPI = int(os.getenv("DOCUMENT_OCR_DPI", "300"))
+PAGE_CACHE_PATH = os.getenv("DOCUMENT_PAGE_CACHE_PATH", "backend/data/page_text_cache")
+# Halaman dengan text layer lebih pendek dari ini dianggap hasil scan
+MIN_TEXT_LAYER_CHARS = int(os.getenv("DOCUMENT_MIN_TEXT_LAYER_CHARS", "25"))
+
+# async callback(pages_done, pages_total)
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+@dataclass
+class PageText:
+    """Teks satu halaman"""
+    page: int  # 1-based
+    text: str
+    method: str  # "text_layer" | "ocr" | "cache" | "empty"
+
+
+class PageTextCache:
+    """
+    Disk cache teks OCR per hash halaman
+
+    Satu file per entry (root/ab/<key>.txt), ditulis via tmp + os.replace
+    sehingga aman ditulis bersamaan dari beberapa worker process.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    @staticmethod
+    def make_key(content_hash: str, lang: str, dpi: int) -> str:
+        """Key cache = hash isi halaman + setting OCR"""
+        return hashlib.sha256(f"{content_hash}|{lang}|{dpi}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+
+def format_pages(pages: List[PageText]) -> str:
+    """Gabungkan halaman dengan header "--- Halaman N ---" (satu join)"""
+    return "".join(f"\n--- Halaman {page.page} ---\n{page.text}" for page in pages).strip()
+
+
+# ============================================================================
+# Worker functions (dijalankan di worker process)
+# ============================================================================
+
+def _init_worker():
+    """Satu thread tesseract per worker; paralelisme berasal dari jumlah process"""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    # Proses "spawn" tidak mewarisi konfigurasi DocumentService (Windows specific)
+    if HAS_TESSERACT and os.name == 'nt':
+        pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Jumlah halaman PDF (hanya membaca xref, bukan isi halaman)"""
+    with fitz.open(file_path) as doc:
+        return len(doc)
+
+
+def page_content_hash(doc: Any, page: Any) -> str:
+    """SHA-256 dari content stream halaman + raw stream semua image-nya"""
+    digest = hashlib.sha256(page.read_contents())
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
+
+
+def _ocr_pdf_page(page: Any, lang: str, dpi: int) -> str:
+    """Render halaman ke grayscale bitmap lalu OCR"""
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+def extract_pdf_page(
+    file_path: str,
+    page_index: int,
+    cache_dir: Optional[str] = None,
+    lang: str = OCR_LANG,
+    dpi: int = OCR_DPI,
+    min_text_chars: int = MIN_TEXT_LAYER_CHARS
+) -> PageText:
+    """
+    Extract teks satu halaman PDF
+
+    Text layer dipakai jika cukup panjang; selain itu halaman di-OCR
+    (dengan cache per hash halaman jika cache_dir diisi).
+    """
+    with fitz.open(file_path) as doc:
+        page = doc.load_page(page_index)
+        text = page.get_text()
+        if len(text.strip()) >= min_text_chars or not HAS_OCR:
+            return PageText(page_index + 1, text, "text_layer" if text.strip() else "empty")
+
+        cache = PageTextCache(cache_dir) if cache_dir else None
+        key = None
+        if cache is not None:
+            key = PageTextCache.make_key(page_content_hash(doc, page), lang, dpi)
+            cached = cache.get(key)
+            if cached is not None:
+                return PageText(page_index + 1, cached, "cache")
+
+        text = _ocr_pdf_page(page, lang, dpi)
+        if cache is not None:
+            cache.put(key, text)
+        return PageText(page_index + 1, text, "ocr")
+
+
+def ocr_image_file(file_path: str, cache_dir: Optional[str] = None, lang: str = OCR_LANG) -> str:
+    """OCR satu file image (grayscale), cache per hash isi file"""
+    cache = PageTextCache(cache_dir) if cache_dir else None
+    key = None
+    if cache is not None:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        key = PageTextCache.make_key(digest.hexdigest(), lang, 0)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    with Image.open(file_path) as image:
+        # Preprocessing for better OCR
+        # Convert to grayscale if needed
+        if image.mode != 'L':
+            image = image.convert('L')
+
+        # Extract text with Indonesian language support if available
+        text = pytesseract.image_to_string(image, lang=lang)
+
+    if cache is not None:
+        cache.put(key, text)
+    return text
+
+
+# ============================================================================
+# Pool
+# ============================================================================
+
+class DocumentExtractionPool:
+    """
+    Process pool untuk ekstraksi PDF/image
+
+    Args:
+        max_workers: Jumlah worker process (0 = tanpa process pool, task
+            dijalankan di default thread pool event loop)
+        cache_dir: Direktori cache OCR per halaman (None = tanpa cache)
+        lang: Bahasa tesseract
+        dpi: Resolusi render halaman scan
+        min_text_chars: Minimal panjang text layer agar OCR di-skip
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[str] = PAGE_CACHE_PATH,
+        lang: str = OCR_LANG,
+        dpi: int = OCR_DPI,
+        min_text_chars: int = MIN_TEXT_LAYER_CHARS
+    ):
+        self.max_workers = DOCUMENT_WORKERS if max_workers is None else max_workers
+        self.cache_dir = cache_dir
+        self.lang = lang
+        self.dpi = dpi
+        self.min_text_chars = min_text_chars
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Process pool dibuat lazy saat dokumen pertama diproses"""
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+            logger.info(f"🧵 Document extraction pool started ({self.max_workers} workers)")
+        return self._executor
+
+    async def _run(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def extract_pdf_pages(
+        self,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> List[PageText]:
+        """
+        Extract semua halaman PDF secara paralel
+
+        Args:
+            file_path: Path PDF di disk
+            progress: Dipanggil setiap halaman selesai (done, total)
+
+        Returns:
+            List PageText urut sesuai nomor halaman
+        """
+        if not HAS_FITZ:
+            raise Exception("PyMuPDF tidak tersedia")
+
+        total = await self._run(pdf_page_count, file_path)
+        if progress:
+            await progress(0, total)
+
+        tasks = [
+            asyncio.ensure_future(self._run(
+                extract_pdf_page, file_path, index, self.cache_dir,
+                self.lang, self.dpi, self.min_text_chars
+            ))
+            for index in range(total)
+        ]
+        pages: List[Optional[PageText]] = [None] * total
+        try:
+            for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+                page = await future
+                pages[page.page - 1] = page
+                if progress:
+                    await progress(done, total)
+        except BaseException:
+            # Halaman yang belum mulai tidak perlu dikerjakan lagi
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return pages
+
+    async def extract_pdf(self, file_path: str, progress: Optional[ProgressCallback] = None) -> str:
+        """Extract PDF menjadi satu teks dengan header per halaman"""
+        return format_pages(await self.extract_pdf_pages(file_path, progress))
+
+    async def extract_image(self, file_path: str) -> str:
+        """OCR satu image di worker process"""
+        if not HAS_OCR:
+            raise Exception("Pillow atau tesseract tidak tersedia")
+        return await self._run(ocr_image_file, file_path, self.cache_dir, self.lang)
+
+    def shutdown(self, wait: bool = True):
+        """Hentikan worker process"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton
+_extraction_pool: Optional[DocumentExtractionPool] = None
+
+
+def get_extraction_pool() -> DocumentExtractionPool:
+    """Get singleton DocumentExtractionPool instance"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = DocumentExtractionPool()
+    return _extraction_pool
+
+
+def close_extraction_pool():
+    """Shutdown singleton pool (dipanggil saat aplikasi berhenti)"""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
+        _extraction_pool = None
@@ -63,11 +63,44 @@ class LegalDocumentRepository:
                 status=status
             )
             logger.info(f"✅ Created legal document: {title}")
+            self._index_document(result, title, doc_type, summary, content, domain)
             return result
         except Exception as e:
             logger.error(f"❌ Error creating legal document: {e}")
             raise
     
+    def _index_document(
+        self,
+        result: Any,
+        title: str,
+        doc_type: str,
+        summary: Optional[str],
+        content: Optional[str],
+        domain: Optional[str]
+    ) -> None:
+        """
+        Add a newly inserted document to the search inverted index.
+        
+        Indexing failures are logged and never fail the insert.
+        """
+        if result is None:
+            return
+        
+        try:
+            # Imported lazily: knowledge_graph depends on this package
+            from ..knowledge_graph.inverted_index import get_legal_document_index
+            
+            get_legal_document_index().add_document(
+                doc_id=str(result.id),
+                title=title,
+                summary=summary,
+                content=content,
+                document_type=doc_type,
+                domain=domain
+            )
+        except Exception as e:
+            logger.warning(f"Failed to index legal document {title}: {e}")
+    
     async def get_by_id(self, doc_id: str) -> Optional[Any]:
         """
         Get legal document by ID.
@@ -6,6 +6,7 @@ from passlib.context import CryptContext
 from backend.core.config import settings
 from backend import schemas
 from backend.models import ChatSession
+from backend.services.ai.context_builder import get_context_builder
 
 logger = logging.getLogger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -300,14 +301,16 @@ class EnhancedAIConsultationService:
             }
 
     def _build_context(self, history: List[ChatMessage]) -> List[Dict[str, str]]:
-        """Build conversation context from history"""
-        return [
-            {
-                "role": msg.role,
-                "content": msg.content
-            }
-            for msg in history
-        ]
+        """
+        Build conversation context from history
+        
+        Hanya turn terbaru dalam token budget; konteks lama sudah terangkum
+        di consultation_data yang dikirim di prompt.
+        """
+        window = get_context_builder().build(
+            [{"role": msg.role, "content": msg.content} for msg in history]
+        )
+        return window.messages
 
     def _update_consultation_data(
         self,
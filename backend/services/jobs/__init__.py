@@ -0,0 +1,62 @@
+"""
+Durable Background Jobs
+
+Komponen:
+1. JobQueue - SQLite-backed antrian (priority, retry + backoff,
+   idempotency key, concurrency cap per queue, lease)
+2. JobWorker - Worker process terpisah (python -m backend.services.jobs.worker)
+3. Handlers - Nama job -> handler (documents.process, research.exhaustive,
+   ethics.audit, chat.summarize_context)
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from .queue import (
+    Job,
+    JobQueue,
+    JobStatus,
+    get_job_queue,
+    retry_delay
+)
+
+from .handlers import (
+    JOB_HANDLERS,
+    register_handler,
+    resolve_handler
+)
+
+from .worker import (
+    JobContext,
+    JobWorker
+)
+
+
+async def enqueue_job(
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    queue: str = "default",
+    **options: Any
+) -> Job:
+    """Enqueue dari async code (SQLite write di worker thread)"""
+    return await asyncio.to_thread(get_job_queue().enqueue, name, payload, queue, **options)
+
+
+__all__ = [
+    # Queue
+    "Job",
+    "JobQueue",
+    "JobStatus",
+    "get_job_queue",
+    "retry_delay",
+    "enqueue_job",
+
+    # Handlers
+    "JOB_HANDLERS",
+    "register_handler",
+    "resolve_handler",
+
+    # Worker
+    "JobContext",
+    "JobWorker",
+]
@@ -0,0 +1,129 @@
+"""
+Job Handlers
+
+Handler untuk setiap nama job. Handler adalah async function
+`handler(payload, ctx) -> result` dengan result JSON-serializable.
+
+JOB_HANDLERS memetakan nama job ke "module:function" dan di-resolve lazy
+di worker process, sehingga API process tidak perlu meng-import modul
+yang berat (PyMuPDF, AI client) hanya untuk enqueue.
+"""
+
+import importlib
+from typing import Any, Awaitable, Callable, Dict
+
+# Nama job -> "module:function"
+JOB_HANDLERS: Dict[str, str] = {
+    "documents.process": "backend.services.jobs.handlers:process_document",
+    "documents.release_blob": "backend.services.jobs.handlers:release_document_blob",
+    "research.exhaustive": "backend.services.jobs.handlers:exhaustive_research",
+    "ethics.audit": "backend.services.jobs.handlers:ethics_audit",
+    "chat.summarize_context": "backend.services.jobs.handlers:summarize_chat_context",
+}
+
+JobHandler = Callable[[Dict[str, Any], Any], Awaitable[Any]]
+
+_resolved: Dict[str, JobHandler] = {}
+
+
+def register_handler(name: str, handler: JobHandler):
+    """Daftarkan handler secara langsung (in-process, mis. untuk tests)"""
+    _resolved[name] = handler
+
+
+def resolve_handler(name: str) -> JobHandler:
+    """Import handler untuk nama job"""
+    handler = _resolved.get(name)
+    if handler is None:
+        target = JOB_HANDLERS.get(name)
+        if target is None:
+            raise KeyError(f"No handler registered for job '{name}'")
+        module_name, _, attr = target.partition(":")
+        handler = getattr(importlib.import_module(module_name), attr)
+        _resolved[name] = handler
+    return handler
+
+
+async def process_document(payload: Dict[str, Any], ctx) -> Dict[str, Any]:
+    """Ekstraksi + analisis AI dokumen yang sudah ada di blob store"""
+    from backend.services.blob_store import get_blob_store
+    from backend.services.blockchain_databases import get_mongodb_cursor
+    from backend.services.document_service import document_service
+
+    mongodb = get_mongodb_cursor()
+    if not mongodb:
+        raise RuntimeError("MongoDB not available for document processing")
+    collection = mongodb["pasalku_ai_analytics"]["documents"]
+
+    # Job lama (sebelum blob_sha256) masih membawa file_path
+    if "blob_sha256" in payload:
+        file_path = str(get_blob_store().path_for(payload["blob_sha256"]))
+    else:
+        file_path = payload["file_path"]
+
+    await ctx.progress(stage="processing")
+    success = await document_service.process_document_async(
+        document_id=payload["document_id"],
+        file_content=None,
+        file_type=payload["file_type"],
+        filename=payload["filename"],
+        mongodb_collection=collection,
+        file_path=file_path
+    )
+    if not success:
+        raise RuntimeError(f"Document processing failed: {payload['document_id']}")
+    return {"document_id": payload["document_id"]}
+
+
+async def release_document_blob(payload: Dict[str, Any], ctx) -> Dict[str, Any]:
+    """Hapus blob dokumen yang sudah dihapus jika tidak dipakai dokumen lain (dedup)"""
+    from backend.services.blob_store import get_blob_store
+    from backend.services.blockchain_databases import get_mongodb_cursor
+
+    mongodb = get_mongodb_cursor()
+    if not mongodb:
+        raise RuntimeError("MongoDB not available for blob release")
+    collection = mongodb["pasalku_ai_analytics"]["documents"]
+
+    async def is_referenced(sha256: str) -> bool:
+        return await collection.count_documents({"blob.sha256": sha256}, limit=1) > 0
+
+    deleted = await get_blob_store().release(payload["blob_sha256"], is_referenced)
+    return {"blob_sha256": payload["blob_sha256"], "deleted": deleted}
+
+
+async def exhaustive_research(payload: Dict[str, Any], ctx) -> Dict[str, Any]:
+    """Extended research untuk research_depth="exhaustive" """
+    from backend.routers.research_assistant import ResearchQuery, _perform_exhaustive_research
+
+    await ctx.progress(stage="researching")
+    await _perform_exhaustive_research(
+        payload["research_id"],
+        ResearchQuery(**payload["research"]),
+        payload.get("findings", {})
+    )
+    return {"research_id": payload["research_id"]}
+
+
+async def ethics_audit(payload: Dict[str, Any], ctx) -> Dict[str, Any]:
+    """Ethics audit satu sesi; alerts disimpan sebagai hasil job"""
+    from backend.routers.ethics_monitor import EthicsAuditRequest, ethics_monitor
+
+    await ctx.progress(stage="auditing")
+    alerts = await ethics_monitor.audit_session(EthicsAuditRequest(**payload))
+    return {"alerts": [alert.dict() for alert in alerts]}
+
+
+async def summarize_chat_context(payload: Dict[str, Any], ctx) -> Dict[str, Any]:
+    """Rolling summary transcript chat sampai index `until` (off critical path)"""
+    from backend.database import get_db_connections
+    from backend.services.ai.context_builder import update_rolling_summary
+    from backend.services.transcript_store import get_transcript_store
+
+    store = get_transcript_store(get_db_connections().get_mongodb_async())
+    if store is None:
+        raise RuntimeError("MongoDB not available for context summarization")
+
+    await ctx.progress(stage="summarizing")
+    summary = await update_rolling_summary(store, payload["transcript_id"], payload["until"])
+    return {"transcript_id": payload["transcript_id"], "covered_until": summary.covered_until}
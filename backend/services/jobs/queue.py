@@ -0,0 +1,561 @@
+"""
+Durable Job Queue (SQLite)
+
+Antrian job yang tahan restart untuk pekerjaan berat (analisis dokumen,
+exhaustive research, ethics audit):
+- Disimpan di SQLite (WAL) sehingga API process dan worker process
+  berbagi satu antrian lewat file yang sama
+- Priority (besar = lebih dulu), lalu run_at (FIFO)
+- Retry dengan exponential backoff sampai max_attempts
+- Idempotency key: enqueue ulang dengan key yang sama mengembalikan job lama
+- Concurrency cap per queue (lintas semua worker)
+- Lease + heartbeat: job milik worker yang mati otomatis diambil ulang
+  setelah lease habis
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Root repo (berisi backend/): path relatif di-resolve dari sini, bukan dari cwd,
+# agar API (cd backend && uvicorn ...) dan worker (python -m backend...) memakai file yang sama
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def resolve_job_db_path(path: Optional[str] = None) -> str:
+    """Path SQLite absolut; default backend/data/jobs.sqlite3, relatif terhadap root repo"""
+    if not path:
+        return str(_PROJECT_ROOT / "backend" / "data" / "jobs.sqlite3")
+    if path == ":memory:" or Path(path).is_absolute():
+        return path
+    return str(_PROJECT_ROOT / path)
+
+
+JOB_DB_PATH = resolve_job_db_path(os.getenv("JOB_QUEUE_DB_PATH"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+# "documents=2,research=1,ethics=4,chat=4"; queue yang tidak disebut = tanpa batas
+JOB_QUEUE_CONCURRENCY = os.getenv("JOB_QUEUE_CONCURRENCY", "documents=2,research=1,ethics=4,chat=4")
+
+
+class JobStatus(str, Enum):
+    """Status job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class Job:
+    """Satu job di antrian"""
+    id: str
+    queue: str
+    name: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = 3
+    run_at: float = 0.0
+    idempotency_key: Optional[str] = None
+    owner_id: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = None
+    result: Any = None
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    lease_until: Optional[float] = None
+    cancel_requested: bool = False
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self, include_payload: bool = False) -> Dict[str, Any]:
+        """Representasi untuk API (payload disembunyikan secara default)"""
+        data = {
+            "job_id": self.id,
+            "queue": self.queue,
+            "name": self.name,
+            "status": self.status.value,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "next_run_at": self.run_at if self.status == JobStatus.QUEUED else None,
+        }
+        if include_payload:
+            data["payload"] = self.payload
+        return data
+
+
+def parse_concurrency_caps(spec: str) -> Dict[str, int]:
+    """Parse "queue=n,queue=n" menjadi dict"""
+    caps: Dict[str, int] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            caps[name.strip()] = int(value)
+    return caps
+
+
+def retry_delay(attempts: int, base: float = JOB_RETRY_BASE_SECONDS, maximum: float = JOB_RETRY_MAX_SECONDS) -> float:
+    """Exponential backoff: base, 2x base, 4x base, ... dibatasi maximum"""
+    return min(base * (2 ** max(attempts - 1, 0)), maximum)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_at REAL NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    owner_id TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    worker_id TEXT,
+    lease_until REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, queue, priority DESC, run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner_id, created_at DESC);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed durable job queue
+
+    Semua method sinkron dan thread-safe (satu koneksi + lock per instance);
+    beberapa process koordinasi lewat lock SQLite (BEGIN IMMEDIATE).
+    Dari async code panggil lewat asyncio.to_thread.
+
+    Args:
+        db_path: Path file SQLite (relatif terhadap root repo; ":memory:"
+            hanya untuk satu process)
+        concurrency_caps: Maksimal job running per queue (lintas worker)
+        retry_base_seconds: Delay retry pertama (lalu 2x, 4x, ...)
+        retry_max_seconds: Batas atas delay retry
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        concurrency_caps: Optional[Dict[str, int]] = None,
+        retry_base_seconds: float = JOB_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = JOB_RETRY_MAX_SECONDS
+    ):
+        self.db_path = resolve_job_db_path(db_path) if db_path else JOB_DB_PATH
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.concurrency_caps = (
+            parse_concurrency_caps(JOB_QUEUE_CONCURRENCY) if concurrency_caps is None else dict(concurrency_caps)
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        queue: str = "default",
+        priority: int = 0,
+        max_attempts: int = 3,
+        delay: float = 0.0,
+        idempotency_key: Optional[str] = None,
+        owner_id: Optional[str] = None
+    ) -> Job:
+        """
+        Tambah job ke antrian
+
+        Args:
+            name: Nama handler (lihat jobs.handlers.JOB_HANDLERS)
+            payload: Argumen handler (harus JSON-serializable)
+            queue: Nama queue (menentukan worker dan concurrency cap)
+            priority: Semakin besar semakin dulu dikerjakan
+            max_attempts: Total percobaan termasuk retry
+            delay: Tunda eksekusi (detik)
+            idempotency_key: Jika sudah ada job dengan key ini, job lama
+                dikembalikan dan tidak ada job baru
+            owner_id: User pemilik job (untuk filter di API)
+
+        Returns:
+            Job baru atau job lama dengan idempotency_key yang sama
+        """
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            queue=queue,
+            name=name,
+            payload=dict(payload or {}),
+            priority=priority,
+            max_attempts=max(1, max_attempts),
+            run_at=now + max(delay, 0.0),
+            idempotency_key=idempotency_key,
+            owner_id=owner_id,
+            created_at=now,
+            updated_at=now,
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (id, queue, name, payload, status, priority, attempts, max_attempts, run_at,"
+                " idempotency_key, owner_id, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(idempotency_key) DO NOTHING",
+                (job.id, queue, name, _dumps(job.payload), JobStatus.QUEUED.value, priority,
+                 job.max_attempts, job.run_at, idempotency_key, owner_id, now, now)
+            )
+            if cursor.rowcount == 0:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                return _row_to_job(row)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(
+        self,
+        queue: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        owner_id: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        """Job terbaru dulu, dengan filter opsional"""
+        clauses, params = [], []
+        for column, value in (("queue", queue), ("status", status.value if status else None), ("owner_id", owner_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Jumlah job per queue per status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT queue, status, COUNT(*) AS n FROM jobs GROUP BY queue, status"
+            ).fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            result.setdefault(row["queue"], {})[row["status"]] = row["n"]
+        return result
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Batalkan job
+
+        Job queued langsung menjadi cancelled; job running ditandai
+        cancel_requested dan dihentikan worker saat heartbeat berikutnya.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.CANCELLED.value, now, now, job_id, JobStatus.QUEUED.value)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, job_id, JobStatus.RUNNING.value)
+            )
+        return self.get(job_id)
+
+    # ------------------------------------------------------------------
+    # Worker API
+    # ------------------------------------------------------------------
+
+    def claim(self, queues: Iterable[str], worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Job]:
+        """
+        Ambil satu job siap jalan dari queues (atomic lintas process)
+
+        Job siap = queued dengan run_at <= now, atau running dengan lease
+        yang sudah habis (worker-nya mati). Queue yang sudah mencapai
+        concurrency cap dilewati.
+        """
+        queues = list(queues)
+        if not queues:
+            return None
+        now = time.time()
+        marks = ",".join("?" for _ in queues)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = {
+                    row["queue"]: row["n"]
+                    for row in self._conn.execute(
+                        f"SELECT queue, COUNT(*) AS n FROM jobs WHERE status = ? AND lease_until > ?"
+                        f" AND queue IN ({marks}) GROUP BY queue",
+                        (JobStatus.RUNNING.value, now, *queues)
+                    )
+                }
+                open_queues = [
+                    queue for queue in queues
+                    if queue not in self.concurrency_caps or running.get(queue, 0) < self.concurrency_caps[queue]
+                ]
+                claimed = None
+                if open_queues:
+                    claimed = self._claim_locked(open_queues, worker_id, lease_seconds, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def _claim_locked(self, queues: List[str], worker_id: str, lease_seconds: float, now: float) -> Optional[Job]:
+        marks = ",".join("?" for _ in queues)
+        rows = self._conn.execute(
+            f"SELECT * FROM jobs WHERE queue IN ({marks}) AND ("
+            f" (status = ? AND run_at <= ?) OR (status = ? AND lease_until <= ?))"
+            f" ORDER BY priority DESC, run_at ASC LIMIT 20",
+            (*queues, JobStatus.QUEUED.value, now, JobStatus.RUNNING.value, now)
+        ).fetchall()
+
+        for row in rows:
+            job = _row_to_job(row)
+            if job.status == JobStatus.RUNNING and (job.attempts >= job.max_attempts or job.cancel_requested):
+                # Lease habis di percobaan terakhir: worker mati, jangan ulang lagi
+                final = JobStatus.CANCELLED if job.cancel_requested else JobStatus.FAILED
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = COALESCE(error, ?), finished_at = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (final.value, "Worker lease expired", now, now, job.id)
+                )
+                continue
+
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker_id = ?, lease_until = ?,"
+                " started_at = ?, updated_at = ? WHERE id = ?",
+                (JobStatus.RUNNING.value, worker_id, now + lease_seconds, now, now, job.id)
+            )
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.worker_id = worker_id
+            job.lease_until = now + lease_seconds
+            job.started_at = job.updated_at = now
+            return job
+        return None
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """
+        Perpanjang lease job
+
+        Returns:
+            False jika job sudah bukan milik worker ini atau cancel diminta
+            (bedakan dengan is_cancel_requested)
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + lease_seconds, now, job_id, worker_id, JobStatus.RUNNING.value)
+            )
+            if cursor.rowcount == 0:
+                return False
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return not row["cancel_requested"]
+
+    def is_cancel_requested(self, job_id: str, worker_id: str) -> bool:
+        """True jika job masih dipegang worker ini dan cancel diminta dari API"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, JobStatus.RUNNING.value)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def set_progress(self, job_id: str, progress: Dict[str, Any], worker_id: Optional[str] = None) -> bool:
+        """Simpan progress; diabaikan jika job sudah tidak dipegang worker_id"""
+        now = time.time()
+        owner_clause, owner_params = self._owner_clause(worker_id)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ? AND status = ?{owner_clause}",
+                (_dumps(progress), now, job_id, JobStatus.RUNNING.value, *owner_params)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, result: Any = None, worker_id: Optional[str] = None) -> bool:
+        return self._finish(job_id, JobStatus.SUCCEEDED, result=result, worker_id=worker_id)
+
+    def mark_cancelled(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        return self._finish(job_id, JobStatus.CANCELLED, error="Cancelled", worker_id=worker_id)
+
+    def fail(self, job_id: str, error: str, retry: bool = True, worker_id: Optional[str] = None) -> Optional[Job]:
+        """
+        Catat kegagalan; jadwalkan retry (backoff) jika percobaan masih tersisa
+
+        Args:
+            worker_id: Jika diisi, hanya berlaku selama job masih running
+                milik worker ini (worker yang lease-nya hilang tidak boleh
+                menimpa hasil worker baru)
+
+        Returns:
+            Job setelah update (status queued jika akan di-retry), None jika
+            job tidak ada atau bukan milik worker_id
+        """
+        now = time.time()
+        owner_clause, owner_params = self._owner_clause(worker_id)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT attempts, max_attempts, cancel_requested FROM jobs WHERE id = ? AND status = ?{owner_clause}",
+                (job_id, JobStatus.RUNNING.value, *owner_params)
+            ).fetchone()
+            if row is None:
+                return None
+            if retry and row["attempts"] < row["max_attempts"] and not row["cancel_requested"]:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, run_at = ?, error = ?, worker_id = NULL, lease_until = NULL,"
+                    f" updated_at = ? WHERE id = ? AND status = ?{owner_clause}",
+                    (JobStatus.QUEUED.value,
+                     now + retry_delay(row["attempts"], self.retry_base_seconds, self.retry_max_seconds),
+                     error, now, job_id, JobStatus.RUNNING.value, *owner_params)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, finished_at = ?, updated_at = ?"
+                    f" WHERE id = ? AND status = ?{owner_clause}",
+                    (JobStatus.FAILED.value, error, now, now, job_id, JobStatus.RUNNING.value, *owner_params)
+                )
+            if cursor.rowcount == 0:
+                return None
+        return self.get(job_id)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: Any = None,
+        error: Optional[str] = None,
+        worker_id: Optional[str] = None
+    ) -> bool:
+        """Tandai job running selesai; False jika sudah tidak dipegang worker_id"""
+        now = time.time()
+        owner_clause, owner_params = self._owner_clause(worker_id)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, finished_at = ?,"
+                f" updated_at = ? WHERE id = ? AND status = ?{owner_clause}",
+                (status.value, _dumps(result) if result is not None else None, error, now, now,
+                 job_id, JobStatus.RUNNING.value, *owner_params)
+            )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _owner_clause(worker_id: Optional[str]):
+        if worker_id is None:
+            return "", ()
+        return " AND worker_id = ?", (worker_id,)
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Hapus job selesai yang lebih tua dari batas waktu"""
+        cutoff = time.time() - older_than_seconds
+        marks = ",".join("?" for _ in FINISHED_STATUSES)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({marks}) AND finished_at < ?",
+                (*(status.value for status in FINISHED_STATUSES), cutoff)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _loads(value: Optional[str]) -> Any:
+    return json.loads(value) if value is not None else None
+
+
+def _row_to_job(row: sqlite3.Row) -> Job:
+    return Job(
+        id=row["id"],
+        queue=row["queue"],
+        name=row["name"],
+        payload=_loads(row["payload"]) or {},
+        status=JobStatus(row["status"]),
+        priority=row["priority"],
+        attempts=row["attempts"],
+        max_attempts=row["max_attempts"],
+        run_at=row["run_at"],
+        idempotency_key=row["idempotency_key"],
+        owner_id=row["owner_id"],
+        progress=_loads(row["progress"]),
+        result=_loads(row["result"]),
+        error=row["error"],
+        worker_id=row["worker_id"],
+        lease_until=row["lease_until"],
+        cancel_requested=bool(row["cancel_requested"]),
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        started_at=row["started_at"],
+        finished_at=row["finished_at"],
+    )
+
+
+# Singleton
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get singleton JobQueue instance"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
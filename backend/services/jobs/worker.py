@@ -0,0 +1,218 @@
+"""
+Job Worker
+
+Process terpisah yang mengambil job dari JobQueue dan menjalankannya,
+sehingga pekerjaan berat tidak berebut event loop dengan request API.
+
+Usage:
+    python -m backend.services.jobs.worker --queues documents,research,ethics,chat --concurrency 4
+
+Setiap worker:
+- Claim job sesuai priority selama slot lokal (--concurrency) dan
+  concurrency cap per queue (JOB_QUEUE_CONCURRENCY) masih tersedia
+- Memperpanjang lease via heartbeat; job yang di-cancel dari API
+  dihentikan saat heartbeat berikutnya
+- Exception -> retry dengan exponential backoff sampai max_attempts
+- SIGINT/SIGTERM: berhenti claim, tunggu job yang sedang jalan selesai
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from .handlers import resolve_handler
+from .queue import JOB_LEASE_SECONDS, Job, JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+
+class JobContext:
+    """Context yang diterima handler: info job + pelaporan progress"""
+
+    def __init__(self, job: Job, queue: JobQueue):
+        self.job = job
+        self._queue = queue
+
+    @property
+    def job_id(self) -> str:
+        return self.job.id
+
+    @property
+    def attempt(self) -> int:
+        return self.job.attempts
+
+    async def progress(self, **fields: Any):
+        """Simpan progress (mis. stage="extracting", pages_done=3) ke job"""
+        await asyncio.to_thread(self._queue.set_progress, self.job.id, fields, self.job.worker_id)
+
+
+class JobWorker:
+    """
+    Async worker loop
+
+    Args:
+        queues: Nama queue yang dikerjakan worker ini
+        job_queue: JobQueue (default: singleton)
+        concurrency: Maksimal job paralel di worker ini
+        poll_interval: Jeda polling saat antrian kosong (detik)
+        lease_seconds: Lama lease; heartbeat dikirim tiap lease / 3
+    """
+
+    def __init__(
+        self,
+        queues: List[str],
+        job_queue: Optional[JobQueue] = None,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        lease_seconds: float = JOB_LEASE_SECONDS
+    ):
+        self.queues = list(queues)
+        self.job_queue = job_queue or get_job_queue()
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._active: Set[asyncio.Task] = set()
+        # job_id -> "cancelled" | "lease_lost" (diisi heartbeat sebelum work di-cancel)
+        self._stop_reasons: Dict[str, str] = {}
+        self._stopping = asyncio.Event()
+        self.processed = 0
+
+    def stop(self):
+        """Berhenti claim job baru; job yang berjalan dibiarkan selesai"""
+        self._stopping.set()
+
+    async def run(self, stop_when_idle: bool = False):
+        """
+        Jalankan worker loop
+
+        Args:
+            stop_when_idle: Berhenti saat antrian kosong dan tidak ada job
+                berjalan (untuk tests / batch run)
+        """
+        logger.info(f"🛠️ Job worker {self.worker_id} started (queues={self.queues}, concurrency={self.concurrency})")
+        try:
+            while not self._stopping.is_set():
+                claimed = await self._fill_slots()
+                if stop_when_idle and not claimed and not self._active:
+                    break
+                await self._wait_for_work(claimed)
+        finally:
+            if self._active:
+                await asyncio.gather(*self._active, return_exceptions=True)
+            logger.info(f"🛑 Job worker {self.worker_id} stopped ({self.processed} jobs processed)")
+
+    async def _fill_slots(self) -> int:
+        """Claim job sampai slot lokal penuh atau antrian kosong"""
+        claimed = 0
+        while len(self._active) < self.concurrency and not self._stopping.is_set():
+            job = await asyncio.to_thread(self.job_queue.claim, self.queues, self.worker_id, self.lease_seconds)
+            if job is None:
+                break
+            task = asyncio.create_task(self._execute(job))
+            self._active.add(task)
+            task.add_done_callback(self._active.discard)
+            claimed += 1
+        return claimed
+
+    async def _wait_for_work(self, claimed: int):
+        """Tunggu slot kosong atau poll interval (mana yang lebih dulu)"""
+        if claimed and len(self._active) < self.concurrency:
+            return  # masih ada slot, langsung coba claim lagi
+        waiters = [asyncio.create_task(self._stopping.wait())]
+        try:
+            await asyncio.wait(
+                [*self._active, *waiters],
+                timeout=self.poll_interval,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _execute(self, job: Job):
+        """Jalankan satu job dengan heartbeat, lalu catat hasilnya"""
+        ctx = JobContext(job, self.job_queue)
+        work = asyncio.create_task(self._call_handler(job, ctx))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            if self._stop_reasons.get(job.id) == "cancelled":
+                await asyncio.to_thread(self.job_queue.mark_cancelled, job.id, self.worker_id)
+                logger.info(f"🚫 Job {job.id} ({job.name}) cancelled")
+            else:
+                # Lease hilang (sudah diambil worker lain): hasil dibuang, status tidak disentuh
+                logger.warning(f"⚠️ Job {job.id} ({job.name}) lease lost - dropped by {self.worker_id}")
+        except Exception as e:
+            updated = await asyncio.to_thread(
+                self.job_queue.fail, job.id, f"{type(e).__name__}: {e}", True, self.worker_id
+            )
+            if updated is None:
+                logger.warning(f"⚠️ Job {job.id} ({job.name}) failed after its lease was lost - result dropped")
+            else:
+                logger.error(
+                    f"❌ Job {job.id} ({job.name}) failed on attempt {job.attempts}/{job.max_attempts}: {e}"
+                    + (" - retry scheduled" if not updated.finished else "")
+                )
+        else:
+            if await asyncio.to_thread(self.job_queue.complete, job.id, result, self.worker_id):
+                logger.info(f"✅ Job {job.id} ({job.name}) completed")
+            else:
+                logger.warning(f"⚠️ Job {job.id} ({job.name}) finished after its lease was lost - result dropped")
+        finally:
+            heartbeat.cancel()
+            self._stop_reasons.pop(job.id, None)
+            self.processed += 1
+
+    async def _call_handler(self, job: Job, ctx: JobContext) -> Any:
+        handler = resolve_handler(job.name)
+        return await handler(job.payload, ctx)
+
+    async def _heartbeat(self, job: Job, work: asyncio.Task):
+        """Perpanjang lease; hentikan work jika job di-cancel atau lease hilang"""
+        interval = max(self.lease_seconds / 3, 0.05)
+        while not work.done():
+            await asyncio.sleep(interval)
+            alive = await asyncio.to_thread(self.job_queue.heartbeat, job.id, self.worker_id, self.lease_seconds)
+            if not alive:
+                cancelled = await asyncio.to_thread(self.job_queue.is_cancel_requested, job.id, self.worker_id)
+                self._stop_reasons[job.id] = "cancelled" if cancelled else "lease_lost"
+                work.cancel()
+                return
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pasalku job worker")
+    parser.add_argument("--queues", default="documents,research,ethics,chat", help="Comma-separated queue names")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--db", default=None, help="SQLite path (default: JOB_QUEUE_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    job_queue = JobQueue(args.db) if args.db else get_job_queue()
+    queues = [name.strip() for name in args.queues.split(",") if name.strip()]
+
+    async def run():
+        worker = JobWorker(queues, job_queue=job_queue, concurrency=args.concurrency)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:  # Windows
+                pass
+        await worker.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,12 @@ from .search_engine import (
     get_search_engine
 )
 
+from .inverted_index import (
+    InvertedIndex,
+    IndexRebuildInProgress,
+    get_legal_document_index
+)
+
 from .citation_extractor import (
     CitationExtractor,
     ExtractedCitation,
@@ -29,6 +35,9 @@ __all__ = [
     "SearchResult",
     "CitationInfo",
     "get_search_engine",
+    "InvertedIndex",
+    "IndexRebuildInProgress",
+    "get_legal_document_index",
     "CitationExtractor",
     "ExtractedCitation",
     "get_citation_extractor",
@@ -0,0 +1,678 @@
+"""
+Inverted Index for Legal Documents
+
+In-process full-text index over the LegalDocument corpus.
+Replaces per-query `contains_insensitive` scans with posting-list lookups
+and BM25F scoring across title, summary and content.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Field order defines the layout of term-frequency tuples in posting lists
+FIELDS: Tuple[str, ...] = ("title", "summary", "content")
+
+# Per-field boosts for BM25F (title matches matter most)
+FIELD_WEIGHTS: Dict[str, float] = {
+    "title": 3.0,
+    "summary": 1.5,
+    "content": 1.0,
+}
+
+# Common Indonesian/English function words that carry no search signal
+STOPWORDS = frozenset({
+    "yang", "dan", "di", "ke", "dari", "untuk", "dengan", "atau", "ini",
+    "itu", "pada", "dalam", "oleh", "adalah", "sebagai", "akan", "tidak",
+    "juga", "bagi", "serta", "dapat", "telah", "para", "suatu", "tersebut",
+    "the", "of", "and", "to", "in", "for", "on", "is", "a", "an",
+})
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+INDEX_FORMAT_VERSION = 1
+
+# Compact once this fraction of document slots are tombstones
+COMPACT_TOMBSTONE_RATIO = float(os.getenv("KG_INDEX_COMPACT_RATIO", "0.25"))
+
+# ...and at least this many, so small indexes are not compacted constantly
+COMPACT_MIN_TOMBSTONES = int(os.getenv("KG_INDEX_COMPACT_MIN_TOMBSTONES", "1000"))
+
+
+class IndexRebuildInProgress(RuntimeError):
+    """Raised when build_from_edgedb is called while a rebuild is running"""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into normalized index tokens.
+
+    Numbers are kept because pasal and UU numbers are primary search keys.
+    """
+    if not text:
+        return []
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class InvertedIndex:
+    """
+    Token -> posting list index with BM25F ranking.
+
+    Posting lists map an internal document number to a tuple of term
+    frequencies, one slot per entry in FIELDS. Document metadata used for
+    pre-filtering (document type, domain) is kept in a compact side table so
+    filters never touch the database.
+    """
+
+    def __init__(
+        self,
+        index_path: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        autosave_every: int = 500,
+        compact_ratio: float = COMPACT_TOMBSTONE_RATIO,
+        compact_min_tombstones: int = COMPACT_MIN_TOMBSTONES
+    ):
+        """
+        Initialize index.
+
+        Args:
+            index_path: File used for on-disk persistence (None = memory only)
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            autosave_every: Persist after this many incremental updates
+            compact_ratio: Tombstone fraction that triggers compaction
+            compact_min_tombstones: Minimum tombstones before compacting
+        """
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+        self.autosave_every = autosave_every
+        self.compact_ratio = compact_ratio
+        self.compact_min_tombstones = compact_min_tombstones
+
+        self._lock = threading.RLock()
+        self._save_in_progress = False
+        # Updates received while build_from_edgedb fills a fresh index:
+        # doc_id -> add_document kwargs, or None for a removal
+        self._rebuild_journal: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+        self._reset()
+
+        if index_path and os.path.exists(index_path):
+            self.load(index_path)
+
+    def _reset(self) -> None:
+        """Clear all index structures"""
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._doc_ids: List[Optional[str]] = []
+        self._doc_numbers: Dict[str, int] = {}
+        self._doc_meta: List[Optional[Tuple[str, str]]] = []
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self._field_lengths: List[Tuple[int, ...]] = []
+        self._total_field_lengths: List[int] = [0] * len(FIELDS)
+        self._live_documents = 0
+        self._pending_updates = 0
+
+    # ------------------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------------------
+
+    @property
+    def document_count(self) -> int:
+        """Number of live (non-deleted) documents"""
+        return self._live_documents
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct tokens in the vocabulary"""
+        return len(self._postings)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_numbers
+
+    def __len__(self) -> int:
+        return self._live_documents
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add_document(
+        self,
+        doc_id: str,
+        title: Optional[str] = None,
+        summary: Optional[str] = None,
+        content: Optional[str] = None,
+        document_type: Optional[str] = None,
+        domain: Optional[str] = None
+    ) -> None:
+        """
+        Add or replace a document in the index.
+
+        Args:
+            doc_id: LegalDocument id
+            title: Document title
+            summary: Document summary
+            content: Full text content
+            document_type: Document type used for filtering
+            domain: Legal domain used for filtering
+        """
+        field_tokens = [tokenize(title), tokenize(summary), tokenize(content)]
+
+        term_frequencies: Dict[str, List[int]] = {}
+        for slot, tokens in enumerate(field_tokens):
+            for token in tokens:
+                frequencies = term_frequencies.get(token)
+                if frequencies is None:
+                    frequencies = term_frequencies[token] = [0] * len(FIELDS)
+                frequencies[slot] += 1
+
+        lengths = tuple(len(tokens) for tokens in field_tokens)
+        meta = (
+            (document_type or "").lower(),
+            (domain or "").lower(),
+        )
+
+        with self._lock:
+            if self._rebuild_journal is not None:
+                self._rebuild_journal[doc_id] = {
+                    "title": title,
+                    "summary": summary,
+                    "content": content,
+                    "document_type": document_type,
+                    "domain": domain,
+                }
+
+            if doc_id in self._doc_numbers:
+                self._remove_locked(doc_id)
+
+            doc_number = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._doc_numbers[doc_id] = doc_number
+            self._doc_meta.append(meta)
+            self._doc_terms.append(tuple(term_frequencies))
+            self._field_lengths.append(lengths)
+            for slot, length in enumerate(lengths):
+                self._total_field_lengths[slot] += length
+
+            for token, frequencies in term_frequencies.items():
+                self._postings.setdefault(token, {})[doc_number] = tuple(frequencies)
+
+            self._live_documents += 1
+            self._pending_updates += 1
+            self._maybe_compact_locked()
+
+        self._maybe_autosave()
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Bulk add documents.
+
+        Each dict must contain "id" and may contain title, summary, content,
+        document_type and domain. Returns number of documents indexed.
+        """
+        count = 0
+        for doc in documents:
+            self.add_document(
+                doc_id=str(doc["id"]),
+                title=doc.get("title"),
+                summary=doc.get("summary"),
+                content=doc.get("content"),
+                document_type=doc.get("document_type"),
+                domain=doc.get("domain")
+            )
+            count += 1
+        return count
+
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Remove a document from the index.
+
+        Returns:
+            True if the document was indexed
+        """
+        with self._lock:
+            if self._rebuild_journal is not None:
+                self._rebuild_journal[doc_id] = None
+
+            removed = self._remove_locked(doc_id)
+            if removed:
+                self._pending_updates += 1
+                self._maybe_compact_locked()
+
+        if removed:
+            self._maybe_autosave()
+        return removed
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        """Remove a document; caller must hold the lock"""
+        doc_number = self._doc_numbers.pop(doc_id, None)
+        if doc_number is None:
+            return False
+
+        # Document slots are tombstoned rather than compacted so that
+        # internal numbers stored in other posting lists stay valid.
+        for token in self._doc_terms[doc_number]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_number, None)
+            if not postings:
+                del self._postings[token]
+
+        for slot, length in enumerate(self._field_lengths[doc_number]):
+            self._total_field_lengths[slot] -= length
+
+        self._doc_ids[doc_number] = None
+        self._doc_meta[doc_number] = None
+        self._doc_terms[doc_number] = ()
+        self._field_lengths[doc_number] = (0,) * len(FIELDS)
+        self._live_documents -= 1
+        return True
+
+    def clear(self) -> None:
+        """Remove every document from the index"""
+        with self._lock:
+            self._reset()
+
+    @property
+    def tombstone_count(self) -> int:
+        """Number of document slots freed by removals"""
+        return len(self._doc_ids) - self._live_documents
+
+    def _maybe_compact_locked(self) -> None:
+        """Compact once tombstones pass the configured threshold; caller must hold the lock"""
+        tombstones = len(self._doc_ids) - self._live_documents
+        if (
+            tombstones >= self.compact_min_tombstones
+            and tombstones > self.compact_ratio * len(self._doc_ids)
+        ):
+            self._compact_locked()
+
+    def compact(self) -> int:
+        """
+        Drop tombstoned slots and renumber live documents.
+
+        Returns:
+            Number of slots reclaimed
+        """
+        with self._lock:
+            return self._compact_locked()
+
+    def _compact_locked(self) -> int:
+        """Rewrite document tables and posting lists without tombstones"""
+        reclaimed = len(self._doc_ids) - self._live_documents
+        if not reclaimed:
+            return 0
+
+        renumber: Dict[int, int] = {}
+        doc_ids: List[Optional[str]] = []
+        doc_meta: List[Optional[Tuple[str, str]]] = []
+        doc_terms: List[Tuple[str, ...]] = []
+        field_lengths: List[Tuple[int, ...]] = []
+        for doc_number, doc_id in enumerate(self._doc_ids):
+            if doc_id is None:
+                continue
+            renumber[doc_number] = len(doc_ids)
+            doc_ids.append(doc_id)
+            doc_meta.append(self._doc_meta[doc_number])
+            doc_terms.append(self._doc_terms[doc_number])
+            field_lengths.append(self._field_lengths[doc_number])
+
+        # Removed documents are already gone from posting lists,
+        # so every remaining entry maps to a live slot
+        self._postings = {
+            token: {renumber[doc_number]: frequencies for doc_number, frequencies in postings.items()}
+            for token, postings in self._postings.items()
+        }
+        self._doc_ids = doc_ids
+        self._doc_meta = doc_meta
+        self._doc_terms = doc_terms
+        self._field_lengths = field_lengths
+        self._doc_numbers = {doc_id: doc_number for doc_number, doc_id in enumerate(doc_ids)}
+
+        logger.info(f"Compacted inverted index: reclaimed {reclaimed} tombstoned slots")
+        return reclaimed
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        terms: Iterable[str],
+        document_types: Optional[List[str]] = None,
+        domains: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents for the given query terms with BM25F.
+
+        Terms are re-tokenized, so multi-word keywords ("hukum keluarga")
+        match documents containing any of their tokens.
+
+        Args:
+            terms: Query keywords
+            document_types: Only return documents with these types
+            domains: Only return documents in these domains
+            limit: Maximum number of results
+
+        Returns:
+            List of (document id, score) sorted by descending score
+        """
+        query_tokens = set()
+        for term in terms:
+            query_tokens.update(tokenize(term))
+
+        if not query_tokens or limit <= 0:
+            return []
+
+        type_filter = {t.lower() for t in document_types} if document_types else None
+        domain_filter = {d.lower() for d in domains} if domains else None
+
+        with self._lock:
+            total_docs = self._live_documents
+            if total_docs == 0:
+                return []
+
+            average_lengths = [
+                (total / total_docs) or 1.0
+                for total in self._total_field_lengths
+            ]
+            weights = [FIELD_WEIGHTS[name] for name in FIELDS]
+            k1 = self.k1
+            b = self.b
+
+            scores: Dict[int, float] = {}
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+
+                doc_freq = len(postings)
+                idf = math.log(1.0 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+                for doc_number, frequencies in postings.items():
+                    if type_filter is not None or domain_filter is not None:
+                        doc_type, doc_domain = self._doc_meta[doc_number]
+                        if type_filter is not None and doc_type not in type_filter:
+                            continue
+                        if domain_filter is not None and doc_domain not in domain_filter:
+                            continue
+
+                    lengths = self._field_lengths[doc_number]
+                    weighted_tf = 0.0
+                    for slot, tf in enumerate(frequencies):
+                        if tf:
+                            norm = 1.0 - b + b * lengths[slot] / average_lengths[slot]
+                            weighted_tf += weights[slot] * tf / norm
+
+                    scores[doc_number] = scores.get(doc_number, 0.0) + (
+                        idf * weighted_tf * (k1 + 1.0) / (weighted_tf + k1)
+                    )
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._doc_ids[doc_number], score) for doc_number, score in top]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Persist index to disk.
+
+        Writes to a temporary file first and atomically replaces the target,
+        so a crash mid-write never leaves a truncated index behind.
+        """
+        path = path or self.index_path
+        if not path:
+            return
+
+        with self._lock:
+            state = {
+                "version": INDEX_FORMAT_VERSION,
+                "fields": FIELDS,
+                "postings": self._postings,
+                "doc_ids": self._doc_ids,
+                "doc_meta": self._doc_meta,
+                "doc_terms": self._doc_terms,
+                "field_lengths": self._field_lengths,
+                "total_field_lengths": self._total_field_lengths,
+                "live_documents": self._live_documents,
+            }
+
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._pending_updates = 0
+
+        logger.info(f"Saved inverted index ({self._live_documents} docs) to {path}")
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """
+        Load index from disk.
+
+        The index file is local state written by `save`; it must not come
+        from an untrusted source.
+
+        Returns:
+            True if the index was loaded
+        """
+        path = path or self.index_path
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load inverted index from {path}: {e}")
+            return False
+
+        if state.get("version") != INDEX_FORMAT_VERSION or tuple(state.get("fields", ())) != FIELDS:
+            logger.warning(f"Ignoring inverted index with incompatible format: {path}")
+            return False
+
+        with self._lock:
+            self._postings = state["postings"]
+            self._doc_ids = state["doc_ids"]
+            self._doc_meta = state["doc_meta"]
+            self._doc_terms = state["doc_terms"]
+            self._field_lengths = state["field_lengths"]
+            self._total_field_lengths = state["total_field_lengths"]
+            self._live_documents = state["live_documents"]
+            self._doc_numbers = {
+                doc_id: doc_number
+                for doc_number, doc_id in enumerate(self._doc_ids)
+                if doc_id is not None
+            }
+            self._pending_updates = 0
+
+        logger.info(f"Loaded inverted index ({self._live_documents} docs) from {path}")
+        return True
+
+    async def save_async(self) -> None:
+        """Persist index without blocking the event loop"""
+        await asyncio.to_thread(self.save)
+
+    def _maybe_autosave(self) -> None:
+        """
+        Persist once enough incremental updates have accumulated.
+
+        When called from the event loop the snapshot is written on a worker
+        thread so request handling is not blocked by serialization.
+        """
+        if (
+            not self.index_path
+            or self._save_in_progress
+            or self._pending_updates < self.autosave_every
+        ):
+            return
+
+        self._save_in_progress = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            self._autosave()
+        else:
+            loop.run_in_executor(None, self._autosave)
+
+    def _autosave(self) -> None:
+        """Save and swallow errors (autosave must never fail an update)"""
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Inverted index autosave failed: {e}")
+        finally:
+            self._save_in_progress = False
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    async def build_from_edgedb(self, manager: Any, batch_size: int = 1000) -> int:
+        """
+        Rebuild the index from every LegalDocument in EdgeDB.
+
+        Pages through the corpus with keyset pagination on id so each batch
+        is an index range read instead of an OFFSET scan. Documents are
+        loaded into a fresh index while this one keeps serving searches;
+        updates that arrive meanwhile are replayed onto the fresh index and
+        its structures are swapped in under the lock.
+
+        Args:
+            manager: EdgeDBManager instance
+            batch_size: Documents fetched per round trip
+
+        Returns:
+            Number of documents indexed
+        """
+        query = """
+            SELECT LegalDocument {
+                id,
+                title,
+                summary,
+                content,
+                document_type := <str>.type,
+                domain := <str>.domain
+            }
+            FILTER .id > <uuid>$after
+            ORDER BY .id
+            LIMIT <int64>$limit
+        """
+
+        # Memory-only, so a full rebuild is persisted once at the end
+        fresh = InvertedIndex(
+            k1=self.k1,
+            b=self.b,
+            compact_ratio=self.compact_ratio,
+            compact_min_tombstones=self.compact_min_tombstones
+        )
+        after = "00000000-0000-0000-0000-000000000000"
+        total = 0
+
+        with self._lock:
+            if self._rebuild_journal is not None:
+                raise IndexRebuildInProgress("Inverted index rebuild already in progress")
+            self._rebuild_journal = {}
+
+        try:
+            while True:
+                batch = await manager.query(query, after=after, limit=batch_size)
+                if not batch:
+                    break
+
+                for doc in batch:
+                    fresh.add_document(
+                        doc_id=str(doc.id),
+                        title=doc.title,
+                        summary=doc.summary,
+                        content=doc.content,
+                        document_type=doc.document_type,
+                        domain=doc.domain
+                    )
+
+                total += len(batch)
+                after = str(batch[-1].id)
+                logger.info(f"Indexed {total} legal documents")
+
+                if len(batch) < batch_size:
+                    break
+
+            with self._lock:
+                for doc_id, fields in self._rebuild_journal.items():
+                    if fields is None:
+                        fresh.remove_document(doc_id)
+                    else:
+                        fresh.add_document(doc_id, **fields)
+                self._adopt_locked(fresh)
+        finally:
+            with self._lock:
+                self._rebuild_journal = None
+
+        await self.save_async()
+        return total
+
+    def _adopt_locked(self, other: "InvertedIndex") -> None:
+        """Take over the structures of another index; caller must hold the lock"""
+        self._postings = other._postings
+        self._doc_ids = other._doc_ids
+        self._doc_numbers = other._doc_numbers
+        self._doc_meta = other._doc_meta
+        self._doc_terms = other._doc_terms
+        self._field_lengths = other._field_lengths
+        self._total_field_lengths = other._total_field_lengths
+        self._live_documents = other._live_documents
+        self._pending_updates = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "documents": self._live_documents,
+            "terms": len(self._postings),
+            "postings": sum(len(p) for p in self._postings.values()),
+            "tombstones": self.tombstone_count,
+            "pending_updates": self._pending_updates,
+            "index_path": self.index_path,
+        }
+
+
+# Singleton instance
+_legal_document_index: Optional[InvertedIndex] = None
+
+
+def get_legal_document_index() -> InvertedIndex:
+    """
+    Get or create singleton LegalDocument index.
+
+    Location is controlled by KG_INDEX_PATH.
+    """
+    global _legal_document_index
+
+    if _legal_document_index is None:
+        _legal_document_index = InvertedIndex(
+            index_path=os.getenv("KG_INDEX_PATH", "data/kg_index/legal_documents.idx")
+        )
+
+    return _legal_document_index
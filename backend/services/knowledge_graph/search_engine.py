@@ -15,6 +15,7 @@ import logging
 import edgedb
 
 from ..edgedb.connection import get_edgedb_manager
+from .inverted_index import InvertedIndex, get_legal_document_index
 from ..ai.consensus_engine import get_consensus_engine, DualAIConsensusEngine
 from ..ark_ai_service import ArkAIService
 from ..ai.groq_service import get_groq_service
@@ -53,7 +54,7 @@ class KnowledgeGraphSearchEngine:
     Semantic search engine for legal documents in Knowledge Graph.
     
     Features:
-    - Full-text search across legal documents
+    - Full-text search across legal documents (inverted index + BM25)
     - Semantic similarity matching
     - AI-enhanced query understanding
     - Citation extraction and ranking
@@ -64,7 +65,8 @@ class KnowledgeGraphSearchEngine:
         self,
         edgedb_client: Optional[edgedb.AsyncIOClient] = None,
         consensus_engine: Optional[DualAIConsensusEngine] = None,
-        enable_ai_enhancement: bool = True
+        enable_ai_enhancement: bool = True,
+        search_index: Optional[InvertedIndex] = None
     ):
         """
         Initialize search engine.
@@ -73,9 +75,11 @@ class KnowledgeGraphSearchEngine:
             edgedb_client: EdgeDB client instance
             consensus_engine: Dual AI consensus engine for query enhancement
             enable_ai_enhancement: Whether to use AI for query enhancement
+            search_index: Inverted index over LegalDocuments (default: shared index)
         """
         self.edgedb_manager = get_edgedb_manager()
         self.edgedb_client = edgedb_client
+        self.search_index = search_index if search_index is not None else get_legal_document_index()
         self.enable_ai_enhancement = enable_ai_enhancement
         
         # Initialize AI consensus engine if enabled
@@ -237,12 +241,90 @@ class KnowledgeGraphSearchEngine:
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """
-        Search EdgeDB using full-text search.
+        Search legal documents.
+        
+        Ranks candidates with the in-process inverted index and only fetches
+        the winning documents from EdgeDB by id. Falls back to a
+        `contains_insensitive` scan while the index is still empty.
         
         Returns raw results from database.
         """
+        if len(self.search_index) > 0:
+            return await self._search_index(keywords, document_types, domains, limit)
+        
+        logger.warning("Inverted index is empty, falling back to EdgeDB scan")
+        return await self._scan_edgedb(keywords, limit)
+    
+    async def _search_index(
+        self,
+        keywords: List[str],
+        document_types: Optional[List[str]] = None,
+        domains: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank with the inverted index, then hydrate top hits from EdgeDB.
+        """
+        hits = self.search_index.search(
+            keywords,
+            document_types=document_types,
+            domains=domains,
+            limit=limit
+        )
+        if not hits:
+            return []
+        
+        try:
+            client = self.edgedb_client or await self.edgedb_manager.connect()
+            
+            query = """
+                SELECT LegalDocument {
+                    id,
+                    title,
+                    document_number,
+                    document_type,
+                    content,
+                    summary,
+                    issued_date,
+                    issuing_authority,
+                    url,
+                    metadata
+                }
+                FILTER .id IN array_unpack(<array<uuid>>$ids)
+            """
+            
+            results = await client.query(query, ids=[doc_id for doc_id, _ in hits])
+            by_id = {str(doc.id): doc for doc in results}
+            
+            # Keep BM25 order; ids deleted since indexing are skipped
+            documents = []
+            for doc_id, score in hits:
+                doc = by_id.get(doc_id)
+                if doc is None:
+                    continue
+                document = self._document_to_dict(doc)
+                document["index_score"] = score
+                documents.append(document)
+            
+            logger.info(f"Found {len(documents)} documents via inverted index")
+            return documents
+            
+        except Exception as e:
+            logger.error(f"EdgeDB hydration failed: {e}", exc_info=True)
+            return []
+    
+    async def _scan_edgedb(
+        self,
+        keywords: List[str],
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Search EdgeDB using a full `contains_insensitive` scan.
+        
+        Only used until the inverted index has been built.
+        """
         try:
-            client = self.edgedb_client or await self.edgedb_manager.get_client()
+            client = self.edgedb_client or await self.edgedb_manager.connect()
             
             # Build search query
             search_text = " ".join(keywords)
@@ -272,20 +354,7 @@ class KnowledgeGraphSearchEngine:
             results = await client.query(query, search_text=search_text, limit=limit)
             
             # Convert EdgeDB results to dicts
-            documents = []
-            for doc in results:
-                documents.append({
-                    "id": str(doc.id),
-                    "title": doc.title,
-                    "document_number": doc.document_number,
-                    "document_type": str(doc.document_type),
-                    "content": doc.content[:500] if doc.content else "",  # Truncate
-                    "summary": doc.summary,
-                    "issued_date": doc.issued_date,
-                    "issuing_authority": doc.issuing_authority,
-                    "url": doc.url,
-                    "metadata": doc.metadata or {}
-                })
+            documents = [self._document_to_dict(doc) for doc in results]
             
             logger.info(f"Found {len(documents)} documents in EdgeDB")
             return documents
@@ -294,6 +363,21 @@ class KnowledgeGraphSearchEngine:
             logger.error(f"EdgeDB search failed: {e}", exc_info=True)
             return []
     
+    def _document_to_dict(self, doc: Any) -> Dict[str, Any]:
+        """Convert EdgeDB LegalDocument object to dict"""
+        return {
+            "id": str(doc.id),
+            "title": doc.title,
+            "document_number": doc.document_number,
+            "document_type": str(doc.document_type),
+            "content": doc.content[:500] if doc.content else "",  # Truncate
+            "summary": doc.summary,
+            "issued_date": doc.issued_date,
+            "issuing_authority": doc.issuing_authority,
+            "url": doc.url,
+            "metadata": doc.metadata or {}
+        }
+    
     async def _rank_results(
         self,
         query: str,
@@ -303,6 +387,7 @@ class KnowledgeGraphSearchEngine:
         Rank search results by relevance to query.
         
         Uses simple scoring based on:
+        - BM25 score from the inverted index (normalized, when available)
         - Keyword matches in title (high weight)
         - Keyword matches in content (medium weight)
         - Document type relevance (law > regulation > case > article)
@@ -311,11 +396,20 @@ class KnowledgeGraphSearchEngine:
         query_lower = query.lower()
         query_words = set(re.findall(r'\b\w+\b', query_lower))
         
+        max_index_score = max(
+            (doc.get("index_score", 0.0) for doc in results),
+            default=0.0
+        )
+        
         ranked = []
         
         for doc in results:
             score = 0.0
             
+            # BM25 match (weight: 2.0)
+            if max_index_score > 0:
+                score += doc.get("index_score", 0.0) / max_index_score * 2.0
+            
             # Title match (weight: 3.0)
             title_lower = doc.get("title", "").lower()
             title_words = set(re.findall(r'\b\w+\b', title_lower))
@@ -447,7 +541,7 @@ class KnowledgeGraphSearchEngine:
             CitationInfo if found, None otherwise
         """
         try:
-            client = self.edgedb_client or await self.edgedb_manager.get_client()
+            client = self.edgedb_client or await self.edgedb_manager.connect()
             
             # Search by document number or title
             query = """
@@ -498,7 +592,8 @@ _search_engine_instance: Optional[KnowledgeGraphSearchEngine] = None
 def get_search_engine(
     edgedb_client: Optional[edgedb.AsyncIOClient] = None,
     consensus_engine: Optional[DualAIConsensusEngine] = None,
-    enable_ai_enhancement: bool = True
+    enable_ai_enhancement: bool = True,
+    search_index: Optional[InvertedIndex] = None
 ) -> KnowledgeGraphSearchEngine:
     """
     Get or create singleton search engine instance.
@@ -507,6 +602,7 @@ def get_search_engine(
         edgedb_client: Optional EdgeDB client
         consensus_engine: Optional consensus engine
         enable_ai_enhancement: Whether to enable AI features
+        search_index: Optional inverted index
     
     Returns:
         KnowledgeGraphSearchEngine instance
@@ -517,7 +613,8 @@ def get_search_engine(
         _search_engine_instance = KnowledgeGraphSearchEngine(
             edgedb_client=edgedb_client,
             consensus_engine=consensus_engine,
-            enable_ai_enhancement=enable_ai_enhancement
+            enable_ai_enhancement=enable_ai_enhancement,
+            search_index=search_index
         )
     
     return _search_engine_instance
@@ -15,14 +15,15 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 import json
+import os
 from datetime import datetime
 
 # AI/ML Libraries
 import openai
-import chromadb
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .retrieval import Chunk, RetrievalEngine
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("LegalAIOrchestrator")
@@ -255,16 +256,13 @@ class LegalNLU:
 class LegalRAG:
     """Retrieval-Augmented Generation for Indonesian Legal Knowledge"""
     
-    def __init__(self):
-        # Initialize ChromaDB
-        self.chroma_client = chromadb.Client()
-        self.legal_collection = self.chroma_client.get_or_create_collection(
-            name="indonesian_legal_docs"
+    def __init__(self, index_path: Optional[str] = None):
+        # Persistent vector index (memmap + IVF); embedding model default
+        # paraphrase-multilingual-MiniLM-L12-v2, di-encode per batch
+        self.engine = RetrievalEngine(
+            index_path or os.getenv("LEGAL_RAG_INDEX_PATH", "backend/data/legal_rag_index")
         )
         
-        # Initialize sentence transformer for embeddings
-        self.embedding_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        
         # Mock legal knowledge base (would be populated with real data)
         self._setup_mock_knowledge_base()
     
@@ -303,67 +301,64 @@ class LegalRAG:
             }
         ]
         
-        # Add to vector store
-        for doc in mock_docs:
-            self.add_legal_document(LegalDocument(**doc))
+        # Index persisten: hanya tambah yang belum ada; proses read-only
+        # (writer lock dipegang worker lain) membiarkan writer yang seed
+        missing = [doc for doc in mock_docs if self.engine.index.get_fingerprint(doc["id"]) is None]
+        if missing and not self.engine.index.read_only:
+            self.add_legal_documents([LegalDocument(**doc) for doc in missing])
     
     def add_legal_document(self, doc: LegalDocument):
         """Add legal document to vector store"""
+        self.add_legal_documents([doc])
+    
+    def add_legal_documents(self, docs: List[LegalDocument]):
+        """Add legal documents to vector store (one batched embedding call)"""
         try:
-            # Generate embedding
-            embedding = self.embedding_model.encode(doc.content)
-            
-            # Add to ChromaDB
-            self.legal_collection.add(
-                embeddings=[embedding.tolist()],
-                documents=[doc.content],
-                metadatas=[{
-                    "id": doc.id,
-                    "title": doc.title,
-                    "type": doc.type,
-                    "year": doc.year,
-                    "jurisdiction": doc.jurisdiction,
-                    "pasal": doc.pasal,
-                    "relevance_score": doc.relevance_score
-                }],
-                ids=[doc.id]
-            )
+            chunks = [
+                Chunk(
+                    chunk_id=doc.id,
+                    doc_id=doc.id,
+                    text=doc.content,
+                    title=doc.title,
+                    doc_type=doc.type,
+                    year=doc.year,
+                    pasal=doc.pasal,
+                    metadata={"jurisdiction": doc.jurisdiction, "relevance_score": doc.relevance_score}
+                )
+                for doc in docs
+            ]
+            self.engine.add_chunks(chunks)
+            for doc in docs:
+                self.engine.index.set_fingerprint(doc.id, doc.id)
+            self.engine.flush()
             
-            logger.info(f"Added legal document: {doc.id}")
+            logger.info(f"Added {len(docs)} legal documents")
             
         except Exception as e:
-            logger.error(f"Error adding document {doc.id}: {str(e)}")
+            logger.error(f"Error adding documents {[doc.id for doc in docs]}: {str(e)}")
     
     def retrieve_relevant_legal(self, query: LegalAnalysis, 
                                max_results: int = 5) -> List[LegalDocument]:
         """Retrieve relevant legal documents based on query"""
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query.processed_text)
-            
-            # Search in vector store
-            results = self.legal_collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=max_results
-            )
+            # Embed query + top-k search di index
+            hits = self.engine.search(query.processed_text, k=max_results)
             
             # Convert results to LegalDocument objects
             documents = []
-            if results['documents'] and results['documents'][0]:
-                for i, doc_content in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i]
-                    
-                    doc = LegalDocument(
-                        id=metadata['id'],
-                        title=metadata['title'],
-                        content=doc_content,
-                        type=metadata['type'],
-                        year=metadata['year'],
-                        jurisdiction=metadata['jurisdiction'],
-                        pasal=metadata.get('pasal'),
-                        relevance_score=metadata.get('relevance_score', 0.8)
-                    )
-                    documents.append(doc)
+            for hit in hits:
+                payload = hit.payload
+                doc = LegalDocument(
+                    id=payload['doc_id'],
+                    title=payload['title'],
+                    content=payload['text'],
+                    type=payload['doc_type'],
+                    year=payload['year'],
+                    jurisdiction=payload['metadata'].get('jurisdiction', 'Indonesia'),
+                    pasal=payload.get('pasal'),
+                    relevance_score=payload['metadata'].get('relevance_score', 0.8)
+                )
+                documents.append(doc)
             
             logger.info(f"Retrieved {len(documents)} relevant documents")
             return documents
@@ -297,17 +297,12 @@ Jangan tambahkan penjelasan lain."""
         
         return suggested[:3]  # Max 3 options
     
-    async def generate_ai_clarification(
+    async def _build_clarification_messages(
         self,
         user_message: str,
-        legal_area: LegalArea,
-        context: Dict[str, Any]
-    ) -> str:
-        """
-        Generate REAL AI response untuk clarification stage
-        Bukan template! Pakai LLM untuk understand & respond naturally
-        WITH RAG ENHANCEMENT if available!
-        """
+        legal_area: LegalArea
+    ) -> List[Dict[str, str]]:
+        """Prompt untuk clarification stage (dengan RAG jika tersedia)"""
         
         # Get RAG context if available
         rag_context = ""
@@ -339,32 +334,22 @@ Format:
 [2-3 Pertanyaan spesifik]
 [Kenapa ini penting]"""
 
-        try:
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"User berkata: {user_message}"}
-            ]
-            
-            response = await ai_service.get_chat_completion(messages)
-            return response.get("response", "Bisa tolong ceritakan lebih detail?")
-            
-        except Exception as e:
-            print(f"AI clarification failed: {e}")
-            # Fallback ke template
-            questions = self.generate_clarifying_questions(legal_area, context)
-            return f"Saya memahami situasi Anda. Untuk analisis yang akurat, saya perlu tahu:\n\n" + "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"User berkata: {user_message}"}
+        ]
     
-    async def generate_ai_analysis_with_features(
+    def _clarification_fallback(self, legal_area: LegalArea, context: Dict[str, Any]) -> str:
+        questions = self.generate_clarifying_questions(legal_area, context)
+        return f"Saya memahami situasi Anda. Untuk analisis yang akurat, saya perlu tahu:\n\n" + "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
+    
+    def _build_analysis_messages(
         self,
         conversation_summary: str,
         legal_area: LegalArea,
-        features: List[Dict[str, Any]],
-        context: Dict[str, Any]
-    ) -> str:
-        """
-        Generate REAL AI analysis & feature suggestion
-        AI akan explain WHY fitur-fitur ini relevan, bukan cuma list
-        """
+        features: List[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """Prompt untuk analysis + feature offer stage"""
         
         features_desc = "\n".join([
             f"- {f['name']} ({f['tier']}): {f['description']}"
@@ -391,12 +376,74 @@ Jangan:
 
 Gaya: Friendly advisor yang peduli, bukan sales pitch!"""
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Ringkasan situasi user: {conversation_summary}"}
+        ]
+    
+    def _build_general_messages(
+        self,
+        user_message: str,
+        legal_area: LegalArea,
+        signals: Dict[str, Any],
+        conversation_history: List[Dict[str, str]] = None
+    ) -> List[Dict[str, str]]:
+        """Prompt untuk general conversation"""
+        system_prompt = f"""Kamu adalah AI Konsultan Hukum Indonesia (Pasalku.AI).
+Area: {legal_area.value}
+Context: {json.dumps(signals, ensure_ascii=False)}
+
+Tugasmu: Jawab pertanyaan user dengan natural & helpful.
+Gunakan pengetahuan hukum Indonesia yang akurat.
+Selalu sebutkan rujukan hukum (UU/PP) jika relevan."""
+
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        # Add conversation history
+        if conversation_history:
+            for msg in conversation_history[-4:]:  # Last 4 messages
+                messages.append({
+                    "role": msg.get("role", "user"),
+                    "content": msg.get("content", "")
+                })
+        
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    async def generate_ai_clarification(
+        self,
+        user_message: str,
+        legal_area: LegalArea,
+        context: Dict[str, Any]
+    ) -> str:
+        """
+        Generate REAL AI response untuk clarification stage
+        Bukan template! Pakai LLM untuk understand & respond naturally
+        WITH RAG ENHANCEMENT if available!
+        """
         try:
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Ringkasan situasi user: {conversation_summary}"}
-            ]
+            messages = await self._build_clarification_messages(user_message, legal_area)
+            response = await ai_service.get_chat_completion(messages)
+            return response.get("response", "Bisa tolong ceritakan lebih detail?")
             
+        except Exception as e:
+            print(f"AI clarification failed: {e}")
+            # Fallback ke template
+            return self._clarification_fallback(legal_area, context)
+    
+    async def generate_ai_analysis_with_features(
+        self,
+        conversation_summary: str,
+        legal_area: LegalArea,
+        features: List[Dict[str, Any]],
+        context: Dict[str, Any]
+    ) -> str:
+        """
+        Generate REAL AI analysis & feature suggestion
+        AI akan explain WHY fitur-fitur ini relevan, bukan cuma list
+        """
+        try:
+            messages = self._build_analysis_messages(conversation_summary, legal_area, features)
             response = await ai_service.get_chat_completion(messages)
             return response.get("response", "Berdasarkan situasi Anda, saya punya beberapa tools yang bisa membantu.")
             
@@ -404,27 +451,20 @@ Gaya: Friendly advisor yang peduli, bukan sales pitch!"""
             print(f"AI analysis failed: {e}")
             return f"Berdasarkan situasi Anda, saya bisa membantu dengan {len(features)} tools yang relevan."
     
-    async def orchestrate(
+    async def _plan_turn(
         self,
         user_message: str,
-        conversation_history: List[Dict[str, str]] = None,
-        user_tier: UserTier = UserTier.FREE,
-        context: Dict[str, Any] = None
+        conversation_history: List[Dict[str, str]],
+        user_tier: UserTier,
+        context: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Main orchestration function - NOW WITH REAL AI!
+        STEP 1-3 + response skeleton (semua kecuali AI message).
         
-        Returns response structure dengan:
-        - stage: conversation stage
-        - legal_area: detected area
-        - response_type: 'question', 'analysis', 'feature_offer', 'execution'
-        - content: actual AI-generated response
-        - features: suggested features (if applicable)
+        Returns:
+            Dict with "result" (response tanpa "message"), "messages"
+            (prompt untuk LLM) and "fallback" (message jika LLM gagal)
         """
-        
-        if context is None:
-            context = {}
-        
         # STEP 1: Detect legal area (hybrid: keyword + AI fallback)
         legal_area = self.detect_legal_area(user_message)
         if legal_area == LegalArea.GENERAL and len(user_message) > 20:
@@ -439,79 +479,111 @@ Gaya: Friendly advisor yang peduli, bukan sales pitch!"""
         # STEP 3: Determine stage
         stage = self.determine_stage(context)
         
-        # STEP 4: Generate REAL AI response based on stage
+        result = {
+            "stage": stage.value,
+            "legal_area": legal_area.value,
+            "signals": signals,
+            "ai_powered": True
+        }
+        
         if stage == ConversationStage.INITIAL or stage == ConversationStage.CLARIFICATION:
-            # Generate AI clarification questions
-            ai_message = await self.generate_ai_clarification(user_message, legal_area, context)
-            questions = self.generate_clarifying_questions(legal_area, context)  # Keep for frontend
-            
-            return {
-                "stage": stage.value,
-                "legal_area": legal_area.value,
-                "response_type": "clarification",
-                "questions": questions,
-                "signals": signals,
-                "message": ai_message,  # AI-generated message!
-                "ai_powered": True
-            }
+            result["response_type"] = "clarification"
+            result["questions"] = self.generate_clarifying_questions(legal_area, context)  # Keep for frontend
+            try:
+                messages = await self._build_clarification_messages(user_message, legal_area)
+            except Exception as e:
+                print(f"AI clarification failed: {e}")
+                messages = None
+            fallback = self._clarification_fallback(legal_area, context)
         
         elif stage == ConversationStage.ANALYSIS:
-            # Get features
             features = self.get_feature_suggestions(legal_area, context, user_tier)
+            result["response_type"] = "feature_offer"
+            result["features"] = features
             
-            # Generate AI analysis
             conversation_summary = " ".join([msg.get("content", "") for msg in (conversation_history or [])])
-            ai_message = await self.generate_ai_analysis_with_features(
-                conversation_summary, legal_area, features, context
-            )
-            
-            return {
-                "stage": stage.value,
-                "legal_area": legal_area.value,
-                "response_type": "feature_offer",
-                "features": features,
-                "signals": signals,
-                "message": ai_message,  # AI-generated analysis!
-                "ai_powered": True
-            }
+            messages = self._build_analysis_messages(conversation_summary, legal_area, features)
+            fallback = f"Berdasarkan situasi Anda, saya bisa membantu dengan {len(features)} tools yang relevan."
         
         else:
-            # General conversation - full AI response
-            system_prompt = f"""Kamu adalah AI Konsultan Hukum Indonesia (Pasalku.AI).
-Area: {legal_area.value}
-Context: {json.dumps(signals, ensure_ascii=False)}
-
-Tugasmu: Jawab pertanyaan user dengan natural & helpful.
-Gunakan pengetahuan hukum Indonesia yang akurat.
-Selalu sebutkan rujukan hukum (UU/PP) jika relevan."""
-
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add conversation history
-            if conversation_history:
-                for msg in conversation_history[-4:]:  # Last 4 messages
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
-            
-            messages.append({"role": "user", "content": user_message})
-            
+            result["response_type"] = "general"
+            messages = self._build_general_messages(user_message, legal_area, signals, conversation_history)
+            fallback = "Silakan lanjutkan ceritakan masalah Anda..."
+        
+        return {"result": result, "messages": messages, "fallback": fallback}
+    
+    async def orchestrate(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        user_tier: UserTier = UserTier.FREE,
+        context: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Main orchestration function - NOW WITH REAL AI!
+        
+        Returns response structure dengan:
+        - stage: conversation stage
+        - legal_area: detected area
+        - response_type: 'question', 'analysis', 'feature_offer', 'execution'
+        - content: actual AI-generated response
+        - features: suggested features (if applicable)
+        """
+        
+        if context is None:
+            context = {}
+        
+        plan = await self._plan_turn(user_message, conversation_history, user_tier, context)
+        
+        # STEP 4: Generate REAL AI response based on stage
+        ai_message = plan["fallback"]
+        if plan["messages"]:
             try:
-                response = await ai_service.get_chat_completion(messages)
-                ai_message = response.get("response", "Silakan lanjutkan...")
+                response = await ai_service.get_chat_completion(plan["messages"])
+                ai_message = response.get("response") or plan["fallback"]
             except Exception as e:
                 print(f"AI response failed: {e}")
-                ai_message = "Silakan lanjutkan ceritakan masalah Anda..."
-            
-            return {
-                "stage": stage.value,
-                "legal_area": legal_area.value,
-                "response_type": "general",
-                "message": ai_message,
-                "signals": signals,
-                "ai_powered": True
-            }
+        
+        return {**plan["result"], "message": ai_message}
+    
+    async def orchestrate_stream(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        user_tier: UserTier = UserTier.FREE,
+        context: Dict[str, Any] = None
+    ):
+        """
+        Streaming version of orchestrate.
+        
+        Yields:
+            {"type": "meta", ...} with stage/legal_area/questions/features,
+            {"type": "delta", "content": ...} as the AI message is generated,
+            then {"type": "done", ...} with the same payload as orchestrate()
+        """
+        if context is None:
+            context = {}
+        
+        plan = await self._plan_turn(user_message, conversation_history, user_tier, context)
+        yield {"type": "meta", **plan["result"]}
+        
+        parts = []
+        if plan["messages"]:
+            try:
+                async for event in ai_service.stream_chat_completion(plan["messages"]):
+                    if event["type"] == "delta":
+                        parts.append(event["content"])
+                        yield event
+            except Exception as e:
+                print(f"AI response failed: {e}")
+        
+        ai_message = "".join(parts)
+        if not ai_message:
+            # Nothing streamed yet - send fallback as a single delta
+            ai_message = plan["fallback"]
+            yield {"type": "delta", "content": ai_message}
+        
+        yield {"type": "done", **plan["result"], "message": ai_message}
 
 
 # Global instance
@@ -4,37 +4,80 @@ TANPA TRAINING MODEL! Pakai vector database + pre-trained LLM
 """
 
 from typing import List, Dict, Any, Optional
+import asyncio
 import os
 from datetime import datetime
+from pathlib import Path
 
-# Nanti pakai library ini (install dulu):
-# pip install chromadb sentence-transformers pypdf
+from .retrieval import EmbedderMismatchError, RetrievalEngine
+
+try:
+    import fitz  # PyMuPDF untuk PDF
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+    fitz = None
+
+try:
+    import docx2txt
+    HAS_DOCX2TXT = True
+except ImportError:
+    HAS_DOCX2TXT = False
+    docx2txt = None
+
+# Embedding: pip install sentence-transformers (tanpa itu pakai hashing embedder)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.md', '.docx')
+
+
+def extract_text(file_path: str) -> str:
+    """Extract teks dari PDF/TXT/MD/DOCX (kosong jika format tidak didukung)"""
+    suffix = Path(file_path).suffix.lower()
+    if suffix in ('.txt', '.md'):
+        return Path(file_path).read_text(encoding="utf-8", errors="ignore")
+    if suffix == '.pdf' and HAS_FITZ:
+        with fitz.open(file_path) as pdf:
+            return "\n".join(page.get_text() for page in pdf)
+    if suffix == '.docx' and HAS_DOCX2TXT:
+        return docx2txt.process(file_path) or ""
+    return ""
+
+
+def _file_fingerprint(file_path: str) -> str:
+    stat = os.stat(file_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
 
 
 class RAGService:
     """
     RAG = Kasih AI "buku referensi" hukum Indonesia
     AI baca buku ini sebelum jawab pertanyaan user
+
+    Dokumen dipecah per pasal/ayat, di-embed per batch, dan disimpan di
+    vector index lokal (memory-mapped int8 + IVF) yang persisten di disk.
     """
     
-    def __init__(self):
-        # Vector DB untuk simpan dokumen hukum
-        # Nanti initialize ChromaDB atau Pinecone
-        self.vector_db = None
+    def __init__(
+        self,
+        docs_path: Optional[str] = None,
+        index_path: Optional[str] = None,
+        embedder=None
+    ):
+        self.docs_path = docs_path or os.getenv("RAG_DOCUMENTS_PATH", "backend/data/legal_documents/")
+        self.index_path = index_path or os.getenv("RAG_INDEX_PATH", "backend/data/rag_index")
+        self.embedder = embedder
+        self.engine: Optional[RetrievalEngine] = None
         self.initialized = False
     
     async def initialize(self):
-        """Setup vector database"""
+        """Load/buat vector index lalu sinkronkan dengan folder dokumen"""
         try:
-            try:
-                import chromadb
-                self.vector_db = chromadb.PersistentClient(path="./data/chroma_db")
-                self.collection = self.vector_db.get_or_create_collection("legal_docs")
-                print("✅ ChromaDB initialized")
-            except ImportError:
-                print("⚠️ ChromaDB not installed. Install with: pip install chromadb sentence-transformers")
-                self.initialized = False
-                return
+            if self.engine is None:
+                # Load model embedding & memmap index di thread (blocking)
+                self.engine = await asyncio.to_thread(
+                    RetrievalEngine, self.index_path, embedder=self.embedder
+                )
+                print(f"✅ Vector index ready: {self.engine.index.size} chunks")
             
             # Load dokumen hukum
             await self._load_legal_documents()
@@ -47,69 +90,101 @@ class RAGService:
     
     async def _load_legal_documents(self):
         """
-        Load dokumen hukum ke vector database
+        Index dokumen hukum di docs_path (incremental)
         TIDAK PERLU TRAINING! Cukup upload PDF!
+
+        - Subfolder pertama dipakai sebagai domain (employment/, consumer/, ...)
+        - File yang tidak berubah (size + mtime sama) dilewati
+        - File yang dihapus dari folder ikut dihapus dari index
         """
         
-        # Path ke folder dokumen
-        docs_path = "backend/data/legal_documents/"
-        
-        if not os.path.exists(docs_path):
-            os.makedirs(docs_path)
-            print(f"📁 Created folder: {docs_path}")
+        if not os.path.exists(self.docs_path):
+            os.makedirs(self.docs_path)
+            print(f"📁 Created folder: {self.docs_path}")
             print("ℹ️  Upload dokumen hukum (PDF/TXT) ke folder ini")
             return
         
-        # Scan semua file
-        files = os.listdir(docs_path)
-        
-        for file in files:
-            if file.endswith(('.pdf', '.txt', '.docx')):
-                file_path = os.path.join(docs_path, file)
-                # Extract text dari dokumen
-                # text = extract_text(file_path)
-                # Simpan ke vector DB
-                # self.collection.add(documents=[text], ids=[file])
-                print(f"📄 Loaded: {file}")
+        await asyncio.to_thread(self._sync_documents)
+    
+    def _sync_documents(self):
+        if self.engine.index.read_only:
+            print("📖 RAG index dibuka read-only (proses lain yang sinkronisasi folder)")
+            return
+        root = Path(self.docs_path)
+        indexed = self.engine.index.list_documents()
+        seen = set()
+        
+        for file_path in sorted(root.rglob("*")):
+            if not file_path.is_file() or file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            doc_id = file_path.relative_to(root).as_posix()
+            seen.add(doc_id)
+            fingerprint = _file_fingerprint(str(file_path))
+            if indexed.get(doc_id) == fingerprint:
+                continue
+            
+            relative = file_path.relative_to(root)
+            domain = relative.parts[0] if len(relative.parts) > 1 else "umum"
+            added = self.engine.add_document(
+                extract_text(str(file_path)),
+                doc_id=doc_id,
+                domain=domain,
+                fingerprint=fingerprint
+            )
+            print(f"📄 Loaded: {doc_id} ({added} chunks)")
+        
+        for doc_id in set(indexed) - seen:
+            self.engine.delete_document(doc_id)
+            print(f"🗑️ Removed: {doc_id}")
+        
+        self.engine.flush()
     
     async def search_relevant_docs(
         self, 
         query: str, 
-        top_k: int = 3
+        top_k: int = 3,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Cari dokumen yang relevan dengan pertanyaan user
+        Cari potongan pasal/ayat yang relevan dengan pertanyaan user
+        
+        Args:
+            query: Pertanyaan user
+            top_k: Jumlah hasil
+            filters: Pre-filter metadata: doc_type ("uu"/"pp"/...), domain,
+                year, year_min, year_max
         
         Example:
             query = "Saya di-PHK, berhak pesangon?"
             returns = [
-                {"doc": "PP 35 Tahun 2021", "content": "Pesangon = 2x upah..."},
-                {"doc": "UU Ketenagakerjaan", "content": "PHK harus ada alasan..."}
+                {"document": "PP No. 35 Tahun 2021 Pasal 40 ayat (2)", "content": "Uang pesangon ...", ...},
+                {"document": "UU No. 13 Tahun 2003 Pasal 151 ayat (1)", "content": "Pengusaha ...", ...}
             ]
         """
         
-        if not self.initialized:
+        if not self.initialized or self.engine is None:
             return []
         
-        # Search di vector DB (similarity search)
-        # results = self.collection.query(query_texts=[query], n_results=top_k)
+        try:
+            hits = await asyncio.to_thread(self.engine.search, query, top_k, filters)
+        except EmbedderMismatchError as e:
+            print(f"⚠️ RAG search ditolak: {e}")
+            return []
         
-        # Dummy results for now
-        dummy_results = [
-            {
-                "document": "PP No. 35 Tahun 2021",
-                "content": "Pesangon untuk masa kerja 5 tahun adalah 2 bulan upah dikali masa kerja...",
-                "relevance_score": 0.92
-            },
+        return [
             {
-                "document": "UU No. 13 Tahun 2003",
-                "content": "PHK hanya dapat dilakukan dengan alasan yang sah...",
-                "relevance_score": 0.85
+                "document": hit.payload.get("label") or hit.payload.get("title"),
+                "content": hit.payload.get("text", ""),
+                "relevance_score": round(hit.score, 4),
+                "source": hit.payload.get("doc_id"),
+                "doc_type": hit.payload.get("doc_type"),
+                "domain": hit.payload.get("domain"),
+                "year": hit.payload.get("year"),
+                "pasal": hit.payload.get("pasal"),
+                "ayat": hit.payload.get("ayat")
             }
+            for hit in hits
         ]
-        
-        return dummy_results
-    
     async def get_augmented_context(
         self,
         user_query: str,
@@ -150,26 +225,48 @@ class RAGService:
         self,
         file_path: str,
         metadata: Optional[Dict] = None
-    ):
+    ) -> int:
         """
         Tambah dokumen baru ke knowledge base
         REAL-TIME! Tidak perlu re-training!
+
+        Args:
+            file_path: Path PDF/TXT/DOCX
+            metadata: Opsional title, doc_type, year, domain + metadata lain
+
+        Returns:
+            Jumlah chunk yang di-index
         """
         
         if not self.initialized:
             await self.initialize()
+        if self.engine is None:
+            return 0
         
-        # Extract text
-        # text = extract_text(file_path)
-        
-        # Add to vector DB
-        # self.collection.add(
-        #     documents=[text],
-        #     metadatas=[metadata or {}],
-        #     ids=[os.path.basename(file_path)]
-        # )
+        metadata = dict(metadata or {})
+        text = await asyncio.to_thread(extract_text, file_path)
+        added = await asyncio.to_thread(
+            self.engine.add_document,
+            text,
+            metadata.pop("doc_id", os.path.basename(file_path)),
+            metadata.pop("title", None),
+            metadata.pop("doc_type", None),
+            metadata.pop("year", None),
+            metadata.pop("domain", "umum"),
+            metadata
+        )
+        await asyncio.to_thread(self.engine.flush)
         
-        print(f"✅ Added document: {os.path.basename(file_path)}")
+        print(f"✅ Added document: {os.path.basename(file_path)} ({added} chunks)")
+        return added
+    
+    async def delete_document(self, doc_id: str) -> int:
+        """Hapus semua chunk dokumen dari index"""
+        if self.engine is None:
+            return 0
+        deleted = await asyncio.to_thread(self.engine.delete_document, doc_id)
+        await asyncio.to_thread(self.engine.flush)
+        return deleted
 
 
 # Global instance
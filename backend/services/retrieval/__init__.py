@@ -0,0 +1,60 @@
+"""
+Local Retrieval Subsystem (RAG)
+
+Komponen:
+1. Statute Chunker - Pecah UU/PP per pasal/ayat
+2. Embeddings - Batched sentence-transformers (fallback: hashing)
+3. Vector Index - Memory-mapped float16/int8 matrix + IVF + metadata pre-filter
+4. Retrieval Engine - Chunk -> embed -> index -> search
+"""
+
+from .chunker import (
+    Chunk,
+    StatuteChunker,
+    detect_document_info
+)
+
+from .embeddings import (
+    Embedder,
+    SentenceTransformerEmbedder,
+    HashingEmbedder,
+    get_default_embedder,
+    l2_normalize
+)
+
+from .vector_index import (
+    VectorIndex,
+    SearchHit,
+    ReadOnlyIndexError
+)
+
+from .engine import (
+    RetrievalEngine,
+    EmbedderMismatchError,
+    fingerprint_text
+)
+
+
+__all__ = [
+    # Chunker
+    "Chunk",
+    "StatuteChunker",
+    "detect_document_info",
+
+    # Embeddings
+    "Embedder",
+    "SentenceTransformerEmbedder",
+    "HashingEmbedder",
+    "get_default_embedder",
+    "l2_normalize",
+
+    # Vector Index
+    "VectorIndex",
+    "SearchHit",
+    "ReadOnlyIndexError",
+
+    # Engine
+    "RetrievalEngine",
+    "EmbedderMismatchError",
+    "fingerprint_text",
+]
@@ -0,0 +1,221 @@
+"""
+Statute Chunker
+
+Splits Indonesian statutes (UU, PP, Perpres, KUHP, ...) into retrieval
+chunks at pasal/ayat granularity so a hit points to "Pasal 156 ayat (2)"
+instead of a whole 200-page PDF.
+
+Rules:
+- Each "Pasal N" heading starts a new pasal
+- Numbered "(1)", "(2)" paragraphs inside a pasal become ayat chunks
+- Long pasal/ayat texts are further split on sentence boundaries
+  (max_chars) with the pasal/ayat label preserved
+- Text before the first pasal (konsiderans, menimbang, mengingat) is kept
+  as a "preamble" chunk
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# "Pasal 1", "Pasal 27A" at the start of a line
+_PASAL_RE = re.compile(r"^[ \t]*Pasal[ \t]+(\d+[A-Z]?)[ \t]*$", re.MULTILINE)
+
+# "(1) ..." ayat marker at the start of a line
+_AYAT_RE = re.compile(r"^[ \t]*\((\d+[a-z]?)\)[ \t]+", re.MULTILINE)
+
+# "UU No. 13 Tahun 2003", "Undang-Undang Nomor 11 Tahun 2020", "PP 35/2021"
+_TITLE_RE = re.compile(
+    r"\b(UU|Undang-Undang|PP|Peraturan Pemerintah|Perpres|Peraturan Presiden|Permen\w*)"
+    r"[^\d]{0,40}?(?:No(?:mor|\.)?\s*)?(\d+)\s*(?:Tahun\s*|/)(\d{4})",
+    re.IGNORECASE
+)
+
+_SENTENCE_RE = re.compile(r"(?<=[\.;:])\s+")
+
+_TYPE_ALIASES = {
+    "uu": "uu",
+    "undang-undang": "uu",
+    "pp": "pp",
+    "peraturan pemerintah": "pp",
+    "perpres": "perpres",
+    "peraturan presiden": "perpres",
+}
+
+
+@dataclass
+class Chunk:
+    """Single retrieval unit (pasal, ayat or preamble)"""
+    chunk_id: str
+    doc_id: str
+    text: str
+    title: str
+    doc_type: str = "lainnya"
+    year: int = 0
+    domain: str = "umum"
+    pasal: Optional[str] = None
+    ayat: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        """Human-readable citation, e.g. "UU 13/2003 Pasal 156 ayat (2)" """
+        parts = [self.title]
+        if self.pasal:
+            parts.append(f"Pasal {self.pasal}")
+        if self.ayat:
+            parts.append(f"ayat ({self.ayat})")
+        return " ".join(parts)
+
+
+def detect_document_info(text: str, fallback_title: str = "") -> Dict[str, Any]:
+    """
+    Guess title, peraturan type and year from the first lines of a statute.
+
+    Returns:
+        {"title": str, "doc_type": str, "year": int}
+    """
+    match = _TITLE_RE.search(text[:2000])
+    if not match:
+        return {"title": fallback_title, "doc_type": "lainnya", "year": 0}
+
+    raw_type = match.group(1).lower()
+    doc_type = _TYPE_ALIASES.get(raw_type, "permen" if raw_type.startswith("permen") else "lainnya")
+    number, year = match.group(2), int(match.group(3))
+    return {
+        "title": f"{doc_type.upper()} No. {number} Tahun {year}",
+        "doc_type": doc_type,
+        "year": year,
+    }
+
+
+class StatuteChunker:
+    """
+    Pasal/ayat chunker for Indonesian statutes.
+
+    Args:
+        max_chars: Split chunks longer than this on sentence boundaries
+        min_chars: Merge tiny trailing pieces into the previous piece
+        split_ayat: Emit one chunk per ayat (False = one chunk per pasal)
+    """
+
+    def __init__(self, max_chars: int = 1200, min_chars: int = 80, split_ayat: bool = True):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.split_ayat = split_ayat
+
+    def chunk(
+        self,
+        text: str,
+        doc_id: str,
+        title: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        year: Optional[int] = None,
+        domain: str = "umum",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Chunk]:
+        """Chunk one document (see iter_chunks)"""
+        return list(self.iter_chunks(text, doc_id, title, doc_type, year, domain, metadata))
+
+    def iter_chunks(
+        self,
+        text: str,
+        doc_id: str,
+        title: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        year: Optional[int] = None,
+        domain: str = "umum",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Chunk]:
+        """
+        Chunk one document.
+
+        Args:
+            text: Full statute text
+            doc_id: Stable document id (used as chunk id prefix)
+            title/doc_type/year: Override values detected from the text
+            domain: Legal domain (ketenagakerjaan, pidana, ...) for pre-filtering
+            metadata: Extra metadata copied to every chunk
+
+        Yields:
+            Chunk objects in document order
+        """
+        info = detect_document_info(text, fallback_title=title or doc_id)
+        base = {
+            "doc_id": doc_id,
+            "title": title or info["title"],
+            "doc_type": doc_type or info["doc_type"],
+            "year": int(year if year is not None else info["year"]),
+            "domain": domain,
+            "metadata": dict(metadata or {}),
+        }
+
+        headings = list(_PASAL_RE.finditer(text))
+        preamble = text[:headings[0].start()] if headings else text
+        for index, piece in enumerate(self._split_long(preamble)):
+            yield self._make_chunk(base, piece, None, None, index)
+
+        for i, heading in enumerate(headings):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+            pasal = heading.group(1)
+            body = text[heading.end():end]
+
+            ayat_marks = list(_AYAT_RE.finditer(body)) if self.split_ayat else []
+            if not ayat_marks:
+                for index, piece in enumerate(self._split_long(body)):
+                    yield self._make_chunk(base, piece, pasal, None, index)
+                continue
+
+            lead = body[:ayat_marks[0].start()]
+            for index, piece in enumerate(self._split_long(lead)):
+                yield self._make_chunk(base, piece, pasal, None, index)
+
+            for j, mark in enumerate(ayat_marks):
+                ayat_end = ayat_marks[j + 1].start() if j + 1 < len(ayat_marks) else len(body)
+                for index, piece in enumerate(self._split_long(body[mark.end():ayat_end])):
+                    yield self._make_chunk(base, piece, pasal, mark.group(1), index)
+
+    def _split_long(self, text: str) -> List[str]:
+        """Normalize whitespace and split on sentence boundaries above max_chars"""
+        text = " ".join(text.split())
+        if not text:
+            return []
+        if len(text) <= self.max_chars:
+            return [text]
+
+        pieces: List[str] = []
+        current = ""
+        for sentence in _SENTENCE_RE.split(text):
+            while len(sentence) > self.max_chars:  # kalimat super panjang
+                pieces.append(sentence[:self.max_chars])
+                sentence = sentence[self.max_chars:]
+            if current and len(current) + 1 + len(sentence) > self.max_chars:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            if pieces and len(current) < self.min_chars and len(pieces[-1]) + len(current) < self.max_chars * 1.25:
+                pieces[-1] = f"{pieces[-1]} {current}"
+            else:
+                pieces.append(current)
+        return pieces
+
+    @staticmethod
+    def _make_chunk(base: Dict[str, Any], text: str, pasal: Optional[str], ayat: Optional[str], index: int) -> Chunk:
+        locator = f"p{pasal or 0}-a{ayat or 0}-{index}"
+        digest = hashlib.sha1(f"{base['doc_id']}|{locator}".encode("utf-8")).hexdigest()[:16]
+        return Chunk(
+            chunk_id=digest,
+            doc_id=base["doc_id"],
+            text=text,
+            title=base["title"],
+            doc_type=base["doc_type"],
+            year=base["year"],
+            domain=base["domain"],
+            pasal=pasal,
+            ayat=ayat,
+            metadata=dict(base["metadata"]),
+        )
@@ -0,0 +1,122 @@
+"""
+Batched Text Embedders
+
+- SentenceTransformerEmbedder: multilingual MiniLM (default) encoded in
+  large batches with normalized outputs
+- HashingEmbedder: dependency-free fallback (feature hashing of word
+  unigrams/bigrams + char trigrams), deterministic across processes
+
+Both return float32 L2-normalized matrices so inner product == cosine.
+"""
+
+import logging
+import os
+import re
+import zlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise L2 normalization (zero rows stay zero)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class Embedder:
+    """Base interface: encode a batch of texts into an (n, dim) float32 matrix"""
+
+    dim: int = 0
+    name: str = "embedder"
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """sentence-transformers model, encoded in batches"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: Optional[str] = None):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers not installed. Install with: pip install sentence-transformers")
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.name = model_name
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Feature-hashing embedder (no model download).
+
+    Lexical only — good enough for statute lookup by keywords and as a
+    test/dev fallback when sentence-transformers is unavailable.
+    """
+
+    def __init__(self, dim: int = 384, char_ngrams: int = 3):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = list(tokens)
+        features.extend(f"{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+        n = self.char_ngrams
+        for token in tokens:
+            padded = f"#{token}#"
+            features.extend(f"c:{padded[i:i + n]}" for i in range(max(1, len(padded) - n + 1)))
+        return features
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 1 else -1.0
+                matrix[row, (digest >> 1) % self.dim] += sign
+        return l2_normalize(matrix)
+
+
+def get_default_embedder() -> Embedder:
+    """
+    Embedder from env RAG_EMBEDDING_MODEL ("hashing" forces the fallback).
+
+    Falls back to HashingEmbedder when sentence-transformers is missing.
+    """
+    model_name = os.getenv("RAG_EMBEDDING_MODEL", DEFAULT_MODEL)
+    if model_name != "hashing" and SENTENCE_TRANSFORMERS_AVAILABLE:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding model {model_name} unavailable ({e}), using hashing embedder")
+    elif model_name != "hashing":
+        logger.warning("⚠️ sentence-transformers not installed, using hashing embedder")
+    return HashingEmbedder(dim=int(os.getenv("RAG_HASHING_DIM", "384")))
@@ -0,0 +1,206 @@
+"""
+Retrieval Engine
+
+Glue between StatuteChunker, an Embedder and VectorIndex:
+chunk -> embed in large batches -> upsert into the persistent index,
+plus query-time embedding and filtered top-k search.
+
+The index remembers which embedder produced its vectors. Opening it with
+a different embedder (e.g. sentence-transformers missing, so the hashing
+fallback is used at the same dim) re-embeds the stored chunks, or raises
+EmbedderMismatchError when RAG_EMBEDDER_MISMATCH=error.
+"""
+
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from .chunker import Chunk, StatuteChunker
+from .embeddings import Embedder, get_default_embedder
+from .vector_index import SearchHit, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# "reindex" (default) atau "error"
+EMBEDDER_MISMATCH_POLICY = os.getenv("RAG_EMBEDDER_MISMATCH", "reindex")
+
+
+class EmbedderMismatchError(RuntimeError):
+    """Index dibangun dengan embedder lain; skor query tidak bermakna"""
+
+
+def _chunk_payload(chunk: Chunk) -> Dict[str, Any]:
+    return {
+        "doc_id": chunk.doc_id,
+        "text": chunk.text,
+        "title": chunk.title,
+        "label": chunk.label,
+        "doc_type": chunk.doc_type,
+        "domain": chunk.domain,
+        "year": chunk.year,
+        "pasal": chunk.pasal,
+        "ayat": chunk.ayat,
+        "metadata": chunk.metadata,
+    }
+
+
+def fingerprint_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class RetrievalEngine:
+    """
+    Local retrieval subsystem for statutes.
+
+    Args:
+        index_path: Directory of the persistent VectorIndex
+        embedder: Embedder instance (default: get_default_embedder())
+        chunker: StatuteChunker instance
+        batch_size: Texts per embedding batch
+        dtype: Vector storage ("int8" or "float16")
+        on_embedder_mismatch: "reindex" or "error" when the index was built
+            by another embedder (read-only processes refuse to search instead)
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        embedder: Optional[Embedder] = None,
+        chunker: Optional[StatuteChunker] = None,
+        batch_size: int = 256,
+        dtype: str = "int8",
+        on_embedder_mismatch: str = EMBEDDER_MISMATCH_POLICY,
+        **index_kwargs
+    ):
+        self.embedder = embedder or get_default_embedder()
+        self.chunker = chunker or StatuteChunker()
+        self.batch_size = batch_size
+        self.index = VectorIndex(
+            index_path, dim=self.embedder.dim, dtype=dtype, embedder=self.embedder.name, **index_kwargs
+        )
+        if self.index.dim != self.embedder.dim:
+            raise ValueError(
+                f"Index at {index_path} has dim={self.index.dim}, embedder {self.embedder.name} has dim={self.embedder.dim}"
+            )
+        if self.index.embedder != self.embedder.name:
+            if self.index.read_only:
+                logger.warning(
+                    f"⚠️ Index at {index_path} was embedded with {self.index.embedder}, "
+                    f"not {self.embedder.name}; searches refused until the writer re-embeds it"
+                )
+            elif on_embedder_mismatch == "error":
+                raise EmbedderMismatchError(
+                    f"Index at {index_path} was embedded with {self.index.embedder}, not {self.embedder.name}"
+                )
+            else:
+                self.reindex()
+
+    def add_chunks(self, chunks: Iterable[Chunk]) -> int:
+        """Embed and upsert chunks in batches; returns number added"""
+        added = 0
+        batch: List[Chunk] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                added += self._add_batch(batch)
+                batch = []
+        if batch:
+            added += self._add_batch(batch)
+        return added
+
+    def _add_batch(self, batch: List[Chunk]) -> int:
+        vectors = self.embedder.encode([f"{c.label}: {c.text}" for c in batch], batch_size=self.batch_size)
+        self.index.add([c.chunk_id for c in batch], vectors, [_chunk_payload(c) for c in batch])
+        return len(batch)
+
+    def add_document(
+        self,
+        text: str,
+        doc_id: str,
+        title: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        year: Optional[int] = None,
+        domain: str = "umum",
+        metadata: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None
+    ) -> int:
+        """
+        Chunk, embed and (re)index one document.
+
+        Unchanged documents (same fingerprint) are skipped; changed ones
+        have their old chunks deleted first.
+
+        Returns:
+            Number of chunks indexed (0 if unchanged)
+        """
+        fingerprint = fingerprint or fingerprint_text(text)
+        if self.index.get_fingerprint(doc_id) == fingerprint:
+            return 0
+        self.index.delete_document(doc_id)
+        added = self.add_chunks(self.chunker.iter_chunks(text, doc_id, title, doc_type, year, domain, metadata))
+        self.index.set_fingerprint(doc_id, fingerprint)
+        logger.info(f"📄 Indexed {doc_id}: {added} chunks")
+        return added
+
+    def delete_document(self, doc_id: str) -> int:
+        return self.index.delete_document(doc_id)
+
+    def reindex(self) -> int:
+        """
+        Re-embed every stored chunk with the current embedder.
+
+        Texts come from the stored payloads (label + text), so the source
+        documents are not needed.
+
+        Returns:
+            Number of chunks re-embedded
+        """
+        previous = self.index.embedder
+        total = 0
+        for batch in self.index.iter_payloads(self.batch_size):
+            payloads = [payload for _, payload in batch]
+            vectors = self.embedder.encode(
+                [f"{p.get('label')}: {p.get('text')}" for p in payloads], batch_size=self.batch_size
+            )
+            self.index.add([chunk_id for chunk_id, _ in batch], vectors, payloads)
+            total += len(batch)
+        self.index.compact()
+        if self.index.centroids is not None:
+            self.index.train()
+        self.index.embedder = self.embedder.name
+        self.index.flush()
+        logger.warning(f"⚠️ Re-embedded {total} chunks: {previous} -> {self.embedder.name}")
+        return total
+
+    def _check_embedder(self) -> None:
+        self.index.refresh()
+        if self.index.embedder != self.embedder.name:
+            raise EmbedderMismatchError(
+                f"Index at {self.index.path} was embedded with {self.index.embedder}, "
+                f"query embedder is {self.embedder.name}"
+            )
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        **search_kwargs
+    ) -> List[SearchHit]:
+        """Embed the query and return filtered top-k hits"""
+        self._check_embedder()
+        vector = self.embedder.encode([query])[0]
+        return self.index.search(vector, k=k, filters=filters, **search_kwargs)
+
+    def search_many(self, queries: List[str], k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchHit]]:
+        """Batch variant: one embedding call for all queries"""
+        self._check_embedder()
+        vectors = self.embedder.encode(queries, batch_size=self.batch_size)
+        return [self.index.search(vector, k=k, filters=filters) for vector in vectors]
+
+    def flush(self) -> None:
+        self.index.flush()
+
+    def close(self) -> None:
+        self.index.close()
@@ -0,0 +1,672 @@
+"""
+Persistent IVF Vector Index
+
+Disk-backed approximate nearest-neighbour index for legal chunks:
+
+- Vectors live in a memory-mapped float16 or int8 matrix (vectors.bin)
+  that grows by doubling; int8 rows carry a per-row float32 scale
+- IVF (inverted file) partitioning: spherical k-means centroids, one
+  posting list per centroid; a query scores only the `nprobe` closest
+  lists instead of every row
+- Metadata columns (doc_type, domain, year) are numpy arrays so filters
+  are a vectorized boolean mask applied *before* scoring; very selective
+  filters switch to exact search over the matching rows
+- Chunk payloads (text, title, pasal, ...) are stored in SQLite and only
+  fetched for the final top-k
+- Incremental add (upsert by chunk_id) and delete (tombstones +
+  compact()); flush() persists everything atomically next to the matrix
+- One writer per directory: the first process to take the writer lock
+  (.writer.lock) may write, the others open read-only and reload when
+  the writer flushes a new meta.json
+- meta.json records the embedder name so vectors from a different model
+  are never searched with the wrong query embedding (see RetrievalEngine)
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: satu proses, selalu writer
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+DTYPES = {"float16": np.float16, "int8": np.int8}
+
+# Kolom metadata yang bisa dipakai sebagai pre-filter
+FILTER_COLUMNS = ("doc_type", "domain")
+
+WRITER_LOCK_FILE = ".writer.lock"
+
+
+class ReadOnlyIndexError(RuntimeError):
+    """Write ke index yang dibuka read-only (writer lock dipegang proses lain)"""
+
+
+@dataclass
+class SearchHit:
+    """One search result"""
+    chunk_id: str
+    score: float
+    payload: Dict[str, Any]
+
+
+def _atomic_save(path: Path, writer) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        writer(f)
+    os.replace(tmp, path)
+
+
+class VectorIndex:
+    """
+    Memory-mapped IVF index with metadata pre-filtering.
+
+    Args:
+        path: Index directory (created if missing; loaded if it exists)
+        dim: Vector dimension (ignored when loading an existing index)
+        dtype: "int8" (default, fastest to dequantize) or "float16" storage
+        nprobe: Posting lists scored per query
+        train_threshold: Rows needed before IVF is trained (exact search below)
+        exact_threshold: Filtered candidate counts at or below this use exact search
+        embedder: Name of the embedder for a new index (loaded from meta.json otherwise)
+        read_only: True = never write; False = wait for the writer lock;
+            None = take the writer lock if free, else open read-only
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = 384,
+        dtype: str = "int8",
+        nprobe: int = 16,
+        train_threshold: int = 20000,
+        exact_threshold: int = 20000,
+        embedder: Optional[str] = None,
+        read_only: Optional[bool] = None
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype} (use float16 or int8)")
+
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.exact_threshold = exact_threshold
+        self._lock = threading.RLock()
+        self._writer_lock = None
+        self.read_only = not self._acquire_writer(read_only)
+
+        self.dim = dim
+        self.dtype = dtype
+        self.embedder = embedder
+        self._meta_mtime: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_count = 0
+        self.vocab: Dict[str, Dict[str, int]] = {column: {} for column in FILTER_COLUMNS}
+
+        self._conn = sqlite3.connect(str(self.path / "chunks.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE, doc_id TEXT, payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc ON chunks (doc_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (doc_id TEXT PRIMARY KEY, fingerprint TEXT)"
+        )
+        self._conn.commit()
+
+        if (self.path / "meta.json").exists():
+            self._load_meta_file()
+        else:
+            self._init_columns(0)
+            self._open_matrix(0 if self.read_only else 1024)
+
+        self._postings: Optional[List[np.ndarray]] = None
+        self._row_of: Dict[str, int] = dict(
+            self._conn.execute("SELECT chunk_id, row FROM chunks").fetchall()
+        )
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _acquire_writer(self, read_only: Optional[bool]) -> bool:
+        """Ambil writer lock; False jika index harus dibuka read-only"""
+        if read_only:
+            return False
+        if fcntl is None:
+            return True
+        lock_file = open(self.path / WRITER_LOCK_FILE, "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if read_only is False else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            logger.info(f"📖 Vector index {self.path} opened read-only (writer lock held by another process)")
+            return False
+        self._writer_lock = lock_file
+        return True
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ReadOnlyIndexError(f"Vector index {self.path} is read-only in this process")
+
+    def _init_columns(self, capacity: int) -> None:
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.years = np.zeros(capacity, dtype=np.int16)
+        self.codes = {column: np.zeros(capacity, dtype=np.int16) for column in FILTER_COLUMNS}
+        self.lists = np.full(capacity, -1, dtype=np.int32)
+        self.scales = np.ones(capacity, dtype=np.float32)
+
+    def _open_matrix(self, capacity: int) -> None:
+        """(Re)open vectors.bin with room for `capacity` rows"""
+        matrix_path = self.path / "vectors.bin"
+        if self.read_only:
+            # Reader tidak pernah menumbuhkan file; writer sudah melakukannya sebelum flush meta
+            if capacity == 0 or not matrix_path.exists():
+                capacity = 0
+                self.vectors = np.zeros((0, self.dim), dtype=DTYPES[self.dtype])
+            else:
+                self.vectors = np.memmap(matrix_path, dtype=DTYPES[self.dtype], mode="r", shape=(capacity, self.dim))
+        else:
+            itemsize = np.dtype(DTYPES[self.dtype]).itemsize
+            size = capacity * self.dim * itemsize
+            with open(matrix_path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self.vectors = np.memmap(matrix_path, dtype=DTYPES[self.dtype], mode="r+", shape=(capacity, self.dim))
+        # view ndarray biasa: fancy indexing tanpa overhead subclass memmap
+        self._matrix = self.vectors.view(np.ndarray)
+
+        if capacity > len(self.alive):
+            grow = capacity - len(self.alive)
+            self.alive = np.concatenate([self.alive, np.zeros(grow, dtype=bool)])
+            self.years = np.concatenate([self.years, np.zeros(grow, dtype=np.int16)])
+            self.codes = {
+                column: np.concatenate([values, np.zeros(grow, dtype=np.int16)])
+                for column, values in self.codes.items()
+            }
+            self.lists = np.concatenate([self.lists, np.full(grow, -1, dtype=np.int32)])
+            self.scales = np.concatenate([self.scales, np.ones(grow, dtype=np.float32)])
+        self.capacity = capacity
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        capacity = max(self.capacity, 1024)
+        while capacity < needed:
+            capacity *= 2
+        self.vectors.flush()
+        del self.vectors, self._matrix
+        self._open_matrix(capacity)
+
+    def _load_meta_file(self) -> None:
+        meta_path = self.path / "meta.json"
+        # mtime dibaca sebelum isi: jika writer flush di antaranya, refresh berikutnya memuat ulang
+        mtime = meta_path.stat().st_mtime_ns
+        self._load(json.loads(meta_path.read_text(encoding="utf-8")))
+        self._meta_mtime = mtime
+
+    def _load(self, meta: Dict[str, Any]) -> None:
+        self.dim = meta["dim"]
+        self.dtype = meta["dtype"]
+        self.embedder = meta.get("embedder")
+        # meta.json ditulis terakhir saat flush, jadi kolom yang dibaca
+        # sesudahnya tidak pernah lebih lama dari count ini
+        self.count = meta["count"]
+        self.trained_count = meta.get("trained_count", 0)
+        self.vocab = {column: dict(meta["vocab"].get(column, {})) for column in FILTER_COLUMNS}
+
+        with np.load(self.path / "columns.npz") as columns:
+            self.alive = columns["alive"]
+            self.years = columns["years"]
+            self.codes = {column: columns[f"code_{column}"] for column in FILTER_COLUMNS}
+            self.lists = columns["lists"]
+            self.scales = columns["scales"]
+
+        centroid_path = self.path / "centroids.npy"
+        self.centroids = np.load(centroid_path) if centroid_path.exists() else None
+        self._open_matrix(max(meta["capacity"], len(self.alive)))
+        logger.info(f"📂 Vector index loaded: {int(self.alive.sum())} chunks ({self.dtype}, dim={self.dim})")
+
+    def refresh(self) -> bool:
+        """
+        Read-only: reload state once the writer has flushed a new meta.json.
+
+        Returns:
+            True if the index was reloaded
+        """
+        if not self.read_only:
+            return False
+        try:
+            mtime = (self.path / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._meta_mtime:
+            return False
+        with self._lock:
+            self._load_meta_file()
+            self._row_of = dict(self._conn.execute("SELECT chunk_id, row FROM chunks").fetchall())
+            self._postings = None
+        return True
+
+    def flush(self) -> None:
+        """Persist matrix, columns, centroids and metadata (no-op when read-only)"""
+        if self.read_only:
+            return
+        with self._lock:
+            self.vectors.flush()
+            n = self.count
+            _atomic_save(self.path / "columns.npz", lambda f: np.savez(
+                f,
+                alive=self.alive[:n],
+                years=self.years[:n],
+                lists=self.lists[:n],
+                scales=self.scales[:n],
+                **{f"code_{column}": values[:n] for column, values in self.codes.items()}
+            ))
+            if self.centroids is not None:
+                _atomic_save(self.path / "centroids.npy", lambda f: np.save(f, self.centroids))
+            meta = {
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "embedder": self.embedder,
+                "count": self.count,
+                "capacity": self.capacity,
+                "trained_count": self.trained_count,
+                "vocab": self.vocab,
+            }
+            _atomic_save(self.path / "meta.json", lambda f: f.write(json.dumps(meta).encode("utf-8")))
+            self._conn.commit()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+            if self._writer_lock is not None:
+                self._writer_lock.close()  # fd ditutup = flock dilepas
+                self._writer_lock = None
+
+    @property
+    def size(self) -> int:
+        """Number of live (non-deleted) chunks"""
+        return len(self._row_of)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        vocab = self.vocab[column]
+        key = (value or "").lower()
+        if key not in vocab:
+            vocab[key] = len(vocab)
+        return vocab[key]
+
+    def _encode_rows(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Quantize normalized float32 rows for storage"""
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def add(
+        self,
+        chunk_ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict[str, Any]]
+    ) -> None:
+        """
+        Add or replace chunks.
+
+        Args:
+            chunk_ids: Unique ids (existing ids are replaced)
+            vectors: (n, dim) float32, L2-normalized
+            payloads: Per-chunk dicts; "doc_id", "doc_type", "domain" and
+                "year" keys feed the filter columns
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of shape (n, {self.dim}), got {vectors.shape}")
+        if not (len(chunk_ids) == len(vectors) == len(payloads)):
+            raise ValueError("chunk_ids, vectors and payloads must have the same length")
+        if not len(chunk_ids):
+            return
+        self._check_writable()
+
+        with self._lock:
+            self.delete([chunk_id for chunk_id in chunk_ids if chunk_id in self._row_of])
+
+            start = self.count
+            end = start + len(chunk_ids)
+            self._ensure_capacity(end)
+
+            stored, scales = self._encode_rows(vectors)
+            self.vectors[start:end] = stored
+            self.scales[start:end] = scales
+            self.alive[start:end] = True
+            self.years[start:end] = [int(p.get("year") or 0) for p in payloads]
+            for column in FILTER_COLUMNS:
+                self.codes[column][start:end] = [self._code(column, p.get(column)) for p in payloads]
+
+            if self.centroids is not None:
+                self.lists[start:end] = self._assign(vectors)
+                self._postings = None
+
+            rows = range(start, end)
+            self._conn.executemany(
+                "INSERT INTO chunks (row, chunk_id, doc_id, payload) VALUES (?, ?, ?, ?)",
+                [
+                    (row, chunk_id, payload.get("doc_id"), json.dumps(payload, ensure_ascii=False))
+                    for row, chunk_id, payload in zip(rows, chunk_ids, payloads)
+                ]
+            )
+            self._row_of.update(zip(chunk_ids, rows))
+            self.count = end
+
+            # Train IVF sekali cukup data; retrain kalau korpus tumbuh 4x
+            if self.centroids is None and self.size >= self.train_threshold:
+                self.train()
+            elif self.centroids is not None and self.size > 4 * max(self.trained_count, 1):
+                self.train()
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        """Tombstone chunks by id; returns number deleted"""
+        self._check_writable()
+        with self._lock:
+            rows = [self._row_of.pop(chunk_id) for chunk_id in chunk_ids if chunk_id in self._row_of]
+            if not rows:
+                return 0
+            self.alive[rows] = False
+            self._conn.executemany("DELETE FROM chunks WHERE row = ?", [(row,) for row in rows])
+            self._postings = None
+            return len(rows)
+
+    def delete_document(self, doc_id: str) -> int:
+        """Delete every chunk of a document"""
+        self._check_writable()
+        with self._lock:
+            chunk_ids = [r[0] for r in self._conn.execute("SELECT chunk_id FROM chunks WHERE doc_id = ?", (doc_id,))]
+            self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            return self.delete(chunk_ids)
+
+    def get_fingerprint(self, doc_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_fingerprint(self, doc_id: str, fingerprint: str) -> None:
+        self._check_writable()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, fingerprint) VALUES (?, ?)", (doc_id, fingerprint)
+            )
+
+    def list_documents(self) -> Dict[str, str]:
+        """doc_id -> fingerprint of every indexed document"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT doc_id, fingerprint FROM documents").fetchall())
+
+    def iter_payloads(self, batch_size: int = 1000) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Batches of (chunk_id, payload) for every live chunk, in row order.
+
+        Chunk ids are snapshotted up front, so the caller may re-add them
+        (e.g. re-embedding) while iterating.
+        """
+        with self._lock:
+            chunk_ids = [r[0] for r in self._conn.execute("SELECT chunk_id FROM chunks ORDER BY row")]
+        for start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[start:start + batch_size]
+            with self._lock:
+                payloads = dict(self._conn.execute(
+                    f"SELECT chunk_id, payload FROM chunks WHERE chunk_id IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+            yield [(chunk_id, json.loads(payloads[chunk_id])) for chunk_id in batch if chunk_id in payloads]
+
+    def compact(self) -> int:
+        """
+        Drop tombstoned rows and renumber the matrix.
+
+        Returns:
+            Number of rows reclaimed
+        """
+        self._check_writable()
+        with self._lock:
+            keep = np.flatnonzero(self.alive[:self.count])
+            reclaimed = self.count - len(keep)
+            if reclaimed == 0:
+                return 0
+
+            n = len(keep)
+            self.vectors[:n] = self.vectors[keep]
+            for name in ("alive", "years", "lists", "scales"):
+                values = getattr(self, name)
+                values[:n] = values[keep]
+                values[n:] = -1 if name == "lists" else (1 if name == "scales" else 0)
+            for values in self.codes.values():
+                values[:n] = values[keep]
+                values[n:] = 0
+
+            # row baru <= row lama, update ascending bebas bentrok PRIMARY KEY
+            self._conn.executemany(
+                "UPDATE chunks SET row = ? WHERE row = ?",
+                [(new, int(old)) for new, old in enumerate(keep) if new != old]
+            )
+            self._row_of = dict(self._conn.execute("SELECT chunk_id, row FROM chunks").fetchall())
+            self.count = n
+            self._postings = None
+            logger.info(f"🧹 Vector index compacted: {reclaimed} rows reclaimed")
+            return reclaimed
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _rows_float(self, rows: np.ndarray) -> np.ndarray:
+        """Dequantize stored rows to float32"""
+        matrix = self._matrix[rows].astype(np.float32)
+        if self.dtype == "int8":
+            matrix *= self.scales[rows][:, None]
+        return matrix
+
+    def _assign(self, vectors: np.ndarray, batch: int = 16384) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch):
+            out[start:start + batch] = np.argmax(vectors[start:start + batch] @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: int = 100000, seed: int = 0) -> None:
+        """
+        Train IVF centroids (spherical k-means on a sample) and assign all rows.
+
+        Args:
+            nlist: Number of posting lists (default ~sqrt(live rows))
+        """
+        self._check_writable()
+        with self._lock:
+            live = np.flatnonzero(self.alive[:self.count])
+            if len(live) == 0:
+                return
+            nlist = nlist or int(min(4096, max(16, math.sqrt(len(live)))))
+            nlist = min(nlist, len(live))
+
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(live, size=min(len(live), max(sample_size, nlist * 8)), replace=False))
+            sample = self._rows_float(sample_rows)
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                counts = np.bincount(assignment, minlength=nlist)
+                empty = counts == 0
+                if empty.any():  # centroid kosong di-reseed dari sample acak
+                    sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                centroids = (sums / norms).astype(np.float32)
+
+            self.centroids = centroids
+            for start in range(0, len(live), 65536):
+                rows = live[start:start + 65536]
+                self.lists[rows] = self._assign(self._rows_float(rows))
+            self.trained_count = len(live)
+            self._postings = None
+            logger.info(f"🧭 IVF trained: {nlist} lists over {len(live)} chunks")
+
+    def _get_postings(self) -> List[np.ndarray]:
+        if self._postings is None:
+            live = np.flatnonzero(self.alive[:self.count] & (self.lists[:self.count] >= 0))
+            order = live[np.argsort(self.lists[live], kind="stable")]
+            bounds = np.searchsorted(self.lists[order], np.arange(len(self.centroids) + 1))
+            self._postings = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._postings
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = self.alive[:self.count].copy()
+        if not filters:
+            return mask
+        for column in FILTER_COLUMNS:
+            if filters.get(column) is None:
+                continue
+            wanted = filters[column]
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            codes = [self.vocab[column][v.lower()] for v in values if v.lower() in self.vocab[column]]
+            column_values = self.codes[column][:self.count]
+            if len(codes) == 1:  # perbandingan langsung jauh lebih cepat dari lookup table
+                mask &= column_values == codes[0]
+            else:
+                lookup = np.zeros(max(len(self.vocab[column]), 1), dtype=bool)
+                lookup[codes] = True
+                mask &= lookup[column_values]
+        years = self.years[:self.count]
+        if filters.get("year") is not None:
+            mask &= years == int(filters["year"])
+        if filters.get("year_min") is not None:
+            mask &= years >= int(filters["year_min"])
+        if filters.get("year_max") is not None:
+            mask &= years <= int(filters["year_max"])
+        return mask
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
+
+    def _score(self, rows: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.sort(rows)  # akses memmap berurutan
+        scores = self._matrix[rows].astype(np.float32) @ query
+        if self.dtype == "int8":
+            scores *= self.scales[rows]
+        return self._top_k(rows, scores, k)
+
+    def _scan(self, query: np.ndarray, k: int, block: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact search over all live rows in contiguous blocks (no gather)"""
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, block):
+            end = min(start + block, self.count)
+            scores[start:end] = self._matrix[start:end].astype(np.float32) @ query
+        if self.dtype == "int8":
+            scores *= self.scales[:self.count]
+        live = np.flatnonzero(self.alive[:self.count])
+        return self._top_k(live, scores[live], k)
+
+    def search_rows(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k row ids and scores (no payload lookup).
+
+        Args:
+            query: (dim,) float32, L2-normalized
+            filters: doc_type / domain (str or list), year, year_min, year_max
+            nprobe: Override posting lists to probe
+            exact: Brute-force over all matching rows
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        self.refresh()
+        with self._lock:
+            if self.count == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+            mask = self._filter_mask(filters) if filters else None
+            allowed = int(np.count_nonzero(mask)) if mask is not None else self.size
+            if allowed == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+            if mask is None:
+                if exact or self.centroids is None:
+                    return self._scan(query, k)
+            elif exact or self.centroids is None or allowed <= self.exact_threshold:
+                rows = np.flatnonzero(mask)
+                return self._score(rows, query, k) if len(rows) else (rows, np.empty(0, dtype=np.float32))
+
+            postings = self._get_postings()
+            order = np.argsort(-(self.centroids @ query))
+            probe = min(nprobe or self.nprobe, len(order))
+            while True:
+                rows = np.concatenate([postings[i] for i in order[:probe]])
+                if mask is not None:
+                    rows = rows[mask[rows]]
+                # filter ketat: perluas probe sampai cukup kandidat
+                if len(rows) >= k or probe >= len(order):
+                    break
+                probe = min(probe * 2, len(order))
+            return self._score(rows, query, k) if len(rows) else (rows, np.empty(0, dtype=np.float32))
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[SearchHit]:
+        """Top-k hits with payloads (see search_rows)"""
+        rows, scores = self.search_rows(query, k, filters, nprobe, exact)
+        if not len(rows):
+            return []
+        with self._lock:
+            found = {
+                row: (chunk_id, payload)
+                for row, chunk_id, payload in self._conn.execute(
+                    f"SELECT row, chunk_id, payload FROM chunks WHERE row IN ({', '.join('?' * len(rows))})",
+                    [int(r) for r in rows]
+                )
+            }
+        return [
+            SearchHit(chunk_id=found[int(row)][0], score=float(score), payload=json.loads(found[int(row)][1]))
+            for row, score in zip(rows, scores)
+            if int(row) in found
+        ]
@@ -0,0 +1,420 @@
+"""
+Bucketed Chat Transcript Store (MongoDB / motor)
+
+Transcript chat tidak lagi disimpan sebagai satu dokumen dengan array
+`messages` yang terus membesar:
+
+- `chat_transcripts`: satu header per transcript (_id = mongodb_transcript_id)
+  berisi counter dan preview yang didenormalisasi (message_count,
+  bucket_count, first_user_preview, last_message_preview, ...)
+- `chat_transcript_buckets`: pesan disimpan dalam bucket berukuran tetap
+  (TRANSCRIPT_BUCKET_SIZE pesan), _id = "<transcript_id>:<seq>"
+
+Append hanya menyentuh header + bucket terakhir, dan history untuk prompt
+dibaca dari bucket paling baru (newest-first) sampai jumlah pesan atau
+token budget terpenuhi, sehingga biaya per request tidak tumbuh dengan
+panjang percakapan.
+
+Dokumen lama (format single-document dengan field `messages`) tetap bisa
+dibaca (via $slice) dan dimigrasi otomatis ke bucket saat append pertama.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .ai.context_builder import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_BUCKET_SIZE = int(os.getenv("TRANSCRIPT_BUCKET_SIZE", "50"))
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "20"))
+PREVIEW_LENGTH = 100
+
+HEADER_COLLECTION = "chat_transcripts"
+BUCKET_COLLECTION = "chat_transcript_buckets"
+
+# Field header yang dikembalikan ke caller (tanpa array pesan legacy)
+SUMMARY_PROJECTION = {
+    "user_id": 1,
+    "session_id": 1,
+    "message_count": 1,
+    "bucket_count": 1,
+    "token_count": 1,
+    "context_summary": 1,
+    "first_user_preview": 1,
+    "last_message_preview": 1,
+    "last_role": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Jumlah token pesan (token counter lokal, lihat ai.context_builder)
+
+    Args:
+        text: Isi pesan
+
+    Returns:
+        Jumlah token (minimal 1)
+    """
+    return max(1, get_token_counter().count(text))
+
+
+def bucket_id(transcript_id: str, seq: int) -> str:
+    """_id bucket ke-`seq` milik transcript (zero-padded agar urut leksikal)"""
+    return f"{transcript_id}:{seq:06d}"
+
+
+def split_into_buckets(start_index: int, messages: List[Dict[str, Any]], bucket_size: int) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Kelompokkan pesan baru per nomor bucket
+
+    Args:
+        start_index: Index global pesan pertama (0-based)
+        messages: Pesan yang akan ditulis, berurutan
+        bucket_size: Jumlah pesan per bucket
+
+    Returns:
+        Dict seq -> list pesan (setiap pesan diberi field `n` = index global)
+    """
+    buckets: Dict[int, List[Dict[str, Any]]] = {}
+    for offset, message in enumerate(messages):
+        index = start_index + offset
+        buckets.setdefault(index // bucket_size, []).append({**message, "n": index})
+    return buckets
+
+
+def select_tail(
+    newest_first: List[Dict[str, Any]],
+    max_messages: Optional[int] = None,
+    token_budget: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ambil pesan terbaru sampai batas jumlah pesan / token budget
+
+    Args:
+        newest_first: Pesan dengan urutan terbaru lebih dulu
+        max_messages: Batas jumlah pesan (None = tanpa batas)
+        token_budget: Batas total token (None = tanpa batas); pesan yang
+            membuat total melewati budget tidak diambil
+
+    Returns:
+        Pesan terpilih dalam urutan kronologis
+    """
+    selected = []
+    used_tokens = 0
+    for message in newest_first:
+        if max_messages is not None and len(selected) >= max_messages:
+            break
+        if token_budget is not None:
+            used_tokens += estimate_tokens(message.get("content", ""))
+            if used_tokens > token_budget:
+                break
+        selected.append(message)
+    selected.reverse()
+    return selected
+
+
+def _preview(content: Optional[str]) -> Optional[str]:
+    return content[:PREVIEW_LENGTH] if content else None
+
+
+class TranscriptStore:
+    """
+    Penyimpanan transcript chat berbasis bucket
+
+    Args:
+        db: AsyncIOMotorDatabase
+        bucket_size: Jumlah pesan per bucket
+    """
+
+    def __init__(self, db, bucket_size: int = TRANSCRIPT_BUCKET_SIZE):
+        self.headers = db[HEADER_COLLECTION]
+        self.buckets = db[BUCKET_COLLECTION]
+        self.bucket_size = bucket_size
+        self._indexes_ready = False
+
+    async def ensure_indexes(self):
+        """Buat index sekali per proses"""
+        if self._indexes_ready:
+            return
+        await self.buckets.create_index([("transcript_id", ASCENDING), ("seq", DESCENDING)])
+        await self.headers.create_index([("user_id", ASCENDING), ("updated_at", DESCENDING)])
+        self._indexes_ready = True
+
+    async def append(
+        self,
+        transcript_id: str,
+        messages: List[Dict[str, Any]],
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> int:
+        """
+        Tambahkan pesan ke transcript (membuat transcript jika belum ada)
+
+        Args:
+            transcript_id: ChatSession.mongodb_transcript_id
+            messages: Pesan berurutan (dict dengan role, content, ...)
+            user_id: Pemilik transcript (disimpan saat insert)
+            session_id: ID ChatSession (disimpan saat insert)
+
+        Returns:
+            message_count setelah append
+        """
+        if not messages:
+            return 0
+        await self.ensure_indexes()
+
+        try:
+            header = await self._reserve(transcript_id, messages, user_id, session_id)
+        except DuplicateKeyError:
+            # Header lama masih menyimpan array `messages`: pindahkan ke bucket dulu
+            await self.migrate_legacy(transcript_id)
+            header = await self._reserve(transcript_id, messages, user_id, session_id)
+
+        count = header["message_count"]
+        start_index = count - len(messages)
+        now = datetime.utcnow()
+        for seq, chunk in split_into_buckets(start_index, messages, self.bucket_size).items():
+            await self.buckets.update_one(
+                {"_id": bucket_id(transcript_id, seq)},
+                {
+                    "$push": {"messages": {"$each": chunk}},
+                    "$inc": {"count": len(chunk)},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"transcript_id": transcript_id, "seq": seq, "created_at": now}
+                },
+                upsert=True
+            )
+        return count
+
+    async def _reserve(self, transcript_id, messages, user_id, session_id) -> Dict[str, Any]:
+        """Naikkan counter header secara atomik; index pesan baru = count - len(messages)"""
+        now = datetime.utcnow()
+        last = messages[-1]
+        first_user = next((m for m in messages if m.get("role") == "user"), None)
+        set_on_insert = {"user_id": user_id, "session_id": session_id, "created_at": now}
+        if first_user:
+            set_on_insert["first_user_preview"] = _preview(first_user.get("content"))
+
+        header = await self.headers.find_one_and_update(
+            # Filter `messages` tidak ada: dokumen legacy tidak match, upsert
+            # lalu bentrok di _id dan ditangani oleh caller
+            {"_id": transcript_id, "messages": {"$exists": False}},
+            {
+                "$inc": {
+                    "message_count": len(messages),
+                    "token_count": get_token_counter().count_messages(messages)
+                },
+                "$set": {
+                    "last_message_preview": _preview(last.get("content")),
+                    "last_role": last.get("role"),
+                    "updated_at": now
+                },
+                "$setOnInsert": set_on_insert
+            },
+            projection={"message_count": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        count = header["message_count"]
+        start_index = count - len(messages)
+        if (count - 1) // self.bucket_size != (start_index - 1) // self.bucket_size:
+            # Append ini membuka bucket baru
+            bucket_count = (count - 1) // self.bucket_size + 1
+            await self.headers.update_one(
+                {"_id": transcript_id, "bucket_count": {"$not": {"$gte": bucket_count}}},
+                {"$set": {"bucket_count": bucket_count}}
+            )
+        return header
+
+    async def migrate_legacy(self, transcript_id: str) -> bool:
+        """
+        Pindahkan transcript format lama (array `messages`) ke bucket
+
+        Idempotent: bucket ditulis dengan $setOnInsert dan header hanya
+        di-update jika masih memiliki field `messages`.
+
+        Returns:
+            True jika dokumen dimigrasi oleh pemanggil ini
+        """
+        doc = await self.headers.find_one({"_id": transcript_id, "messages": {"$exists": True}})
+        if not doc:
+            return False
+
+        messages = doc.get("messages") or []
+        now = datetime.utcnow()
+        for seq, chunk in split_into_buckets(0, messages, self.bucket_size).items():
+            await self.buckets.update_one(
+                {"_id": bucket_id(transcript_id, seq)},
+                {"$setOnInsert": {
+                    "transcript_id": transcript_id,
+                    "seq": seq,
+                    "messages": chunk,
+                    "count": len(chunk),
+                    "created_at": now,
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+
+        first_user = next((m for m in messages if m.get("role") == "user"), None)
+        last = messages[-1] if messages else {}
+        result = await self.headers.update_one(
+            {"_id": transcript_id, "messages": {"$exists": True}},
+            {
+                "$unset": {"messages": ""},
+                "$set": {
+                    "message_count": len(messages),
+                    "token_count": get_token_counter().count_messages(messages),
+                    "bucket_count": (len(messages) - 1) // self.bucket_size + 1 if messages else 0,
+                    "first_user_preview": _preview(first_user.get("content")) if first_user else None,
+                    "last_message_preview": _preview(last.get("content")),
+                    "last_role": last.get("role"),
+                    "updated_at": now
+                }
+            }
+        )
+        if result.modified_count:
+            logger.info(f"📦 Migrated legacy transcript {transcript_id} ({len(messages)} messages)")
+        return bool(result.modified_count)
+
+    async def load_tail(
+        self,
+        transcript_id: str,
+        max_messages: Optional[int] = CHAT_HISTORY_MAX_MESSAGES,
+        token_budget: Optional[int] = None,
+        since: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Pesan terakhir untuk prompt (hanya bucket terbaru yang dibaca)
+
+        Args:
+            transcript_id: ChatSession.mongodb_transcript_id
+            max_messages: Batas jumlah pesan (None = tanpa batas)
+            token_budget: Batas estimasi token (None = tanpa batas)
+            since: Abaikan pesan dengan index < since (mis. sudah dirangkum)
+
+        Returns:
+            Pesan dalam urutan kronologis
+        """
+        # Header tanpa array pesan; untuk dokumen legacy hanya tail via $slice
+        projection = {"message_count": 1, "messages": {"$slice": -max_messages} if max_messages else 1}
+        header = await self.headers.find_one({"_id": transcript_id}, projection)
+        if not header:
+            return []
+        if "messages" in header:
+            return select_tail(list(reversed(header["messages"])), max_messages, token_budget)
+        if not header.get("message_count"):
+            return []
+
+        newest_first: List[Dict[str, Any]] = []
+        cursor = self.buckets.find(
+            {"transcript_id": transcript_id, "seq": {"$gte": since // self.bucket_size}},
+            {"messages": 1}
+        ).sort("seq", DESCENDING).batch_size(2)
+        async for bucket in cursor:
+            # Append konkuren bisa menulis bucket tidak berurutan: sort via `n`
+            messages = [m for m in bucket.get("messages", []) if m.get("n", 0) >= since]
+            newest_first.extend(sorted(messages, key=lambda m: m.get("n", 0), reverse=True))
+            if self._enough(newest_first, max_messages, token_budget):
+                break
+        await cursor.close()
+        return select_tail(newest_first, max_messages, token_budget)
+
+    @staticmethod
+    def _enough(newest_first, max_messages, token_budget) -> bool:
+        if max_messages is not None and len(newest_first) >= max_messages:
+            return True
+        if token_budget is not None:
+            return sum(estimate_tokens(m.get("content", "")) for m in newest_first) > token_budget
+        return False
+
+    async def load_all(self, transcript_id: str) -> List[Dict[str, Any]]:
+        """Seluruh transcript (untuk tampilan detail sesi)"""
+        return await self.load_tail(transcript_id, max_messages=None)
+
+    async def load_range(self, transcript_id: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """
+        Pesan dengan index start <= n < end (hanya bucket yang mencakup range)
+
+        Args:
+            transcript_id: ChatSession.mongodb_transcript_id
+            start: Index pertama (inklusif)
+            end: Index terakhir (eksklusif)
+
+        Returns:
+            Pesan dalam urutan kronologis
+        """
+        if end <= start:
+            return []
+        messages: List[Dict[str, Any]] = []
+        cursor = self.buckets.find(
+            {
+                "transcript_id": transcript_id,
+                "seq": {"$gte": start // self.bucket_size, "$lte": (end - 1) // self.bucket_size}
+            },
+            {"messages": 1}
+        )
+        async for bucket in cursor:
+            messages.extend(m for m in bucket.get("messages", []) if start <= m.get("n", -1) < end)
+        return sorted(messages, key=lambda m: m["n"])
+
+    async def get_summary(self, transcript_id: str) -> Optional[Dict[str, Any]]:
+        """Header transcript (counter + preview + context summary) tanpa pesan"""
+        return await self.headers.find_one({"_id": transcript_id}, SUMMARY_PROJECTION)
+
+    async def save_context_summary(self, transcript_id: str, summary: Dict[str, Any]) -> bool:
+        """
+        Simpan rolling summary (lihat ai.context_builder.ContextSummary)
+
+        Hanya maju: summary yang mencakup lebih sedikit pesan daripada yang
+        tersimpan (job lama yang selesai belakangan) diabaikan.
+
+        Returns:
+            True jika tersimpan
+        """
+        result = await self.headers.update_one(
+            {
+                "_id": transcript_id,
+                "$or": [
+                    {"context_summary.covered_until": {"$lt": summary["covered_until"]}},
+                    {"context_summary": {"$exists": False}}
+                ]
+            },
+            {"$set": {"context_summary": summary}}
+        )
+        return bool(result.modified_count)
+
+    async def delete(self, transcript_id: str):
+        """Hapus header dan semua bucket transcript"""
+        await self.buckets.delete_many({"transcript_id": transcript_id})
+        await self.headers.delete_one({"_id": transcript_id})
+
+
+_stores: Dict[int, TranscriptStore] = {}
+
+
+def get_transcript_store(db) -> Optional[TranscriptStore]:
+    """
+    TranscriptStore per motor database (index dibuat sekali per proses)
+
+    Args:
+        db: AsyncIOMotorDatabase atau None jika MongoDB tidak dikonfigurasi
+
+    Returns:
+        TranscriptStore atau None
+    """
+    if db is None:
+        return None
+    store = _stores.get(id(db))
+    if store is None:
+        store = _stores[id(db)] = TranscriptStore(db)
+    return store
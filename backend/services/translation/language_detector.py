@@ -1,4 +1,3 @@
-
 """
 Language Detector
 
@@ -6,13 +5,27 @@ Auto-detect bahasa dari text dengan support untuk:
 - Indonesian (id)
 - English (en)
 - Regional languages (Javanese, Sundanese, etc.)
+
+Detector memakai profil frekuensi character trigram per bahasa yang
+dihitung sekali saat init dan disimpan sebagai satu matrix NumPy
+(vocabulary x bahasa). Scoring satu text = satu sparse dot product
+terhadap matrix tersebut; hasil di-cache (LRU, key = hash text) dan
+detect_batch men-score banyak text dalam satu operasi vectorized.
 """
 
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
 from enum import Enum
+import hashlib
 import re
 
+import numpy as np
+
+
+# Kata = run huruf (tanpa angka / underscore), termasuk huruf beraksen
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
 
 class SupportedLanguage(Enum):
     """Bahasa yang didukung"""
@@ -37,17 +50,48 @@ class DetectionResult:
             self.alternative_languages = []
 
 
+def extract_trigrams(text: str) -> Counter:
+    """
+    Hitung character trigram dari text
+    
+    Setiap kata di-pad dengan spasi (" kata ") sehingga awal/akhir kata
+    ikut menjadi fitur; trigram lintas kata tidak dihitung.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return Counter()
+    
+    # Dua spasi di antara kata: trigram lintas kata selalu punya spasi di
+    # tengah, dan itu satu-satunya trigram dengan spasi di tengah
+    padded = "  ".join(words)
+    padded = f" {padded} "
+    return Counter(
+        padded[i:i + 3]
+        for i in range(len(padded) - 2)
+        if padded[i + 1] != " "
+    )
+
+
 class LanguageDetector:
     """
     Detect language dari text
     
-    Menggunakan kombinasi:
-    - Keyword matching untuk bahasa Indonesia & regional
-    - Character pattern analysis
-    - Common word frequency
+    Menggunakan character trigram profile per bahasa:
+    - Profil dibangun dari common words, legal terms, pattern words dan
+      contoh kalimat per bahasa (lihat _load_sample_texts)
+    - Score = log-likelihood trigram text terhadap profil (naive Bayes,
+      add-alpha smoothing), dinormalisasi per trigram
+    - Confidence = posterior bahasa terbaik x coverage (porsi trigram text
+      yang memang muncul di profil bahasa tersebut)
+    
+    Args:
+        cache_size: Jumlah hasil detect yang disimpan di LRU cache
+            (0 = tanpa cache)
+        smoothing: Add-alpha smoothing untuk trigram yang tidak ada di profil
+        sharpness: Skala softmax untuk posterior (semakin besar semakin tegas)
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096, smoothing: float = 0.5, sharpness: float = 4.0):
         # Load language patterns
         self.patterns = self._load_patterns()
         
@@ -56,6 +100,72 @@ class LanguageDetector:
         
         # Legal terms per language
         self.legal_terms = self._load_legal_terms()
+        
+        # Contoh kalimat per language (seed tambahan untuk profil trigram)
+        self.sample_texts = self._load_sample_texts()
+        
+        self.cache_size = cache_size
+        self.smoothing = smoothing
+        self.sharpness = sharpness
+        self._cache: "OrderedDict[bytes, DetectionResult]" = OrderedDict()
+        
+        # Kata -> row index trigram; kosakata chat berulang terus sehingga
+        # sebagian besar kata tidak perlu dipecah ulang
+        self.word_cache_size = 50000
+        self._word_cache: Dict[str, Tuple[int, ...]] = {}
+        
+        self._build_profiles()
+    
+    def _build_profiles(self):
+        """
+        Bangun matrix profil trigram
+        
+        self._vocab: trigram -> row index; baris terakhir (self._oov)
+        menampung semua trigram yang tidak dikenal profil mana pun.
+        
+        self._profiles (float32, shape (vocab + 1, 2 * n_lang + 1)), satu
+        baris per trigram:
+        - kolom [0, n_lang): log P(trigram | bahasa)
+        - kolom [n_lang, 2 * n_lang): 1.0 jika trigram muncul di profil bahasa
+        - kolom terakhir: 1.0 (jumlah trigram text)
+        Satu dot product menghasilkan log-likelihood, coverage dan panjang
+        text sekaligus.
+        """
+        counts: Dict[SupportedLanguage, Counter] = {}
+        for lang in SupportedLanguage:
+            seed = self._seed_text(lang)
+            if seed:
+                counts[lang] = extract_trigrams(seed)
+        
+        self.profile_languages: List[SupportedLanguage] = list(counts)
+        vocab = sorted(set().union(*counts.values())) if counts else []
+        self._vocab: Dict[str, int] = {gram: index for index, gram in enumerate(vocab)}
+        self._oov = len(vocab)
+        
+        n_lang = len(self.profile_languages)
+        frequencies = np.zeros((n_lang, len(vocab) + 1), dtype=np.float64)
+        for row, lang in enumerate(self.profile_languages):
+            for gram, count in counts[lang].items():
+                frequencies[row, self._vocab[gram]] = count
+        
+        totals = frequencies.sum(axis=1, keepdims=True)
+        log_probs = np.log(
+            (frequencies + self.smoothing) / (totals + self.smoothing * frequencies.shape[1])
+        )
+        seen = (frequencies > 0).astype(np.float64)
+        ones = np.ones((1, frequencies.shape[1]))
+        self._profiles = np.ascontiguousarray(np.vstack([log_probs, seen, ones]).T, dtype=np.float32)
+    
+    def _seed_text(self, language: SupportedLanguage) -> str:
+        """Gabungkan semua seed (kata, istilah, pola, contoh kalimat) satu bahasa"""
+        parts: List[str] = []
+        parts.extend(self.common_words.get(language, []))
+        parts.extend(self.legal_terms.get(language, []))
+        parts.extend(
+            re.sub(r"\\b", "", pattern) for pattern in self.patterns.get(language, [])
+        )
+        parts.extend(self.sample_texts.get(language, []))
+        return " ".join(parts)
     
     def detect(self, text: str) -> DetectionResult:
         """
@@ -65,49 +175,150 @@ class LanguageDetector:
             text: Text untuk di-detect
         
         Returns:
-            DetectionResult dengan bahasa dan confidence
+            DetectionResult dengan bahasa dan confidence. Hasil berasal dari
+            cache yang dipakai bersama; jangan di-mutate.
         """
-        if not text or not text.strip():
-            return DetectionResult(
-                language=SupportedLanguage.UNKNOWN,
-                confidence=0.0
-            )
+        return self.detect_batch([text])[0]
+    
+    def detect_batch(self, texts: Sequence[str]) -> List[DetectionResult]:
+        """
+        Detect language untuk banyak text sekaligus
         
-        text_lower = text.lower()
+        Text yang belum ada di cache di-score dalam satu sparse matrix
+        product (CSR rows x profil bahasa).
         
-        # Calculate scores for each language
-        scores = {}
+        Args:
+            texts: List text
         
-        for lang in SupportedLanguage:
-            if lang == SupportedLanguage.UNKNOWN:
+        Returns:
+            List DetectionResult, urutan sama dengan input
+        """
+        results: List[Optional[DetectionResult]] = [None] * len(texts)
+        pending: Dict[bytes, List[int]] = {}
+        pending_texts: List[str] = []
+        
+        for position, text in enumerate(texts):
+            if not text or not text.strip():
+                results[position] = DetectionResult(
+                    language=SupportedLanguage.UNKNOWN,
+                    confidence=0.0
+                )
                 continue
             
-            score = self._calculate_language_score(text_lower, lang)
-            scores[lang] = score
-        
-        # Get best match
-        if not scores:
-            return DetectionResult(
-                language=SupportedLanguage.UNKNOWN,
-                confidence=0.0
-            )
+            key = self._cache_key(text)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[position] = cached
+                continue
+            
+            if key in pending:
+                pending[key].append(position)
+                continue
+            
+            pending[key] = [position]
+            pending_texts.append(text)
         
-        # Sort by score
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        if pending:
+            scored = self._score(pending_texts)
+            for (key, positions), result in zip(pending.items(), scored):
+                for position in positions:
+                    results[position] = result
+                self._remember(key, result)
         
-        best_lang, best_score = sorted_scores[0]
+        return results
+    
+    def _word_indices(self, word: str) -> Tuple[int, ...]:
+        """Row index profil untuk setiap trigram satu kata (di-cache per kata)"""
+        indices = self._word_cache.get(word)
+        if indices is None:
+            lookup = self._vocab.get
+            padded = f" {word} "
+            indices = tuple(lookup(padded[i:i + 3], self._oov) for i in range(len(padded) - 2))
+            if len(self._word_cache) >= self.word_cache_size:
+                self._word_cache.clear()
+            self._word_cache[word] = indices
+        return indices
+    
+    def _score(self, texts: List[str]) -> List[DetectionResult]:
+        """
+        Score banyak text dalam satu sparse dot product
         
-        # Alternative languages
-        alternatives = [(lang.value, score) for lang, score in sorted_scores[1:3]]
+        Setiap text menjadi satu baris CSR (offsets + row index trigram,
+        trigram berulang = index berulang); np.add.reduceat menjumlahkan
+        baris profil per text.
+        """
+        results: List[Optional[DetectionResult]] = [None] * len(texts)
         
-        # Normalize confidence (0.0 - 1.0)
-        confidence = min(best_score / 100.0, 1.0)
+        word_indices = self._word_indices
+        indices: List[int] = []
+        offsets: List[int] = []
+        rows: List[int] = []
         
-        return DetectionResult(
-            language=best_lang,
-            confidence=confidence,
-            alternative_languages=alternatives
-        )
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall(text.lower())
+            if not words or not self.profile_languages:
+                # Tidak ada huruf sama sekali (angka/simbol saja)
+                results[row] = DetectionResult(
+                    language=SupportedLanguage.UNKNOWN,
+                    confidence=0.0
+                )
+                continue
+            offsets.append(len(indices))
+            rows.append(row)
+            for word in words:
+                indices.extend(word_indices(word))
+        
+        if not rows:
+            return results
+        
+        sums = np.add.reduceat(self._profiles[indices], offsets, axis=0)
+        
+        # Kolom terakhir profil = 1.0 -> jumlah trigram per text
+        n_lang = len(self.profile_languages)
+        scores = sums[:, :-1] / sums[:, -1:]
+        log_likelihood = scores[:, :n_lang]
+        coverage = scores[:, n_lang:]
+        
+        # Posterior per text, dari log-likelihood rata-rata per trigram agar
+        # text panjang tidak otomatis 100% yakin
+        logits = log_likelihood * self.sharpness
+        logits -= logits.max(axis=1, keepdims=True)
+        posterior = np.exp(logits)
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        confidence = (posterior * coverage).tolist()
+        
+        languages = self.profile_languages
+        for row, values in zip(rows, confidence):
+            ranked = sorted(range(n_lang), key=values.__getitem__, reverse=True)
+            best = ranked[0]
+            results[row] = DetectionResult(
+                language=languages[best],
+                confidence=round(values[best], 4),
+                alternative_languages=[
+                    (languages[index].value, round(values[index], 4))
+                    for index in ranked[1:3]
+                ]
+            )
+        
+        return results
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Hash text untuk key LRU cache (text panjang tidak disimpan utuh)"""
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    
+    def _remember(self, key: bytes, result: DetectionResult):
+        """Simpan hasil ke LRU cache"""
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Kosongkan LRU cache hasil detect"""
+        self._cache.clear()
     
     def is_indonesian(self, text: str) -> bool:
         """Check if text is Indonesian"""
@@ -119,41 +330,6 @@ class LanguageDetector:
         result = self.detect(text)
         return result.language == SupportedLanguage.ENGLISH and result.confidence > 0.5
     
-    def _calculate_language_score(self, text: str, language: SupportedLanguage) -> float:
-        """Calculate score untuk bahasa tertentu"""
-        score = 0.0
-        
-        # 1. Common words matching (40 points)
-        common_words = self.common_words.get(language, [])
-        word_matches = sum(1 for word in common_words if word in text)
-        score += min(word_matches * 4, 40)
-        
-        # 2. Legal terms matching (30 points)
-        legal_terms = self.legal_terms.get(language, [])
-        legal_matches = sum(1 for term in legal_terms if term in text)
-        score += min(legal_matches * 6, 30)
-        
-        # 3. Pattern matching (20 points)
-        patterns = self.patterns.get(language, [])
-        pattern_matches = sum(1 for pattern in patterns if re.search(pattern, text))
-        score += min(pattern_matches * 5, 20)
-        
-        # 4. Character analysis (10 points)
-        if language == SupportedLanguage.ENGLISH:
-            # English has more spaces between words
-            word_count = len(text.split())
-            if word_count > 0:
-                avg_word_len = len(text) / word_count
-                if 4 <= avg_word_len <= 6:
-                    score += 10
-        elif language == SupportedLanguage.INDONESIAN:
-            # Indonesian has specific suffixes
-            indonesian_suffixes = ['-kan', '-an', '-nya', '-i', '-lah']
-            suffix_count = sum(1 for suffix in indonesian_suffixes if suffix in text)
-            score += min(suffix_count * 2, 10)
-        
-        return score
-    
     def _load_patterns(self) -> Dict[SupportedLanguage, List[str]]:
         """Load regex patterns per language"""
         return {
@@ -246,42 +422,88 @@ class LanguageDetector:
             ],
         }
     
+    def _load_sample_texts(self) -> Dict[SupportedLanguage, List[str]]:
+        """Load contoh kalimat per language (seed profil trigram)"""
+        return {
+            SupportedLanguage.INDONESIAN: [
+                "Setiap orang berhak atas pengakuan, jaminan, perlindungan, dan kepastian hukum yang adil.",
+                "Pekerja yang mengalami pemutusan hubungan kerja berhak mendapatkan uang pesangon.",
+                "Penggugat mengajukan gugatan wanprestasi terhadap tergugat di pengadilan negeri.",
+                "Saya ingin bertanya tentang hak waris anak dari perkawinan yang sah menurut undang-undang.",
+                "Bagaimana cara membuat perjanjian sewa menyewa rumah yang berlaku secara hukum?",
+                "Ketentuan sebagaimana dimaksud pada ayat tersebut diatur lebih lanjut dengan peraturan pemerintah.",
+                "Terdakwa dijatuhi pidana penjara paling lama lima tahun dan denda paling banyak satu miliar rupiah.",
+                "Kami sudah melaporkan kejadian itu kepada polisi tetapi belum ada tanggapan sampai sekarang.",
+                "Perusahaan wajib memberikan cuti tahunan kepada pekerja setelah bekerja selama dua belas bulan.",
+                "Tolong jelaskan bagaimana proses perceraian dan pembagian harta bersama setelah menikah.",
+                "Undang-undang nomor tahun tentang kitab hukum acara pidana mulai berlaku pada tanggal diundangkan.",
+            ],
+            SupportedLanguage.ENGLISH: [
+                "Every person has the right to recognition, protection and legal certainty before the law.",
+                "The employee who was dismissed is entitled to receive severance pay from the employer.",
+                "The plaintiff filed a lawsuit against the defendant in the district court.",
+                "I would like to ask about the inheritance rights of children from a lawful marriage.",
+                "How do I draft a house rental agreement that is legally binding?",
+                "The provisions referred to in this article shall be further regulated by government regulation.",
+                "The accused was sentenced to a maximum of five years in prison and a fine of one billion rupiah.",
+                "We have already reported the incident to the police but there has been no response so far.",
+                "The company must grant annual leave to workers after they have worked for twelve months.",
+                "Please explain the divorce process and the division of joint property after marriage.",
+                "This law regarding the criminal procedure code shall come into force on the date of its enactment.",
+            ],
+            SupportedLanguage.JAVANESE: [
+                "Kula badhe nyuwun pirsa babagan warisan saking tiyang sepuh ingkang sampun seda.",
+                "Simbah tindak dhateng griya putranipun kaliyan eyang kakung wingi sonten.",
+                "Menawi panjenengan kersa, mangga rawuh wonten ing pasamuan punika.",
+                "Aku arep takon babagan pegaweyan sing dipecat tanpa pesangon saka juragan.",
+                "Bocah-bocah lagi dolanan neng omah, wong tuwane durung bali saka sawah.",
+                "Yen kowe ora gelem, aku ora bakal meksa, nanging kudu dirembug bareng.",
+                "Sedaya warga kedah nindakaken pranatan ingkang sampun dipuntetepaken.",
+                "Piyambakipun dereng mangertos menapa ingkang dipunrembag wonten pengadilan.",
+                "Kowe wis mangan durung, iki ana sega karo iwak ing pawon.",
+                "Nuwun sewu, kula mboten saged rawuh amargi gerah.",
+            ],
+            SupportedLanguage.SUNDANESE: [
+                "Abdi bade naroskeun perkawis hak waris ti kolot anu parantos pupus.",
+                "Ieu mangrupikeun aturan anu kedah dilaksanakeun ku sadaya warga.",
+                "Anjeunna henteu acan terang naon anu dibahas di pangadilan.",
+                "Urang kudu ngajaga lingkungan sangkan tetep beresih jeung asri.",
+                "Punten, abdi teu tiasa sumping margi nuju teu damang.",
+                "Budak-budak keur ulin di buruan, kolotna can mulang ti sawah.",
+                "Upami anjeun teu satuju, mangga sawala heula sareng kulawarga.",
+                "Jalmi anu kalibet dina perkara eta kedah ngahadiran sidang.",
+                "Naha anjeun parantos tuang? Ieu aya sangu sareng lauk di dapur.",
+                "Pamarentah ngaluarkeun peraturan anyar pikeun ngajaga kaamanan masarakat.",
+            ],
+        }
+    
     def detect_multiple_languages(self, text: str) -> List[DetectionResult]:
         """
         Detect if text contains multiple languages (code-switching)
         
+        Semua kalimat di-score sekaligus lewat detect_batch.
+        
         Returns:
             List of detected languages with their segments
         """
         # Split text into sentences
-        sentences = re.split(r'[.!?]+', text)
-        
-        detections = []
+        sentences = [sentence for sentence in re.split(r'[.!?]+', text) if sentence.strip()]
         
-        for sentence in sentences:
-            if not sentence.strip():
-                continue
-            
-            result = self.detect(sentence)
-            if result.confidence > 0.3:  # Only include confident detections
-                detections.append(result)
+        detections = [
+            result for result in self.detect_batch(sentences)
+            if result.confidence > 0.3  # Only include confident detections
+        ]
         
         # Group by language
-        language_counts = {}
+        language_counts: Dict[SupportedLanguage, int] = {}
         for detection in detections:
-            lang = detection.language
-            if lang not in language_counts:
-                language_counts[lang] = 0
-            language_counts[lang] += 1
+            language_counts[detection.language] = language_counts.get(detection.language, 0) + 1
         
         # Create results
-        results = []
-        for lang, count in language_counts.items():
-            confidence = count / len(detections) if detections else 0
-            results.append(DetectionResult(
-                language=lang,
-                confidence=confidence
-            ))
+        results = [
+            DetectionResult(language=lang, confidence=count / len(detections))
+            for lang, count in language_counts.items()
+        ]
         
         # Sort by confidence
         results.sort(key=lambda x: x.confidence, reverse=True)
@@ -0,0 +1,116 @@
+"""
+Text Spans
+
+Span-based helpers untuk Translator:
+- ProtectedTermMasker: satu regex gabungan untuk semua pola istilah hukum,
+  satu kali scan menghasilkan daftar span, teks di-mask/di-restore dengan
+  satu str.join (tanpa str.replace berulang per istilah)
+- tokenize / translate_tokens: dictionary translation per token; spasi dan
+  tanda baca tetap di posisinya
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+
+PLACEHOLDER_TEMPLATE = "__LEGAL_TERM_{}__"
+_PLACEHOLDER_RE = re.compile(r"__LEGAL_TERM_(\d+)__")
+
+# Word (termasuk kata ber-tanda hubung dan placeholder) | non-word run
+_TOKEN_RE = re.compile(r"\w+(?:-\w+)*|[^\w]+")
+
+
+class ProtectedTermMasker:
+    """
+    Single-pass masker untuk istilah hukum yang tidak boleh ditranslate
+
+    Args:
+        patterns: Regex pola istilah (urutan = prioritas jika dua pola
+            cocok di posisi yang sama)
+        flags: Regex flags (default: IGNORECASE)
+    """
+
+    def __init__(self, patterns: List[str], flags: int = re.IGNORECASE):
+        self.patterns = list(patterns)
+        combined = "|".join(f"(?:{pattern})" for pattern in self.patterns)
+
+        # Semua pola dimulai di awal kata: \b di depan membuat regex engine
+        # hanya mencoba alternatif di batas kata (~2x lebih cepat)
+        if all(pattern[:1].isalnum() or pattern.startswith(r"\b") for pattern in self.patterns):
+            combined = rf"\b(?:{combined})"
+        self._regex = re.compile(combined, flags)
+
+    def find_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Non-overlapping (start, end) span istilah, urut dari kiri ke kanan"""
+        if not self.patterns:
+            return []
+        return [match.span() for match in self._regex.finditer(text) if match.end() > match.start()]
+
+    def mask(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Ganti setiap istilah dengan placeholder
+
+        Istilah yang sama (teks persis) memakai placeholder yang sama.
+
+        Returns:
+            (masked_text, list of unique terms); placeholder ke-n = terms[n - 1]
+        """
+        terms: List[str] = []
+        numbers: Dict[str, int] = {}
+        parts: List[str] = []
+        position = 0
+
+        for start, end in self.find_spans(text):
+            term = text[start:end]
+            number = numbers.get(term)
+            if number is None:
+                terms.append(term)
+                number = numbers[term] = len(terms)
+            parts.append(text[position:start])
+            parts.append(PLACEHOLDER_TEMPLATE.format(number))
+            position = end
+
+        if not terms:
+            return text, terms
+        parts.append(text[position:])
+        return "".join(parts), terms
+
+    @staticmethod
+    def unmask(text: str, terms: List[str]) -> str:
+        """Kembalikan placeholder menjadi istilah aslinya (satu kali scan)"""
+        if not terms:
+            return text
+
+        def restore(match: "re.Match") -> str:
+            number = int(match.group(1))
+            return terms[number - 1] if 1 <= number <= len(terms) else match.group()
+
+        return _PLACEHOLDER_RE.sub(restore, text)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word and non-word tokens; "".join(tokens) == text"""
+    return _TOKEN_RE.findall(text)
+
+
+def translate_tokens(tokens: List[str], dictionary: Dict[str, str]) -> str:
+    """
+    Word-by-word dictionary translation atas token yang sudah dipisah
+
+    Kata yang tidak ada di dictionary (termasuk placeholder) dibiarkan;
+    huruf kapital di awal kata dipertahankan.
+    """
+    if not dictionary:
+        return "".join(tokens)
+
+    lookup = dictionary.get
+    output = []
+    for token in tokens:
+        translated = lookup(token.lower()) if token[0].isalnum() else None
+        if translated is None:
+            output.append(token)
+        elif token[0].isupper():
+            output.append(translated.capitalize())
+        else:
+            output.append(translated)
+    return "".join(output)
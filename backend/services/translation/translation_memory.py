@@ -2,14 +2,35 @@
 Translation Memory
 
 Cache translations dengan fuzzy matching untuk consistency
+
+Index per language pair:
+- Exact: dict source_text -> entry (O(1))
+- Fuzzy: inverted index trigram karakter -> entry ids. Kandidat disaring
+  dengan length filter dan count filter (q-gram lemma), diurutkan menurut
+  batas atas similarity, lalu diverifikasi dengan bounded edit distance
+  (banded DP / bit-parallel) yang berhenti begitu jarak melewati batas.
+
+Persistence: append-only JSONL (satu baris per add/update), dikompaksi
+ulang menjadi snapshot saat log sudah jauh lebih besar dari isi memory.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, timedelta
+from array import array
+import heapq
 import json
+import os
 from pathlib import Path
 
+import numpy as np
+
+
+QGRAM = 3
+
+# Band lebih lebar dari ini: bit-parallel (Myers) lebih murah dari DP banded
+BAND_LIMIT = 8
+
 
 @dataclass
 class TranslationEntry:
@@ -43,23 +64,344 @@ class TranslationEntry:
         return TranslationEntry(**data)
 
 
+def _normalize(text: str) -> str:
+    """Normalisasi teks untuk fuzzy matching (sama dengan _calculate_similarity)"""
+    return text.lower().strip()
+
+
+def _qgrams(text: str) -> set:
+    """Set trigram karakter dengan padding, sehingga teks pendek tetap punya gram"""
+    padded = "\x02" * (QGRAM - 1) + text + "\x03" * (QGRAM - 1)
+    return {padded[i:i + QGRAM] for i in range(len(padded) - QGRAM + 1)}
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance dengan batas atas (Ukkonen band)
+    
+    Hanya diagonal |i - j| <= max_distance yang dihitung dan perhitungan
+    berhenti begitu seluruh baris melewati batas.
+    
+    Returns:
+        Distance jika <= max_distance, selain itu max_distance + 1
+    """
+    over = max_distance + 1
+    if s1 == s2:
+        return 0
+    if abs(len(s1) - len(s2)) > max_distance:
+        return over
+    
+    # Strip common prefix/suffix (gratis dan sering panjang di teks hukum)
+    start = 0
+    shortest = min(len(s1), len(s2))
+    while start < shortest and s1[start] == s2[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and s1[-1 - end] == s2[-1 - end]:
+        end += 1
+    s1 = s1[start:len(s1) - end]
+    s2 = s2[start:len(s2) - end]
+    
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+    len1, len2 = len(s1), len(s2)
+    if len1 == 0:
+        return len2 if len2 <= max_distance else over
+    if max_distance > BAND_LIMIT:
+        return _bit_parallel_levenshtein(s1, s2, max_distance)
+    
+    previous_row = [j if j <= max_distance else over for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        low = max(1, i - max_distance)
+        high = min(len2, i + max_distance)
+        current_row = [over] * (len2 + 1)
+        current_row[0] = i if i <= max_distance else over
+        row_min = current_row[0] if low == 1 else over
+        c1 = s1[i - 1]
+        
+        for j in range(low, high + 1):
+            value = previous_row[j - 1] + (c1 != s2[j - 1])
+            if previous_row[j] + 1 < value:
+                value = previous_row[j] + 1
+            if current_row[j - 1] + 1 < value:
+                value = current_row[j - 1] + 1
+            if value > over:
+                value = over
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+        
+        if row_min > max_distance:
+            return over
+        previous_row = current_row
+    
+    return previous_row[len2] if previous_row[len2] <= max_distance else over
+
+
+def _bit_parallel_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """
+    Myers/Hyyrö bit-vector edit distance (s1 = string terpendek, tidak kosong)
+    
+    Satu kolom DP dikodekan sebagai bit vector (int Python), sehingga biaya
+    per karakter s2 konstan berapa pun lebar band-nya.
+    """
+    over = max_distance + 1
+    peq: Dict[str, int] = {}
+    bit = 1
+    for char in s1:
+        peq[char] = peq.get(char, 0) | bit
+        bit <<= 1
+    mask = bit - 1
+    high = 1 << (len(s1) - 1)
+    
+    pv, mv, score = mask, 0, len(s1)
+    remaining = len(s2)
+    for char in s2:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        remaining -= 1
+        if score - remaining > max_distance:
+            return over
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    
+    return score if score <= max_distance else over
+
+
+class _PairIndex:
+    """
+    Index untuk satu language pair
+    
+    - exact: source_text -> entry id
+    - postings: trigram -> array entry ids (inverted index)
+    - lengths / alive: array paralel per entry id untuk filter numpy
+    
+    Entry yang dihapus hanya ditandai mati (tombstone); postings-nya
+    dibersihkan saat index di-rebuild.
+    """
+    
+    def __init__(self):
+        self.entries: List[Optional[TranslationEntry]] = []
+        self.normalized: List[str] = []
+        self.exact: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.lengths = array("i")
+        self.alive = bytearray()
+        self.live = 0
+    
+    def __len__(self) -> int:
+        return self.live
+    
+    @property
+    def dead(self) -> int:
+        return len(self.entries) - self.live
+    
+    def add(self, entry: TranslationEntry) -> int:
+        """Index entry baru; returns entry id"""
+        entry_id = len(self.entries)
+        normalized = _normalize(entry.source_text)
+        self.entries.append(entry)
+        self.normalized.append(normalized)
+        self.exact[entry.source_text] = entry_id
+        self.lengths.append(len(normalized))
+        self.alive.append(1)
+        self.live += 1
+        
+        for gram in _qgrams(normalized):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("i")
+            posting.append(entry_id)
+        return entry_id
+    
+    def get_exact(self, source_text: str) -> Optional[TranslationEntry]:
+        entry_id = self.exact.get(source_text)
+        return None if entry_id is None else self.entries[entry_id]
+    
+    def remove(self, entry_id: int) -> None:
+        entry = self.entries[entry_id]
+        if entry is None:
+            return
+        self.entries[entry_id] = None
+        self.alive[entry_id] = 0
+        self.live -= 1
+        if self.exact.get(entry.source_text) == entry_id:
+            del self.exact[entry.source_text]
+    
+    def iter_entries(self):
+        """Yield (entry_id, entry) untuk entry yang masih hidup"""
+        for entry_id, entry in enumerate(self.entries):
+            if entry is not None:
+                yield entry_id, entry
+    
+    def rebuild(self) -> '_PairIndex':
+        """Index baru tanpa tombstone"""
+        fresh = _PairIndex()
+        for _, entry in self.iter_entries():
+            fresh.add(entry)
+        return fresh
+    
+    def search(
+        self,
+        text: str,
+        threshold: float,
+        limit: int,
+        accept=None,
+        max_candidates: int = 2000,
+        stop_gram_ratio: float = 0.25,
+        block_size: int = 256
+    ) -> List[Tuple[int, float]]:
+        """
+        Fuzzy search dengan similarity = 1 - distance / max_len
+        
+        Args:
+            text: Query (belum dinormalisasi)
+            threshold: Minimum similarity
+            limit: Maximum number of results
+            accept: Optional predicate(entry) -> bool (mis. cek expired)
+            max_candidates: Batas jumlah kandidat yang diverifikasi (hasil
+                bisa tidak lengkap untuk threshold rendah di memory besar)
+            stop_gram_ratio: Trigram yang muncul di lebih dari rasio ini
+                tidak dihitung (terlalu umum, mahal, hampir tidak menyaring)
+            block_size: Jumlah kandidat per blok verifikasi
+        
+        Returns:
+            List of (entry_id, similarity), similarity menurun
+        """
+        query = _normalize(text)
+        query_len = len(query)
+        total = len(self.entries)
+        if not query or total == 0 or self.live == 0 or limit <= 0:
+            return []
+        threshold = max(threshold, 1e-6)
+        
+        # Count filter (q-gram lemma): |grams(A) ∩ grams(B)| >= |grams(A)| - q * d
+        grams = _qgrams(query)
+        stop_size = max(1000, int(total * stop_gram_ratio))
+        lists = []
+        stop_grams = 0
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            if len(posting) > stop_size:
+                stop_grams += 1
+            else:
+                lists.append(np.frombuffer(posting, dtype=np.int32))
+        if lists:
+            counts = np.bincount(np.concatenate(lists), minlength=total)
+        else:
+            counts = np.zeros(total, dtype=np.int64)
+        del lists
+        
+        # Prefilter skalar dengan distance terbesar yang mungkin; jika tidak
+        # menyaring apa pun, pakai view penuh (tanpa copy)
+        required = len(grams) - stop_grams
+        widest = int((1.0 - threshold) * (query_len / threshold) + 1e-9)
+        lengths = np.frombuffer(self.lengths, dtype=np.int32)
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        if required - QGRAM * widest > 0:
+            candidates = np.flatnonzero(counts >= required - QGRAM * widest).astype(np.int32)
+            lengths, alive, counts = lengths[candidates], alive[candidates], counts[candidates]
+        else:
+            candidates = None
+        
+        # Batas atas similarity: setiap trigram query yang hilang butuh edit,
+        # jadi distance >= ceil(missing / q) dan >= selisih panjang. Stop-gram
+        # dianggap selalu ada (batas lebih longgar tapi tetap valid).
+        max_lengths = np.maximum(lengths, query_len)
+        length_gaps = np.abs(lengths - query_len)
+        max_distances = np.floor((1.0 - threshold) * max_lengths + 1e-9)
+        lower_bounds = np.maximum(-(-(required - counts) // QGRAM), length_gaps)
+        bounds = 1.0 - lower_bounds / max_lengths
+        
+        # Length filter + count filter (q-gram lemma) + tombstone
+        rejected = ~alive | (length_gaps > max_distances) | (counts < required - QGRAM * max_distances)
+        bounds[rejected] = -1.0
+        del lengths, alive
+        
+        heap: List[Tuple[float, int, int]] = []
+        verified = 0
+        remaining = np.flatnonzero(bounds >= threshold - 1e-9)
+        while len(remaining) and verified < max_candidates:
+            # Blok berikutnya: kandidat dengan batas atas tertinggi
+            if len(remaining) > block_size:
+                split = np.argpartition(-bounds[remaining], block_size - 1)
+                block, remaining = remaining[split[:block_size]], remaining[split[block_size:]]
+            else:
+                block, remaining = remaining, remaining[:0]
+            block = block[np.argsort(-bounds[block], kind="stable")]
+            
+            for position, upper_bound in zip(block.tolist(), bounds[block].tolist()):
+                if len(heap) >= limit and upper_bound <= heap[0][0]:
+                    remaining = remaining[:0]  # blok berikutnya pasti lebih buruk
+                    break
+                if verified >= max_candidates:
+                    break
+                entry_id = position if candidates is None else int(candidates[position])
+                entry = self.entries[entry_id]
+                if accept is not None and not accept(entry):
+                    continue
+                
+                verified += 1
+                max_len = int(max_lengths[position])
+                budget = int(max_distances[position])
+                if len(heap) >= limit:
+                    # Hanya hasil yang lebih baik dari yang terburuk yang berguna
+                    budget = min(budget, int(np.ceil((1.0 - heap[0][0]) * max_len - 1e-9)) - 1)
+                    if budget < 0:
+                        continue
+                
+                distance = bounded_levenshtein(query, self.normalized[entry_id], budget)
+                if distance > budget:
+                    continue
+                
+                item = (1.0 - distance / max_len, -entry_id, entry_id)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heapreplace(heap, item)
+        
+        return [(entry_id, similarity) for similarity, _, entry_id in sorted(heap, reverse=True)]
+
+
 class TranslationMemory:
     """
     Translation memory dengan caching dan fuzzy matching
+    
+    Args:
+        cache_file: Path log persistence (append-only JSONL); None = in-memory
+        ttl_days: Entry lebih tua dari ini dianggap expired (<= 0: tidak pernah)
+        max_entries: Batas jumlah entry; entry paling jarang dipakai dibuang
+        compact_ratio: Kompaksi log saat jumlah record > ratio * jumlah entry
     """
     
+    LOG_FORMAT = "pasalku-tm"
+    LOG_VERSION = 2
+    
     def __init__(
         self,
         cache_file: Optional[str] = None,
         ttl_days: int = 30,
-        max_entries: int = 10000
+        max_entries: int = 10000,
+        compact_ratio: float = 2.0
     ):
         self.cache_file = cache_file
         self.ttl_days = ttl_days
         self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
         
-        # In-memory cache
-        self.cache: Dict[str, List[TranslationEntry]] = {}
+        # In-memory index per language pair
+        self.cache: Dict[str, _PairIndex] = {}
         
         # Statistics
         self.stats = {
@@ -69,6 +411,10 @@ class TranslationMemory:
             "total_entries": 0
         }
         
+        # Append-only log
+        self._log = None
+        self._log_records = 0
+        
         # Load from file jika ada
         if cache_file:
             self.load_from_file(cache_file)
@@ -93,22 +439,6 @@ class TranslationMemory:
             quality: Translation quality
             confidence: Confidence score
         """
-        # Create cache key
-        cache_key = self._create_cache_key(source_lang, target_lang)
-        
-        # Check if already exists (exact match)
-        if cache_key in self.cache:
-            for entry in self.cache[cache_key]:
-                if entry.source_text == source_text:
-                    # Update existing entry
-                    entry.translated_text = translated_text
-                    entry.timestamp = datetime.now()
-                    entry.usage_count += 1
-                    entry.quality = quality
-                    entry.confidence = confidence
-                    return
-        
-        # Create new entry
         entry = TranslationEntry(
             source_text=source_text,
             translated_text=translated_text,
@@ -117,20 +447,42 @@ class TranslationMemory:
             quality=quality,
             confidence=confidence
         )
+        self.add_translations([entry])
+    
+    def add_translations(self, entries: List[TranslationEntry]) -> None:
+        """
+        Bulk add/update translations (satu kali tulis log untuk semua entry)
         
-        # Add to cache
-        if cache_key not in self.cache:
-            self.cache[cache_key] = []
-        
-        self.cache[cache_key].append(entry)
-        self.stats["total_entries"] += 1
-        
-        # Clean old entries jika terlalu banyak
-        self._clean_old_entries()
-        
-        # Save to file
-        if self.cache_file:
-            self.save_to_file(self.cache_file)
+        Args:
+            entries: TranslationEntry baru; entry dengan source_text yang sudah
+                ada meng-update entry lama (usage_count bertambah)
+        """
+        records = []
+        for entry in entries:
+            cache_key = self._create_cache_key(entry.source_lang, entry.target_lang)
+            index = self.cache.get(cache_key)
+            existing = index.get_exact(entry.source_text) if index is not None else None
+            
+            if existing is not None:
+                # Update existing entry
+                existing.translated_text = entry.translated_text
+                existing.timestamp = datetime.now()
+                existing.usage_count += 1
+                existing.quality = entry.quality
+                existing.confidence = entry.confidence
+                entry = existing
+            else:
+                self._insert(cache_key, entry)
+            records.append((cache_key, entry))
+        
+        self._append_log(records)
+        
+        # Evict least used secara batch (bukan setiap insert)
+        if self.stats["total_entries"] > self.max_entries:
+            self._clean_old_entries()
+            self._compact_if_needed(force=True)
+        else:
+            self._compact_if_needed()
     
     def get_translation(
         self,
@@ -151,38 +503,23 @@ class TranslationMemory:
         Returns:
             TranslationEntry jika found, None otherwise
         """
-        cache_key = self._create_cache_key(source_lang, target_lang)
+        index = self.cache.get(self._create_cache_key(source_lang, target_lang))
         
-        if cache_key not in self.cache:
+        if index is None:
             self.stats["misses"] += 1
             return None
         
-        # Exact match
-        for entry in self.cache[cache_key]:
-            if entry.source_text == source_text:
-                # Check if expired
-                if self._is_expired(entry):
-                    continue
-                
-                entry.usage_count += 1
-                self.stats["hits"] += 1
-                return entry
-        
-        # Fuzzy match
-        best_match = None
-        best_similarity = 0.0
-        
-        for entry in self.cache[cache_key]:
-            if self._is_expired(entry):
-                continue
-            
-            similarity = self._calculate_similarity(source_text, entry.source_text)
-            
-            if similarity > best_similarity and similarity >= fuzzy_threshold:
-                best_similarity = similarity
-                best_match = entry
-        
-        if best_match:
+        # Exact match (hash lookup)
+        entry = index.get_exact(source_text)
+        if entry is not None and not self._is_expired(entry):
+            entry.usage_count += 1
+            self.stats["hits"] += 1
+            return entry
+        
+        # Fuzzy match (trigram index + banded edit distance)
+        matches = index.search(source_text, fuzzy_threshold, limit=1, accept=self._is_fresh)
+        if matches:
+            best_match = index.entries[matches[0][0]]
             best_match.usage_count += 1
             self.stats["fuzzy_hits"] += 1
             return best_match
@@ -211,27 +548,13 @@ class TranslationMemory:
         Returns:
             List of (TranslationEntry, similarity_score)
         """
-        cache_key = self._create_cache_key(source_lang, target_lang)
+        index = self.cache.get(self._create_cache_key(source_lang, target_lang))
         
-        if cache_key not in self.cache:
+        if index is None:
             return []
         
-        # Calculate similarity untuk semua entries
-        results = []
-        
-        for entry in self.cache[cache_key]:
-            if self._is_expired(entry):
-                continue
-            
-            similarity = self._calculate_similarity(source_text, entry.source_text)
-            
-            if similarity >= threshold:
-                results.append((entry, similarity))
-        
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x[1], reverse=True)
-        
-        return results[:limit]
+        matches = index.search(source_text, threshold, limit=limit, accept=self._is_fresh)
+        return [(index.entries[entry_id], similarity) for entry_id, similarity in matches]
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """
@@ -241,8 +564,8 @@ class TranslationMemory:
             Similarity score (0.0 - 1.0)
         """
         # Normalize
-        text1 = text1.lower().strip()
-        text2 = text2.lower().strip()
+        text1 = _normalize(text1)
+        text2 = _normalize(text2)
         
         if text1 == text2:
             return 1.0
@@ -263,33 +586,24 @@ class TranslationMemory:
         """
         Calculate Levenshtein distance between two strings
         """
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        
-        if len(s2) == 0:
-            return len(s1)
-        
-        previous_row = range(len(s2) + 1)
-        
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            
-            for j, c2 in enumerate(s2):
-                # Cost of insertions, deletions, or substitutions
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                
-                current_row.append(min(insertions, deletions, substitutions))
-            
-            previous_row = current_row
-        
-        return previous_row[-1]
+        return bounded_levenshtein(s1, s2, max(len(s1), len(s2)))
     
     def _create_cache_key(self, source_lang: str, target_lang: str) -> str:
         """Create cache key dari language pair"""
         return f"{source_lang}_{target_lang}"
     
+    def _insert(self, cache_key: str, entry: TranslationEntry) -> None:
+        index = self.cache.get(cache_key)
+        if index is None:
+            index = self.cache[cache_key] = _PairIndex()
+        
+        existing = index.exact.get(entry.source_text)
+        if existing is not None:
+            index.remove(existing)
+            self.stats["total_entries"] -= 1
+        index.add(entry)
+        self.stats["total_entries"] += 1
+    
     def _is_expired(self, entry: TranslationEntry) -> bool:
         """Check if entry expired"""
         if self.ttl_days <= 0:
@@ -298,45 +612,43 @@ class TranslationMemory:
         age = datetime.now() - entry.timestamp
         return age.days > self.ttl_days
     
+    def _is_fresh(self, entry: TranslationEntry) -> bool:
+        return not self._is_expired(entry)
+    
     def _clean_old_entries(self) -> None:
         """Clean old or expired entries"""
         # Remove expired entries
-        for cache_key in list(self.cache.keys()):
-            self.cache[cache_key] = [
-                entry for entry in self.cache[cache_key]
-                if not self._is_expired(entry)
-            ]
-            
-            # Remove empty cache keys
-            if not self.cache[cache_key]:
-                del self.cache[cache_key]
+        for index in self.cache.values():
+            for entry_id, entry in list(index.iter_entries()):
+                if self._is_expired(entry):
+                    index.remove(entry_id)
         
-        # Jika masih terlalu banyak, remove least used
-        total_entries = sum(len(entries) for entries in self.cache.values())
+        # Jika masih terlalu banyak, remove least used sampai ~90% max_entries
+        total_entries = sum(len(index) for index in self.cache.values())
         
         if total_entries > self.max_entries:
-            # Collect all entries
-            all_entries = []
-            for cache_key, entries in self.cache.items():
-                for entry in entries:
-                    all_entries.append((cache_key, entry))
-            
-            # Sort by usage_count (ascending)
-            all_entries.sort(key=lambda x: x[1].usage_count)
-            
-            # Remove least used
-            to_remove = total_entries - self.max_entries
-            removed = 0
-            
-            for cache_key, entry in all_entries:
-                if removed >= to_remove:
-                    break
-                
-                self.cache[cache_key].remove(entry)
-                removed += 1
+            target = max(0, int(self.max_entries * 0.9))
+            victims = heapq.nsmallest(
+                total_entries - target,
+                (
+                    (entry.usage_count, entry.timestamp, cache_key, entry_id)
+                    for cache_key, index in self.cache.items()
+                    for entry_id, entry in index.iter_entries()
+                )
+            )
+            for _, _, cache_key, entry_id in victims:
+                self.cache[cache_key].remove(entry_id)
+        
+        # Rebuild index yang kebanyakan tombstone, buang pair kosong
+        for cache_key in list(self.cache.keys()):
+            index = self.cache[cache_key]
+            if not len(index):
+                del self.cache[cache_key]
+            elif index.dead > len(index):
+                self.cache[cache_key] = index.rebuild()
         
         # Update stats
-        self.stats["total_entries"] = sum(len(entries) for entries in self.cache.values())
+        self.stats["total_entries"] = sum(len(index) for index in self.cache.values())
     
     def clear_cache(self) -> None:
         """Clear all cache"""
@@ -349,6 +661,8 @@ class TranslationMemory:
         }
         
         # Delete cache file
+        self._close_log()
+        self._log_records = 0
         if self.cache_file:
             cache_path = Path(self.cache_file)
             if cache_path.exists():
@@ -370,57 +684,129 @@ class TranslationMemory:
             "fuzzy_hit_rate": self.stats["fuzzy_hits"] / total_requests if total_requests > 0 else 0.0
         }
     
+    def _append_log(self, records: List[Tuple[str, TranslationEntry]]) -> None:
+        """Append record "put" ke log (tanpa rewrite seluruh file)"""
+        if not self.cache_file or not records:
+            return
+        try:
+            if self._log is None:
+                self._log = open(self.cache_file, 'a', encoding='utf-8')
+            self._log.writelines(
+                json.dumps({"op": "put", "key": cache_key, **entry.to_dict()}, ensure_ascii=False) + "\n"
+                for cache_key, entry in records
+            )
+            self._log.flush()
+            self._log_records += len(records)
+        
+        except Exception as e:
+            print(f"Error appending translation memory log: {e}")
+    
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+    
+    def _compact_if_needed(self, force: bool = False) -> None:
+        """Rewrite log menjadi snapshot jika sudah terlalu banyak record usang"""
+        if not self.cache_file:
+            return
+        limit = self.compact_ratio * max(self.stats["total_entries"], 1) + 1000
+        if force or self._log_records > limit:
+            self.compact()
+    
+    def compact(self) -> None:
+        """Tulis ulang cache_file sebagai snapshot (header + satu record per entry)"""
+        if self.cache_file:
+            self._clean_old_entries()
+            self.save_to_file(self.cache_file)
+    
     def save_to_file(self, filepath: str) -> None:
-        """Save cache to file"""
+        """Save cache to file (snapshot, atomic replace)"""
         try:
-            cache_data = {}
+            is_log = filepath == self.cache_file
+            if is_log:
+                self._close_log()
             
-            for cache_key, entries in self.cache.items():
-                cache_data[cache_key] = [
-                    entry.to_dict() for entry in entries
-                ]
-            
-            data = {
-                "cache": cache_data,
+            header = {
+                "format": self.LOG_FORMAT,
+                "version": self.LOG_VERSION,
                 "stats": self.stats,
                 "saved_at": datetime.now().isoformat()
             }
+            tmp_path = f"{filepath}.tmp"
+            records = 0
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + "\n")
+                for cache_key, index in self.cache.items():
+                    for _, entry in index.iter_entries():
+                        record = {"op": "put", "key": cache_key, **entry.to_dict()}
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        records += 1
+            os.replace(tmp_path, filepath)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if is_log:
+                self._log_records = records
         
         except Exception as e:
             print(f"Error saving translation memory: {e}")
     
     def load_from_file(self, filepath: str) -> None:
-        """Load cache from file"""
+        """
+        Load cache from file
+        
+        Mendukung log JSONL (format sekarang) dan file JSON lama
+        ({"cache": ..., "stats": ...}); file lama langsung dikonversi.
+        """
         try:
             cache_path = Path(filepath)
             
             if not cache_path.exists():
                 return
             
+            records = 0
+            legacy = False
             with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Load cache
-            cache_data = data.get("cache", {})
-            
-            for cache_key, entries in cache_data.items():
-                self.cache[cache_key] = [
-                    TranslationEntry.from_dict(entry_data)
-                    for entry_data in entries
-                ]
-            
-            # Load stats
-            self.stats = data.get("stats", self.stats)
+                first_line = f.readline()
+                try:
+                    header = json.loads(first_line)
+                except ValueError:
+                    header = None
+                
+                if header is None or "cache" in header:
+                    legacy = True
+                    f.seek(0)
+                    data = json.load(f)
+                    for cache_key, entries in data.get("cache", {}).items():
+                        for entry_data in entries:
+                            self._load_entry(cache_key, entry_data)
+                    self.stats.update(data.get("stats", {}))
+                else:
+                    for line in [first_line, *f]:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # baris terpotong (crash saat append)
+                        records += 1
+                        if record.get("format") == self.LOG_FORMAT:
+                            self.stats.update(record.get("stats", {}))
+                        elif record.pop("op", None) == "put":
+                            self._load_entry(record.pop("key"), record)
             
             # Clean expired entries
             self._clean_old_entries()
+            self._log_records = records
+            
+            if filepath == self.cache_file:
+                self._compact_if_needed(force=legacy)
         
         except Exception as e:
             print(f"Error loading translation memory: {e}")
     
+    def _load_entry(self, cache_key: str, entry_data: dict) -> None:
+        entry = TranslationEntry.from_dict(entry_data)
+        if not self._is_expired(entry):
+            self._insert(cache_key, entry)
+    
     def export_to_tmx(self, filepath: str) -> None:
         """
         Export cache to TMX format (Translation Memory eXchange)
@@ -448,10 +834,9 @@ class TranslationMemory:
             ]
             
             # Add translation units
-            for cache_key, entries in self.cache.items():
-                source_lang, target_lang = cache_key.split('_')
-                
-                for entry in entries:
+            for index in self.cache.values():
+                for _, entry in index.iter_entries():
+                    source_lang, target_lang = entry.source_lang, entry.target_lang
                     if self._is_expired(entry):
                         continue
                     
@@ -6,14 +6,72 @@ Translation service dengan:
 - Translation memory integration
 - Multiple translation providers
 - Quality scoring
+- Async batch pipeline: sentence split -> dedup -> TM-first -> packed,
+  bounded-concurrency model calls -> reassembly -> bulk TM write-back
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from enum import Enum
+import asyncio
+import os
 import re
 from datetime import datetime
 
+from .text_spans import ProtectedTermMasker, tokenize, translate_tokens
+
+if TYPE_CHECKING:
+    from .translation_memory import TranslationMemory
+
+
+# Batch pipeline config
+TRANSLATION_MAX_CONCURRENCY = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "4"))
+TRANSLATION_SEGMENTS_PER_CALL = int(os.getenv("TRANSLATION_SEGMENTS_PER_CALL", "25"))
+TRANSLATION_MAX_CHARS_PER_CALL = int(os.getenv("TRANSLATION_MAX_CHARS_PER_CALL", "6000"))
+
+# Batas kalimat: tanda baca akhir + spasi + huruf kapital/kurung, atau baris baru
+_BOUNDARY_RE = re.compile(r'(?<=[.!?;])[ \t]+(?=[A-Z(\"\'“])|[ \t]*\n\s*')
+
+# Singkatan yang diakhiri titik tapi bukan akhir kalimat ("UU No. 13", "jo. Pasal 5")
+_ABBREVIATIONS = {
+    "no", "nomor", "jo", "yth", "prof", "dr", "ir", "drs", "hj", "h", "sdr", "bpk",
+    "tn", "ny", "pt", "cv", "tbk", "kab", "kec", "kel", "jl", "hlm", "tgl", "rp",
+    "s.h", "m.h", "m.kn", "s.e", "art", "sec", "mr", "mrs", "ms", "vs", "etc",
+}
+
+_SEGMENT_MARKER_RE = re.compile(r'^\s*<<(\d+)>>[ \t]*', re.MULTILINE)
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into sentence segments
+    
+    Returns:
+        List of (segment, separator); "".join(seg + sep) == text
+    """
+    pieces: List[Tuple[str, str]] = []
+    start = 0
+    
+    for match in _BOUNDARY_RE.finditer(text):
+        if "\n" not in match.group():
+            last_word = text[start:match.start()].rsplit(None, 1)
+            token = last_word[-1].rstrip(".!?;").lower() if last_word else ""
+            if token in _ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+                continue
+        
+        if match.start() > start:
+            pieces.append((text[start:match.start()], match.group()))
+        elif pieces:
+            segment, separator = pieces[-1]
+            pieces[-1] = (segment, separator + match.group())
+        else:
+            pieces.append(("", match.group()))  # leading whitespace
+        start = match.end()
+    
+    if start < len(text) or not pieces:
+        pieces.append((text[start:], ""))
+    return pieces
+
 
 class TranslationQuality(Enum):
     """Quality level of translation"""
@@ -50,8 +108,9 @@ class Translator:
     """
     
     def __init__(self):
-        # Legal terms yang tidak ditranslate
+        # Legal terms yang tidak ditranslate (satu regex gabungan)
         self.protected_terms = self._load_protected_terms()
+        self.term_masker = ProtectedTermMasker(self.protected_terms)
         
         # Translation dictionaries
         self.dictionaries = self._load_dictionaries()
@@ -59,11 +118,11 @@ class Translator:
         # AI translation available?
         self.ai_available = False
         try:
-            from backend.services.ai_agent import AIAgent
-            self.ai_agent = AIAgent()
-            self.ai_available = True
-        except:
-            self.ai_agent = None
+            from backend.services.ai_service import ai_service
+            self.ai_client = ai_service
+            self.ai_available = ai_service._is_configured()
+        except Exception:
+            self.ai_client = None
     
     def translate(
         self,
@@ -114,9 +173,13 @@ class Translator:
         if preserve_legal_terms:
             protected_text, protected_terms = self._protect_legal_terms(text)
         
-        # Translate
-        if use_ai and self.ai_available:
-            translated = self._translate_with_ai(protected_text, source_lang, target_lang)
+        # Translate (model call hanya bisa ditunggu di luar event loop;
+        # caller async pakai translate_async)
+        translated = None
+        if use_ai and self.ai_available and not self._in_event_loop():
+            translated = asyncio.run(self._translate_with_ai([protected_text], source_lang, target_lang))[0]
+        
+        if translated is not None:
             translator_used = "ai"
         else:
             translated = self._translate_with_dictionary(protected_text, source_lang, target_lang)
@@ -146,8 +209,260 @@ class Translator:
         source_lang: str,
         target_lang: str
     ) -> List[TranslationResult]:
-        """Translate multiple texts"""
-        return [self.translate(text, source_lang, target_lang) for text in texts]
+        """Translate multiple texts (sync wrapper untuk translate_batch_async)"""
+        if self._in_event_loop():
+            return [self.translate(text, source_lang, target_lang) for text in texts]
+        return asyncio.run(self.translate_batch_async(texts, source_lang, target_lang))
+    
+    async def translate_async(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        preserve_legal_terms: bool = True,
+        use_ai: bool = True,
+        memory: Optional['TranslationMemory'] = None
+    ) -> TranslationResult:
+        """Async translate; teks panjang dipecah per kalimat dan ditranslate paralel"""
+        results = await self.translate_batch_async(
+            [text], source_lang, target_lang, preserve_legal_terms, use_ai, memory
+        )
+        return results[0]
+    
+    async def translate_batch_async(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        preserve_legal_terms: bool = True,
+        use_ai: bool = True,
+        memory: Optional['TranslationMemory'] = None,
+        max_concurrency: Optional[int] = None,
+        segments_per_call: Optional[int] = None,
+        max_chars_per_call: Optional[int] = None
+    ) -> List[TranslationResult]:
+        """
+        Translate multiple texts dengan batch pipeline
+        
+        1. Teks yang sudah ada utuh di translation memory langsung dipakai
+        2. Sisanya dipecah per kalimat; kalimat identik di seluruh batch
+           hanya ditranslate sekali
+        3. Kalimat dicari dulu di translation memory (exact)
+        4. Miss dikemas menjadi beberapa request multi-segment ke model,
+           maksimal max_concurrency request berjalan bersamaan
+        5. Hasil disusun kembali sesuai urutan, hasil model ditulis ke
+           translation memory sekaligus
+        
+        Args:
+            texts: Texts untuk ditranslate
+            source_lang: Source language code
+            target_lang: Target language code
+            preserve_legal_terms: Preserve legal terminology
+            use_ai: Use AI for translation (fallback to dictionary)
+            memory: TranslationMemory untuk lookup dan write-back (optional)
+            max_concurrency: Maximum concurrent model calls
+            segments_per_call: Maximum segments per model call
+            max_chars_per_call: Maximum characters per model call
+        
+        Returns:
+            List of TranslationResult (urutan sama dengan texts)
+        """
+        results: List[Optional[TranslationResult]] = [None] * len(texts)
+        pending: Dict[int, List[Tuple[str, str]]] = {}
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip() or source_lang == target_lang:
+                results[i] = self.translate(text, source_lang, target_lang)
+                continue
+            
+            cached = memory.get_translation(text, source_lang, target_lang, fuzzy_threshold=1.0) if memory else None
+            if cached is not None:
+                results[i] = self._cached_result(text, cached, source_lang, target_lang)
+            else:
+                pending[i] = split_sentences(text)
+        
+        # Unique segments (yang punya huruf/angka; sisanya dipakai apa adanya)
+        segment_translations: Dict[str, Tuple[str, str]] = {}
+        unique_segments: List[str] = []
+        for pieces in pending.values():
+            for segment, _ in pieces:
+                key = segment.strip()
+                if key and key not in segment_translations and re.search(r'\w', key):
+                    segment_translations[key] = ("", "")
+                    unique_segments.append(key)
+        
+        # TM-first per segment
+        misses: List[str] = []
+        for segment in unique_segments:
+            cached = memory.get_translation(segment, source_lang, target_lang, fuzzy_threshold=1.0) if memory else None
+            if cached is not None:
+                segment_translations[segment] = (cached.translated_text, "cache")
+            else:
+                misses.append(segment)
+        
+        # Translate misses
+        preserved: Dict[str, List[str]] = {}
+        if misses:
+            protected = []
+            for segment in misses:
+                if preserve_legal_terms:
+                    protected_text, terms = self._protect_legal_terms(segment)
+                else:
+                    protected_text, terms = segment, []
+                protected.append(protected_text)
+                preserved[segment] = terms
+            
+            translated_misses: List[Optional[str]] = [None] * len(misses)
+            if use_ai and self.ai_available:
+                translated_misses = await self._translate_segments_concurrently(
+                    protected,
+                    source_lang,
+                    target_lang,
+                    max_concurrency or TRANSLATION_MAX_CONCURRENCY,
+                    segments_per_call or TRANSLATION_SEGMENTS_PER_CALL,
+                    max_chars_per_call or TRANSLATION_MAX_CHARS_PER_CALL
+                )
+            
+            new_entries = []
+            for segment, protected_text, translated in zip(misses, protected, translated_misses):
+                translator_used = "ai"
+                if translated is None:
+                    translated = self._translate_with_dictionary(protected_text, source_lang, target_lang)
+                    translator_used = "dictionary"
+                translated = self._restore_protected_terms(translated, preserved[segment])
+                segment_translations[segment] = (translated, translator_used)
+                
+                if translator_used == "ai" and memory is not None:
+                    quality, confidence = self._assess_quality(segment, translated, source_lang, target_lang)
+                    new_entries.append(self._memory_entry(segment, translated, source_lang, target_lang, quality, confidence))
+            
+            # Bulk write-back (hanya hasil model; hasil kamus murah dibuat ulang)
+            if new_entries:
+                memory.add_translations(new_entries)
+        
+        # Reassemble per text
+        for i, pieces in pending.items():
+            parts = []
+            used = set()
+            terms: List[str] = []
+            for segment, separator in pieces:
+                key = segment.strip()
+                translated, translator_used = segment_translations.get(key, (key, ""))
+                if translator_used:
+                    used.add(translator_used)
+                for term in preserved.get(key, []):
+                    if term not in terms:
+                        terms.append(term)
+                # Pertahankan whitespace di sekitar segmen
+                leading = segment[:len(segment) - len(segment.lstrip())]
+                trailing = segment[len(segment.rstrip()):]
+                parts.append(f"{leading}{translated}{trailing}{separator}")
+            
+            text = texts[i]
+            translated_text = "".join(parts)
+            quality, confidence = self._assess_quality(text, translated_text, source_lang, target_lang)
+            if used == {"cache"}:
+                translator_used = "cache"
+            elif "ai" in used:
+                translator_used = "ai"
+            else:
+                translator_used = "dictionary"
+            
+            results[i] = TranslationResult(
+                source_text=text,
+                translated_text=translated_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                quality=quality,
+                confidence=confidence,
+                preserved_terms=terms,
+                translator_used=translator_used
+            )
+        
+        return results
+    
+    async def _translate_segments_concurrently(
+        self,
+        segments: List[str],
+        source_lang: str,
+        target_lang: str,
+        max_concurrency: int,
+        segments_per_call: int,
+        max_chars_per_call: int
+    ) -> List[Optional[str]]:
+        """
+        Kemas segments ke beberapa model call dan jalankan dengan batas konkurensi
+        
+        Returns:
+            Translations sesuai urutan segments (None jika gagal)
+        """
+        # Pack berurutan (konteks kalimat tetangga tetap satu request)
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        current_chars = 0
+        for index, segment in enumerate(segments):
+            if current and (len(current) >= segments_per_call or current_chars + len(segment) > max_chars_per_call):
+                chunks.append(current)
+                current, current_chars = [], 0
+            current.append(index)
+            current_chars += len(segment)
+        if current:
+            chunks.append(current)
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        translations: List[Optional[str]] = [None] * len(segments)
+        
+        async def run_chunk(chunk: List[int]) -> None:
+            async with semaphore:
+                outputs = await self._translate_with_ai([segments[i] for i in chunk], source_lang, target_lang)
+            missing = []
+            for index, output in zip(chunk, outputs):
+                translations[index] = output
+                if output is None:
+                    missing.append(index)
+            
+            # Segmen yang hilang dari jawaban multi-segment: coba sendiri-sendiri
+            if len(chunk) > 1 and missing:
+                await asyncio.gather(*(run_chunk([index]) for index in missing))
+        
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        return translations
+    
+    def _cached_result(self, text: str, cached, source_lang: str, target_lang: str) -> TranslationResult:
+        try:
+            quality = TranslationQuality(cached.quality)
+        except ValueError:
+            quality = TranslationQuality.GOOD
+        return TranslationResult(
+            source_text=text,
+            translated_text=cached.translated_text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            quality=quality,
+            confidence=cached.confidence or 0.9,
+            translator_used="cache",
+            timestamp=cached.timestamp
+        )
+    
+    @staticmethod
+    def _memory_entry(source: str, translated: str, source_lang: str, target_lang: str, quality, confidence):
+        from .translation_memory import TranslationEntry
+        return TranslationEntry(
+            source_text=source,
+            translated_text=translated,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            quality=quality.value,
+            confidence=confidence
+        )
+    
+    @staticmethod
+    def _in_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
     
     def _protect_legal_terms(self, text: str) -> tuple:
         """
@@ -156,92 +471,74 @@ class Translator:
         Returns:
             (protected_text, list of protected terms)
         """
-        protected_terms = []
-        protected_text = text
-        
-        for term_pattern in self.protected_terms:
-            matches = re.finditer(term_pattern, text, re.IGNORECASE)
-            for match in matches:
-                term = match.group()
-                if term not in protected_terms:
-                    protected_terms.append(term)
-                    placeholder = f"__LEGAL_TERM_{len(protected_terms)}__"
-                    protected_text = protected_text.replace(term, placeholder, 1)
-        
-        return protected_text, protected_terms
+        return self.term_masker.mask(text)
     
     def _restore_protected_terms(self, text: str, protected_terms: List[str]) -> str:
         """Restore protected legal terms"""
-        restored = text
+        return self.term_masker.unmask(text, protected_terms)
+    
+    async def _translate_with_ai(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """
+        Translate one or more segments in a single model call
         
-        for i, term in enumerate(protected_terms, 1):
-            placeholder = f"__LEGAL_TERM_{i}__"
-            restored = restored.replace(placeholder, term)
+        Returns:
+            Translations sesuai urutan texts (None untuk segmen yang gagal)
+        """
+        if not self.ai_client or not texts:
+            return [None] * len(texts)
         
-        return restored
-    
-    def _translate_with_ai(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate using AI"""
-        if not self.ai_agent:
-            return self._translate_with_dictionary(text, source_lang, target_lang)
+        if len(texts) == 1:
+            body = f"Text to translate:\n{texts[0]}\n\nTranslation:"
+        else:
+            numbered = "\n".join(f"<<{i}>> {text}" for i, text in enumerate(texts, 1))
+            body = (
+                "Each segment starts with a marker like <<1>>. Reply with every segment translated, "
+                "one per line, keeping the same markers and order. Do not add anything else.\n\n"
+                f"{numbered}"
+            )
         
-        try:
-            prompt = f"""Translate the following legal text from {source_lang} to {target_lang}.
+        prompt = f"""Translate the following legal text from {source_lang} to {target_lang}.
 Maintain legal terminology and formal tone.
 Do not translate legal citations (like UU No. X Tahun XXXX, Pasal X, etc).
+Keep placeholders like __LEGAL_TERM_1__ unchanged.
 
-Text to translate:
-{text}
-
-Translation:"""
-            
-            response = self.ai_agent.generate(prompt, max_tokens=2000)
-            
-            if response and response.strip():
-                return response.strip()
-            
+{body}"""
+        
+        try:
+            response = await self.ai_client.get_chat_completion(
+                [{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=min(8000, max(512, sum(len(text) for text in texts) // 2))
+            )
+            content = (response.get("response") or "").strip()
+        
         except Exception as e:
             print(f"AI translation failed: {e}")
-        
-        # Fallback to dictionary
-        return self._translate_with_dictionary(text, source_lang, target_lang)
+            return [None] * len(texts)
+        
+        if len(texts) == 1:
+            return [content or None]
+        
+        # Parse "<<n>> ..." per segmen
+        outputs: List[Optional[str]] = [None] * len(texts)
+        markers = list(_SEGMENT_MARKER_RE.finditer(content))
+        for j, marker in enumerate(markers):
+            number = int(marker.group(1))
+            end = markers[j + 1].start() if j + 1 < len(markers) else len(content)
+            translated = content[marker.end():end].strip()
+            if 1 <= number <= len(texts) and translated:
+                outputs[number - 1] = translated
+        return outputs
     
     def _translate_with_dictionary(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate using dictionary (word-by-word)"""
-        # Get dictionary
-        dict_key = f"{source_lang}_{target_lang}"
-        dictionary = self.dictionaries.get(dict_key, {})
+        """Translate using dictionary (token-by-token, spasi dan tanda baca tetap)"""
+        dictionary = self.dictionaries.get(f"{source_lang}_{target_lang}", {})
         
         if not dictionary:
             # No dictionary available
             return text
         
-        # Split into words
-        words = text.split()
-        translated_words = []
-        
-        for word in words:
-            # Clean word (remove punctuation for lookup)
-            clean_word = re.sub(r'[^\w\s]', '', word).lower()
-            
-            # Lookup in dictionary
-            if clean_word in dictionary:
-                translated_word = dictionary[clean_word]
-                
-                # Preserve capitalization
-                if word[0].isupper():
-                    translated_word = translated_word.capitalize()
-                
-                # Restore punctuation
-                punctuation = re.findall(r'[^\w\s]', word)
-                if punctuation:
-                    translated_word += ''.join(punctuation)
-                
-                translated_words.append(translated_word)
-            else:
-                translated_words.append(word)
-        
-        return ' '.join(translated_words)
+        return translate_tokens(tokenize(text), dictionary)
     
     def _assess_quality(
         self,
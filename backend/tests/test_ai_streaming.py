@@ -0,0 +1,88 @@
+"""
+AI Streaming Tests
+
+Tests untuk streaming helpers:
+- Provider SSE parsing
+- Delta / done events
+- SSE formatting
+"""
+
+import json
+
+import httpx
+import pytest
+
+from backend.services.ai.streaming import (
+    collect_chat_completion,
+    format_sse,
+    iter_chat_completion_events
+)
+
+
+# ============================================================================
+# Test Data
+# ============================================================================
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    chunk = {
+        "model": "test-model",
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}]
+    }
+    if usage:
+        chunk = {"model": "test-model", "choices": [], "usage": usage}
+    return "data: " + json.dumps(chunk) + "\n\n"
+
+
+PROVIDER_BODY = (
+    _chunk("Menurut ")
+    + ": keep-alive\n\n"
+    + _chunk("Pasal 156")
+    + "data: {not json}\n\n"
+    + _chunk(finish_reason="stop")
+    + _chunk(usage={"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13})
+    + "data: [DONE]\n\n"
+)
+
+
+async def _events():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=PROVIDER_BODY))
+    async with httpx.AsyncClient(transport=transport) as client:
+        async with client.stream("POST", "https://provider.test/chat/completions") as response:
+            async for event in iter_chat_completion_events(response, "default-model"):
+                yield event
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class TestStreaming:
+    """Test streaming helpers"""
+
+    @pytest.mark.asyncio
+    async def test_events_yield_deltas_then_done(self):
+        """Deltas arrive in order, done carries full content and usage"""
+        events = [event async for event in _events()]
+
+        assert [e["content"] for e in events if e["type"] == "delta"] == ["Menurut ", "Pasal 156"]
+
+        done = events[-1]
+        assert done["type"] == "done"
+        assert done["content"] == "Menurut Pasal 156"
+        assert done["model"] == "test-model"
+        assert done["finish_reason"] == "stop"
+        assert done["usage"]["total_tokens"] == 13
+
+    @pytest.mark.asyncio
+    async def test_collect_chat_completion(self):
+        """Drained stream looks like a regular completion"""
+        result = await collect_chat_completion(_events())
+
+        assert result["choices"][0]["message"]["content"] == "Menurut Pasal 156"
+        assert result["usage"]["completion_tokens"] == 3
+
+    def test_format_sse(self):
+        """Test SSE frame format"""
+        frame = format_sse("delta", {"content": "Pasal"})
+
+        assert frame == 'event: delta\ndata: {"content": "Pasal"}\n\n'
@@ -0,0 +1,187 @@
+"""
+Tests for AnalyticsTracker on the columnar, date-partitioned event store
+"""
+
+import json
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.analytics_store import ColumnarEventStore, to_us
+from backend.services.analytics_tracker import AnalyticsTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = AnalyticsTracker(storage_path=str(tmp_path), flush_interval=None)
+    yield tracker
+    tracker.close()
+
+
+def _backdated(tracker, days_ago, event_type="chat_query", **metadata):
+    ts = datetime.utcnow() - timedelta(days=days_ago)
+    event = {
+        "event_id": f"old-{days_ago}-{event_type}",
+        "event_type": event_type,
+        "timestamp": ts.isoformat(),
+        "user_id": "anonymous",
+        "metadata": metadata
+    }
+    tracker.store.append(to_us(ts), event)
+    return event
+
+
+def _record_sample(tracker):
+    tracker.track_chat_query("u1", "Bagaimana cara gugat cerai?", 120.0, True, "id")
+    tracker.track_chat_query("u2", "Sengketa tanah warisan", 300.0, False, "en")
+    tracker.track_chat_query(None, "Kontrak kerja", 180.0, True)
+    tracker.track_citation_detected("u1", "Pasal 378 KUHP", True, "KUHP", "378")
+    tracker.track_prediction_requested("u1", "perdata", "menang", 0.85, 3)
+
+
+def _snapshot(tracker):
+    return (
+        tracker.get_event_counts(),
+        tracker.get_popular_topics(),
+        tracker.get_average_response_time(),
+        tracker.get_success_rate("chat_query"),
+        tracker.get_language_distribution(),
+        tracker.get_citation_statistics(),
+        tracker.get_prediction_accuracy(),
+        [{k: v for k, v in point.items() if k != "timestamp"} for point in tracker.get_usage_timeline()]
+    )
+
+
+def test_aggregations_same_before_and_after_flush(tracker):
+    _record_sample(tracker)
+
+    buffered = _snapshot(tracker)
+    tracker.flush()
+    flushed = _snapshot(tracker)
+
+    assert buffered == flushed
+    counts, topics, response, success, languages, citations, predictions, timeline = flushed
+    assert counts == {"chat_query": 3, "citation_detected": 1, "prediction_requested": 1}
+    assert {"topic": "cerai", "count": 1} in topics
+    assert response == {"average_ms": 200.0, "min_ms": 120.0, "max_ms": 300.0}
+    assert success["successful"] == 2 and success["failed"] == 1
+    assert languages == {"id": 2, "en": 1}
+    assert citations["most_cited_laws"] == [{"law": "KUHP", "count": 1}]
+    assert predictions["high_confidence_count"] == 1
+    assert timeline == [{"chat_query": 3, "citation_detected": 1, "prediction_requested": 1, "total": 5}]
+
+
+def test_date_range_prunes_partitions(tracker):
+    _record_sample(tracker)
+    _backdated(tracker, 40, response_time_ms=5000.0)
+    _backdated(tracker, 10, response_time_ms=1000.0)
+    tracker.flush()
+    assert len(tracker.store.partition_keys()) == 3
+
+    tracker.store._cache.clear()
+    assert tracker.get_event_counts(start_date=datetime.utcnow() - timedelta(days=30))["chat_query"] == 4
+    assert len(tracker.store._cache) == 2  # partisi 40 hari lalu tidak dibuka
+
+    assert tracker.get_average_response_time(days=5)["max_ms"] == 300.0
+    assert tracker.get_event_counts()["chat_query"] == 5
+
+
+def test_get_events_newest_first_with_filters(tracker):
+    old = _backdated(tracker, 3, event_type="export_performed", export_format="pdf")
+    tracker.flush()
+    tracker.track_export_performed("u9", "docx", 4, True, False)
+
+    events = tracker.get_events(event_type="export_performed")
+
+    assert [e["metadata"]["export_format"] for e in events] == ["docx", "pdf"]
+    assert events[1] == old
+    assert tracker.get_events(user_id="u9", limit=5)[0]["user_id"] == "u9"
+    assert tracker.get_events(limit=1)[0]["metadata"]["export_format"] == "docx"
+
+
+def test_compaction_retention_and_legacy_migration(tmp_path):
+    day = (datetime.utcnow() - timedelta(days=100)).strftime("%Y-%m-%d")
+    legacy_event = {
+        "event_id": "legacy-1",
+        "event_type": "chat_query",
+        "timestamp": f"{day}T10:00:00",
+        "user_id": "anonymous",
+        "metadata": {"query_keywords": ["waris"], "response_time_ms": 50}
+    }
+    (tmp_path / f"events_{day}.jsonl").write_text(json.dumps(legacy_event) + "\n", encoding="utf-8")
+
+    tracker = AnalyticsTracker(storage_path=str(tmp_path), flush_interval=None)
+    assert (tmp_path / f"events_{day}.jsonl.migrated").exists()
+    assert tracker.get_events() == [legacy_event]
+
+    _backdated(tracker, 100, response_time_ms=70.0)
+    tracker.flush()
+    assert tracker.store.compact(before=datetime.utcnow().strftime("%Y-%m-%d")) == 1
+    assert [f.name for f in (tmp_path / day).iterdir()] == ["part.npz"]
+    assert tracker.get_event_counts() == {"chat_query": 2}
+
+    tracker.clear_old_events(days=90)
+    assert tracker.get_event_counts() == {}
+    tracker.close()
+
+
+def _store_with_old_segments(path, count=10, days_ago=3):
+    store = ColumnarEventStore(str(path), flush_interval=None)
+    ts = datetime.utcnow() - timedelta(days=days_ago)
+    for i in range(count):
+        # satu segmen per event supaya compaction punya beberapa file
+        store.append(to_us(ts), {
+            "event_id": f"evt-{i}", "event_type": "chat_query",
+            "timestamp": ts.isoformat(), "user_id": "anonymous", "metadata": {}
+        })
+        store.flush()
+    return store, ts.strftime("%Y-%m-%d")
+
+
+def _stored_events(store):
+    return sum(int(mask.sum()) for _, mask in store.scan())
+
+
+def test_concurrent_compaction_across_processes_does_not_duplicate(tmp_path):
+    a, day = _store_with_old_segments(tmp_path)
+    b = ColumnarEventStore(str(tmp_path), flush_interval=None)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    original_write = a._write_file
+    b_result = {}
+
+    def write_then_race(path, columns):
+        original_write(path, columns)
+        if path.name == "part.npz":
+            # B mencoba compact setelah A menulis part.npz, sebelum A unlink segmen
+            racer = threading.Thread(target=lambda: b_result.update(compacted=b.compact(before=today)))
+            racer.start()
+            racer.join(timeout=0.3)
+            b_result["blocked"] = racer.is_alive()
+            b_result["thread"] = racer
+
+    a._write_file = write_then_race
+    assert a.compact(before=today) == 1
+    b_result["thread"].join(timeout=5)
+
+    assert b_result == {"blocked": True, "compacted": 0, "thread": b_result["thread"]}
+    assert [f.name for f in (tmp_path / day).iterdir()] == ["part.npz"]
+    assert _stored_events(a) == _stored_events(b) == 10
+    a.close()
+    b.close()
+
+
+def test_segments_merged_twice_are_deduplicated(tmp_path):
+    store, day = _store_with_old_segments(tmp_path)
+    segments = sorted((tmp_path / day).glob("seg-*.npz"))
+    # Crash setelah part.npz tertulis tapi sebelum segmen dihapus
+    store._write_file(tmp_path / day / "part.npz", store._load(day).columns)
+    for segment in segments[:3]:
+        shutil.copy(segment, segment.with_name("seg-0-copy" + segment.name[4:]))
+
+    assert _stored_events(store) == 10
+    assert store.compact(before=datetime.utcnow().strftime("%Y-%m-%d")) == 1
+    assert _stored_events(store) == 10
+    store.close()
@@ -0,0 +1,106 @@
+"""
+Tests for the content-addressed document blob store
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from backend.services.blob_store import BlobStore, BlobTooLargeError, resolve_blob_store_path
+
+
+def test_save_streams_and_deduplicates(tmp_path):
+    store = BlobStore(str(tmp_path), chunk_size=1024)
+    data = b"%PDF-1.7 " + b"x" * 10_000
+
+    first = store.save_fileobj(io.BytesIO(data))
+    second = store.save_bytes(data)
+
+    assert first.sha256 == hashlib.sha256(data).hexdigest()
+    assert first.size == len(data) and not first.deduplicated
+    assert second.deduplicated and second.path == first.path
+    assert first.to_dict() == {"storage": "local", "sha256": first.sha256, "size": len(data)}
+    with store.open(first.sha256) as f:
+        assert f.read() == data
+
+    assert store.delete(first.sha256)
+    assert not store.exists(first.sha256)
+    assert not store.delete(first.sha256)
+
+
+def test_oversized_upload_is_rejected_without_leftovers(tmp_path):
+    store = BlobStore(str(tmp_path), chunk_size=100)
+
+    with pytest.raises(BlobTooLargeError):
+        store.save_fileobj(io.BytesIO(b"a" * 1000), max_size=500)
+
+    assert not any(p.is_file() for p in tmp_path.rglob("*"))
+
+
+@pytest.mark.asyncio
+async def test_save_upload_reads_upload_file(tmp_path):
+    store = BlobStore(str(tmp_path))
+    upload = UploadFile(io.BytesIO(b"Pasal 1 tentang hukum"), filename="pasal.txt")
+
+    blob = await store.save_upload(upload, max_size=1024)
+
+    assert blob.path.read_bytes() == b"Pasal 1 tentang hukum"
+
+
+def test_root_does_not_depend_on_working_directory(tmp_path, monkeypatch):
+    default = resolve_blob_store_path()
+    monkeypatch.chdir(tmp_path)
+    assert resolve_blob_store_path() == default
+    assert resolve_blob_store_path("backend/data/document_blobs") == default
+    assert default.is_absolute() and default.parts[-3:] == ("backend", "data", "document_blobs")
+    assert resolve_blob_store_path(str(tmp_path / "blobs")) == tmp_path / "blobs"
+
+
+@pytest.mark.asyncio
+async def test_release_keeps_referenced_and_recently_deduplicated_blobs(tmp_path):
+    store = BlobStore(str(tmp_path))
+    blob = store.save_bytes(b"kontrak sewa")
+    references = set()
+
+    async def is_referenced(sha256):
+        return sha256 in references
+
+    # Upload baru (mtime segar): dokumen dengan isi sama mungkin belum ter-insert
+    assert not await store.release(blob.sha256, is_referenced, grace_seconds=60)
+    assert store.exists(blob.sha256)
+
+    references.add(blob.sha256)
+    assert not await store.release(blob.sha256, is_referenced, grace_seconds=0)
+    assert store.exists(blob.sha256)
+
+    references.clear()
+    old = blob.path.stat().st_mtime - 120
+    os.utime(blob.path, (old, old))
+    assert store.save_bytes(b"kontrak sewa").deduplicated  # dedup menyegarkan mtime
+    assert not await store.release(blob.sha256, is_referenced, grace_seconds=60)
+
+    os.utime(blob.path, (old, old))
+    assert await store.release(blob.sha256, is_referenced, grace_seconds=60)
+    assert not store.exists(blob.sha256)
+    assert not any(p.is_file() for p in tmp_path.rglob("*"))
+    assert not await store.release(blob.sha256, is_referenced)
+
+
+def test_dedup_during_release_rewrites_the_blob(tmp_path, monkeypatch):
+    store = BlobStore(str(tmp_path))
+    blob = store.save_bytes(b"akta")
+
+    def utime_after_release(path, *args, **kwargs):
+        # release() di proses lain menghapus blob di antara is_file() dan utime()
+        os.unlink(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr("backend.services.blob_store.os.utime", utime_after_release)
+    again = store.save_bytes(b"akta")
+
+    assert not again.deduplicated
+    with store.open(blob.sha256) as f:
+        assert f.read() == b"akta"
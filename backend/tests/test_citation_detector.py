@@ -0,0 +1,160 @@
+"""
+Tests for the single-pass CitationDetector (master regex + detect_iter)
+"""
+
+import re
+
+import pytest
+
+from backend.services.citation.citation_detector import CitationDetector, CitationType
+
+
+STATUTE_TEXT = (
+    "Pasal 1\n"
+    "(1) Berdasarkan Undang-Undang Nomor 13 Tahun 2003 tentang Ketenagakerjaan, "
+    "pekerja berhak atas upah sebagaimana dimaksud dalam Pasal 88 ayat (2).\n"
+    "(2) Ketentuan lebih lanjut diatur dengan PP No. 35 Tahun 2021 dan Pasal 5 huruf b.\n"
+    "Pasal 2\n"
+    "Pelaku dipidana berdasarkan Pasal 378 KUHP dan Putusan No. 123/Pid/2024/PN.Jkt "
+    "sebagaimana diubah dengan UU 6/2023, lihat pula Pasal 10 sampai dengan Pasal 12.\n"
+) * 20
+
+
+@pytest.fixture
+def detector():
+    return CitationDetector()
+
+
+def _key(citation):
+    return (citation.start_pos, citation.end_pos, citation.type, citation.confidence, citation.normalized)
+
+
+def test_detect_is_ordered_and_non_overlapping(detector):
+    citations = detector.detect(STATUTE_TEXT)
+
+    assert len(citations) == 20 * 12
+    for prev, current in zip(citations, citations[1:]):
+        assert prev.end_pos <= current.start_pos
+    for citation in citations:
+        assert STATUTE_TEXT[citation.start_pos:citation.end_pos] == citation.text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 4096])
+def test_detect_iter_chunks_match_full_text(detector, chunk_size):
+    chunks = (STATUTE_TEXT[i:i + chunk_size] for i in range(0, len(STATUTE_TEXT), chunk_size))
+
+    streamed = list(detector.detect_iter(chunks))
+
+    assert [_key(c) for c in streamed] == [_key(c) for c in detector.detect(STATUTE_TEXT)]
+
+
+def test_specific_pattern_wins_at_same_position(detector):
+    citations = detector.detect("Lihat Pasal 88 ayat (2) dan Pasal 5 huruf b serta Pasal 378.")
+
+    assert [c.text for c in citations] == ["Pasal 88 ayat (2)", "Pasal 5 huruf b", "Pasal 378"]
+    assert citations[0].normalized == "Pasal 88 ayat (2)"
+    assert citations[0].metadata == {"raw_text": "Pasal 88 ayat (2)", "pasal": "88", "ayat": "2"}
+    assert all(c.type == CitationType.PASAL for c in citations)
+
+
+def test_confidence_uses_context_window(detector):
+    with_context = detector.detect("Berdasarkan UU No. 13 Tahun 2003 tentang Ketenagakerjaan")[0]
+    without_context = detector.detect("x" * 100 + " UU No. 13 Tahun 2003 " + "x" * 100)[0]
+
+    # format lengkap 0.5 + "berdasarkan" 0.05 + Nomor 0.1 + Tahun 0.1
+    assert with_context.confidence == pytest.approx(0.75)
+    assert without_context.confidence == pytest.approx(0.7)
+    assert with_context.metadata["nomor"] == "13"
+
+
+# Referensi: perilaku PASAL sebelum master regex (satu finditer per pola,
+# urut posisi, overlap diselesaikan dengan confidence lebih tinggi)
+LEGACY_PASAL_PATTERNS = [
+    r"Pasal\s+(\d+)\s+ayat\s*\((\d+)\)",
+    r"Pasal\s+(\d+)(?!\s+ayat)",
+    r"Pasal\s+(\d+)\s+huruf\s+([a-z])",
+    r"Pasal\s+(\d+)\s+(?:sampai|hingga|s\.?d\.?)\s+(?:Pasal\s+)?(\d+)",
+]
+LEGACY_KEYWORDS = [
+    "berdasarkan", "sesuai", "menurut", "mengacu", "merujuk",
+    "pasal", "ayat", "undang-undang", "peraturan", "ketentuan",
+    "hukum", "pidana", "perdata", "putusan", "pengadilan"
+]
+
+
+def _legacy_pasal(text):
+    found = []
+    for pattern in LEGACY_PASAL_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            context = text[max(0, match.start() - 50):match.end() + 50].lower()
+            confidence = 0.5 + min(0.3, sum(kw in context for kw in LEGACY_KEYWORDS) * 0.05)
+            found.append((match, confidence))
+    found.sort(key=lambda item: item[0].start())
+
+    kept = []
+    for match, confidence in found:
+        if kept and match.start() < kept[-1][0].end():
+            if confidence > kept[-1][1]:
+                kept[-1] = (match, confidence)
+            continue
+        kept.append((match, confidence))
+    return [(m.start(), m.end(), m.group(0), m.group(1)) for m, _ in kept]
+
+
+def _pasal(citations):
+    return [
+        (c.start_pos, c.end_pos, c.text, c.metadata["pasal"])
+        for c in citations if c.type == CitationType.PASAL
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "Pasal 88 ayat (2)",
+    "berdasarkan Pasal 1 ayat(3) dan Pasal 27 ayat (1) UUD",
+    "Pasal 5 sampai Pasal 9 ayat (2)",
+])
+def test_ayat_matches_legacy(detector, text):
+    citations = detector.detect(text)
+
+    assert _pasal(citations) == _legacy_pasal(text)
+    for citation in citations:
+        assert ("ayat" in citation.metadata) == ("ayat" in citation.text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Pasal 5 sampai Pasal 9", [("5", {"range_end": "9"}), ("9", {"range_start": "5"})]),
+    ("Pasal 10 sampai dengan Pasal 12", [("10", {"range_end": "12"}), ("12", {"range_start": "10"})]),
+    ("lihat Pasal 7 hingga Pasal 11 KUHP", [("7", {"range_end": "11"}), ("11", {"range_start": "7"})]),
+])
+def test_range_keeps_both_ends_like_legacy(detector, text, expected):
+    citations = [c for c in detector.detect(text) if c.type == CitationType.PASAL]
+
+    # Tidak ada lagi satu sitasi gabungan dengan nomor pasal akhir sebagai "ayat"
+    assert _pasal(citations) == _legacy_pasal(text)
+    assert [(c.metadata["pasal"], {k: v for k, v in c.metadata.items() if k.startswith("range_")}) for c in citations] == expected
+    assert all("ayat" not in c.metadata for c in citations)
+
+
+def test_range_without_second_pasal_keyword(detector):
+    citations = detector.detect("Pasal 180 s.d. 220")
+
+    # Versi lama kehilangan pasal akhir; sekarang keduanya ada
+    assert _legacy_pasal("Pasal 180 s.d. 220") == [(0, 9, "Pasal 180", "180")]
+    assert [(c.text, c.normalized, c.metadata["pasal"]) for c in citations] == [
+        ("Pasal 180", "Pasal 180", "180"),
+        ("220", "Pasal 220", "220"),
+    ]
+
+
+@pytest.mark.parametrize("text, pasal, huruf", [
+    ("Pasal 3 huruf a", "3", "a"),
+    ("sesuai Pasal 5 huruf B dan Pasal 6", "5", "b"),
+])
+def test_huruf_is_not_ayat(detector, text, pasal, huruf):
+    citation = detector.detect(text)[0]
+    legacy = _legacy_pasal(text)[0]
+
+    assert (citation.start_pos, citation.metadata["pasal"]) == (legacy[0], legacy[3]) == (citation.start_pos, pasal)
+    assert citation.metadata["huruf"] == huruf
+    assert "ayat" not in citation.metadata
+    assert citation.normalized == f"Pasal {pasal} huruf {huruf}"
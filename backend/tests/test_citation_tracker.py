@@ -0,0 +1,148 @@
+"""
+Tests for the bucketed, bounded CitationTracker
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from backend.services.citation import citation_tracker as tracker_module
+from backend.services.citation.citation_detector import CitationType
+from backend.services.citation.citation_tracker import (
+    CitationTracker,
+    CitationUsage,
+    SQLiteCitationStore,
+    close_tracker
+)
+
+
+def _usage(text="UU No. 13 Tahun 2003", type=CitationType.UU, days_ago=0.0, user_id=None,
+           law_id="uu-13-2003", confidence=0.9):
+    return CitationUsage(
+        citation_text=text,
+        citation_type=type,
+        law_id=law_id,
+        law_title="UU Ketenagakerjaan" if law_id else None,
+        timestamp=datetime.now() - timedelta(days=days_ago),
+        user_id=user_id,
+        metadata={"confidence": confidence, "linked": law_id is not None, "link_status": None}
+    )
+
+
+def test_statistics_from_rollups():
+    tracker = CitationTracker()
+    for _ in range(3):
+        tracker.record_usage(_usage(user_id="u1"))
+    tracker.record_usage(_usage("Pasal 378", CitationType.PASAL, law_id=None, confidence=0.6))
+    tracker.record_usage(_usage("PP No. 35 Tahun 2021", CitationType.PP, days_ago=30, law_id="pp-35-2021"))
+
+    stats = tracker.get_statistics()
+    assert stats.total_citations == 5
+    assert stats.unique_citations == 3
+    assert stats.by_law == {"uu-13-2003": 3, "pp-35-2021": 1}
+
+    week = tracker.get_statistics(time_range=timedelta(days=7))
+    assert week.total_citations == 4
+    assert week.by_type == {"undang_undang": 3, "pasal": 1}
+    assert week.top_citations[0] == {"text": "UU No. 13 Tahun 2003", "count": 3, "percentage": 75.0}
+
+    assert tracker.get_statistics(citation_type=CitationType.PP).total_citations == 1
+    assert tracker.get_statistics(user_id="u1").total_citations == 3
+
+    quality = tracker.get_citation_quality_metrics()
+    assert quality["linked_citations"] == 4
+    assert quality["quality_distribution"] == {"high": 4, "medium": 1, "low": 0}
+
+
+def test_trending_compares_previous_period():
+    tracker = CitationTracker()
+    for _ in range(4):
+        tracker.record_usage(_usage("Pasal 378", CitationType.PASAL))
+    tracker.record_usage(_usage("Pasal 378", CitationType.PASAL, days_ago=10))
+    tracker.record_usage(_usage("Pasal 372", CitationType.PASAL, days_ago=3))
+
+    trending = tracker.get_trending_citations(time_range=timedelta(days=7))
+
+    by_text = {t["text"]: t for t in trending}
+    assert by_text["Pasal 378"]["current_count"] == 4
+    assert by_text["Pasal 378"]["previous_count"] == 1
+    assert by_text["Pasal 378"]["growth_percentage"] == 300.0
+    assert by_text["Pasal 372"]["is_new"] is True
+
+
+def test_memory_is_bounded():
+    tracker = CitationTracker(recent_size=5, user_history_size=3, max_users=2)
+    for i in range(20):
+        tracker.record_usage(_usage(f"Pasal {i}", CitationType.PASAL, user_id=f"user-{i % 4}"))
+
+    assert len(tracker.recent) == 5
+    assert len(tracker.user_rollups) == 2
+    assert set(tracker.user_recent) <= set(tracker.user_rollups)
+    assert all(len(history) <= 3 for history in tracker.user_recent.values())
+    # round-robin 4 user dengan max_users=2: user lama di-evict (LRU)
+    assert list(tracker.user_rollups) == ["user-2", "user-3"]
+    assert [u.citation_text for u in tracker.get_user_history("user-3")] == ["Pasal 19"]
+    # rollup tetap menghitung semua event
+    assert tracker.get_statistics().total_citations == 20
+
+
+def test_sqlite_store_rebuilds_rollups(tmp_path):
+    db_path = str(tmp_path / "citations.db")
+    tracker = CitationTracker(store=SQLiteCitationStore(db_path), flush_batch_size=2, user_history_size=2)
+    for days_ago in (0, 0, 20):
+        tracker.record_usage(_usage(user_id="u1", days_ago=days_ago))
+    tracker.record_usage(_usage("Pasal 378", CitationType.PASAL, law_id=None, user_id="u1"))
+    expected = tracker.get_statistics()
+    tracker.close()
+
+    restored = CitationTracker(store=SQLiteCitationStore(db_path))
+
+    stats = restored.get_statistics()
+    assert stats.total_citations == expected.total_citations == 4
+    assert stats.by_law == expected.by_law
+    assert restored.get_statistics(time_range=timedelta(days=7)).total_citations == 3
+    assert restored.get_statistics(user_id="u1").total_citations == 4
+    assert len(restored.get_user_history("u1", limit=10)) == 4
+    assert restored.get_citation_quality_metrics()["linked_citations"] == 3
+    restored.close()
+
+
+def _stored(db_path):
+    store = SQLiteCitationStore(db_path)
+    try:
+        return sum(row[-1] for row in store.totals())
+    finally:
+        store.close()
+
+
+def test_background_writer_flushes_partial_batch(tmp_path):
+    db_path = str(tmp_path / "citations.db")
+    tracker = CitationTracker(store=SQLiteCitationStore(db_path), flush_batch_size=500, flush_interval=0.05)
+    tracker.record_usage(_usage(user_id="u1"))
+    tracker.record_usage(_usage("Pasal 378", CitationType.PASAL, law_id=None))
+
+    deadline = time.time() + 5
+    while len(tracker.pending) and time.time() < deadline:
+        time.sleep(0.02)
+
+    # Jauh di bawah flush_batch_size, tapi sudah ditulis oleh timer
+    assert len(tracker.pending) == 0
+    assert _stored(db_path) == 2
+    tracker.close()
+
+
+def test_close_tracker_flushes_singleton(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "citations.db")
+    monkeypatch.setenv("CITATION_TRACKER_DB", db_path)
+    monkeypatch.setenv("CITATION_TRACKER_FLUSH_INTERVAL", "3600")
+    monkeypatch.setattr(tracker_module, "_citation_tracker", None)
+
+    tracker = tracker_module.get_citation_tracker()
+    tracker.record_usage(_usage(user_id="u1"))
+    assert _stored(db_path) == 0
+
+    close_tracker()
+
+    assert tracker_module._citation_tracker is None
+    assert not tracker._writer.is_alive()
+    assert _stored(db_path) == 1
+    close_tracker()  # idempotent
@@ -0,0 +1,117 @@
+"""
+Consensus Execution Mode Tests
+
+Tests untuk latency-aware execution:
+- First-acceptable-wins
+- Hedged requests
+- Background audit / cancellation
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.ai.consensus_engine import DualAIConsensusEngine
+from backend.services.ai.response_cache import InMemoryResponseCache, ResponseCache
+
+
+GOOD_ANSWER = "Pesangon dihitung berdasarkan masa kerja sesuai Pasal 156 UU Ketenagakerjaan."
+
+
+class SlowService:
+    """Fake provider with a fixed latency"""
+
+    def __init__(self, model_id: str, delay: float, content: str = GOOD_ANSWER, finish_reason: str = "stop"):
+        self.model_id = model_id
+        self.delay = delay
+        self.content = content
+        self.finish_reason = finish_reason
+        self.calls = 0
+        self.finished = 0
+
+    async def chat_completion(self, messages, temperature, max_tokens):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        self.finished += 1
+        return {
+            "choices": [{"message": {"content": self.content}, "finish_reason": self.finish_reason}],
+            "usage": {"total_tokens": 150}
+        }
+
+
+class TestExecutionModes:
+    """Test hedged / first-acceptable execution"""
+
+    @pytest.mark.asyncio
+    async def test_first_acceptable_returns_fast_answer_and_audits(self):
+        """Fast acceptable Groq answer wins; BytePlus finishes in background"""
+        byteplus = SlowService("ark", 0.3)
+        groq = SlowService("groq", 0.01)
+        cache = ResponseCache(InMemoryResponseCache(), near_duplicate=False)
+        engine = DualAIConsensusEngine(
+            byteplus, groq, response_cache=cache, execution_mode="first_acceptable"
+        )
+
+        start = time.perf_counter()
+        result = await engine.get_consensus_response("Berapa pesangon PHK 5 tahun?")
+
+        assert time.perf_counter() - start < 0.2
+        assert result.consensus_method == "first_acceptable_groq"
+        assert result.final_content == GOOD_ANSWER
+        assert result.byteplus_response.metadata["is_pending"] is True
+
+        await engine.drain_background()
+
+        audit = engine.audit_records[-1]
+        assert audit["completed"] is True
+        assert audit["similarity_score"] == pytest.approx(1.0)
+        # Audited full consensus is what gets cached
+        cached = await engine.get_consensus_response("Berapa pesangon PHK 5 tahun?")
+        assert cached.from_cache and cached.cache_info["provenance"]["audited"] is True
+
+    @pytest.mark.asyncio
+    async def test_unacceptable_fast_answer_waits_for_other(self):
+        """A low-confidence fast answer does not win"""
+        byteplus = SlowService("ark", 0.05)
+        groq = SlowService("groq", 0.01, content="Tidak tahu.", finish_reason="length")
+        engine = DualAIConsensusEngine(byteplus, groq, execution_mode="first_acceptable")
+
+        result = await engine.get_consensus_response("Berapa pesangon PHK 5 tahun?")
+
+        assert result.byteplus_response.content == GOOD_ANSWER
+        assert groq.finished == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_skips_secondary_when_primary_is_fast(self):
+        """No hedge request if the primary answers before its p95 delay"""
+        byteplus = SlowService("ark", 0.01)
+        groq = SlowService("groq", 0.01)
+        engine = DualAIConsensusEngine(byteplus, groq, execution_mode="hedged")
+        engine.HEDGE_DEFAULT_DELAY = 0.2
+
+        result = await engine.get_consensus_response("Apa itu PKWT?")
+
+        assert result.consensus_method == "hedged_byteplus"
+        assert groq.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_hedged_fires_secondary_after_delay(self):
+        """Slow primary gets hedged and the hedge wins"""
+        byteplus = SlowService("ark", 0.5)
+        groq = SlowService("groq", 0.01)
+        engine = DualAIConsensusEngine(
+            byteplus, groq, execution_mode="hedged", audit_background=False
+        )
+        engine.HEDGE_DEFAULT_DELAY = 0.05
+
+        start = time.perf_counter()
+        result = await engine.get_consensus_response("Apa itu PKWT?")
+        elapsed = time.perf_counter() - start
+
+        assert result.consensus_method == "hedged_groq"
+        assert 0.05 <= elapsed < 0.3
+
+        # Without background audit the slow call is cancelled
+        await asyncio.sleep(0.01)
+        assert byteplus.calls == 1 and byteplus.finished == 0
@@ -0,0 +1,86 @@
+"""
+Tests for the token-budgeted conversation context builder
+"""
+
+import pytest
+
+from backend.services.ai.context_builder import (
+    ContextSummary,
+    ConversationContextBuilder,
+    TokenCounter,
+    update_rolling_summary
+)
+
+
+def _turns(count, words=40):
+    return [
+        {"n": i, "role": "user" if i % 2 == 0 else "assistant", "content": " ".join(["kata"] * words) + f" {i}"}
+        for i in range(count)
+    ]
+
+
+def test_prompt_stays_bounded_and_schedules_summary():
+    counter = TokenCounter()
+    builder = ConversationContextBuilder(
+        token_budget=500, recent_window_tokens=250, summary_max_tokens=100, summary_batch_tokens=50, counter=counter
+    )
+
+    window = builder.build(_turns(40))
+
+    assert window.prompt_tokens <= 500
+    assert window.messages[-1]["content"].endswith(" 39")
+    assert window.tokens_saved == window.full_tokens - window.prompt_tokens > 0
+    assert 0 < window.summarize_until < 39
+    assert builder.metrics.to_dict()["requests"] == 1
+
+    summary = ContextSummary(text="Sengketa sewa ruko.", covered_until=35, pinned={"law_reference": ["Pasal 1365"]}, tokens=20)
+    window = builder.build(_turns(40), summary)
+    assert window.messages[0]["role"] == "system"
+    assert "Pasal 1365" in window.messages[0]["content"]
+    assert [m["content"][-2:] for m in window.messages[1:]] == [str(i) for i in range(35, 40)]
+    assert window.summarize_until is None
+
+
+class _MemoryStore:
+    def __init__(self, messages):
+        self.messages = messages
+        self.header = {}
+
+    async def get_summary(self, transcript_id):
+        return self.header
+
+    async def load_range(self, transcript_id, start, end):
+        return [m for m in self.messages if start <= m["n"] < end]
+
+    async def save_context_summary(self, transcript_id, summary):
+        self.header["context_summary"] = summary
+        return True
+
+
+class _SummaryAI:
+    def __init__(self):
+        self.calls = []
+
+    async def chat_completion(self, messages, temperature, max_tokens):
+        self.calls.append(messages)
+        return {"success": True, "content": "- Penyewa menunggak sewa 3 bulan"}
+
+
+@pytest.mark.asyncio
+async def test_rolling_summary_is_incremental_and_pins_facts():
+    messages = [
+        {"n": 0, "role": "user", "content": "Penyewa menunggak Rp 15.000.000 sejak 1 Maret 2024"},
+        {"n": 1, "role": "assistant", "content": "Ini wanprestasi.", "citations": [{"text": "Pasal 1243 KUHPerdata"}]},
+        {"n": 2, "role": "user", "content": "Apa langkah berikutnya?"},
+    ]
+    store, ai = _MemoryStore(messages), _SummaryAI()
+
+    summary = await update_rolling_summary(store, "t1", 2, ai_service=ai)
+    assert summary.covered_until == 2
+    assert summary.pinned["citation"] == ["Pasal 1243 KUHPerdata"]
+    assert any("15.000.000" in value for value in summary.pinned["money"])
+    assert store.header["context_summary"]["text"] == "- Penyewa menunggak sewa 3 bulan"
+
+    # Already covered: no second model call
+    await update_rolling_summary(store, "t1", 2, ai_service=ai)
+    assert len(ai.calls) == 1
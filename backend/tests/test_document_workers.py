@@ -0,0 +1,60 @@
+"""
+Tests for the document extraction worker pool
+"""
+
+import pytest
+
+from backend.services.document_workers import (
+    DocumentExtractionPool,
+    PageText,
+    PageTextCache,
+    format_pages,
+)
+
+
+def test_page_cache_roundtrip_and_key_includes_ocr_settings(tmp_path):
+    cache = PageTextCache(str(tmp_path))
+    key = PageTextCache.make_key("abc", "ind+eng", 300)
+
+    assert cache.get(key) is None
+    cache.put(key, "Pasal 1\nKetentuan umum")
+    assert cache.get(key) == "Pasal 1\nKetentuan umum"
+    assert PageTextCache.make_key("abc", "ind", 300) != key
+    assert PageTextCache.make_key("abc", "ind+eng", 200) != key
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_format_pages_keeps_page_headers():
+    pages = [PageText(1, "Pasal 1", "text_layer"), PageText(2, "Pasal 2", "ocr")]
+
+    assert format_pages(pages) == "--- Halaman 1 ---\nPasal 1\n--- Halaman 2 ---\nPasal 2"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_pdf_pages_extracted_in_order_with_progress(tmp_path, workers):
+    fitz = pytest.importorskip("fitz")
+
+    pdf_path = tmp_path / "kontrak.pdf"
+    doc = fitz.open()
+    for number in range(1, 6):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Pasal {number} tentang kewajiban para pihak dalam perjanjian ini")
+    doc.save(str(pdf_path))
+    doc.close()
+
+    pool = DocumentExtractionPool(max_workers=workers, cache_dir=str(tmp_path / "cache"))
+    progress = []
+
+    async def report(done, total):
+        progress.append((done, total))
+
+    try:
+        pages = await pool.extract_pdf_pages(str(pdf_path), progress=report)
+    finally:
+        pool.shutdown()
+
+    assert [page.page for page in pages] == [1, 2, 3, 4, 5]
+    assert all(page.method == "text_layer" for page in pages)
+    assert "Pasal 3" in pages[2].text
+    assert progress[0] == (0, 5) and progress[-1] == (5, 5)
@@ -0,0 +1,62 @@
+"""
+Tests for the field encryption service
+"""
+
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+
+from backend.core.encryption import EncryptionConfigError, EncryptionService
+
+
+def test_key_rotation_keeps_old_tokens_readable():
+    old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+    old_token = EncryptionService([old_key]).encrypt("Pasal 1320 KUHPerdata")
+
+    service = EncryptionService([new_key, old_key])
+    assert service.decrypt(old_token) == "Pasal 1320 KUHPerdata"
+
+    rotated = service.rotate(old_token)
+    assert EncryptionService([new_key]).decrypt(rotated) == "Pasal 1320 KUHPerdata"
+
+
+def test_legacy_double_encoded_key_is_accepted():
+    key = Fernet.generate_key()
+    legacy = base64.urlsafe_b64encode(key).decode()
+    assert EncryptionService([legacy]).decrypt(EncryptionService([key]).encrypt("halo")) == "halo"
+
+    with pytest.raises(EncryptionConfigError):
+        EncryptionService(["not-a-key"])
+
+
+@pytest.mark.asyncio
+async def test_bulk_decrypt_marks_bad_tokens_and_offloads_large_batches():
+    service = EncryptionService([Fernet.generate_key()], thread_threshold=10)
+    tokens = [service.encrypt(f"pesan {i}") for i in range(50)]
+    tokens[3] = "rusak"
+    tokens[4] = None
+
+    plaintext = await service.decrypt_many_async(tokens, default="[unavailable]")
+
+    assert plaintext[0] == "pesan 0" and plaintext[49] == "pesan 49"
+    assert plaintext[3] == "[unavailable]"
+    assert plaintext[4] is None
+
+
+def test_crud_imports_and_builds_message_page():
+    # database.py needs sqlalchemy[asyncio]; crud must import without models.ChatMessage at class-definition time
+    pytest.importorskip("greenlet")
+    crud = pytest.importorskip("crud")
+    from types import SimpleNamespace
+
+    rows = [
+        SimpleNamespace(content=crud.encrypt_text("halo"), citations='["Pasal 1"]', role="user"),
+        SimpleNamespace(content="rusak", citations=None, role="assistant"),
+    ]
+    page = crud.ChatMessagePage(rows)
+
+    assert len(page) == 2
+    assert page[0].content == "halo" and page[0].citations == ["Pasal 1"] and page[0].role == "user"
+    assert page[-1].content == crud.UNAVAILABLE_CONTENT
+    assert rows[0].content != "halo"
@@ -0,0 +1,127 @@
+"""
+Tests for the durable SQLite job queue and worker
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.jobs import JobQueue, JobStatus, JobWorker, register_handler, retry_delay
+from backend.services.jobs.queue import resolve_job_db_path
+
+
+def test_priority_idempotency_and_concurrency_caps(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), concurrency_caps={"documents": 1})
+
+    low = queue.enqueue("documents.process", {"n": 1}, queue="documents")
+    high = queue.enqueue("documents.process", {"n": 2}, queue="documents", priority=10)
+    duplicate = queue.enqueue("documents.process", {"n": 3}, queue="documents", idempotency_key="doc:1")
+    assert queue.enqueue("documents.process", {"n": 4}, queue="documents", idempotency_key="doc:1").id == duplicate.id
+
+    first = queue.claim(["documents"], "w1")
+    assert first.id == high.id and first.status == JobStatus.RUNNING and first.attempts == 1
+    assert queue.claim(["documents"], "w2") is None  # cap documents=1
+
+    queue.complete(first.id, {"ok": True})
+    assert queue.get(first.id).result == {"ok": True}
+    assert queue.claim(["documents"], "w2").id == low.id
+
+    # Queue lain yang sama file-nya (process lain) melihat state yang sama
+    other = JobQueue(str(tmp_path / "jobs.sqlite3"), concurrency_caps={})
+    assert other.stats()["documents"] == {"succeeded": 1, "running": 1, "queued": 1}
+
+
+def test_retry_backoff_and_expired_lease(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), concurrency_caps={})
+    job = queue.enqueue("research.exhaustive", queue="research", max_attempts=2)
+
+    claimed = queue.claim(["research"], "w1")
+    before = time.time()
+    retried = queue.fail(claimed.id, "boom")
+    assert retried.status == JobStatus.QUEUED and retried.error == "boom"
+    assert retried.run_at >= before + retry_delay(1) - 0.01
+    assert queue.claim(["research"], "w1") is None  # belum waktunya
+
+    # Worker mati di percobaan terakhir: lease habis -> failed, tidak diulang
+    queue._conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (job.id,))
+    assert queue.claim(["research"], "w2", lease_seconds=-1).attempts == 2
+    assert queue.claim(["research"], "w3") is None
+    assert queue.get(job.id).status == JobStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_handlers_with_progress_retry_and_cancel(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), concurrency_caps={}, retry_base_seconds=0)
+    calls = []
+
+    async def flaky(payload, ctx):
+        calls.append(ctx.attempt)
+        await ctx.progress(stage="working", attempt=ctx.attempt)
+        if ctx.attempt == 1:
+            raise ValueError("transient")
+        return {"doubled": payload["n"] * 2}
+
+    async def slow(payload, ctx):
+        await asyncio.sleep(10)
+
+    register_handler("test.flaky", flaky)
+    register_handler("test.slow", slow)
+
+    ok = queue.enqueue("test.flaky", {"n": 21}, queue="test", max_attempts=2)
+    worker = JobWorker(["test"], job_queue=queue, concurrency=2, poll_interval=0.01, lease_seconds=0.3)
+    await worker.run(stop_when_idle=True)
+
+    done = queue.get(ok.id)
+    assert calls == [1, 2]
+    assert done.status == JobStatus.SUCCEEDED and done.result == {"doubled": 42}
+    assert done.progress == {"stage": "working", "attempt": 2}
+
+    slow_job = queue.enqueue("test.slow", queue="test")
+    run = asyncio.create_task(worker.run(stop_when_idle=True))
+    while queue.get(slow_job.id).status != JobStatus.RUNNING:
+        await asyncio.sleep(0.01)
+    queue.cancel(slow_job.id)
+    await asyncio.wait_for(run, timeout=5)
+    assert queue.get(slow_job.id).status == JobStatus.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_cannot_overwrite_reclaimed_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), concurrency_caps={})
+
+    async def stalled(payload, ctx):
+        await asyncio.sleep(10)
+
+    register_handler("test.stalled", stalled)
+    job = queue.enqueue("test.stalled", queue="stall", max_attempts=3)
+    worker_a = JobWorker(["stall"], job_queue=queue, concurrency=1, poll_interval=0.01, lease_seconds=0.3)
+    run = asyncio.create_task(worker_a.run(stop_when_idle=True))
+    while queue.get(job.id).status != JobStatus.RUNNING:
+        await asyncio.sleep(0.01)
+
+    # Worker A macet, lease habis, worker B mengambil alih
+    reclaimed = None
+    while reclaimed is None:
+        queue._conn.execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job.id,))
+        reclaimed = queue.claim(["stall"], "worker-B", lease_seconds=60)
+    worker_a.stop()
+    await asyncio.wait_for(run, timeout=5)
+
+    current = queue.get(job.id)
+    assert current.status == JobStatus.RUNNING and current.worker_id == "worker-B"
+    assert not queue.complete(job.id, {"from": "A"}, worker_id=worker_a.worker_id)
+    assert queue.fail(job.id, "stale", worker_id=worker_a.worker_id) is None
+    assert not queue.set_progress(job.id, {"stage": "stale"}, worker_id=worker_a.worker_id)
+
+    assert queue.complete(job.id, {"from": "B"}, worker_id="worker-B")
+    assert queue.get(job.id).result == {"from": "B"}
+
+
+def test_db_path_does_not_depend_on_working_directory(tmp_path, monkeypatch):
+    default = resolve_job_db_path()
+    monkeypatch.chdir(tmp_path)
+    assert resolve_job_db_path() == default
+    assert resolve_job_db_path("backend/data/jobs.sqlite3") == default
+    assert default.endswith("backend/data/jobs.sqlite3") and default.startswith("/")
+    assert resolve_job_db_path(str(tmp_path / "q.sqlite3")) == str(tmp_path / "q.sqlite3")
@@ -0,0 +1,230 @@
+"""
+Knowledge Graph Search Index Tests
+
+Tests untuk inverted index:
+- Tokenization
+- BM25F ranking
+- Filters
+- Incremental updates
+- Persistence
+- Rebuild swap dan compaction
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.knowledge_graph.inverted_index import (
+    IndexRebuildInProgress,
+    InvertedIndex,
+    tokenize
+)
+
+
+# ============================================================================
+# Test Data
+# ============================================================================
+
+SAMPLE_DOCUMENTS = [
+    {
+        "id": "doc-perkawinan",
+        "title": "UU No. 1 Tahun 1974 tentang Perkawinan",
+        "summary": "Mengatur perkawinan dan perceraian",
+        "content": "Perceraian hanya dapat dilakukan di depan sidang pengadilan.",
+        "document_type": "law",
+        "domain": "keluarga"
+    },
+    {
+        "id": "doc-ketenagakerjaan",
+        "title": "UU No. 13 Tahun 2003 tentang Ketenagakerjaan",
+        "summary": "Hak pekerja, pesangon dan PHK",
+        "content": "Dalam hal terjadi PHK, pengusaha wajib membayar uang pesangon.",
+        "document_type": "law",
+        "domain": "ketenagakerjaan"
+    },
+    {
+        "id": "doc-pkwt",
+        "title": "PP No. 35 Tahun 2021 tentang PKWT",
+        "summary": "Perjanjian kerja waktu tertentu dan PHK",
+        "content": "Pesangon pekerja PKWT diatur dalam peraturan ini.",
+        "document_type": "regulation",
+        "domain": "ketenagakerjaan"
+    },
+]
+
+
+@pytest.fixture
+def index():
+    idx = InvertedIndex()
+    idx.add_documents(SAMPLE_DOCUMENTS)
+    return idx
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class TestInvertedIndex:
+    """Test inverted index"""
+
+    def test_tokenize_keeps_numbers_drops_stopwords(self):
+        """Test tokenizer"""
+        tokens = tokenize("Pasal 1 UU No. 13 Tahun 2003 tentang Ketenagakerjaan dan PHK")
+
+        assert "1" in tokens
+        assert "2003" in tokens
+        assert "ketenagakerjaan" in tokens
+        assert "dan" not in tokens
+
+    def test_search_ranks_title_match_first(self, index):
+        """Test BM25F ranking"""
+        results = index.search(["ketenagakerjaan"])
+
+        assert results[0][0] == "doc-ketenagakerjaan"
+
+    def test_search_matches_any_keyword(self, index):
+        """Keywords do not need to appear as one joined phrase"""
+        results = index.search(["pesangon", "perceraian"])
+        ids = {doc_id for doc_id, _ in results}
+
+        assert ids == {"doc-perkawinan", "doc-ketenagakerjaan", "doc-pkwt"}
+
+    def test_search_filters(self, index):
+        """Test document type and domain filters"""
+        results = index.search(["pesangon"], document_types=["regulation"])
+        assert [doc_id for doc_id, _ in results] == ["doc-pkwt"]
+
+        results = index.search(["uu"], domains=["keluarga"])
+        assert [doc_id for doc_id, _ in results] == ["doc-perkawinan"]
+
+    def test_search_limit(self, index):
+        """Test result limit"""
+        assert len(index.search(["pesangon", "perceraian"], limit=2)) == 2
+
+    def test_add_replaces_existing_document(self, index):
+        """Re-adding a document replaces its postings"""
+        index.add_document("doc-pkwt", title="Peraturan tentang Lingkungan Hidup")
+
+        assert len(index) == 3
+        assert "doc-pkwt" not in {doc_id for doc_id, _ in index.search(["pkwt"])}
+        assert index.search(["lingkungan"])[0][0] == "doc-pkwt"
+
+    def test_remove_document(self, index):
+        """Test removing a document"""
+        assert index.remove_document("doc-perkawinan") is True
+        assert index.remove_document("doc-perkawinan") is False
+
+        assert len(index) == 2
+        assert index.search(["perceraian"]) == []
+
+    def test_persistence_roundtrip(self, index, tmp_path):
+        """Test save and load"""
+        path = str(tmp_path / "legal_documents.idx")
+        index.save(path)
+
+        restored = InvertedIndex(index_path=path)
+
+        assert len(restored) == len(index)
+        assert restored.search(["pesangon"]) == index.search(["pesangon"])
+
+    def test_autosave(self, tmp_path):
+        """Incremental updates are persisted after autosave_every changes"""
+        path = str(tmp_path / "legal_documents.idx")
+        idx = InvertedIndex(index_path=path, autosave_every=2)
+
+        idx.add_documents(SAMPLE_DOCUMENTS[:2])
+
+        assert InvertedIndex(index_path=path).document_count == 2
+
+    def test_compaction_reclaims_tombstones(self):
+        """Slots of removed documents are compacted past the threshold"""
+        idx = InvertedIndex(compact_ratio=0.25, compact_min_tombstones=2)
+        idx.add_documents(SAMPLE_DOCUMENTS)
+        idx.add_document("doc-lain", title="Hukum Lingkungan Hidup")
+        expected = InvertedIndex()
+        expected.add_documents(SAMPLE_DOCUMENTS[1:])
+
+        idx.remove_document("doc-lain")
+        assert idx.tombstone_count == 1
+
+        idx.remove_document("doc-perkawinan")
+
+        assert idx.tombstone_count == 0
+        assert len(idx) == 2
+        assert idx.search(["pesangon", "pkwt"]) == expected.search(["pesangon", "pkwt"])
+        assert idx.search(["perceraian"]) == []
+
+        idx.add_document("doc-perkawinan", **{k: v for k, v in SAMPLE_DOCUMENTS[0].items() if k != "id"})
+        assert idx.search(["perceraian"])[0][0] == "doc-perkawinan"
+
+
+class FakeEdgeDBManager:
+    """EdgeDB manager yang mengembalikan LegalDocument secara bertahap"""
+
+    def __init__(self, documents, on_query=None):
+        self.documents = sorted(documents, key=lambda doc: doc.id)
+        self.on_query = on_query
+
+    async def query(self, query, after, limit):
+        await asyncio.sleep(0)
+        if self.on_query:
+            self.on_query()
+        return [doc for doc in self.documents if doc.id > after][:limit]
+
+
+def _edgedb_doc(doc):
+    return SimpleNamespace(**{k: doc.get(k) for k in ("id", "title", "summary", "content", "document_type", "domain")})
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_serving_and_swaps_atomically():
+    """Searches during a rebuild see the old index, never an empty one"""
+    idx = InvertedIndex()
+    idx.add_document("doc-lama", title="Ketenagakerjaan lama")
+
+    edgedb_docs = [_edgedb_doc(doc) for doc in SAMPLE_DOCUMENTS]
+    seen_during_build = []
+
+    def during_build():
+        seen_during_build.append([doc_id for doc_id, _ in idx.search(["ketenagakerjaan"])])
+
+    manager = FakeEdgeDBManager(edgedb_docs, on_query=during_build)
+
+    async def concurrent_updates():
+        await asyncio.sleep(0)
+        idx.add_document("doc-baru", title="Hak Cipta")
+        idx.remove_document("doc-pkwt")
+
+    indexed, _ = await asyncio.gather(idx.build_from_edgedb(manager, batch_size=1), concurrent_updates())
+
+    assert indexed == 3
+    assert all("doc-lama" in ids for ids in seen_during_build)
+    assert "doc-lama" not in idx
+    # Update selama rebuild tidak hilang saat swap
+    assert idx.search(["cipta"])[0][0] == "doc-baru"
+    assert "doc-pkwt" not in idx
+    assert len(idx) == 3
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rejects_concurrent_rebuild():
+    idx = InvertedIndex()
+    manager = FakeEdgeDBManager([_edgedb_doc(doc) for doc in SAMPLE_DOCUMENTS])
+
+    first = asyncio.ensure_future(idx.build_from_edgedb(manager, batch_size=1))
+    await asyncio.sleep(0)
+    with pytest.raises(IndexRebuildInProgress):
+        await idx.build_from_edgedb(manager)
+
+    assert await first == 3
+    assert len(idx) == 3
+
+
+def test_search_engine_keeps_injected_empty_index():
+    """Index kosong (len == 0) tetap dipakai, bukan diganti shared index"""
+    from backend.services.knowledge_graph.search_engine import KnowledgeGraphSearchEngine
+
+    empty = InvertedIndex()
+    engine = KnowledgeGraphSearchEngine(enable_ai_enhancement=False, search_index=empty)
+    assert engine.search_index is empty
@@ -0,0 +1,55 @@
+"""
+Tests for the trigram-profile LanguageDetector (batch API + LRU cache)
+"""
+
+from backend.services.translation.language_detector import (
+    LanguageDetector,
+    SupportedLanguage,
+    extract_trigrams,
+)
+
+
+MESSAGES = [
+    ("Saya mau tanya soal kontrak kerja yang belum dibayar", SupportedLanguage.INDONESIAN),
+    ("What are my rights if my employer fires me without notice?", SupportedLanguage.ENGLISH),
+    ("Kula badhe nyuwun pirsa babagan warisan simbah", SupportedLanguage.JAVANESE),
+    ("Abdi teu terang kedah kumaha ngurus perkawis ieu", SupportedLanguage.SUNDANESE),
+]
+
+
+def test_extract_trigrams_pads_words_and_skips_cross_word_grams():
+    grams = extract_trigrams("Hak  waris, 2024!")
+
+    assert grams[" ha"] == 1 and grams["ak "] == 1 and grams["ris"] == 1
+    assert all(gram[1] != " " for gram in grams)
+    assert extract_trigrams("2024 / 17") == {}
+
+
+def test_detect_batch_matches_single_detection():
+    detector = LanguageDetector(cache_size=0)
+    texts = [text for text, _ in MESSAGES] + ["", "12345", MESSAGES[0][0]]
+
+    batch = detector.detect_batch(texts)
+
+    assert [r.language for r in batch[:4]] == [language for _, language in MESSAGES]
+    assert batch[4].language == batch[5].language == SupportedLanguage.UNKNOWN
+    assert batch[6] is batch[0]  # duplicate di-score sekali
+    for text, result in zip(texts, batch):
+        assert detector.detect(text) == result
+        assert 0.0 <= result.confidence <= 1.0
+        assert all(isinstance(code, str) for code, _ in result.alternative_languages)
+
+
+def test_lru_cache_is_bounded_and_reused():
+    detector = LanguageDetector(cache_size=2)
+
+    first = detector.detect(MESSAGES[0][0])
+    assert detector.detect(MESSAGES[0][0]) is first
+
+    detector.detect(MESSAGES[1][0])
+    detector.detect(MESSAGES[2][0])
+    assert len(detector._cache) == 2
+    assert detector.detect(MESSAGES[0][0]) is not first  # sudah di-evict
+
+    detector.clear_cache()
+    assert len(detector._cache) == 0
@@ -0,0 +1,56 @@
+"""
+Tests for keyset (cursor) pagination helpers
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, insert, select
+
+from backend.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    keyset_order,
+    split_page
+)
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    when = datetime(2026, 3, 1, 9, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(when, "abc")) == (when, "abc")
+    assert decode_cursor(encode_cursor(None, 42)) == (None, "42")
+
+    for bad in ("bukan-cursor", encode_cursor(when, "x")[:-3], "e30"):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad)
+
+
+def test_keyset_pages_cover_all_rows_including_nulls():
+    metadata = MetaData()
+    sessions = Table("sessions", metadata, Column("id", Integer, primary_key=True), Column("last_at", DateTime))
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+
+    base = datetime(2026, 1, 1)
+    rows = [{"id": i, "last_at": None if i > 8 else base + timedelta(minutes=i // 3)} for i in range(1, 12)]
+    order = keyset_order(sessions.c.last_at, sessions.c.id)
+
+    with engine.begin() as conn:
+        conn.execute(insert(sessions), rows)
+        expected = [row.id for row in conn.execute(select(sessions).order_by(*order))]
+
+        seen, cursor = [], None
+        while True:
+            query = select(sessions).order_by(*order)
+            if cursor:
+                position = decode_cursor(cursor)
+                query = query.where(keyset_after(sessions.c.last_at, sessions.c.id, position.sort_value, int(position.last_id)))
+            page, cursor = split_page(conn.execute(query.limit(4)).all(), 3, "last_at")
+            seen.extend(row.id for row in page)
+            if cursor is None:
+                break
+
+    assert seen == expected
+    assert expected[-3:] == [11, 10, 9]
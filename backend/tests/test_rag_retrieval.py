@@ -0,0 +1,165 @@
+"""
+Tests for the local retrieval subsystem behind RAGService
+"""
+
+import numpy as np
+import pytest
+
+from backend.services.rag_service import RAGService
+from backend.services.retrieval import (
+    EmbedderMismatchError,
+    HashingEmbedder,
+    ReadOnlyIndexError,
+    RetrievalEngine,
+    StatuteChunker,
+    VectorIndex,
+    l2_normalize,
+)
+
+
+UU_TEXT = """UNDANG-UNDANG REPUBLIK INDONESIA
+NOMOR 13 TAHUN 2003
+TENTANG KETENAGAKERJAAN
+
+Menimbang: bahwa pembangunan ketenagakerjaan merupakan bagian integral dari pembangunan nasional.
+
+Pasal 1
+Dalam undang-undang ini yang dimaksud dengan pekerja/buruh adalah setiap orang yang bekerja dengan menerima upah.
+
+Pasal 156
+(1) Dalam hal terjadi pemutusan hubungan kerja, pengusaha diwajibkan membayar uang pesangon dan atau uang penghargaan masa kerja.
+(2) Perhitungan uang pesangon paling sedikit sebagai berikut: masa kerja kurang dari 1 tahun, 1 bulan upah.
+
+Pasal 79
+(1) Pengusaha wajib memberi waktu istirahat dan cuti kepada pekerja/buruh.
+(2) Cuti tahunan sekurang-kurangnya 12 hari kerja setelah pekerja bekerja 12 bulan secara terus menerus.
+"""
+
+
+def _random_unit(n, dim=32, seed=0):
+    return l2_normalize(np.random.default_rng(seed).standard_normal((n, dim)))
+
+
+def test_chunker_splits_pasal_and_ayat():
+    chunks = StatuteChunker().chunk(UU_TEXT, doc_id="uu-13-2003", domain="ketenagakerjaan")
+
+    labels = [c.label for c in chunks]
+    assert labels[0] == "UU No. 13 Tahun 2003"  # preamble
+    assert "UU No. 13 Tahun 2003 Pasal 156 ayat (2)" in labels
+    assert "UU No. 13 Tahun 2003 Pasal 1" in labels
+    assert all(c.year == 2003 and c.doc_type == "uu" for c in chunks)
+    assert len({c.chunk_id for c in chunks}) == len(chunks) == 6
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_ivf_matches_exact_with_filters_and_persistence(tmp_path, dtype):
+    vectors = _random_unit(3000)
+    payloads = [{"doc_id": f"d{i % 30}", "doc_type": "uu" if i % 3 else "pp", "domain": "pidana", "year": 1990 + i % 30}
+                for i in range(3000)]
+    index = VectorIndex(str(tmp_path), dim=32, dtype=dtype, train_threshold=1000, nprobe=64, exact_threshold=0)
+    index.add([f"c{i}" for i in range(3000)], vectors, payloads)
+    assert index.centroids is not None
+
+    query = vectors[42]
+    hits = index.search(query, k=5)
+    assert hits[0].chunk_id == "c42"
+    assert hits[0].score == pytest.approx(1.0, abs=0.02)
+
+    filtered = index.search(query, k=5, filters={"doc_type": "pp", "year_min": 2010})
+    assert filtered and all(h.payload["doc_type"] == "pp" and h.payload["year"] >= 2010 for h in filtered)
+    exact = index.search(query, k=5, filters={"doc_type": "pp", "year_min": 2010}, exact=True)
+    assert [h.chunk_id for h in filtered] == [h.chunk_id for h in exact]
+
+    assert index.delete(["c42"]) == 1
+    assert index.search(query, k=1)[0].chunk_id != "c42"
+    expected = [h.chunk_id for h in index.search(vectors[7], k=3)]
+    index.close()
+
+    reopened = VectorIndex(str(tmp_path))
+    assert reopened.size == 2999 and reopened.dtype == dtype
+    assert [h.chunk_id for h in reopened.search(vectors[7], k=3)] == expected
+    assert reopened.compact() == 1
+    assert reopened.search(vectors[7], k=1)[0].chunk_id == "c7"
+    reopened.close()
+
+
+def test_engine_upsert_and_document_replacement(tmp_path):
+    engine = RetrievalEngine(str(tmp_path), embedder=HashingEmbedder(dim=256))
+
+    assert engine.add_document(UU_TEXT, doc_id="uu-13-2003", domain="ketenagakerjaan") == 6
+    assert engine.add_document(UU_TEXT, doc_id="uu-13-2003", domain="ketenagakerjaan") == 0  # unchanged
+
+    hit = engine.search("berapa uang pesangon setelah pemutusan hubungan kerja", k=1)[0]
+    assert hit.payload["pasal"] == "156"
+
+    shorter = UU_TEXT.split("Pasal 79")[0]
+    assert engine.add_document(shorter, doc_id="uu-13-2003", domain="ketenagakerjaan") == 4
+    assert engine.index.size == 4
+    assert engine.search("cuti tahunan", k=5, filters={"domain": "pajak"}) == []
+    engine.close()
+
+
+class _RenamedEmbedder(HashingEmbedder):
+    """Same dim as HashingEmbedder(256) but a different model identity"""
+
+    def __init__(self):
+        super().__init__(dim=256, char_ngrams=4)
+        self.name = "other-model-256"
+
+
+def test_engine_reembeds_index_built_by_another_embedder(tmp_path):
+    engine = RetrievalEngine(str(tmp_path), embedder=HashingEmbedder(dim=256))
+    engine.add_document(UU_TEXT, doc_id="uu-13-2003", domain="ketenagakerjaan")
+    engine.close()
+
+    with pytest.raises(EmbedderMismatchError):
+        RetrievalEngine(str(tmp_path), embedder=_RenamedEmbedder(), on_embedder_mismatch="error").close()
+
+    engine = RetrievalEngine(str(tmp_path), embedder=_RenamedEmbedder())
+    assert engine.index.embedder == "other-model-256" and engine.index.size == 6
+    assert engine.search("berapa uang pesangon setelah pemutusan hubungan kerja", k=1)[0].payload["pasal"] == "156"
+    engine.close()
+    reopened = VectorIndex(str(tmp_path))
+    assert reopened.embedder == "other-model-256"
+    reopened.close()
+
+
+def test_second_process_opens_read_only_and_sees_flushed_writes(tmp_path):
+    writer = RetrievalEngine(str(tmp_path), embedder=HashingEmbedder(dim=256))
+    reader = RetrievalEngine(str(tmp_path), embedder=HashingEmbedder(dim=256))
+    assert not writer.index.read_only and reader.index.read_only
+
+    with pytest.raises(ReadOnlyIndexError):
+        reader.add_document(UU_TEXT, doc_id="uu-13-2003")
+    assert reader.search("cuti tahunan", k=1) == []
+
+    writer.add_document(UU_TEXT, doc_id="uu-13-2003", domain="ketenagakerjaan")
+    writer.flush()
+    assert reader.search("cuti tahunan 12 hari kerja", k=1)[0].payload["pasal"] == "79"
+
+    # index baru dengan embedder lain: reader menolak sampai writer re-embed
+    writer.close()
+    RetrievalEngine(str(tmp_path), embedder=_RenamedEmbedder()).close()
+    with pytest.raises(EmbedderMismatchError):
+        reader.search("cuti tahunan", k=1)
+    reader.close()
+
+
+@pytest.mark.asyncio
+async def test_rag_service_indexes_folder_incrementally(tmp_path):
+    docs = tmp_path / "docs" / "employment"
+    docs.mkdir(parents=True)
+    (docs / "uu_13_2003.txt").write_text(UU_TEXT, encoding="utf-8")
+
+    service = RAGService(str(tmp_path / "docs"), str(tmp_path / "index"), embedder=HashingEmbedder(dim=256))
+    await service.initialize()
+    assert service.initialized
+
+    results = await service.search_relevant_docs("cuti tahunan 12 hari kerja", top_k=2)
+    assert results[0]["document"] == "UU No. 13 Tahun 2003 Pasal 79 ayat (2)"
+    assert results[0]["domain"] == "employment"
+    assert "12 hari kerja" in await service.get_augmented_context("cuti tahunan 12 hari kerja")
+
+    (docs / "uu_13_2003.txt").unlink()
+    await service._load_legal_documents()
+    assert await service.search_relevant_docs("cuti tahunan") == []
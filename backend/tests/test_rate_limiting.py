@@ -0,0 +1,103 @@
+"""
+Rate Limiting Tests
+
+Tests untuk rate limiter:
+- Sliding window counter
+- Token bucket
+- Timer wheel expiry
+- Middleware headers & 429
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.middleware.rate_limiting import (
+    InMemoryRateLimitStore,
+    RateLimiter,
+    RateLimitMiddleware
+)
+
+
+class TestInMemoryStore:
+    """Test in-memory algorithms"""
+
+    def test_sliding_window_limits_and_reports_remaining(self):
+        """Requests beyond the limit are rejected within one window"""
+        store = InMemoryRateLimitStore(shards=4)
+        decisions = [store.sliding_window("ip", 3, 60, now=120.0 + i) for i in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+        assert decisions[-1].retry_after > 0
+
+    def test_sliding_window_weights_previous_window(self):
+        """Half way into the next window, half of the previous count still applies"""
+        store = InMemoryRateLimitStore()
+        for _ in range(4):
+            store.sliding_window("ip", 4, 60, now=60.0)
+
+        # 30s into next window: weighted = 4 * 0.5 = 2 -> two more allowed
+        decisions = [store.sliding_window("ip", 4, 60, now=150.0) for _ in range(3)]
+        assert [d.allowed for d in decisions] == [True, True, False]
+
+    def test_token_bucket_refills(self):
+        """Bucket refills at max_requests / window per second"""
+        store = InMemoryRateLimitStore()
+        assert all(store.token_bucket("ip", 2, 1.0, now=10.0).allowed for _ in range(2))
+        assert not store.token_bucket("ip", 2, 1.0, now=10.0).allowed
+        assert store.token_bucket("ip", 2, 1.0, now=11.0).allowed
+
+    def test_timer_wheel_expires_idle_keys(self):
+        """Idle identifiers are dropped without a full scan"""
+        store = InMemoryRateLimitStore(shards=1, wheel_slots=8)
+        store.sliding_window("idle", 10, 2, now=100.0)
+        store.sliding_window("active", 10, 2, now=100.0)
+        assert len(store) == 2
+
+        store.sliding_window("active", 10, 2, now=103.0)
+        store.sliding_window("active", 10, 2, now=105.0)
+        assert len(store) == 1
+
+
+class TestRateLimiter:
+    """Test limiter + middleware"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_hits_do_not_over_admit(self):
+        """Burst of concurrent requests admits exactly max_requests"""
+        limiter = RateLimiter()
+        results = await asyncio.gather(*[limiter.check_limit("burst", 10, 60) for _ in range(50)])
+
+        assert sum(results) == 10
+
+    @pytest.mark.asyncio
+    async def test_middleware_headers_and_429(self):
+        """Headers come from the same decision; over-limit gets 429 + Retry-After"""
+        app = FastAPI()
+
+        @app.get("/api/chat/ping")
+        async def ping():
+            return {"ok": True}
+
+        app.add_middleware(
+            RateLimitMiddleware,
+            route_limits=[("/api/chat/*", 2, 60, False)],
+            limiter=RateLimiter()
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/chat/ping")
+            second = await client.get("/api/chat/ping")
+            third = await client.get("/api/chat/ping")
+
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+        assert second.headers["X-RateLimit-Remaining"] == "0"
+        assert third.status_code == 429
+        assert int(third.headers["Retry-After"]) >= 1
+        assert third.json()["detail"]["limit"] == 2
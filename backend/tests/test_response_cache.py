@@ -0,0 +1,182 @@
+"""
+Consensus Response Cache Tests
+
+Tests untuk response cache:
+- Prompt normalization
+- Exact & near-duplicate tiers
+- TTL & LRU eviction
+- Consensus engine integration
+"""
+
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from backend.services.ai.consensus_engine import DualAIConsensusEngine
+from backend.services.ai.response_cache import (
+    InMemoryResponseCache,
+    ResponseCache,
+    make_cache_key,
+    normalize_prompt
+)
+
+
+MODEL_IDS = ["ark-model", "groq-model"]
+
+
+class FakeService:
+    """Counts calls instead of hitting a provider"""
+
+    def __init__(self, model_id: str, content: str):
+        self.model_id = model_id
+        self.content = content
+        self.calls = 0
+
+    async def chat_completion(self, messages, temperature, max_tokens):
+        self.calls += 1
+        return {
+            "choices": [{"message": {"content": self.content}, "finish_reason": "stop"}],
+            "usage": {"total_tokens": 150}
+        }
+
+
+class HashingEmbedder:
+    """Lexical test embedder: word unigrams/bigrams + char trigrams hashed into an L2-normalized vector"""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", normalize_prompt(text))
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[(value >> 1) % self.dim] += 1.0 if value & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+def _cache(**kwargs) -> ResponseCache:
+    return ResponseCache(InMemoryResponseCache(max_entries=kwargs.pop("max_entries", 100)), **kwargs)
+
+
+class TestResponseCache:
+    """Test response cache"""
+
+    def test_key_normalizes_prompt(self):
+        """Case, whitespace and trailing punctuation don't change the key"""
+        a = make_cache_key("Berapa pesangon PHK 5 tahun?", "sys", 0.7, MODEL_IDS)
+        b = make_cache_key("  berapa   pesangon phk 5 tahun ", "sys", 0.7, MODEL_IDS)
+
+        assert a == b
+        assert a != make_cache_key("Berapa pesangon PHK 5 tahun?", "sys", 0.3, MODEL_IDS)
+        assert make_cache_key("x", "sys", 0.7, MODEL_IDS, 256) != make_cache_key("x", "sys", 0.7, MODEL_IDS, 2048)
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_rejects_changed_numbers_and_negation(self):
+        """Lexically close prompts with different amounts, durations or negation never share an answer"""
+        with pytest.raises(ValueError):
+            ResponseCache(InMemoryResponseCache(), near_duplicate=True)
+        assert _cache().near_duplicate is False
+
+        cache = _cache(near_duplicate=True, embedder=HashingEmbedder(), similarity_threshold=0.92)
+        pairs = [
+            ("ancaman pidana penipuan 5 tahun penjara apakah bisa ditahan", "ancaman pidana penipuan 9 tahun penjara apakah bisa ditahan"),
+            ("berapa denda keterlambatan pembayaran sewa ruko menurut perjanjian sewa senilai 10 juta",
+             "berapa denda keterlambatan pembayaran sewa ruko menurut perjanjian sewa senilai 900 juta"),
+            ("apakah karyawan kontrak boleh di-PHK sepihak oleh perusahaan", "apakah karyawan kontrak tidak boleh di-PHK sepihak oleh perusahaan"),
+        ]
+        for cached, asked in pairs:
+            await cache.store(cached, "sys", 0.7, MODEL_IDS, {"answer": cached})
+            assert await cache.lookup(asked, "sys", 0.7, MODEL_IDS) is None
+
+        # Sanity: pasangan di atas memang di atas threshold, yang menolak adalah guard
+        assert all(float(cache.embedder(a) @ cache.embedder(b)) >= 0.92 for a, b in pairs)
+        hit = await cache.lookup("Berapa denda keterlambatan pembayaran sewa ruko sesuai perjanjian sewa senilai 10 juta?", "sys", 0.7, MODEL_IDS)
+        assert hit["value"] == {"answer": pairs[1][0]}
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_with_provenance(self):
+        """Stored value comes back with provenance and counters"""
+        cache = _cache(near_duplicate=False)
+        await cache.store("apa itu PKWT", None, 0.7, MODEL_IDS, {"answer": 1}, {"consensus_method": "x"})
+
+        hit = await cache.lookup("Apa itu PKWT?", None, 0.7, MODEL_IDS)
+
+        assert hit["tier"] == "exact"
+        assert hit["value"] == {"answer": 1}
+        assert hit["provenance"]["consensus_method"] == "x"
+        assert await cache.lookup("apa itu PKWTT", None, 0.7, MODEL_IDS) is None
+        assert cache.stats.exact_hits == 1 and cache.stats.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_hit(self):
+        """Reworded question hits the embedding tier within the same scope only"""
+        cache = _cache(near_duplicate=True, embedder=HashingEmbedder(), similarity_threshold=0.7)
+        await cache.store("berapa pesangon PHK setelah bekerja 5 tahun", "sys", 0.7, MODEL_IDS, {"answer": 1})
+
+        hit = await cache.lookup("berapa pesangon PHK setelah kerja 5 tahun", "sys", 0.7, MODEL_IDS)
+        assert hit["tier"] == "near_duplicate"
+        assert 0.7 <= hit["similarity"] < 1.0
+
+        assert await cache.lookup("berapa pesangon PHK setelah kerja 5 tahun", "other", 0.7, MODEL_IDS) is None
+        assert await cache.lookup("syarat cerai di pengadilan agama", "sys", 0.7, MODEL_IDS) is None
+
+    @pytest.mark.asyncio
+    async def test_embedder_failure_is_not_raised(self):
+        """A broken embedding model degrades to a miss on both lookup and store"""
+        def broken(text):
+            raise RuntimeError("model unavailable")
+
+        cache = _cache(near_duplicate=True, embedder=broken)
+        await cache.store("apa itu PKWT", None, 0.7, MODEL_IDS, {"answer": 1})
+        assert await cache.lookup("apa itu PKWT", None, 0.7, MODEL_IDS) is None
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Expired entries are not served"""
+        cache = _cache(ttl_seconds=0)
+        await cache.store("apa itu PKWT", None, 0.7, MODEL_IDS, {"answer": 1})
+
+        assert await cache.lookup("apa itu PKWT", None, 0.7, MODEL_IDS) is None
+        assert cache.stats.expirations >= 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Least recently used entry is evicted first"""
+        cache = _cache(max_entries=2, near_duplicate=False)
+        await cache.store("satu", None, 0.7, MODEL_IDS, {"n": 1})
+        await cache.store("dua", None, 0.7, MODEL_IDS, {"n": 2})
+        await cache.lookup("satu", None, 0.7, MODEL_IDS)
+        await cache.store("tiga", None, 0.7, MODEL_IDS, {"n": 3})
+
+        assert await cache.lookup("dua", None, 0.7, MODEL_IDS) is None
+        assert await cache.lookup("satu", None, 0.7, MODEL_IDS) is not None
+        assert cache.stats.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_consensus_engine_serves_repeat_from_cache(self):
+        """Second identical question makes no model calls"""
+        byteplus = FakeService("ark-model", "Pesangon dihitung berdasarkan masa kerja sesuai Pasal 156.")
+        groq = FakeService("groq-model", "Pesangon dihitung berdasarkan masa kerja sesuai Pasal 156.")
+        engine = DualAIConsensusEngine(byteplus, groq, response_cache=_cache())
+
+        first = await engine.get_consensus_response("Berapa pesangon PHK 5 tahun?")
+        second = await engine.get_consensus_response("berapa pesangon phk 5 tahun")
+
+        assert byteplus.calls == 1 and groq.calls == 1
+        assert not first.from_cache
+        assert second.from_cache and second.cache_info["tier"] == "exact"
+        assert second.final_content == first.final_content
+        assert "raw_response" not in second.byteplus_response.metadata
+
+        await engine.get_consensus_response("berapa pesangon phk 5 tahun", use_cache=False)
+        assert byteplus.calls == 2
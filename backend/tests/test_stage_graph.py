@@ -0,0 +1,108 @@
+"""
+Tests for the StageGraph pipeline executor
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.ai.stage_graph import Stage, StageGraph, StageMemo
+
+
+def _delayed(value, delay=0.05, calls=None):
+    async def stage(*args):
+        if calls is not None:
+            calls.append(args)
+        await asyncio.sleep(delay)
+        return value(*args) if callable(value) else value
+    return stage
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    graph = StageGraph([
+        Stage("findings", _delayed(lambda q: f"findings:{q}"), inputs=["query"]),
+        Stage("gaps", _delayed(lambda q, f: [f]), inputs=["query"], deps=["findings"]),
+        Stage("risk", _delayed(lambda q, f: {"risk": f}), inputs=["query"], deps=["findings"]),
+        Stage("opportunity", _delayed(lambda q, f: {"opp": f}), inputs=["query"], deps=["findings"]),
+        Stage("summary", _delayed(lambda g, r, o: len(g) + len(r) + len(o), delay=0),
+              deps=["gaps", "risk", "opportunity"]),
+    ])
+
+    run = await graph.run({"query": "phk"})
+
+    assert run.results["gaps"] == ["findings:phk"]
+    assert run.results["summary"] == 3
+    assert not run.partial
+    # 3 stage tengah paralel: ~2 x 50ms, bukan 4 x 50ms
+    assert run.total_ms < 170
+    trace = {entry["stage"]: entry for entry in run.trace}
+    assert [entry["stage"] for entry in run.trace] == ["findings", "gaps", "risk", "opportunity", "summary"]
+    assert trace["gaps"]["start_ms"] >= trace["findings"]["duration_ms"]
+    assert abs(trace["gaps"]["start_ms"] - trace["risk"]["start_ms"]) < 20
+
+
+@pytest.mark.asyncio
+async def test_timeout_uses_fallback_and_skips_dependents_without_one():
+    async def boom(q):
+        raise RuntimeError("provider down")
+
+    graph = StageGraph([
+        Stage("slow", _delayed("late", delay=1.0), inputs=["query"], timeout=0.05, fallback={"degraded": True}),
+        Stage("after_slow", _delayed(lambda s: s), deps=["slow"]),
+        Stage("broken", boom, inputs=["query"]),
+        Stage("after_broken", _delayed("never"), deps=["broken"]),
+    ])
+
+    run = await graph.run({"query": "x"})
+
+    assert run.partial
+    assert run.results == {"slow": {"degraded": True}, "after_slow": {"degraded": True}}
+    statuses = {entry["stage"]: entry["status"] for entry in run.trace}
+    assert statuses == {"slow": "timeout", "after_slow": "ok", "broken": "error", "after_broken": "skipped"}
+    assert run.errors["broken"] == "provider down"
+    assert run.to_metadata()["errors"]["slow"].startswith("timeout")
+
+
+@pytest.mark.asyncio
+async def test_memoization_by_input_hash():
+    calls = []
+    graph = StageGraph([
+        Stage("findings", _delayed(lambda q: q["question"].upper(), delay=0, calls=calls), inputs=["query"],
+              memoize=True),
+        Stage("fresh", _delayed(lambda q: q, delay=0, calls=calls), inputs=["query"]),  # default: tidak di-memoize
+    ], memo=StageMemo(max_entries=8))
+
+    first = await graph.run({"query": {"question": "waris"}})
+    second = await graph.run({"query": {"question": "waris"}})
+    other = await graph.run({"query": {"question": "cerai"}})
+
+    assert second.results == first.results
+    assert other.results["findings"] == "CERAI"
+    assert [entry["cached"] for entry in second.trace] == [True, False]
+    assert len(calls) == 5  # findings x2 (waris, cerai) + fresh x3
+    assert len(graph.memo) == 2
+
+
+@pytest.mark.asyncio
+async def test_fallback_factory_and_class_fallback_value():
+    async def boom(q):
+        raise RuntimeError("provider down")
+
+    graph = StageGraph([
+        Stage("factory", boom, inputs=["query"], fallback_factory=lambda exc: {"error": str(exc)}),
+        # class sebagai nilai fallback tidak dipanggil sebagai factory
+        Stage("value", boom, inputs=["query"], fallback=dict),
+    ])
+
+    run = await graph.run({"query": "x"})
+
+    assert run.results == {"factory": {"error": "provider down"}, "value": dict}
+
+
+def test_graph_validation():
+    noop = _delayed(None)
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", noop, deps=["missing"])])
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", noop, deps=["b"]), Stage("b", noop, deps=["a"])])
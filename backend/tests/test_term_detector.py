@@ -0,0 +1,92 @@
+"""
+Legal Term Detector Tests
+
+Tests untuk term detector:
+- Single-pass matching with word boundaries
+- Overlapping terms (hak / hak milik)
+- Hot reload dari data file
+"""
+
+import json
+import os
+
+import pytest
+
+from backend.services.term_detector import LegalTermDetector
+
+
+def _write_terms(path, terms):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "terms": terms}, f)
+
+
+@pytest.fixture
+def detector():
+    return LegalTermDetector()
+
+
+class TestLegalTermDetector:
+    """Test legal term detector"""
+
+    @pytest.mark.asyncio
+    async def test_detects_terms_with_word_boundaries(self, detector):
+        """PKWT does not match inside PKWTT, hakim is not hak"""
+        terms = await detector.detect_terms("Status PKWTT berbeda dengan PKWT, tanya hakim.")
+
+        assert [(t.term, t.start_pos) for t in terms] == [("PKWTT", 7), ("PKWT", 28)]
+
+    @pytest.mark.asyncio
+    async def test_case_and_whitespace_insensitive(self, detector):
+        """Multi-word terms match across any whitespace, any case"""
+        text = "Ini FORCE\n  majeure."
+        terms = await detector.detect_terms(text)
+
+        assert len(terms) == 1
+        assert terms[0].term == "Force Majeure"
+        assert text[terms[0].start_pos:terms[0].end_pos] == "FORCE\n  majeure"
+
+    @pytest.mark.asyncio
+    async def test_overlapping_terms_are_all_reported(self, detector):
+        """Shorter terms starting at the same position are still annotated"""
+        terms = await detector.detect_terms("Sertifikat hak guna bangunan")
+
+        assert [t.term for t in terms] == ["Sertifikat", "Hak", "Hak Guna Bangunan"]
+        assert terms[1].end_pos == 14 and terms[2].end_pos == 28
+
+    @pytest.mark.asyncio
+    async def test_annotate_text(self, detector):
+        """Annotation payload keeps its shape"""
+        result = await detector.annotate_text("Pekerja berhak atas pesangon.")
+
+        assert result["terms_count"] == 1
+        assert result["detected_terms"][0]["learn_more_url"] == "/sumber-daya/kamus/pesangon"
+
+    def test_get_term_by_slug(self, detector):
+        """Lookup works with URL slugs"""
+        assert detector.get_term("hak-guna-bangunan").term == "Hak Guna Bangunan"
+        assert detector.get_term("undang-undang").term == "Undang-Undang"
+
+    @pytest.mark.asyncio
+    async def test_hot_reload(self, tmp_path):
+        """Editing the data file swaps the dictionary"""
+        path = str(tmp_path / "terms.json")
+        _write_terms(path, [{"phrase": "somasi", "term": "Somasi"}])
+        detector = LegalTermDetector(terms_path=path, reload_interval=0)
+
+        assert [t.term for t in await detector.detect_terms("somasi dan gugatan")] == ["Somasi"]
+
+        _write_terms(path, [{"phrase": "gugatan", "term": "Gugatan"}])
+        os.utime(path, (1, 1))
+
+        assert [t.term for t in await detector.detect_terms("somasi dan gugatan")] == ["Gugatan"]
+
+    def test_bad_reload_keeps_previous_terms(self, tmp_path):
+        """Broken data file does not wipe the dictionary"""
+        path = tmp_path / "terms.json"
+        _write_terms(str(path), [{"phrase": "somasi", "term": "Somasi"}])
+        detector = LegalTermDetector(terms_path=str(path), reload_interval=0)
+
+        path.write_text("{not json")
+
+        assert detector.reload(force=True) is False
+        assert len(detector.terms) == 1
@@ -0,0 +1,34 @@
+"""
+Tests for span-based protected-term masking and token dictionary translation
+"""
+
+from backend.services.translation.text_spans import ProtectedTermMasker, tokenize, translate_tokens
+from backend.services.translation.translator import Translator
+
+
+def test_masker_masks_every_occurrence_and_round_trips():
+    masker = Translator().term_masker
+    text = "Menurut Pasal 5 UU No. 13 Tahun 2003, pasal 5 dan Pasal 5 berlaku; lihat KUHPerdata bukan KUHP."
+
+    masked, terms = masker.mask(text)
+
+    assert terms == ["Pasal 5", "UU No. 13 Tahun 2003", "pasal 5", "KUHPerdata", "KUHP"]
+    assert masked.count("__LEGAL_TERM_1__") == 2 and "Pasal" not in masked
+    assert masker.unmask(masked, terms) == text
+    assert masker.unmask("see __LEGAL_TERM_2__ and __LEGAL_TERM_9__", terms) == "see UU No. 13 Tahun 2003 and __LEGAL_TERM_9__"
+
+
+def test_masker_without_word_boundary_patterns():
+    masker = ProtectedTermMasker([r"\(\d+\)", r"Pasal\s+\d+"])
+    masked, terms = masker.mask("Pasal 2 (1) dan (2)")
+
+    assert masked == "__LEGAL_TERM_1__ __LEGAL_TERM_2__ dan __LEGAL_TERM_3__"
+    assert terms == ["Pasal 2", "(1)", "(2)"]
+
+
+def test_token_dictionary_keeps_spacing_and_punctuation():
+    tokens = tokenize("Hakim  memutuskan (pidana) undang-undang, __LEGAL_TERM_1__.")
+    assert "".join(tokens) == "Hakim  memutuskan (pidana) undang-undang, __LEGAL_TERM_1__."
+
+    dictionary = Translator().dictionaries["id_en"]
+    assert translate_tokens(tokens, dictionary) == "Judge  to decide (criminal) law, __LEGAL_TERM_1__."
@@ -0,0 +1,125 @@
+"""
+Tests for the Clerk JWKS / verified-token cache
+"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from backend.core import token_cache
+from backend.core.token_cache import (
+    ClerkTokenVerifier,
+    JWKSCache,
+    LastLoginThrottle,
+    VerifiedTokenCache,
+    get_request_principal
+)
+
+
+def _make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+def _token(private_key, kid, sub="user_1", exp_in=300):
+    claims = {"sub": sub, "exp": int(time.time()) + exp_in}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class CountingFetcher:
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"keys": self.keys}
+
+
+def test_verifier_caches_jwks_and_verified_claims(monkeypatch):
+    private_key, jwk = _make_key("k1")
+    fetcher = CountingFetcher(jwk)
+    verifier = ClerkTokenVerifier(JWKSCache(fetcher=fetcher), VerifiedTokenCache(max_size=2))
+
+    token = _token(private_key, "k1")
+    assert verifier.verify(token)["sub"] == "user_1"
+
+    decodes = []
+    monkeypatch.setattr(token_cache.jwt, "decode", lambda *a, **kw: decodes.append(a))
+    assert verifier.verify(token)["sub"] == "user_1"
+    assert decodes == [] and fetcher.calls == 1
+
+    # LRU bounded
+    monkeypatch.undo()
+    for sub in ("user_2", "user_3"):
+        verifier.verify(_token(private_key, "k1", sub=sub))
+    assert len(verifier.token_cache) == 2
+    assert fetcher.calls == 1
+
+
+def test_expired_and_tampered_tokens_are_rejected():
+    private_key, jwk = _make_key("k1")
+    verifier = ClerkTokenVerifier(JWKSCache(fetcher=CountingFetcher(jwk)))
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verifier.verify(_token(private_key, "k1", exp_in=-10))
+
+    other_key, _ = _make_key("k1")
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(_token(other_key, "k1"))
+
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        verifier.verify(jwt.encode({"sub": "x"}, "local-secret-key-for-hs256-tokens-in-tests", algorithm="HS256"))
+
+
+def test_kid_miss_refetches_with_throttle():
+    old_key, old_jwk = _make_key("old")
+    new_key, new_jwk = _make_key("new")
+    fetcher = CountingFetcher(old_jwk)
+    jwks = JWKSCache(fetcher=fetcher, min_refetch_interval=60)
+    verifier = ClerkTokenVerifier(jwks)
+
+    verifier.verify(_token(old_key, "old"))
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(_token(new_key, "unknown"))
+    assert fetcher.calls == 1  # dalam min interval: tidak refetch
+
+    # Key rotation: kid baru muncul di JWKS
+    fetcher.keys.append(new_jwk)
+    jwks._last_attempt -= 61
+    assert verifier.verify(_token(new_key, "new"))["sub"] == "user_1"
+    assert fetcher.calls == 2
+
+
+def test_request_principal_is_verified_once_per_request(monkeypatch):
+    private_key, jwk = _make_key("k1")
+    verifier = ClerkTokenVerifier(JWKSCache(fetcher=CountingFetcher(jwk)))
+    calls = []
+    monkeypatch.setattr(token_cache, "get_clerk_verifier", lambda: SimpleNamespace(
+        verify=lambda token: calls.append(token) or verifier.verify(token)
+    ))
+
+    request = SimpleNamespace(
+        headers={"Authorization": f"Bearer {_token(private_key, 'k1')}"},
+        state=SimpleNamespace()
+    )
+    assert get_request_principal(request)["sub"] == "user_1"
+    assert get_request_principal(request)["sub"] == "user_1"
+    assert len(calls) == 1
+
+    anonymous = SimpleNamespace(headers={}, state=SimpleNamespace())
+    assert get_request_principal(anonymous) is None
+
+
+def test_last_login_throttle():
+    throttle = LastLoginThrottle(interval=60)
+    assert throttle.should_write("u1") is True
+    assert throttle.should_write("u1") is False
+    assert throttle.should_write("u2") is True
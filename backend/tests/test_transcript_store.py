@@ -0,0 +1,31 @@
+"""
+Tests for bucketed transcript storage helpers
+"""
+
+from backend.services.transcript_store import bucket_id, estimate_tokens, select_tail, split_into_buckets
+
+
+def _messages(count, start=0):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"pesan {i}"} for i in range(start, start + count)]
+
+
+def test_split_into_buckets_spans_bucket_boundary():
+    buckets = split_into_buckets(49, _messages(2, start=49), bucket_size=50)
+
+    assert sorted(buckets) == [0, 1]
+    assert [m["n"] for m in buckets[0]] == [49]
+    assert [m["n"] for m in buckets[1]] == [50]
+    assert bucket_id("abc", 1) == "abc:000001"
+
+
+def test_select_tail_respects_message_limit_and_token_budget():
+    newest_first = list(reversed(_messages(10)))
+
+    tail = select_tail(newest_first, max_messages=4)
+    assert [m["content"] for m in tail] == ["pesan 6", "pesan 7", "pesan 8", "pesan 9"]
+
+    per_message = estimate_tokens("pesan 9")
+    tail = select_tail(newest_first, token_budget=per_message * 3)
+    assert [m["content"] for m in tail] == ["pesan 7", "pesan 8", "pesan 9"]
+
+    assert select_tail(newest_first) == _messages(10)
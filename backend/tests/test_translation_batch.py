@@ -0,0 +1,94 @@
+"""
+Tests for the async batch translation pipeline
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from backend.services.translation.translation_memory import TranslationMemory
+from backend.services.translation.translator import Translator, split_sentences
+
+
+class FakeModel:
+    """Echoes "EN(<segment>)" for every <<n>> marker, tracking concurrency"""
+
+    def __init__(self, delay: float = 0.01, drop: str = None):
+        self.delay = delay
+        self.drop = drop
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def get_chat_completion(self, messages, temperature=0.7, max_tokens=1024):
+        prompt = messages[-1]["content"]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+
+        segments = re.findall(r"^<<(\d+)>> (.*)$", prompt, re.MULTILINE)
+        if segments:
+            self.calls.append(len(segments))
+            lines = [f"<<{n}>> EN({text})" for n, text in segments if text != self.drop]
+            return {"response": "\n".join(lines)}
+        self.calls.append(1)
+        text = prompt.split("Text to translate:\n", 1)[1].rsplit("\n\nTranslation:", 1)[0]
+        return {"response": f"EN({text})"}
+
+
+def _translator(model: FakeModel) -> Translator:
+    translator = Translator()
+    translator.ai_client = model
+    translator.ai_available = True
+    return translator
+
+
+def test_split_sentences_keeps_citations_and_round_trips():
+    text = "Menurut UU No. 13 Tahun 2003 jo. Pasal 156 pekerja berhak. Pengusaha wajib membayar!\n\n(2) Upah dibayar tepat waktu."
+    pieces = split_sentences(text)
+
+    assert "".join(segment + separator for segment, separator in pieces) == text
+    assert [segment for segment, _ in pieces] == [
+        "Menurut UU No. 13 Tahun 2003 jo. Pasal 156 pekerja berhak.",
+        "Pengusaha wajib membayar!",
+        "(2) Upah dibayar tepat waktu.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_dedups_packs_and_bounds_concurrency(tmp_path):
+    clause = "Para pihak sepakat menyelesaikan sengketa secara musyawarah."
+    texts = [f"Pasal {i} berlaku. {clause} Kewajiban nomor {i} harus dipenuhi." for i in range(40)]
+    model = FakeModel()
+    memory = TranslationMemory(cache_file=str(tmp_path / "tm.json"))
+
+    results = await _translator(model).translate_batch_async(
+        texts, "id", "en", memory=memory, max_concurrency=3, segments_per_call=10
+    )
+
+    assert len(results) == 40 and all(r.translator_used == "ai" for r in results)
+    assert results[7].translated_text == f"EN(Pasal 7 berlaku.) EN({clause}) EN(Kewajiban nomor 7 harus dipenuhi.)"
+    assert "Pasal 7" in results[7].preserved_terms
+    assert sum(model.calls) == 81  # 40 + 1 shared clause + 40, never the duplicate
+    assert len(model.calls) == 9 and model.peak <= 3
+    assert memory.stats["total_entries"] == 81
+    assert len((tmp_path / "tm.json").read_text(encoding="utf-8").splitlines()) == 81
+
+    # Kedua kali semua segmen diambil dari translation memory
+    model.calls.clear()
+    again = await _translator(model).translate_batch_async(texts[:5], "id", "en", memory=memory)
+    assert model.calls == [] and all(r.translator_used == "cache" for r in again)
+    assert again[3].translated_text == results[3].translated_text
+
+
+@pytest.mark.asyncio
+async def test_segment_missing_from_multi_response_is_retried_alone():
+    model = FakeModel(drop="Hukum adalah aturan.")
+    results = await _translator(model).translate_batch_async(
+        ["Hakim memutuskan perkara. Hukum adalah aturan."], "id", "en"
+    )
+
+    assert model.calls == [2, 1]
+    assert results[0].translated_text == "EN(Hakim memutuskan perkara.) EN(Hukum adalah aturan.)"
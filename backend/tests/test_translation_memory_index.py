@@ -0,0 +1,75 @@
+"""
+Tests for the indexed TranslationMemory (trigram index + append-only log)
+"""
+
+import json
+
+from backend.services.translation.translation_memory import TranslationMemory, bounded_levenshtein
+
+
+SEGMENTS = [
+    "Setiap orang berhak atas pekerjaan dan penghidupan yang layak",
+    "Pengusaha wajib membayar upah lembur kepada pekerja",
+    "Pekerja berhak atas cuti tahunan sekurang-kurangnya 12 hari kerja",
+    "Perjanjian kerja dibuat secara tertulis atau lisan",
+    "Pemutusan hubungan kerja wajib dirundingkan terlebih dahulu",
+]
+
+
+def test_bounded_levenshtein_stops_at_budget():
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) == 3  # budget + 1
+    assert bounded_levenshtein("pasal 156", "pasal 156 ayat (2)", 20) == 9
+    assert bounded_levenshtein("", "abc", 5) == 3
+
+
+def test_fuzzy_lookup_uses_index_and_respects_threshold():
+    memory = TranslationMemory(ttl_days=0)
+    for i in range(300):
+        memory.add_translation(f"Pasal {i} mengatur ketentuan umum nomor {i}", f"Article {i}", "id", "en")
+    for segment in SEGMENTS:
+        memory.add_translation(segment, segment.upper(), "id", "en")
+
+    match = memory.get_translation("Pengusaha wajib membayar upah lembur kepada para pekerja", "id", "en")
+    assert match.source_text == SEGMENTS[1]
+    assert memory.stats["fuzzy_hits"] == 1
+
+    assert memory.get_translation("Pengusaha wajib membayar pajak", "id", "en") is None
+    similar = memory.find_similar("Pasal 12 mengatur ketentuan umum nomor 12", "id", "en", threshold=0.9, limit=3)
+    assert similar[0][0].translated_text == "Article 12" and similar[0][1] == 1.0
+    assert len(similar) == 3 and similar[1][1] >= similar[2][1] >= 0.9
+
+
+def test_append_only_log_and_compaction(tmp_path):
+    path = tmp_path / "tm.json"
+    memory = TranslationMemory(cache_file=str(path), max_entries=100)
+    for segment in SEGMENTS:
+        memory.add_translation(segment, segment.upper(), "id", "en")
+    memory.add_translation(SEGMENTS[0], "updated", "id", "en")
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 6 and json.loads(lines[-1])["translated_text"] == "updated"
+
+    reopened = TranslationMemory(cache_file=str(path), max_entries=100)
+    assert reopened.stats["total_entries"] == 5
+    assert reopened.get_translation(SEGMENTS[0], "id", "en").translated_text == "updated"
+
+    reopened.compact()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["format"] == "pasalku-tm" and len(lines) == 6
+
+
+def test_eviction_and_legacy_file(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    entries = [
+        {"source_text": s, "translated_text": s.upper(), "source_lang": "id", "target_lang": "en",
+         "timestamp": "2099-01-01T00:00:00", "usage_count": i, "quality": None, "confidence": None}
+        for i, s in enumerate(SEGMENTS)
+    ]
+    legacy.write_text(json.dumps({"cache": {"id_en": entries}, "stats": {"hits": 7}}, indent=2), encoding="utf-8")
+
+    memory = TranslationMemory(cache_file=str(legacy), max_entries=4)
+    assert memory.stats["hits"] == 7
+    assert memory.stats["total_entries"] == 3  # evicted down to 90% of max_entries
+    assert memory.get_translation(SEGMENTS[0], "id", "en") is None  # least used is gone
+    assert json.loads(legacy.read_text(encoding="utf-8").splitlines()[0])["format"] == "pasalku-tm"